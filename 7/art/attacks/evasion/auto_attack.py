@@ -21,7 +21,9 @@ This module implements the `AutoAttack` attack.
 | Paper link: https://arxiv.org/abs/2003.01690
 """
 import logging
-from typing import List, Optional, Union, Tuple, TYPE_CHECKING
+import multiprocessing
+import os
+from typing import Any, Dict, List, Optional, Union, Tuple, TYPE_CHECKING
 
 import numpy as np
 
@@ -39,6 +41,9 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# AutoAttack instance available to the worker processes of a parallel run
+_WORKER_AUTO_ATTACK: Optional["AutoAttack"] = None
+
 
 class AutoAttack(EvasionAttack):
     """
@@ -55,6 +60,8 @@ class AutoAttack(EvasionAttack):
         "batch_size",
         "estimator_orig",
         "targeted",
+        "parallel_pool_size",
+        "checkpoint_path",
     ]
 
     _estimator_requirements = (BaseEstimator, ClassifierMixin)
@@ -69,6 +76,8 @@ class AutoAttack(EvasionAttack):
         batch_size: int = 32,
         estimator_orig: Optional["CLASSIFIER_TYPE"] = None,
         targeted: bool = False,
+        parallel_pool_size: int = 0,
+        checkpoint_path: Optional[str] = None,
     ):
         """
         Create a :class:`.AutoAttack` instance.
@@ -83,6 +92,12 @@ class AutoAttack(EvasionAttack):
         :param estimator_orig: Original estimator to be attacked by adversarial examples.
         :param targeted: If False run only untargeted attacks, if True also run targeted attacks against each possible
                          target.
+        :param parallel_pool_size: Number of worker processes on which each attack step is run on shards of the still
+                                   robust samples. With 0 all attacks are run sequentially in the current process.
+        :param checkpoint_path: Path of a `.npz` file to which the adversarial examples, the robustness of each sample
+                                and the progress through the attack schedule are saved after every attack step. An
+                                existing checkpoint for the same inputs is resumed by `generate`; additional samples
+                                appended to these inputs are attacked from the beginning of the schedule.
         """
         super().__init__(estimator=estimator)
 
@@ -140,6 +155,8 @@ class AutoAttack(EvasionAttack):
             self.estimator_orig = estimator
 
         self._targeted = targeted
+        self.parallel_pool_size = parallel_pool_size
+        self.checkpoint_path = checkpoint_path
         self._check_params()
 
     def generate(self, x: np.ndarray, y: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
@@ -157,69 +174,164 @@ class AutoAttack(EvasionAttack):
         :type mask: `np.ndarray`
         :return: An array holding the adversarial examples.
         """
-        x_adv = x.astype(ART_NUMPY_DTYPE)
+        x = x.astype(ART_NUMPY_DTYPE)
+        x_adv = x.copy()
         if y is not None:
             y = check_and_transform_label_format(y, nb_classes=self.estimator.nb_classes)
 
-        if y is None:
-            y = get_labels_np_array(self.estimator.predict(x, batch_size=self.batch_size))
+        sample_is_robust = np.zeros(x.shape[0], dtype=bool)
+        progress = np.zeros(x.shape[0], dtype=int)
+
+        # Restore the samples of an earlier, possibly interrupted, run
+        nb_restored = 0
+        checkpoint = self._load_checkpoint(x, y)
+        if checkpoint is not None:
+            nb_restored = checkpoint["x"].shape[0]
+            x_adv[:nb_restored] = checkpoint["x_adv"]
+            sample_is_robust[:nb_restored] = checkpoint["sample_is_robust"]
+            progress[:nb_restored] = checkpoint["progress"]
+            if y is None and nb_restored == x.shape[0]:
+                y = checkpoint["y"]
+
+        # Determine labels and correctly predicted samples for all samples not restored from the checkpoint
+        if nb_restored < x.shape[0]:
+            x_new = x[nb_restored:]
+            y_pred = self.estimator_orig.predict(x_new, batch_size=self.batch_size)
+
+            if y is not None:
+                y_new = y[nb_restored:]
+            elif self.estimator_orig is self.estimator:
+                y_new = get_labels_np_array(y_pred)
+            else:
+                y_new = get_labels_np_array(self.estimator.predict(x_new, batch_size=self.batch_size))
+
+            if y is None:
+                y = y_new if checkpoint is None else np.concatenate([checkpoint["y"], y_new])
+
+            sample_is_robust[nb_restored:] = np.argmax(y_pred, axis=1) == np.argmax(y_new, axis=1)
+
+        # Labels for targeted attacks
+        y_t = np.array([range(y.shape[1])] * y.shape[0])
+        y_idx = np.argmax(y, axis=1)
+        y_idx = np.expand_dims(y_idx, 1)
+        y_t = y_t[y_t != y_idx]
+        targeted_labels = np.reshape(y_t, (y.shape[0], -1))
+
+        pool = None
+        if self.parallel_pool_size > 0:
+            pool = multiprocessing.Pool(self.parallel_pool_size, initializer=_init_worker, initargs=(self,))
+
+        try:
+            for step, (attack_index, target_index) in enumerate(self._schedule()):
+                # Attack only samples which are still robust and have not yet completed this step
+                sample_is_active = np.logical_and(sample_is_robust, progress <= step)
+
+                if np.any(sample_is_active):
+                    if target_index is None:
+                        y_step = y
+                    else:
+                        y_step = check_and_transform_label_format(
+                            targeted_labels[:, target_index], nb_classes=self.estimator.nb_classes
+                        )
 
-        # Determine correctly predicted samples
-        y_pred = self.estimator_orig.predict(x.astype(ART_NUMPY_DTYPE))
-        sample_is_robust = np.argmax(y_pred, axis=1) == np.argmax(y, axis=1)
+                    x_adv[sample_is_active], sample_is_robust[sample_is_active] = self._run_step(
+                        x=x_adv[sample_is_active],
+                        y=y_step[sample_is_active],
+                        attack_index=attack_index,
+                        targeted=target_index is not None,
+                        pool=pool,
+                        **kwargs,
+                    )
 
-        # Untargeted attacks
-        for attack in self.attacks:
+                progress[progress <= step] = step + 1
 
-            # Stop if all samples are misclassified
-            if np.sum(sample_is_robust) == 0:
-                break
+                if np.any(sample_is_active):
+                    self._save_checkpoint(x, y, x_adv, sample_is_robust, progress)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
-            if attack.targeted:
-                attack.set_params(targeted=False)
-
-            x_adv, sample_is_robust = self._run_attack(
-                x=x_adv,
-                y=y,
-                sample_is_robust=sample_is_robust,
-                attack=attack,
-                **kwargs,
-            )
+        self._save_checkpoint(x, y, x_adv, sample_is_robust, progress)
 
-        # Targeted attacks
-        if self.targeted:
-            # Labels for targeted attacks
-            y_t = np.array([range(y.shape[1])] * y.shape[0])
-            y_idx = np.argmax(y, axis=1)
-            y_idx = np.expand_dims(y_idx, 1)
-            y_t = y_t[y_t != y_idx]
-            targeted_labels = np.reshape(y_t, (y.shape[0], -1))
+        return x_adv
 
-            for attack in self.attacks:
+    def _schedule(self) -> List[Tuple[int, Optional[int]]]:
+        """
+        Create the schedule of attack steps, first all untargeted attacks followed by, if `targeted` is True, every
+        targeted attack against each possible target.
 
+        :return: A list of tuples of the index of the attack and the index of the target label, `None` for untargeted
+                 steps.
+        """
+        schedule: List[Tuple[int, Optional[int]]] = [(attack_index, None) for attack_index in range(len(self.attacks))]
+
+        if self.targeted:
+            for attack_index, attack in enumerate(self.attacks):
                 if attack.targeted is not None:
+                    schedule.extend((attack_index, i) for i in range(self.estimator.nb_classes - 1))
+
+        return schedule
+
+    def _run_step(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        attack_index: int,
+        targeted: bool,
+        pool: Optional[Any] = None,
+        **kwargs,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run one step of the attack schedule on robust samples, split into shards over the worker pool if provided.
+
+        :param x: An array of the robust inputs.
+        :param y: An array of the labels or target labels.
+        :param attack_index: Index of the attack in `attacks`.
+        :param targeted: Run the attack as targeted attack.
+        :param pool: Pool of worker processes.
+        :return: A tuple of the adversarial examples and the robustness of the samples.
+        """
+        if pool is None:
+            return self._run_scheduled_attack(x, y, attack_index, targeted, **kwargs)
 
-                    if not attack.targeted:
-                        attack.set_params(targeted=True)
+        shards = np.array_split(np.arange(x.shape[0]), min(self.parallel_pool_size, x.shape[0]))
+        results = pool.starmap(
+            _run_scheduled_attack_in_worker,
+            [(x[shard], y[shard], attack_index, targeted, kwargs) for shard in shards],
+        )
 
-                    for i in range(self.estimator.nb_classes - 1):
-                        # Stop if all samples are misclassified
-                        if np.sum(sample_is_robust) == 0:
-                            break
+        x_adv = np.concatenate([result[0] for result in results])
+        sample_is_robust = np.concatenate([result[1] for result in results])
 
-                        target = check_and_transform_label_format(
-                            targeted_labels[:, i], nb_classes=self.estimator.nb_classes
-                        )
+        return x_adv, sample_is_robust
 
-                        x_adv, sample_is_robust = self._run_attack(
-                            x=x_adv,
-                            y=target,
-                            sample_is_robust=sample_is_robust,
-                            attack=attack,
-                            **kwargs,
-                        )
+    def _run_scheduled_attack(
+        self, x: np.ndarray, y: np.ndarray, attack_index: int, targeted: bool, **kwargs
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Configure an attack of the schedule as targeted or untargeted and run it on robust samples.
 
-        return x_adv
+        :param x: An array of the robust inputs.
+        :param y: An array of the labels or target labels.
+        :param attack_index: Index of the attack in `attacks`.
+        :param targeted: Run the attack as targeted attack.
+        :return: A tuple of the adversarial examples and the robustness of the samples.
+        """
+        attack = self.attacks[attack_index]
+
+        if targeted and not attack.targeted:
+            attack.set_params(targeted=True)
+        elif not targeted and attack.targeted:
+            attack.set_params(targeted=False)
+
+        return self._run_attack(
+            x=x,
+            y=y,
+            sample_is_robust=np.ones(x.shape[0], dtype=bool),
+            attack=attack,
+            **kwargs,
+        )
 
     def _run_attack(
         self,
@@ -244,7 +356,6 @@ class AutoAttack(EvasionAttack):
 
         # Generate adversarial examples
         x_robust_adv = attack.generate(x=x_robust, y=y_robust, **kwargs)
-        y_pred_robust_adv = self.estimator_orig.predict(x_robust_adv)
 
         # Check and update successful examples
         rel_acc = 1e-4
@@ -253,12 +364,26 @@ class AutoAttack(EvasionAttack):
             (x_robust_adv - x_robust).reshape((x_robust_adv.shape[0], -1)), axis=1, ord=order
         ) <= self.eps
 
-        if attack.targeted:
-            samples_misclassified = np.argmax(y_pred_robust_adv, axis=1) == np.argmax(y_robust, axis=1)
-        elif not attack.targeted:
-            samples_misclassified = np.argmax(y_pred_robust_adv, axis=1) != np.argmax(y_robust, axis=1)
-        else:  # pragma: no cover
-            raise ValueError
+        # Samples left unchanged by the attack keep their correct prediction, only predict the modified samples
+        sample_is_modified = np.any((x_robust_adv != x_robust).reshape((x_robust_adv.shape[0], -1)), axis=1)
+        sample_is_candidate = np.logical_and(norm_is_smaller_eps, sample_is_modified)
+
+        samples_misclassified = np.zeros(x_robust.shape[0], dtype=bool)
+        if np.any(sample_is_candidate):
+            y_pred_candidate = self.estimator_orig.predict(
+                x_robust_adv[sample_is_candidate], batch_size=self.batch_size
+            )
+
+            if attack.targeted:
+                samples_misclassified[sample_is_candidate] = np.argmax(y_pred_candidate, axis=1) == np.argmax(
+                    y_robust[sample_is_candidate], axis=1
+                )
+            elif not attack.targeted:
+                samples_misclassified[sample_is_candidate] = np.argmax(y_pred_candidate, axis=1) != np.argmax(
+                    y_robust[sample_is_candidate], axis=1
+                )
+            else:  # pragma: no cover
+                raise ValueError
 
         sample_is_not_robust = np.logical_and(samples_misclassified, norm_is_smaller_eps)
 
@@ -281,3 +406,87 @@ class AutoAttack(EvasionAttack):
 
         if not isinstance(self.batch_size, int) or self.batch_size <= 0:
             raise ValueError("The argument batch_size has to be of type int and larger than zero.")
+
+        if not isinstance(self.parallel_pool_size, int) or self.parallel_pool_size < 0:
+            raise ValueError("The argument parallel_pool_size has to be of type int and larger than or equal to zero.")
+
+        if self.checkpoint_path is not None and not isinstance(self.checkpoint_path, str):
+            raise ValueError("The argument checkpoint_path has to be either of type str or None.")
+
+    def _load_checkpoint(self, x: np.ndarray, y: Optional[np.ndarray]) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Load the checkpoint of an earlier run if its samples are the leading samples of `x`.
+
+        :param x: An array with the original inputs.
+        :param y: An array of the labels or `None`.
+        :return: A dictionary with the arrays of the checkpoint or `None` if there is no matching checkpoint.
+        """
+        if self.checkpoint_path is None or not os.path.isfile(self.checkpoint_path):
+            return None
+
+        with np.load(self.checkpoint_path) as data:
+            checkpoint = {key: data[key] for key in data.files}
+
+        nb_restored = checkpoint["x"].shape[0]
+        if (
+            nb_restored > x.shape[0]
+            or not np.array_equal(checkpoint["x"], x[:nb_restored])
+            or (y is not None and not np.array_equal(checkpoint["y"], y[:nb_restored]))
+        ):
+            logger.warning(
+                "The checkpoint %s does not match the provided samples and is ignored.", self.checkpoint_path
+            )
+            return None
+
+        logger.info("Restored %d samples from checkpoint %s.", nb_restored, self.checkpoint_path)
+
+        return checkpoint
+
+    def _save_checkpoint(
+        self, x: np.ndarray, y: np.ndarray, x_adv: np.ndarray, sample_is_robust: np.ndarray, progress: np.ndarray
+    ) -> None:
+        """
+        Save the current state of the attack to `checkpoint_path`.
+
+        :param x: An array with the original inputs.
+        :param y: An array of the labels.
+        :param x_adv: An array with the adversarial examples.
+        :param sample_is_robust: An array with the robustness of the samples.
+        :param progress: An array with the number of completed steps of the schedule for each sample.
+        """
+        if self.checkpoint_path is None:
+            return
+
+        # Write to a temporary file first to not corrupt the checkpoint if interrupted
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            np.savez(file, x=x, y=y, x_adv=x_adv, sample_is_robust=sample_is_robust, progress=progress)
+        os.replace(tmp_path, self.checkpoint_path)
+
+
+def _init_worker(auto_attack: AutoAttack) -> None:
+    """
+    Store the `AutoAttack` instance in a worker process of a parallel run.
+
+    :param auto_attack: The `AutoAttack` instance.
+    """
+    global _WORKER_AUTO_ATTACK  # pylint: disable=W0603
+    _WORKER_AUTO_ATTACK = auto_attack
+
+
+def _run_scheduled_attack_in_worker(
+    x: np.ndarray, y: np.ndarray, attack_index: int, targeted: bool, kwargs: Dict[str, Any]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run an attack step of the schedule on a shard of the robust samples in a worker process.
+
+    :param x: An array of the robust inputs of the shard.
+    :param y: An array of the labels or target labels of the shard.
+    :param attack_index: Index of the attack in `attacks`.
+    :param targeted: Run the attack as targeted attack.
+    :param kwargs: Additional arguments of `generate`.
+    :return: A tuple of the adversarial examples and the robustness of the samples.
+    """
+    if _WORKER_AUTO_ATTACK is None:  # pragma: no cover
+        raise ValueError("The worker process has not been initialised.")
+    return _WORKER_AUTO_ATTACK._run_scheduled_attack(x, y, attack_index, targeted, **kwargs)  # pylint: disable=W0212
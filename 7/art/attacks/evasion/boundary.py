@@ -24,7 +24,7 @@ predictions.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
-from typing import Optional, Tuple, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
 from tqdm.auto import tqdm, trange
@@ -33,7 +33,14 @@ from art.attacks.attack import EvasionAttack
 from art.config import ART_NUMPY_DTYPE
 from art.estimators.estimator import BaseEstimator
 from art.estimators.classification.classifier import ClassifierMixin
-from art.utils import compute_success, to_categorical, check_and_transform_label_format, get_labels_np_array
+from art.utils import (
+    compute_success,
+    to_categorical,
+    check_and_transform_label_format,
+    get_labels_np_array,
+    expand_per_sample,
+    per_sample_random_states,
+)
 
 if TYPE_CHECKING:
     from art.utils import CLASSIFIER_TYPE
@@ -132,6 +139,7 @@ class BoundaryAttack(EvasionAttack):
             y = get_labels_np_array(self.estimator.predict(x, batch_size=self.batch_size))  # type: ignore
 
         y = check_and_transform_label_format(y, nb_classes=self.estimator.nb_classes, return_one_hot=False)
+        y = np.reshape(y, -1)
 
         # Get clip_min and clip_max from the classifier or infer them from data
         if self.estimator.clip_values is not None:
@@ -148,8 +156,7 @@ class BoundaryAttack(EvasionAttack):
         if x_adv_init is not None:
             init_preds = np.argmax(self.estimator.predict(x_adv_init, batch_size=self.batch_size), axis=1)
         else:
-            init_preds = [None] * len(x)
-            x_adv_init = [None] * len(x)
+            init_preds = None
 
         # Assert that, if attack is targeted, y is provided
         if self.targeted and y is None:  # pragma: no cover
@@ -158,28 +165,22 @@ class BoundaryAttack(EvasionAttack):
         # Some initial setups
         x_adv = x.astype(ART_NUMPY_DTYPE)
 
-        # Generate the adversarial samples
-        for ind, val in enumerate(tqdm(x_adv, desc="Boundary attack", disable=not self.verbose)):
-            if self.targeted:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=y[ind],
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
-            else:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=-1,
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
+        # The random initialisation and the orthogonal perturbations of a sample do not depend on its batch
+        rngs = per_sample_random_states(x.shape[0])
+
+        # Generate the adversarial samples, attacking batches of samples together
+        for begin in tqdm(range(0, x.shape[0], self.batch_size), desc="Boundary attack", disable=not self.verbose):
+            end = min(begin + self.batch_size, x.shape[0])
+            x_adv[begin:end] = self._perturb(
+                x=x_adv[begin:end],
+                y=y[begin:end],
+                y_p=preds[begin:end],
+                init_pred=None if init_preds is None else init_preds[begin:end],
+                adv_init=None if x_adv_init is None else x_adv_init[begin:end],
+                rngs=rngs[begin:end],
+                clip_min=clip_min,
+                clip_max=clip_max,
+            )
 
         y = to_categorical(y, self.estimator.nb_classes)
 
@@ -193,43 +194,48 @@ class BoundaryAttack(EvasionAttack):
     def _perturb(
         self,
         x: np.ndarray,
-        y: int,
-        y_p: int,
-        init_pred: int,
-        adv_init: np.ndarray,
+        y: np.ndarray,
+        y_p: np.ndarray,
+        init_pred: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
+        rngs: List[np.random.RandomState],
         clip_min: float,
         clip_max: float,
     ) -> np.ndarray:
         """
-        Internal attack function for one example.
+        Internal attack function for a batch of examples.
 
-        :param x: An array with one original input to be attacked.
-        :param y: If `self.targeted` is true, then `y` represents the target label.
-        :param y_p: The predicted label of x.
-        :param init_pred: The predicted label of the initial image.
-        :param adv_init: Initial array to act as an initial adversarial example.
+        :param x: An array with the original inputs to be attacked.
+        :param y: If `self.targeted` is true, then `y` represents the target labels.
+        :param y_p: The predicted labels of x.
+        :param init_pred: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
+        :param rngs: The random generator of each example.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: An adversarial example.
+        :return: The adversarial examples.
         """
-        # First, create an initial adversarial sample
-        initial_sample = self._init_sample(x, y, y_p, init_pred, adv_init, clip_min, clip_max)
+        # First, create initial adversarial samples
+        initial_sample, sample_is_initialised = self._init_sample(
+            x, y, y_p, init_pred, adv_init, rngs, clip_min, clip_max
+        )
 
         # If an initial adversarial example is not found, then return the original image
-        if initial_sample is None:
-            return x
+        x_adv = x.copy()
 
         # If an initial adversarial example found, then go with boundary attack
-        x_adv = self._attack(
-            initial_sample[0],
-            x,
-            y_p,
-            initial_sample[1],
-            self.delta,
-            self.epsilon,
-            clip_min,
-            clip_max,
-        )
+        if np.any(sample_is_initialised):
+            x_adv[sample_is_initialised] = self._attack(
+                initial_sample[sample_is_initialised],
+                x[sample_is_initialised],
+                y_p[sample_is_initialised],
+                y[sample_is_initialised],
+                self.delta,
+                self.epsilon,
+                [rngs[i] for i in np.where(sample_is_initialised)[0]],
+                clip_min,
+                clip_max,
+            )
 
         return x_adv
 
@@ -237,218 +243,295 @@ class BoundaryAttack(EvasionAttack):
         self,
         initial_sample: np.ndarray,
         original_sample: np.ndarray,
-        y_p: int,
-        target: int,
+        y_p: np.ndarray,
+        target: np.ndarray,
         initial_delta: float,
         initial_epsilon: float,
+        rngs: List[np.random.RandomState],
         clip_min: float,
         clip_max: float,
     ) -> np.ndarray:
         """
-        Main function for the boundary attack.
+        Main function for the boundary attack. All examples are advanced together, the proposals of all examples of a
+        trial are classified in one prediction call and the step sizes are adapted for each example.
 
-        :param initial_sample: An initial adversarial example.
-        :param original_sample: The original input.
-        :param y_p: The predicted label of the original input.
-        :param target: The target label.
+        :param initial_sample: Initial adversarial examples.
+        :param original_sample: The original inputs.
+        :param y_p: The predicted labels of the original inputs.
+        :param target: The target labels.
         :param initial_delta: Initial step size for the orthogonal step.
         :param initial_epsilon: Initial step size for the step towards the target.
+        :param rngs: The random generator of each example.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: an adversarial example.
+        :return: The adversarial examples.
         """
         # Get initialization for some variables
-        x_adv = initial_sample
-        self.curr_delta = initial_delta
-        self.curr_epsilon = initial_epsilon
+        x_adv = initial_sample.copy()
+        self.curr_delta = np.full(x_adv.shape[0], initial_delta)
+        self.curr_epsilon = np.full(x_adv.shape[0], initial_epsilon)
+        sample_is_active = np.ones(x_adv.shape[0], dtype=bool)
 
         self.curr_adv = x_adv
 
         # Main loop to wander around the boundary
         for _ in trange(self.max_iter, desc="Boundary attack - iterations", disable=not self.verbose):
+            active_idx = np.where(sample_is_active)[0]
+            if active_idx.size == 0:
+                break
+
             # Trust region method to adjust delta
+            x_advs = np.zeros((active_idx.size, self.sample_size) + x_adv.shape[1:], dtype=x_adv.dtype)
+            x_advs_satisfied = np.zeros((active_idx.size, self.sample_size), dtype=bool)
+            sample_is_searching = np.ones(active_idx.size, dtype=bool)
+
             for _ in range(self.num_trial):
-                potential_advs = []
-                for _ in range(self.sample_size):
-                    potential_adv = x_adv + self._orthogonal_perturb(self.curr_delta, x_adv, original_sample)
-                    potential_adv = np.clip(potential_adv, clip_min, clip_max)
-                    potential_advs.append(potential_adv)
-
-                preds = np.argmax(
-                    self.estimator.predict(np.array(potential_advs), batch_size=self.batch_size),
-                    axis=1,
+                search_idx = np.where(sample_is_searching)[0]
+                if search_idx.size == 0:
+                    break
+                sample_idx = active_idx[search_idx]
+
+                potential_advs = x_adv[sample_idx, None] + self._orthogonal_perturb(
+                    self.curr_delta[sample_idx],
+                    x_adv[sample_idx],
+                    original_sample[sample_idx],
+                    [rngs[i] for i in sample_idx],
                 )
+                potential_advs = np.clip(potential_advs, clip_min, clip_max)
 
-                if self.targeted:
-                    satisfied = preds == target
-                else:
-                    satisfied = preds != y_p
+                satisfied = self._adversarial_satisfactory(
+                    potential_advs.reshape((-1,) + x_adv.shape[1:]),
+                    np.repeat(y_p[sample_idx], self.sample_size),
+                    np.repeat(target[sample_idx], self.sample_size),
+                ).reshape((search_idx.size, self.sample_size))
 
-                delta_ratio = np.mean(satisfied)
+                delta_ratio = np.mean(satisfied, axis=1)
+                self.curr_delta[sample_idx] = self._adapt_step(self.curr_delta[sample_idx], delta_ratio)
 
-                if delta_ratio < 0.2:
-                    self.curr_delta *= self.step_adapt
-                elif delta_ratio > 0.5:
-                    self.curr_delta /= self.step_adapt
+                is_found = delta_ratio > 0
+                x_advs[search_idx[is_found]] = potential_advs[is_found]
+                x_advs_satisfied[search_idx[is_found]] = satisfied[is_found]
+                sample_is_searching[search_idx[is_found]] = False
 
-                if delta_ratio > 0:
-                    x_advs = np.array(potential_advs)[np.where(satisfied)[0]]
-                    break
-            else:  # pragma: no cover
+            if np.any(sample_is_searching):  # pragma: no cover
                 logger.warning("Adversarial example found but not optimal.")
-                return x_adv
+                sample_is_active[active_idx[sample_is_searching]] = False
 
             # Trust region method to adjust epsilon
+            found_idx = np.where(np.invert(sample_is_searching))[0]
+            x_advs = x_advs[found_idx]
+            x_advs_satisfied = x_advs_satisfied[found_idx]
+            active_idx = active_idx[found_idx]
+            sample_is_searching = np.ones(active_idx.size, dtype=bool)
+
             for _ in range(self.num_trial):
-                perturb = np.repeat(np.array([original_sample]), len(x_advs), axis=0) - x_advs
-                perturb *= self.curr_epsilon
-                potential_advs = x_advs + perturb
+                search_idx = np.where(sample_is_searching)[0]
+                if search_idx.size == 0:
+                    break
+                sample_idx = active_idx[search_idx]
+
+                perturb = original_sample[sample_idx, None] - x_advs[search_idx]
+                perturb *= expand_per_sample(self.curr_epsilon[sample_idx], perturb)
+                potential_advs = x_advs[search_idx] + perturb
                 potential_advs = np.clip(potential_advs, clip_min, clip_max)
-                preds = np.argmax(
-                    self.estimator.predict(potential_advs, batch_size=self.batch_size),
-                    axis=1,
-                )
 
-                if self.targeted:
-                    satisfied = preds == target
-                else:
-                    satisfied = preds != y_p
+                # Only classify the proposals which have been adversarial after the orthogonal step
+                is_proposal = x_advs_satisfied[search_idx]
+                satisfied = np.zeros(is_proposal.shape, dtype=bool)
+                satisfied[is_proposal] = self._adversarial_satisfactory(
+                    potential_advs[is_proposal],
+                    np.repeat(y_p[sample_idx], np.sum(is_proposal, axis=1)),
+                    np.repeat(target[sample_idx], np.sum(is_proposal, axis=1)),
+                )
 
-                epsilon_ratio = np.mean(satisfied)
+                epsilon_ratio = np.sum(satisfied, axis=1) / np.sum(is_proposal, axis=1)
+                self.curr_epsilon[sample_idx] = self._adapt_step(self.curr_epsilon[sample_idx], epsilon_ratio)
 
-                if epsilon_ratio < 0.2:
-                    self.curr_epsilon *= self.step_adapt
-                elif epsilon_ratio > 0.5:
-                    self.curr_epsilon /= self.step_adapt
+                is_found = epsilon_ratio > 0
+                if np.any(is_found):
+                    x_adv[sample_idx[is_found]] = self._best_adv(
+                        original_sample[sample_idx[is_found]], potential_advs[is_found], satisfied[is_found]
+                    )
+                    sample_is_searching[search_idx[is_found]] = False
 
-                if epsilon_ratio > 0:
-                    x_adv = self._best_adv(original_sample, potential_advs[np.where(satisfied)[0]])
-                    self.curr_adv = x_adv
-                    break
-            else:  # pragma: no cover
+            if np.any(sample_is_searching):  # pragma: no cover
                 logger.warning("Adversarial example found but not optimal.")
-                return self._best_adv(original_sample, x_advs)
+                x_adv[active_idx[sample_is_searching]] = self._best_adv(
+                    original_sample[active_idx[sample_is_searching]],
+                    x_advs[sample_is_searching],
+                    x_advs_satisfied[sample_is_searching],
+                )
+                sample_is_active[active_idx[sample_is_searching]] = False
 
-            if self.curr_epsilon < self.min_epsilon:
-                return x_adv
+            self.curr_adv = x_adv
+
+            sample_is_active[self.curr_epsilon < self.min_epsilon] = False
 
         return x_adv
 
-    def _orthogonal_perturb(self, delta: float, current_sample: np.ndarray, original_sample: np.ndarray) -> np.ndarray:
+    def _adapt_step(self, step: np.ndarray, ratio: np.ndarray) -> np.ndarray:
         """
-        Create an orthogonal perturbation.
+        Adapt the step sizes of the examples to the ratios of successful proposals.
 
-        :param delta: Initial step size for the orthogonal step.
-        :param current_sample: Current adversarial example.
-        :param original_sample: The original input.
-        :return: a possible perturbation.
+        :param step: The current step size of each example.
+        :param ratio: The ratio of successful proposals of each example.
+        :return: The adapted step sizes.
+        """
+        step = np.where(ratio < 0.2, step * self.step_adapt, step)
+        step = np.where(ratio > 0.5, step / self.step_adapt, step)
+        return step
+
+    def _adversarial_satisfactory(self, samples: np.ndarray, y_p: np.ndarray, target: np.ndarray) -> np.ndarray:
+        """
+        Check whether images are adversarial.
+
+        :param samples: A batch of examples.
+        :param y_p: The predicted label of the original input of each example.
+        :param target: The target label of each example.
+        :return: A boolean array.
         """
+        preds = np.argmax(self.estimator.predict(samples, batch_size=self.batch_size), axis=1)
+
+        if self.targeted:
+            return preds == target
+
+        return preds != y_p
+
+    def _orthogonal_perturb(
+        self,
+        delta: np.ndarray,
+        current_sample: np.ndarray,
+        original_sample: np.ndarray,
+        rngs: List[np.random.RandomState],
+    ) -> np.ndarray:
+        """
+        Create `sample_size` orthogonal perturbations for each example.
+
+        :param delta: Current step size for the orthogonal step of each example.
+        :param current_sample: Current adversarial examples.
+        :param original_sample: The original inputs.
+        :param rngs: The random generator of each example.
+        :return: Possible perturbations of shape `(nb_samples, sample_size) + input_shape`.
+        """
+        nb_samples = current_sample.shape[0]
+
         # Generate perturbation randomly
-        perturb = np.random.randn(*self.estimator.input_shape).astype(ART_NUMPY_DTYPE)
+        perturb = np.array([rng.randn(self.sample_size, *self.estimator.input_shape) for rng in rngs])
+        perturb = perturb.astype(ART_NUMPY_DTYPE).reshape((nb_samples, self.sample_size, -1))
 
         # Rescale the perturbation
-        perturb /= np.linalg.norm(perturb)
-        perturb *= delta * np.linalg.norm(original_sample - current_sample)
+        direction = (original_sample - current_sample).reshape((nb_samples, -1))
+        perturb /= np.linalg.norm(perturb, axis=2, keepdims=True)
+        perturb *= (delta * np.linalg.norm(direction, axis=1)).astype(ART_NUMPY_DTYPE)[:, None, None]
 
         # Project the perturbation onto sphere
-        direction = original_sample - current_sample
-
-        direction_flat = direction.flatten()
-        perturb_flat = perturb.flatten()
+        direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+        perturb -= np.einsum("ijk,ik->ij", perturb, direction)[:, :, None] * direction[:, None, :]
+        perturb = perturb.reshape((nb_samples, self.sample_size) + current_sample.shape[1:])
 
-        direction_flat /= np.linalg.norm(direction_flat)
-        perturb_flat -= np.dot(perturb_flat, direction_flat.T) * direction_flat
-        perturb = perturb_flat.reshape(self.estimator.input_shape)
-
-        hypotenuse = np.sqrt(1 + delta ** 2)
-        perturb = ((1 - hypotenuse) * (current_sample - original_sample) + perturb) / hypotenuse
+        hypotenuse = expand_per_sample(np.sqrt(1 + delta**2), perturb)
+        perturb = ((1 - hypotenuse) * (current_sample - original_sample)[:, None] + perturb) / hypotenuse
         return perturb
 
     def _init_sample(
         self,
         x: np.ndarray,
-        y: int,
-        y_p: int,
-        init_pred: int,
-        adv_init: np.ndarray,
+        y: np.ndarray,
+        y_p: np.ndarray,
+        init_pred: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
+        rngs: List[np.random.RandomState],
         clip_min: float,
         clip_max: float,
-    ) -> Optional[Tuple[np.ndarray, int]]:
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Find initial adversarial example for the attack.
+        Find initial adversarial examples for the attack. The random images of all examples are classified together.
 
-        :param x: An array with one original input to be attacked.
-        :param y: If `self.targeted` is true, then `y` represents the target label.
-        :param y_p: The predicted label of x.
-        :param init_pred: The predicted label of the initial image.
-        :param adv_init: Initial array to act as an initial adversarial example.
+        :param x: An array with the original inputs to be attacked.
+        :param y: If `self.targeted` is true, then `y` represents the target labels.
+        :param y_p: The predicted labels of x.
+        :param init_pred: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
+        :param rngs: The random generator of each example.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: an adversarial example.
+        :return: A tuple of the initial adversarial examples and a boolean array indicating for which examples an
+                 initial adversarial example has been found.
         """
-        nprd = np.random.RandomState()
-        initial_sample = None
+        initial_sample = x.copy()
+        sample_is_initialised = np.zeros(x.shape[0], dtype=bool)
 
         if self.targeted:
             # Attack satisfied
-            if y == y_p:
-                return None
+            sample_is_searched = y != y_p
 
             # Attack unsatisfied yet and the initial image satisfied
-            if adv_init is not None and init_pred == y:
-                return adv_init.astype(ART_NUMPY_DTYPE), init_pred
+            if adv_init is not None and init_pred is not None:
+                sample_is_initialised = np.logical_and(sample_is_searched, init_pred == y)
+        else:
+            sample_is_searched = np.ones(x.shape[0], dtype=bool)
 
-            # Attack unsatisfied yet and the initial image unsatisfied
-            for _ in range(self.init_size):
-                random_img = nprd.uniform(clip_min, clip_max, size=x.shape).astype(x.dtype)
-                random_class = np.argmax(
-                    self.estimator.predict(np.array([random_img]), batch_size=self.batch_size),
-                    axis=1,
-                )[0]
+            # The initial image satisfied
+            if adv_init is not None and init_pred is not None:
+                sample_is_initialised = init_pred != y_p
 
-                if random_class == y:
-                    initial_sample = random_img, random_class
+        if adv_init is not None:
+            initial_sample[sample_is_initialised] = adv_init[sample_is_initialised].astype(ART_NUMPY_DTYPE)
 
-                    logger.info("Found initial adversarial image for targeted attack.")
-                    break
-            else:
-                logger.warning("Failed to draw a random image that is adversarial, attack failed.")
+        # Attack unsatisfied yet and the initial image unsatisfied
+        sample_is_searched = np.logical_and(sample_is_searched, np.invert(sample_is_initialised))
+        sample_is_found = np.zeros(x.shape[0], dtype=bool)
 
-        else:
-            # The initial image satisfied
-            if adv_init is not None and init_pred != y_p:
-                return adv_init.astype(ART_NUMPY_DTYPE), init_pred
+        for _ in range(self.init_size):
+            sample_idx = np.where(np.logical_and(sample_is_searched, np.invert(sample_is_found)))[0]
+            if sample_idx.size == 0:
+                break
 
-            # The initial image unsatisfied
-            for _ in range(self.init_size):
-                random_img = nprd.uniform(clip_min, clip_max, size=x.shape).astype(x.dtype)
-                random_class = np.argmax(
-                    self.estimator.predict(np.array([random_img]), batch_size=self.batch_size),
-                    axis=1,
-                )[0]
+            random_img = np.array(
+                [rngs[i].uniform(clip_min, clip_max, size=x.shape[1:]).astype(x.dtype) for i in sample_idx]
+            )
+            random_is_adv = self._adversarial_satisfactory(random_img, y_p[sample_idx], y[sample_idx])
 
-                if random_class != y_p:
-                    initial_sample = random_img, random_class
+            initial_sample[sample_idx[random_is_adv]] = random_img[random_is_adv]
+            sample_is_found[sample_idx[random_is_adv]] = True
 
-                    logger.info("Found initial adversarial image for untargeted attack.")
-                    break
-            else:  # pragma: no cover
-                logger.warning("Failed to draw a random image that is adversarial, attack failed.")
+        if np.any(sample_is_found):
+            logger.info(
+                "Found initial adversarial image for %s attack on %d samples.",
+                "targeted" if self.targeted else "untargeted",
+                np.sum(sample_is_found),
+            )
+
+        nb_failed = np.sum(np.logical_and(sample_is_searched, np.invert(sample_is_found)))
+        if nb_failed > 0:
+            logger.warning(
+                "Failed to draw a random image that is adversarial for %d samples, attack failed.", nb_failed
+            )
 
-        return initial_sample
+        sample_is_initialised = np.logical_or(sample_is_initialised, sample_is_found)
+
+        return initial_sample, sample_is_initialised
 
     @staticmethod
-    def _best_adv(original_sample: np.ndarray, potential_advs: np.ndarray) -> np.ndarray:
+    def _best_adv(original_sample: np.ndarray, potential_advs: np.ndarray, is_valid: np.ndarray) -> np.ndarray:
         """
-        From the potential adversarial examples, find the one that has the minimum L2 distance from the original sample
-
-        :param original_sample: The original input.
-        :param potential_advs: Array containing the potential adversarial examples
-        :return: The adversarial example that has the minimum L2 distance from the original input
+        For each example, find among its valid potential adversarial examples the one that has the minimum L2 distance
+        from the original sample.
+
+        :param original_sample: The original inputs.
+        :param potential_advs: Array containing the potential adversarial examples of shape
+                               `(nb_samples, nb_potential_advs) + input_shape`.
+        :param is_valid: Boolean array of shape `(nb_samples, nb_potential_advs)` indicating the valid potential
+                         adversarial examples.
+        :return: The adversarial examples that have the minimum L2 distance from the original inputs.
         """
         shape = potential_advs.shape
-        min_idx = np.linalg.norm(original_sample.flatten() - potential_advs.reshape(shape[0], -1), axis=1).argmin()
-        return potential_advs[min_idx]
+        distances = np.linalg.norm(
+            original_sample.reshape((shape[0], 1, -1)) - potential_advs.reshape((shape[0], shape[1], -1)), axis=2
+        )
+        distances[np.invert(is_valid)] = np.inf
+        min_idx = distances.argmin(axis=1)
+        return potential_advs[np.arange(shape[0]), min_idx]
 
     def _check_params(self) -> None:
         if not isinstance(self.max_iter, int) or self.max_iter < 0:
@@ -220,19 +220,14 @@ class DPatch(EvasionAttack):
                     standardise_output=True,
                 )
 
-                for i_image in range(gradients.shape[0]):
-
-                    i_x_1 = transforms[i_batch_start + i_image]["i_x_1"]
-                    i_x_2 = transforms[i_batch_start + i_image]["i_x_2"]
-                    i_y_1 = transforms[i_batch_start + i_image]["i_y_1"]
-                    i_y_2 = transforms[i_batch_start + i_image]["i_y_2"]
-
-                    if self.estimator.channels_first:
-                        patch_gradients_i = gradients[i_image, :, i_x_1:i_x_2, i_y_1:i_y_2]
-                    else:
-                        patch_gradients_i = gradients[i_image, i_x_1:i_x_2, i_y_1:i_y_2, :]
+                # Gather the patch regions of all images in the batch at once and accumulate them into the patch:
+                i_n, i_x, i_y = self._patch_indices(transforms[i_batch_start:i_batch_end])
+                if self.estimator.channels_first:
+                    patch_gradients_batch = np.transpose(np.sum(gradients[i_n, :, i_x, i_y], axis=0), (2, 0, 1))
+                else:
+                    patch_gradients_batch = np.sum(gradients[i_n, i_x, i_y, :], axis=0)
 
-                    patch_gradients = patch_gradients + patch_gradients_i
+                patch_gradients = patch_gradients + patch_gradients_batch
 
             if self.target_label:
                 self._patch = self._patch - np.sign(patch_gradients) * self.learning_rate
@@ -246,14 +241,8 @@ class DPatch(EvasionAttack):
                     a_max=self.estimator.clip_values[1],
                 )
 
-            patched_images, _ = self._augment_images_with_patch(
-                x,
-                self._patch,
-                random_location=False,
-                channels_first=self.estimator.channels_first,
-                mask=None,
-                transforms=transforms,
-            )
+            # Only the patch regions change between iterations, overwrite them in place:
+            self._place_patch(patched_images, self._patch, transforms, channels_first=self.estimator.channels_first)
 
         return self._patch
 
@@ -288,20 +277,23 @@ class DPatch(EvasionAttack):
 
         random_transformations = []
         x_copy = x.copy()
-        patch_copy = patch.copy()
 
         if channels_first:
-            x_copy = np.transpose(x_copy, (0, 2, 3, 1))
-            patch_copy = np.transpose(patch_copy, (1, 2, 0))
+            patch_height, patch_width = patch.shape[1:3]
+            image_height, image_width = x.shape[2:4]
+        else:
+            patch_height, patch_width = patch.shape[0:2]
+            image_height, image_width = x.shape[1:3]
 
-        for i_image in range(x.shape[0]):
+        if transforms is None:
 
-            if transforms is None:
+            # Only the sampling of the locations is done per image, the patch is applied to all images at once:
+            for i_image in range(x.shape[0]):
 
                 if random_location:
                     if mask is None:
-                        i_x_1 = random.randint(0, x_copy.shape[1] - 1 - patch_copy.shape[0])
-                        i_y_1 = random.randint(0, x_copy.shape[2] - 1 - patch_copy.shape[1])
+                        i_x_1 = random.randint(0, image_height - 1 - patch_height)
+                        i_y_1 = random.randint(0, image_width - 1 - patch_width)
                     else:
 
                         if mask.shape[0] == 1:
@@ -309,10 +301,10 @@ class DPatch(EvasionAttack):
                         else:
                             mask_2d = mask[i_image, :, :]
 
-                        edge_x_0 = patch_copy.shape[0] // 2
-                        edge_x_1 = patch_copy.shape[0] - edge_x_0
-                        edge_y_0 = patch_copy.shape[1] // 2
-                        edge_y_1 = patch_copy.shape[1] - edge_y_0
+                        edge_x_0 = patch_height // 2
+                        edge_x_1 = patch_height - edge_x_0
+                        edge_y_0 = patch_width // 2
+                        edge_y_1 = patch_width - edge_y_0
 
                         mask_2d[0:edge_x_0, :] = False
                         mask_2d[-edge_x_1:, :] = False
@@ -329,24 +321,57 @@ class DPatch(EvasionAttack):
                     i_x_1 = 0
                     i_y_1 = 0
 
-                i_x_2 = i_x_1 + patch_copy.shape[0]
-                i_y_2 = i_y_1 + patch_copy.shape[1]
+                i_x_2 = i_x_1 + patch_height
+                i_y_2 = i_y_1 + patch_width
 
                 random_transformations.append({"i_x_1": i_x_1, "i_y_1": i_y_1, "i_x_2": i_x_2, "i_y_2": i_y_2})
 
-            else:
-                i_x_1 = transforms[i_image]["i_x_1"]
-                i_x_2 = transforms[i_image]["i_x_2"]
-                i_y_1 = transforms[i_image]["i_y_1"]
-                i_y_2 = transforms[i_image]["i_y_2"]
-
-            x_copy[i_image, i_x_1:i_x_2, i_y_1:i_y_2, :] = patch_copy
+            transforms = random_transformations
 
-        if channels_first:
-            x_copy = np.transpose(x_copy, (0, 3, 1, 2))
+        DPatch._place_patch(x_copy, patch, transforms, channels_first=channels_first)
 
         return x_copy, random_transformations
 
+    @staticmethod
+    def _patch_indices(transforms: List[Dict[str, int]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Create broadcastable index arrays selecting the patch region of every image.
+
+        :param transforms: Patch transforms of the images, all patch regions need to have the same size.
+        :return: Tuple of image, row and column indices of shapes (N, 1, 1), (N, H, 1) and (N, 1, W) for patches of
+                 height H and width W.
+        """
+        i_x_1 = np.asarray([transform["i_x_1"] for transform in transforms], dtype=np.int64)
+        i_y_1 = np.asarray([transform["i_y_1"] for transform in transforms], dtype=np.int64)
+        patch_height = transforms[0]["i_x_2"] - transforms[0]["i_x_1"]
+        patch_width = transforms[0]["i_y_2"] - transforms[0]["i_y_1"]
+
+        i_n = np.arange(len(transforms))[:, np.newaxis, np.newaxis]
+        i_x = (i_x_1[:, np.newaxis] + np.arange(patch_height))[:, :, np.newaxis]
+        i_y = (i_y_1[:, np.newaxis] + np.arange(patch_width))[:, np.newaxis, :]
+
+        return i_n, i_x, i_y
+
+    @staticmethod
+    def _place_patch(x: np.ndarray, patch: np.ndarray, transforms: List[Dict[str, int]], channels_first: bool) -> None:
+        """
+        Write the patch in place into the images at the locations defined by the transforms.
+
+        :param x: Images to be patched, modified in place.
+        :param patch: The patch to be applied.
+        :param transforms: Patch transforms of the images.
+        :param channels_first: Set channels first or last.
+        """
+        if x.shape[0] == 0:
+            return
+
+        i_n, i_x, i_y = DPatch._patch_indices(transforms)
+
+        if channels_first:
+            x[i_n, :, i_x, i_y] = np.transpose(patch, (1, 2, 0))
+        else:
+            x[i_n, i_x, i_y, :] = patch
+
     def apply_patch(
         self,
         x: np.ndarray,
@@ -274,12 +274,16 @@ class RobustDPatch(EvasionAttack):
         """
 
         transformations: Dict[str, Union[float, int]] = {}
-        x_copy = x.copy()
         patch_copy = patch.copy()
         x_patch = x.copy()
 
+        # The unpatched images are only required to predict the labels of the untargeted attack, all transformations
+        # below are applied to the whole batch with views where possible:
+        x_copy = None if self.targeted else x
+
         if channels_first:
-            x_copy = np.transpose(x_copy, (0, 2, 3, 1))
+            if x_copy is not None:
+                x_copy = np.transpose(x_copy, (0, 2, 3, 1))
             x_patch = np.transpose(x_patch, (0, 2, 3, 1))
             patch_copy = np.transpose(patch_copy, (1, 2, 0))
 
@@ -292,8 +296,9 @@ class RobustDPatch(EvasionAttack):
         crop_x = random.randint(0, self.crop_range[0])
         crop_y = random.randint(0, self.crop_range[1])
         x_1, y_1 = crop_x, crop_y
-        x_2, y_2 = x_copy.shape[1] - crop_x + 1, x_copy.shape[2] - crop_y + 1
-        x_copy = x_copy[:, x_1:x_2, y_1:y_2, :]
+        x_2, y_2 = x_patch.shape[1] - crop_x + 1, x_patch.shape[2] - crop_y + 1
+        if x_copy is not None:
+            x_copy = x_copy[:, x_1:x_2, y_1:y_2, :]
         x_patch = x_patch[:, x_1:x_2, y_1:y_2, :]
 
         transformations.update({"crop_x": crop_x, "crop_y": crop_y})
@@ -301,7 +306,8 @@ class RobustDPatch(EvasionAttack):
         # 2) rotate images:
         rot90 = random.choices([0, 1, 2, 3], weights=self.rotation_weights)[0]
 
-        x_copy = np.rot90(x_copy, rot90, (1, 2))
+        if x_copy is not None:
+            x_copy = np.rot90(x_copy, rot90, (1, 2))
         x_patch = np.rot90(x_patch, rot90, (1, 2))
 
         transformations.update({"rot90": rot90})
@@ -310,7 +316,7 @@ class RobustDPatch(EvasionAttack):
 
             y_copy: List[Dict[str, np.ndarray]] = []
 
-            for i_image in range(x_copy.shape[0]):
+            for i_image in range(x.shape[0]):
                 y_b = y[i_image]["boxes"].copy()
                 image_width = x.shape[2]
                 image_height = x.shape[1]
@@ -359,8 +365,9 @@ class RobustDPatch(EvasionAttack):
 
         # 3) adjust brightness:
         brightness = random.uniform(*self.brightness_range)
-        x_copy = np.round(brightness * x_copy / self.learning_rate) * self.learning_rate
-        x_patch = np.round(brightness * x_patch / self.learning_rate) * self.learning_rate
+        if x_copy is not None:
+            x_copy = self._quantise_brightness(x_copy, brightness)
+        x_patch = self._quantise_brightness(x_patch, brightness)
 
         transformations.update({"brightness": brightness})
 
@@ -375,7 +382,7 @@ class RobustDPatch(EvasionAttack):
                 x_copy = np.transpose(x_copy, (0, 3, 1, 2))
             predictions = self.estimator.predict(x=x_copy, standardise_output=True)
 
-        for i_image in range(x_copy.shape[0]):
+        for i_image in range(x.shape[0]):
             target_dict = {}
             target_dict["boxes"] = predictions[i_image]["boxes"]
             target_dict["labels"] = predictions[i_image]["labels"]
@@ -388,6 +395,20 @@ class RobustDPatch(EvasionAttack):
 
         return x_patch, patch_target, transformations
 
+    def _quantise_brightness(self, x: np.ndarray, brightness: float) -> np.ndarray:
+        """
+        Adjust the brightness of images and round them to multiples of the learning rate with a single temporary array.
+
+        :param x: Images, possibly a view of the original images which is not modified.
+        :param brightness: Brightness factor.
+        :return: The adjusted images.
+        """
+        x_adjusted = brightness * x
+        x_adjusted /= self.learning_rate
+        np.round(x_adjusted, out=x_adjusted)
+        x_adjusted *= self.learning_rate
+        return x_adjusted
+
     def _untransform_gradients(
         self,
         gradients: np.ndarray,
@@ -405,9 +426,6 @@ class RobustDPatch(EvasionAttack):
         if channels_first:
             gradients = np.transpose(gradients, (0, 2, 3, 1))
 
-        # Account for brightness adjustment:
-        gradients = transforms["brightness"] * gradients
-
         # Undo rotations:
         rot90 = (4 - transforms["rot90"]) % 4
         gradients = np.rot90(gradients, rot90, (1, 2))
@@ -423,6 +441,9 @@ class RobustDPatch(EvasionAttack):
             y_2 = y_1 + self.patch_shape[1]
         gradients = gradients[:, x_1:x_2, y_1:y_2, :]
 
+        # Account for brightness adjustment, only on the patch region because transpose, rotation and crop are views:
+        gradients = transforms["brightness"] * gradients
+
         if channels_first:
             gradients = np.transpose(gradients, (0, 3, 1, 2))
 
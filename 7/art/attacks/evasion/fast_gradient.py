@@ -24,7 +24,7 @@ Method attack and extends it to other norms, therefore it is called the Fast Gra
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
-from typing import Optional, Union, TYPE_CHECKING
+from typing import Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
 
@@ -33,15 +33,19 @@ from art.attacks.attack import EvasionAttack
 from art.estimators.estimator import BaseEstimator, LossGradientsMixin
 from art.estimators.classification.classifier import ClassifierMixin
 from art.utils import (
+    cache_predictions,
     compute_success,
     get_labels_np_array,
     random_sphere,
     projection,
+    projection_l1_1_pytorch,
     check_and_transform_label_format,
 )
 from art.summary_writer import SummaryWriter
 
 if TYPE_CHECKING:
+    import torch
+
     from art.utils import CLASSIFIER_LOSS_GRADIENTS_TYPE
 
 logger = logging.getLogger(__name__)
@@ -114,6 +118,7 @@ class FastGradientMethod(EvasionAttack):
 
         self._batch_id = 0
         self._i_max_iter = 0
+        self._clip_values_pytorch: Optional[Tuple["torch.Tensor", "torch.Tensor"]] = None
 
     def _check_compatibility_input_and_eps(self, x: np.ndarray):
         """
@@ -204,6 +209,7 @@ class FastGradientMethod(EvasionAttack):
 
         return adv_x
 
+    @cache_predictions
     def generate(self, x: np.ndarray, y: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
         """Generate adversarial samples and return them in an array.
 
@@ -234,7 +240,9 @@ class FastGradientMethod(EvasionAttack):
 
                 # Use model predictions as correct outputs
                 logger.info("Using model predictions as correct labels for FGM.")
-                y_array = get_labels_np_array(self.estimator.predict(x, batch_size=self.batch_size))  # type: ignore
+                y_array = get_labels_np_array(
+                    self.estimator.prediction_cache.predict(x, batch_size=self.batch_size)  # type: ignore
+                )
             else:
                 y_array = y
 
@@ -256,16 +264,26 @@ class FastGradientMethod(EvasionAttack):
                 )
             else:
                 rate_best = 0.0
+                x_compute, y_compute, mask_compute, eps_compute = x, y_array, mask, self.eps
+                if self._tensor_mode(x):
+                    # Transfer the inputs once, all random initialisations then run on the device
+                    self._clip_values_pytorch = None
+                    x_compute, y_compute, mask_compute, eps_compute = (
+                        self._to_device(value) for value in (x, y_array, mask, self.eps)
+                    )
+
                 for _ in range(max(1, self.num_random_init)):
-                    adv_x = self._compute(
-                        x,
-                        x,
-                        y_array,
-                        mask,
-                        self.eps,
-                        self.eps,
-                        self._project,
-                        self.num_random_init > 0,
+                    adv_x = self._to_numpy(
+                        self._compute(
+                            x_compute,
+                            x_compute,
+                            y_compute,
+                            mask_compute,
+                            eps_compute,
+                            eps_compute,
+                            self._project,
+                            self.num_random_init > 0,
+                        )
                     )
 
                     if self.num_random_init > 1:
@@ -380,6 +398,62 @@ class FastGradientMethod(EvasionAttack):
         if not isinstance(self.minimal, bool):
             raise ValueError("The flag `minimal` has to be of type bool.")
 
+    def _tensor_mode(self, x: np.ndarray) -> bool:
+        """
+        Check whether the iterations can run on tensors on the device of the estimator, which is the case if the loss
+        gradients of the estimator take and return tensors. The iterations on tensors are implemented for PyTorch.
+
+        :param x: An array with the original inputs.
+        :return: `True` if the attack should transfer its inputs to the device of the estimator.
+        """
+        return self.estimator.supports_tensor_inputs and x.dtype != object
+
+    def _to_device(
+        self, value: Union[None, int, float, np.ndarray, "torch.Tensor"]
+    ) -> Union[None, int, float, "torch.Tensor"]:
+        """
+        Move arrays to the device of the estimator. Scalars, tensors and `None` are returned unchanged.
+
+        :param value: Scalar, array or tensor.
+        :return: Scalar or tensor on the device of the estimator.
+        """
+        if isinstance(value, np.ndarray):
+            return self.estimator.to_tensor(value)
+        return value
+
+    def _to_numpy(self, value: Union[int, float, np.ndarray, "torch.Tensor"]) -> Union[int, float, np.ndarray]:
+        """
+        Move tensors back to the host. Scalars and arrays are returned unchanged.
+
+        :param value: Scalar, array or tensor.
+        :return: Scalar or array.
+        """
+        if isinstance(value, (int, float, np.ndarray)):
+            return value
+        return self.estimator.to_numpy(value)
+
+    def _clip_pytorch(self, x: "torch.Tensor") -> "torch.Tensor":
+        """
+        Clip examples to the range of the estimator.
+
+        :param x: Current adversarial examples.
+        :return: Clipped examples.
+        """
+        import torch
+
+        if self.estimator.clip_values is None:
+            return x
+
+        if self._clip_values_pytorch is None:
+            clip_min, clip_max = self.estimator.clip_values
+            self._clip_values_pytorch = (
+                self.estimator.to_tensor(np.array(clip_min)),
+                self.estimator.to_tensor(np.array(clip_max)),
+            )
+
+        clip_min_t, clip_max_t = self._clip_values_pytorch
+        return torch.max(torch.min(x, clip_max_t), clip_min_t)
+
     def _compute_perturbation(
         self,
         x: np.ndarray,
@@ -388,6 +462,9 @@ class FastGradientMethod(EvasionAttack):
         decay: Optional[float] = None,
         momentum: Optional[np.ndarray] = None,
     ) -> np.ndarray:
+        if not isinstance(x, np.ndarray):
+            return self._compute_perturbation_pytorch(x, y, mask, decay, momentum)
+
         # Pick a small scalar to avoid division by 0
         tol = 10e-8
 
@@ -461,9 +538,83 @@ class FastGradientMethod(EvasionAttack):
 
         return grad
 
+    def _compute_perturbation_pytorch(
+        self,
+        x: "torch.Tensor",
+        y: "torch.Tensor",
+        mask: Optional["torch.Tensor"],
+        decay: Optional[float] = None,
+        momentum: Optional["torch.Tensor"] = None,
+    ) -> "torch.Tensor":
+        """
+        Compute perturbations on the device of the estimator.
+
+        :param x: Current adversarial examples.
+        :param y: Target values (class labels) one-hot-encoded of shape `(nb_samples, nb_classes)`.
+        :param mask: A tensor with a mask broadcastable to input `x` defining where to apply adversarial perturbations.
+        :param decay: Decay factor for accumulating the velocity vector when using momentum.
+        :param momentum: Tensor accumulating the velocity vector, updated in place.
+        :return: Perturbations.
+        """
+        import torch
+
+        # Pick a small scalar to avoid division by 0
+        tol = 10e-8
+
+        # Get gradient wrt loss; invert it if attack is targeted
+        grad = self.estimator.loss_gradient(x=x, y=y) * (1 - 2 * int(self.targeted))
+
+        # Write summary
+        if self.summary_writer is not None:  # pragma: no cover
+            self.summary_writer.update(
+                batch_id=self._batch_id,
+                global_step=self._i_max_iter,
+                grad=self.estimator.to_numpy(grad),
+                patch=None,
+                estimator=self.estimator,
+                x=self.estimator.to_numpy(x),
+                y=self.estimator.to_numpy(y),
+                targeted=self.targeted,
+            )
+
+        # Check for nan before normalisation an replace with 0
+        if torch.any(grad.isnan()):  # pragma: no cover
+            logger.warning("Elements of the loss gradient are NaN and have been replaced with 0.0.")
+            grad[grad.isnan()] = 0.0
+
+        # Apply mask
+        if mask is not None:
+            grad = torch.where(mask == 0.0, torch.zeros_like(grad), grad)
+
+        # Apply momentum
+        if decay is not None and momentum is not None:
+            ind = tuple(range(1, len(x.shape)))
+            grad = grad / (torch.sum(grad.abs(), dim=ind, keepdims=True) + tol)  # type: ignore
+            grad = decay * momentum + grad
+            # Accumulate the gradient for the next iter
+            momentum += grad
+
+        # Apply norm bound
+        if self.norm in ["inf", np.inf]:
+            grad = grad.sign()
+
+        elif self.norm == 1:
+            ind = tuple(range(1, len(x.shape)))
+            grad = grad / (torch.sum(grad.abs(), dim=ind, keepdims=True) + tol)  # type: ignore
+
+        elif self.norm == 2:
+            ind = tuple(range(1, len(x.shape)))
+            grad = grad / (torch.sqrt(torch.sum(grad * grad, axis=ind, keepdims=True)) + tol)  # type: ignore
+
+        assert x.shape == grad.shape
+
+        return grad
+
     def _apply_perturbation(
         self, x: np.ndarray, perturbation: np.ndarray, eps_step: Union[int, float, np.ndarray]
     ) -> np.ndarray:
+        if not isinstance(x, np.ndarray):
+            return self._apply_perturbation_pytorch(x, perturbation, eps_step)
 
         perturbation_step = eps_step * perturbation
         if perturbation_step.dtype != object:
@@ -487,6 +638,25 @@ class FastGradientMethod(EvasionAttack):
 
         return x
 
+    def _apply_perturbation_pytorch(
+        self, x: "torch.Tensor", perturbation: "torch.Tensor", eps_step: Union[int, float, np.ndarray, "torch.Tensor"]
+    ) -> "torch.Tensor":
+        """
+        Apply perturbation on examples on the device of the estimator.
+
+        :param x: Current adversarial examples.
+        :param perturbation: Current perturbations.
+        :param eps_step: Attack step size (input variation) at each iteration.
+        :return: Adversarial examples.
+        """
+        import torch
+
+        perturbation_step = self._to_device(eps_step) * perturbation
+        perturbation_step[torch.isnan(perturbation_step)] = 0
+        x = x + perturbation_step
+
+        return self._clip_pytorch(x)
+
     def _compute(
         self,
         x: np.ndarray,
@@ -504,16 +674,26 @@ class FastGradientMethod(EvasionAttack):
         if random_init:
             n = x.shape[0]
             m = np.prod(x.shape[1:]).item()
-            random_perturbation = random_sphere(n, m, eps, self.norm).reshape(x.shape).astype(ART_NUMPY_DTYPE)
-            if mask is not None:
-                random_perturbation = random_perturbation * (mask.astype(ART_NUMPY_DTYPE))
-            x_adv = x.astype(ART_NUMPY_DTYPE) + random_perturbation
+            random_perturbation = (
+                random_sphere(n, m, self._to_numpy(eps), self.norm).reshape(x.shape).astype(ART_NUMPY_DTYPE)
+            )
+            if not isinstance(x, np.ndarray):
+                random_perturbation = self._to_device(random_perturbation)
+                if mask is not None:
+                    random_perturbation = random_perturbation * mask
+                x_adv = self._clip_pytorch(x + random_perturbation)
+            else:
+                if mask is not None:
+                    random_perturbation = random_perturbation * (mask.astype(ART_NUMPY_DTYPE))
+                x_adv = x.astype(ART_NUMPY_DTYPE) + random_perturbation
 
-            if self.estimator.clip_values is not None:
-                clip_min, clip_max = self.estimator.clip_values
-                x_adv = np.clip(x_adv, clip_min, clip_max)
+                if self.estimator.clip_values is not None:
+                    clip_min, clip_max = self.estimator.clip_values
+                    x_adv = np.clip(x_adv, clip_min, clip_max)
         else:
-            if x.dtype == object:
+            if not isinstance(x, np.ndarray):
+                x_adv = x.clone()
+            elif x.dtype == object:
                 x_adv = x.copy()
             else:
                 x_adv = x.astype(ART_NUMPY_DTYPE)
@@ -540,7 +720,7 @@ class FastGradientMethod(EvasionAttack):
             perturbation = self._compute_perturbation(batch, batch_labels, mask_batch, decay, momentum)
 
             # Compute batch_eps and batch_eps_step
-            if isinstance(eps, np.ndarray) and isinstance(eps_step, np.ndarray):
+            if not isinstance(eps, (int, float)) and not isinstance(eps_step, (int, float)):
                 if len(eps.shape) == len(x.shape) and eps.shape[0] == x.shape[0]:
                     batch_eps = eps[batch_index_1:batch_index_2]
                     batch_eps_step = eps_step[batch_index_1:batch_index_2]
@@ -557,7 +737,13 @@ class FastGradientMethod(EvasionAttack):
             x_adv[batch_index_1:batch_index_2] = self._apply_perturbation(batch, perturbation, batch_eps_step)
 
             if project:
-                if x_adv.dtype == object:
+                if not isinstance(x_adv, np.ndarray):
+                    perturbation = self._projection_pytorch(
+                        x_adv[batch_index_1:batch_index_2] - x_init[batch_index_1:batch_index_2], batch_eps, self.norm
+                    )
+                    x_adv[batch_index_1:batch_index_2] = x_init[batch_index_1:batch_index_2] + perturbation
+
+                elif x_adv.dtype == object:
                     for i_sample in range(batch_index_1, batch_index_2):
                         if isinstance(batch_eps, np.ndarray) and batch_eps.shape[0] == x_adv.shape[0]:
                             perturbation = projection(
@@ -577,6 +763,56 @@ class FastGradientMethod(EvasionAttack):
 
         return x_adv
 
+    def _projection_pytorch(
+        self,
+        values: "torch.Tensor",
+        eps: Union[int, float, np.ndarray, "torch.Tensor"],
+        norm_p: Union[int, float, str],
+    ) -> "torch.Tensor":
+        """
+        Project `values` on the L_p norm ball of size `eps`.
+
+        :param values: Values to clip.
+        :param eps: Maximum norm allowed.
+        :param norm_p: L_p norm to use for clipping supporting 1, 2, `np.Inf` and "inf". Norm 1 computes the orthogonal
+                       projection on the L1-ball.
+        :return: Values of `values` after projection.
+        """
+        import torch
+
+        # Pick a small scalar to avoid division by 0
+        tol = 10e-8
+        values_tmp = values.reshape(values.shape[0], -1)
+
+        if norm_p == 2:
+            if isinstance(eps, (np.ndarray, torch.Tensor)):
+                raise NotImplementedError(
+                    "The parameter `eps` of type `np.ndarray` is not supported to use with norm 2."
+                )
+
+            values_tmp = values_tmp * torch.clamp(eps / (torch.norm(values_tmp, p=2, dim=1) + tol), max=1.0).unsqueeze_(
+                -1
+            )
+
+        elif norm_p == 1:
+            values_tmp = projection_l1_1_pytorch(values_tmp, eps)
+
+        elif norm_p in [np.inf, "inf"]:
+            if isinstance(eps, (np.ndarray, torch.Tensor)):
+                eps_t = self._to_device(eps) * torch.ones_like(values)
+                values_tmp = values_tmp.sign() * torch.min(values_tmp.abs(), eps_t.reshape(values.shape[0], -1))
+            else:
+                values_tmp = values_tmp.sign() * torch.clamp(values_tmp.abs(), max=eps)
+
+        else:
+            raise NotImplementedError(
+                "Values of `norm_p` different from 1, 2 and `np.inf` are currently not supported."
+            )
+
+        values = values_tmp.reshape(values.shape)
+
+        return values
+
     @staticmethod
     def _get_mask(x: np.ndarray, **kwargs) -> np.ndarray:
         """
@@ -34,6 +34,7 @@ from art.estimators.estimator import BaseEstimator, NeuralNetworkMixin
 from art.estimators.classification.classifier import ClassGradientsMixin
 from art.attacks.attack import EvasionAttack
 from art.utils import (
+    cache_predictions,
     compute_success_array,
     get_labels_np_array,
     check_and_transform_label_format,
@@ -93,6 +94,7 @@ class FrameSaliencyAttack(EvasionAttack):
         self.verbose = verbose
         self._check_params()
 
+    @cache_predictions
     def generate(self, x: np.ndarray, y: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
         """
         Generate adversarial samples and return them in an array.
@@ -122,7 +124,7 @@ class FrameSaliencyAttack(EvasionAttack):
                 raise ValueError("Target labels `y` need to be provided for a targeted attack.")
 
             # Use model predictions as correct outputs
-            targets = get_labels_np_array(self.estimator.predict(x, batch_size=self.batch_size))
+            targets = get_labels_np_array(self.estimator.prediction_cache.predict(x, batch_size=self.batch_size))
         else:
             targets = y
 
@@ -24,16 +24,23 @@ predictions. It is an advanced version of the Boundary attack.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
-from typing import Optional, Tuple, Union, TYPE_CHECKING
+from typing import List, Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
-from tqdm.auto import tqdm
+from tqdm.auto import trange
 
 from art.config import ART_NUMPY_DTYPE
 from art.attacks.attack import EvasionAttack
 from art.estimators.estimator import BaseEstimator
 from art.estimators.classification import ClassifierMixin
-from art.utils import compute_success, to_categorical, check_and_transform_label_format, get_labels_np_array
+from art.utils import (
+    compute_success,
+    to_categorical,
+    check_and_transform_label_format,
+    get_labels_np_array,
+    expand_per_sample,
+    per_sample_random_states,
+)
 
 if TYPE_CHECKING:
     from art.utils import CLASSIFIER_TYPE
@@ -154,8 +161,6 @@ class HopSkipJump(EvasionAttack):
                 mask = mask.astype(ART_NUMPY_DTYPE)
             else:
                 mask = np.array([mask.astype(ART_NUMPY_DTYPE)] * x.shape[0])
-        else:
-            mask = np.array([None] * x.shape[0])
 
         # Get clip_min and clip_max from the classifier or infer them from data
         if self.estimator.clip_values is not None:
@@ -171,16 +176,14 @@ class HopSkipJump(EvasionAttack):
 
         if x_adv_init is not None:
             # Add mask param to the x_adv_init
-            for i in range(x.shape[0]):
-                if mask[i] is not None:
-                    x_adv_init[i] = x_adv_init[i] * mask[i] + x[i] * (1 - mask[i])
+            if mask is not None:
+                x_adv_init = x_adv_init * mask + x * (1 - mask)
 
             # Do prediction on the init
             init_preds = np.argmax(self.estimator.predict(x_adv_init, batch_size=self.batch_size), axis=1)
 
         else:
-            init_preds = [None] * len(x)
-            x_adv_init = [None] * len(x)
+            init_preds = None
 
         # Assert that, if attack is targeted, y is provided
         if self.targeted and y is None:  # pragma: no cover
@@ -191,33 +194,22 @@ class HopSkipJump(EvasionAttack):
 
         y = np.argmax(y, axis=1)
 
-        # Generate the adversarial samples
-        for ind, val in enumerate(tqdm(x_adv, desc="HopSkipJump", disable=not self.verbose)):
-            self.curr_iter = start
+        # The random directions of the gradient estimates of a sample do not depend on the batch it is attacked in
+        rngs = per_sample_random_states(x.shape[0])
 
-            if self.targeted:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=y[ind],  # type: ignore
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    mask=mask[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
-
-            else:
-                x_adv[ind] = self._perturb(
-                    x=val,
-                    y=-1,
-                    y_p=preds[ind],
-                    init_pred=init_preds[ind],
-                    adv_init=x_adv_init[ind],
-                    mask=mask[ind],
-                    clip_min=clip_min,
-                    clip_max=clip_max,
-                )
+        # Generate the adversarial samples
+        self.curr_iter = start
+        x_adv = self._perturb(
+            x=x_adv,
+            y=y,
+            y_p=preds,
+            init_pred=init_preds,
+            adv_init=x_adv_init,
+            mask=mask,
+            rngs=rngs,
+            clip_min=clip_min,
+            clip_max=clip_max,
+        )
 
         y = to_categorical(y, self.estimator.nb_classes)  # type: ignore
 
@@ -231,187 +223,211 @@ class HopSkipJump(EvasionAttack):
     def _perturb(
         self,
         x: np.ndarray,
-        y: int,
-        y_p: int,
-        init_pred: int,
-        adv_init: np.ndarray,
+        y: np.ndarray,
+        y_p: np.ndarray,
+        init_pred: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
         mask: Optional[np.ndarray],
+        rngs: List[np.random.RandomState],
         clip_min: float,
         clip_max: float,
     ) -> np.ndarray:
         """
-        Internal attack function for one example.
+        Internal attack function for a batch of examples.
 
-        :param x: An array with one original input to be attacked.
-        :param y: If `self.targeted` is true, then `y` represents the target label.
-        :param y_p: The predicted label of x.
-        :param init_pred: The predicted label of the initial image.
-        :param adv_init: Initial array to act as an initial adversarial example.
+        :param x: An array with the original inputs to be attacked.
+        :param y: If `self.targeted` is true, then `y` represents the target labels.
+        :param y_p: The predicted labels of x.
+        :param init_pred: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
         :param mask: An array with a mask to be applied to the adversarial perturbations. Shape needs to be
                      broadcastable to the shape of x. Any features for which the mask is zero will not be adversarially
                      perturbed.
+        :param rngs: The random generator of each example.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: An adversarial example.
+        :return: The adversarial examples.
         """
-        # First, create an initial adversarial sample
-        initial_sample = self._init_sample(x, y, y_p, init_pred, adv_init, mask, clip_min, clip_max)
+        # First, create initial adversarial samples
+        initial_sample, target, sample_is_initialised = self._init_sample(
+            x, y, y_p, init_pred, adv_init, mask, rngs, clip_min, clip_max
+        )
 
         # If an initial adversarial example is not found, then return the original image
-        if initial_sample is None:
-            return x
+        x_adv = x.copy()
 
         # If an initial adversarial example found, then go with HopSkipJump attack
-        x_adv = self._attack(initial_sample[0], x, initial_sample[1], mask, clip_min, clip_max)
+        if np.any(sample_is_initialised):
+            x_adv[sample_is_initialised] = self._attack(
+                initial_sample[sample_is_initialised],
+                x[sample_is_initialised],
+                target[sample_is_initialised],
+                None if mask is None else mask[sample_is_initialised],
+                [rngs[i] for i in np.where(sample_is_initialised)[0]],
+                clip_min,
+                clip_max,
+            )
 
         return x_adv
 
     def _init_sample(
         self,
         x: np.ndarray,
-        y: int,
-        y_p: int,
-        init_pred: int,
-        adv_init: np.ndarray,
+        y: np.ndarray,
+        y_p: np.ndarray,
+        init_pred: Optional[np.ndarray],
+        adv_init: Optional[np.ndarray],
         mask: Optional[np.ndarray],
+        rngs: List[np.random.RandomState],
         clip_min: float,
         clip_max: float,
-    ) -> Optional[Union[np.ndarray, Tuple[np.ndarray, int]]]:
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Find initial adversarial example for the attack.
+        Find initial adversarial examples for the attack.
 
-        :param x: An array with 1 original input to be attacked.
-        :param y: If `self.targeted` is true, then `y` represents the target label.
-        :param y_p: The predicted label of x.
-        :param init_pred: The predicted label of the initial image.
-        :param adv_init: Initial array to act as an initial adversarial example.
+        :param x: An array with the original inputs to be attacked.
+        :param y: If `self.targeted` is true, then `y` represents the target labels.
+        :param y_p: The predicted labels of x.
+        :param init_pred: The predicted labels of the initial images.
+        :param adv_init: Initial array to act as initial adversarial examples.
         :param mask: An array with a mask to be applied to the adversarial perturbations. Shape needs to be
                      broadcastable to the shape of x. Any features for which the mask is zero will not be adversarially
                      perturbed.
+        :param rngs: The random generator of each example.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: An adversarial example.
+        :return: A tuple of the initial adversarial examples, the labels to attack and a boolean array indicating for
+                 which examples an initial adversarial example has been found.
         """
-        nprd = np.random.RandomState()
-        initial_sample = None
+        initial_sample = x.copy()
+        sample_is_initialised = np.zeros(x.shape[0], dtype=bool)
 
         if self.targeted:
+            target = y
+
             # Attack satisfied
-            if y == y_p:
-                return None
+            sample_is_searched = y != y_p
 
             # Attack unsatisfied yet and the initial image satisfied
-            if adv_init is not None and init_pred == y:
-                return adv_init.astype(ART_NUMPY_DTYPE), init_pred
-
-            # Attack unsatisfied yet and the initial image unsatisfied
-            for _ in range(self.init_size):
-                random_img = nprd.uniform(clip_min, clip_max, size=x.shape).astype(x.dtype)
-
-                if mask is not None:
-                    random_img = random_img * mask + x * (1 - mask)
-
-                random_class = np.argmax(
-                    self.estimator.predict(np.array([random_img]), batch_size=self.batch_size),
-                    axis=1,
-                )[0]
-
-                if random_class == y:
-                    # Binary search to reduce the l2 distance to the original image
-                    random_img = self._binary_search(
-                        current_sample=random_img,
-                        original_sample=x,
-                        target=y,
-                        norm=2,
-                        clip_min=clip_min,
-                        clip_max=clip_max,
-                        threshold=0.001,
-                    )
-                    initial_sample = random_img, random_class
-
-                    logger.info("Found initial adversarial image for targeted attack.")
-                    break
-            else:
-                logger.warning("Failed to draw a random image that is adversarial, attack failed.")
-
+            if adv_init is not None and init_pred is not None:
+                sample_is_initialised = np.logical_and(sample_is_searched, init_pred == y)
         else:
+            target = y_p
+            sample_is_searched = np.ones(x.shape[0], dtype=bool)
+
             # The initial image satisfied
-            if adv_init is not None and init_pred != y_p:
-                return adv_init.astype(ART_NUMPY_DTYPE), y_p
-
-            # The initial image unsatisfied
-            for _ in range(self.init_size):
-                random_img = nprd.uniform(clip_min, clip_max, size=x.shape).astype(x.dtype)
-
-                if mask is not None:
-                    random_img = random_img * mask + x * (1 - mask)
-
-                random_class = np.argmax(
-                    self.estimator.predict(np.array([random_img]), batch_size=self.batch_size),
-                    axis=1,
-                )[0]
-
-                if random_class != y_p:
-                    # Binary search to reduce the l2 distance to the original image
-                    random_img = self._binary_search(
-                        current_sample=random_img,
-                        original_sample=x,
-                        target=y_p,
-                        norm=2,
-                        clip_min=clip_min,
-                        clip_max=clip_max,
-                        threshold=0.001,
-                    )
-                    initial_sample = random_img, y_p
-
-                    logger.info("Found initial adversarial image for untargeted attack.")
-                    break
+            if adv_init is not None and init_pred is not None:
+                sample_is_initialised = init_pred != y_p
+
+        if adv_init is not None:
+            initial_sample[sample_is_initialised] = adv_init[sample_is_initialised].astype(ART_NUMPY_DTYPE)
+
+        # Attack unsatisfied yet and the initial image unsatisfied
+        sample_is_searched = np.logical_and(sample_is_searched, np.invert(sample_is_initialised))
+        sample_is_found = np.zeros(x.shape[0], dtype=bool)
+
+        for _ in range(self.init_size):
+            sample_idx = np.where(np.logical_and(sample_is_searched, np.invert(sample_is_found)))[0]
+            if sample_idx.size == 0:
+                break
+
+            random_img = np.array(
+                [rngs[i].uniform(clip_min, clip_max, size=x.shape[1:]).astype(x.dtype) for i in sample_idx]
+            )
+
+            if mask is not None:
+                random_img = random_img * mask[sample_idx] + x[sample_idx] * (1 - mask[sample_idx])
+
+            random_class = np.argmax(self.estimator.predict(random_img, batch_size=self.batch_size), axis=1)
+
+            if self.targeted:
+                random_is_adv = random_class == target[sample_idx]
             else:
-                logger.warning("Failed to draw a random image that is adversarial, attack failed.")
+                random_is_adv = random_class != target[sample_idx]
+
+            initial_sample[sample_idx[random_is_adv]] = random_img[random_is_adv]
+            sample_is_found[sample_idx[random_is_adv]] = True
+
+        if np.any(sample_is_found):
+            # Binary search to reduce the l2 distance to the original image
+            initial_sample[sample_is_found] = self._binary_search(
+                current_sample=initial_sample[sample_is_found],
+                original_sample=x[sample_is_found],
+                target=target[sample_is_found],
+                norm=2,
+                clip_min=clip_min,
+                clip_max=clip_max,
+                threshold=0.001,
+            )
 
-        return initial_sample
+            logger.info(
+                "Found initial adversarial image for %s attack on %d samples.",
+                "targeted" if self.targeted else "untargeted",
+                np.sum(sample_is_found),
+            )
+
+        nb_failed = np.sum(np.logical_and(sample_is_searched, np.invert(sample_is_found)))
+        if nb_failed > 0:
+            logger.warning(
+                "Failed to draw a random image that is adversarial for %d samples, attack failed.", nb_failed
+            )
+
+        sample_is_initialised = np.logical_or(sample_is_initialised, sample_is_found)
+
+        return initial_sample, target, sample_is_initialised
 
     def _attack(
         self,
         initial_sample: np.ndarray,
         original_sample: np.ndarray,
-        target: int,
+        target: np.ndarray,
         mask: Optional[np.ndarray],
+        rngs: List[np.random.RandomState],
         clip_min: float,
         clip_max: float,
     ) -> np.ndarray:
         """
-        Main function for the boundary attack.
+        Main function for the boundary attack, advancing all examples together.
 
-        :param initial_sample: An initial adversarial example.
-        :param original_sample: The original input.
-        :param target: The target label.
+        :param initial_sample: Initial adversarial examples.
+        :param original_sample: The original inputs.
+        :param target: The target labels.
         :param mask: An array with a mask to be applied to the adversarial perturbations. Shape needs to be
                      broadcastable to the shape of x. Any features for which the mask is zero will not be adversarially
                      perturbed.
+        :param rngs: The random generator of each example.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: an adversarial example.
+        :return: The adversarial examples.
         """
-        # Set current perturbed image to the initial image
-        current_sample = initial_sample
+        # Set current perturbed images to the initial images
+        current_sample = initial_sample.copy()
+        sample_is_active = np.ones(current_sample.shape[0], dtype=bool)
 
         # Main loop to wander around the boundary
-        for _ in range(self.max_iter):
+        for _ in trange(self.max_iter, desc="HopSkipJump", disable=not self.verbose):
+            active_idx = np.where(sample_is_active)[0]
+            if active_idx.size == 0:
+                break
+
+            current_active = current_sample[active_idx]
+            original_active = original_sample[active_idx]
+            target_active = target[active_idx]
+
             # First compute delta
             delta = self._compute_delta(
-                current_sample=current_sample,
-                original_sample=original_sample,
+                current_sample=current_active,
+                original_sample=original_active,
                 clip_min=clip_min,
                 clip_max=clip_max,
             )
 
             # Then run binary search
-            current_sample = self._binary_search(
-                current_sample=current_sample,
-                original_sample=original_sample,
+            current_active = self._binary_search(
+                current_sample=current_active,
+                original_sample=original_active,
                 norm=self.norm,
-                target=target,
+                target=target_active,
                 clip_min=clip_min,
                 clip_max=clip_max,
             )
@@ -420,44 +436,53 @@ class HopSkipJump(EvasionAttack):
             num_eval = min(int(self.init_eval * np.sqrt(self.curr_iter + 1)), self.max_eval)
 
             update = self._compute_update(
-                current_sample=current_sample,
+                current_sample=current_active,
                 num_eval=num_eval,
                 delta=delta,
-                target=target,
-                mask=mask,
+                target=target_active,
+                mask=None if mask is None else mask[active_idx],
+                rngs=[rngs[i] for i in active_idx],
                 clip_min=clip_min,
                 clip_max=clip_max,
             )
 
             # Finally run step size search by first computing epsilon
+            diff = (original_active - current_active).reshape((active_idx.size, -1))
             if self.norm == 2:
-                dist = np.linalg.norm(original_sample - current_sample)
+                dist = np.linalg.norm(diff, axis=1)
             else:
-                dist = np.max(abs(original_sample - current_sample))
+                dist = np.max(abs(diff), axis=1)
 
             epsilon = 2.0 * dist / np.sqrt(self.curr_iter + 1)
-            success = False
-
-            while not success:
-                epsilon /= 2.0
-                potential_sample = current_sample + epsilon * update
-                success = self._adversarial_satisfactory(  # type: ignore
-                    samples=potential_sample[None],
-                    target=target,
+            potential_sample = current_active.copy()
+            success = np.zeros(active_idx.size, dtype=bool)
+
+            while not np.all(success):
+                searching = np.invert(success)
+                epsilon[searching] /= 2.0
+                potential_sample[searching] = (
+                    current_active[searching]
+                    + expand_per_sample(epsilon[searching], current_active) * update[searching]
+                )
+                success[searching] = self._adversarial_satisfactory(
+                    samples=potential_sample[searching],
+                    target=target_active[searching],
                     clip_min=clip_min,
                     clip_max=clip_max,
                 )
 
-            # Update current sample
-            current_sample = np.clip(potential_sample, clip_min, clip_max)
+            # Update current samples
+            current_sample[active_idx] = np.clip(potential_sample, clip_min, clip_max)
 
             # Update current iteration
             self.curr_iter += 1
 
             # If attack failed. return original sample
-            if np.isnan(current_sample).any():  # pragma: no cover
-                logger.debug("NaN detected in sample, returning original sample.")
-                return original_sample
+            sample_is_nan = np.isnan(current_sample[active_idx].reshape((active_idx.size, -1))).any(axis=1)
+            if np.any(sample_is_nan):  # pragma: no cover
+                logger.debug("NaN detected in %d samples, returning original samples.", np.sum(sample_is_nan))
+                current_sample[active_idx[sample_is_nan]] = original_sample[active_idx[sample_is_nan]]
+                sample_is_active[active_idx[sample_is_nan]] = False
 
         return current_sample
 
@@ -465,60 +490,64 @@ class HopSkipJump(EvasionAttack):
         self,
         current_sample: np.ndarray,
         original_sample: np.ndarray,
-        target: int,
+        target: np.ndarray,
         norm: Union[int, float, str],
         clip_min: float,
         clip_max: float,
         threshold: Optional[float] = None,
     ) -> np.ndarray:
         """
-        Binary search to approach the boundary.
+        Binary search to approach the boundary, run for all examples together.
 
-        :param current_sample: Current adversarial example.
-        :param original_sample: The original input.
-        :param target: The target label.
+        :param current_sample: Current adversarial examples.
+        :param original_sample: The original inputs.
+        :param target: The target labels.
         :param norm: Order of the norm. Possible values: "inf", np.inf or 2.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
         :param threshold: The upper threshold in binary search.
-        :return: an adversarial example.
+        :return: The adversarial examples.
         """
+        nb_samples = current_sample.shape[0]
+
         # First set upper and lower bounds as well as the threshold for the binary search
         if norm == 2:
-            (upper_bound, lower_bound) = (1, 0)
+            upper_bound = np.ones(nb_samples)
+            lower_bound = np.zeros(nb_samples)
 
             if threshold is None:
                 threshold = self.theta
 
         else:
-            (upper_bound, lower_bound) = (
-                np.max(abs(original_sample - current_sample)),
-                0,
-            )
+            upper_bound = np.max(abs(original_sample - current_sample).reshape((nb_samples, -1)), axis=1)
+            lower_bound = np.zeros(nb_samples)
 
             if threshold is None:
                 threshold = np.minimum(upper_bound * self.theta, self.theta)
 
         # Then start the binary search
-        while (upper_bound - lower_bound) > threshold:
+        searching = (upper_bound - lower_bound) > threshold
+        while np.any(searching):
             # Interpolation point
-            alpha = (upper_bound + lower_bound) / 2.0
+            alpha = (upper_bound[searching] + lower_bound[searching]) / 2.0
             interpolated_sample = self._interpolate(
-                current_sample=current_sample,
-                original_sample=original_sample,
+                current_sample=current_sample[searching],
+                original_sample=original_sample[searching],
                 alpha=alpha,
                 norm=norm,
             )
 
             # Update upper_bound and lower_bound
             satisfied = self._adversarial_satisfactory(
-                samples=interpolated_sample[None],
-                target=target,
+                samples=interpolated_sample,
+                target=target[searching],
                 clip_min=clip_min,
                 clip_max=clip_max,
-            )[0]
-            lower_bound = np.where(satisfied == 0, alpha, lower_bound)
-            upper_bound = np.where(satisfied == 1, alpha, upper_bound)
+            )
+            lower_bound[searching] = np.where(satisfied == 0, alpha, lower_bound[searching])
+            upper_bound[searching] = np.where(satisfied == 1, alpha, upper_bound[searching])
+
+            searching = (upper_bound - lower_bound) > threshold
 
         result = self._interpolate(
             current_sample=current_sample,
@@ -535,26 +564,27 @@ class HopSkipJump(EvasionAttack):
         original_sample: np.ndarray,
         clip_min: float,
         clip_max: float,
-    ) -> float:
+    ) -> np.ndarray:
         """
         Compute the delta parameter.
 
-        :param current_sample: Current adversarial example.
-        :param original_sample: The original input.
+        :param current_sample: Current adversarial examples.
+        :param original_sample: The original inputs.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: Delta value.
+        :return: Delta value of each example.
         """
         # Note: This is a bit different from the original paper, instead we keep those that are
         # implemented in the original source code of the authors
         if self.curr_iter == 0:
-            return 0.1 * (clip_max - clip_min)
+            return np.full(current_sample.shape[0], 0.1 * (clip_max - clip_min))
 
+        diff = (original_sample - current_sample).reshape((current_sample.shape[0], -1))
         if self.norm == 2:
-            dist = np.linalg.norm(original_sample - current_sample)
+            dist = np.linalg.norm(diff, axis=1)
             delta = np.sqrt(np.prod(self.estimator.input_shape)) * self.theta * dist
         else:
-            dist = np.max(abs(original_sample - current_sample))
+            dist = np.max(abs(diff), axis=1)
             delta = np.prod(self.estimator.input_shape) * self.theta * dist
 
         return delta
@@ -563,80 +593,99 @@ class HopSkipJump(EvasionAttack):
         self,
         current_sample: np.ndarray,
         num_eval: int,
-        delta: float,
-        target: int,
+        delta: np.ndarray,
+        target: np.ndarray,
         mask: Optional[np.ndarray],
+        rngs: List[np.random.RandomState],
         clip_min: float,
         clip_max: float,
     ) -> np.ndarray:
         """
-        Compute the update in Eq.(14).
+        Compute the update in Eq.(14). The evaluations of several examples are stacked into one prediction call if
+        `num_eval` is smaller than `batch_size`.
 
-        :param current_sample: Current adversarial example.
+        :param current_sample: Current adversarial examples.
         :param num_eval: The number of evaluations for estimating gradient.
-        :param delta: The size of random perturbation.
-        :param target: The target label.
+        :param delta: The size of random perturbation of each example.
+        :param target: The target labels.
         :param mask: An array with a mask to be applied to the adversarial perturbations. Shape needs to be
                      broadcastable to the shape of x. Any features for which the mask is zero will not be adversarially
                      perturbed.
+        :param rngs: The random generator of each example.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
-        :return: an updated perturbation.
+        :return: The updated perturbations.
         """
-        # Generate random noise
+        nb_samples = current_sample.shape[0]
         rnd_noise_shape = [num_eval] + list(self.estimator.input_shape)
-        if self.norm == 2:
-            rnd_noise = np.random.randn(*rnd_noise_shape).astype(ART_NUMPY_DTYPE)
-        else:
-            rnd_noise = np.random.uniform(low=-1, high=1, size=rnd_noise_shape).astype(ART_NUMPY_DTYPE)
+        nb_samples_stacked = max(1, self.batch_size // num_eval)
+        result = np.zeros_like(current_sample)
 
-        # With mask
-        if mask is not None:
-            rnd_noise = rnd_noise * mask
-
-        # Normalize random noise to fit into the range of input data
-        rnd_noise = rnd_noise / np.sqrt(
-            np.sum(
-                rnd_noise ** 2,
-                axis=tuple(range(len(rnd_noise_shape)))[1:],
-                keepdims=True,
-            )
-        )
-        eval_samples = np.clip(current_sample + delta * rnd_noise, clip_min, clip_max)
-        rnd_noise = (eval_samples - current_sample) / delta
-
-        # Compute gradient: This is a bit different from the original paper, instead we keep those that are
-        # implemented in the original source code of the authors
-        satisfied = self._adversarial_satisfactory(
-            samples=eval_samples, target=target, clip_min=clip_min, clip_max=clip_max
-        )
-        f_val = 2 * satisfied.reshape([num_eval] + [1] * len(self.estimator.input_shape)) - 1.0
-        f_val = f_val.astype(ART_NUMPY_DTYPE)
+        for begin in range(0, nb_samples, nb_samples_stacked):
+            end = min(begin + nb_samples_stacked, nb_samples)
 
-        if np.mean(f_val) == 1.0:
-            grad = np.mean(rnd_noise, axis=0)
-        elif np.mean(f_val) == -1.0:
-            grad = -np.mean(rnd_noise, axis=0)
-        else:
-            f_val -= np.mean(f_val)
-            grad = np.mean(f_val * rnd_noise, axis=0)
+            # Generate random noise
+            if self.norm == 2:
+                rnd_noise = np.array([rngs[i].randn(*rnd_noise_shape) for i in range(begin, end)])
+            else:
+                rnd_noise = np.array([rngs[i].uniform(low=-1, high=1, size=rnd_noise_shape) for i in range(begin, end)])
+            rnd_noise = rnd_noise.astype(ART_NUMPY_DTYPE)
+
+            # With mask
+            if mask is not None:
+                rnd_noise = rnd_noise * mask[begin:end, None]
+
+            # Normalize random noise to fit into the range of input data
+            rnd_noise = rnd_noise / np.sqrt(
+                np.sum(
+                    rnd_noise**2,
+                    axis=tuple(range(len(rnd_noise_shape) + 1))[2:],
+                    keepdims=True,
+                )
+            )
+            current_stacked = current_sample[begin:end, None]
+            delta_stacked = expand_per_sample(delta[begin:end], rnd_noise)
+            eval_samples = np.clip(current_stacked + delta_stacked * rnd_noise, clip_min, clip_max)
+            rnd_noise = (eval_samples - current_stacked) / delta_stacked
 
-        # Compute update
-        if self.norm == 2:
-            result = grad / np.linalg.norm(grad)
-        else:
-            result = np.sign(grad)
+            # Compute gradient: This is a bit different from the original paper, instead we keep those that are
+            # implemented in the original source code of the authors
+            satisfied = self._adversarial_satisfactory(
+                samples=eval_samples.reshape([-1] + list(self.estimator.input_shape)),
+                target=np.repeat(target[begin:end], num_eval),
+                clip_min=clip_min,
+                clip_max=clip_max,
+            )
+            f_vals = 2 * satisfied.reshape([end - begin, num_eval] + [1] * len(self.estimator.input_shape)) - 1.0
+            f_vals = f_vals.astype(ART_NUMPY_DTYPE)
+
+            for i in range(end - begin):
+                f_val = f_vals[i]
+
+                if np.mean(f_val) == 1.0:
+                    grad = np.mean(rnd_noise[i], axis=0)
+                elif np.mean(f_val) == -1.0:
+                    grad = -np.mean(rnd_noise[i], axis=0)
+                else:
+                    f_val -= np.mean(f_val)
+                    grad = np.mean(f_val * rnd_noise[i], axis=0)
+
+                # Compute update
+                if self.norm == 2:
+                    result[begin + i] = grad / np.linalg.norm(grad)
+                else:
+                    result[begin + i] = np.sign(grad)
 
         return result
 
     def _adversarial_satisfactory(
-        self, samples: np.ndarray, target: int, clip_min: float, clip_max: float
+        self, samples: np.ndarray, target: Union[int, np.ndarray], clip_min: float, clip_max: float
     ) -> np.ndarray:
         """
-        Check whether an image is adversarial.
+        Check whether images are adversarial.
 
         :param samples: A batch of examples.
-        :param target: The target label.
+        :param target: The target label or an array with the target label of each example.
         :param clip_min: Minimum value of an example.
         :param clip_max: Maximum value of an example.
         :return: An array of 0/1.
@@ -653,17 +702,19 @@ class HopSkipJump(EvasionAttack):
 
     @staticmethod
     def _interpolate(
-        current_sample: np.ndarray, original_sample: np.ndarray, alpha: float, norm: Union[int, float, str]
+        current_sample: np.ndarray, original_sample: np.ndarray, alpha: np.ndarray, norm: Union[int, float, str]
     ) -> np.ndarray:
         """
-        Interpolate a new sample based on the original and the current samples.
+        Interpolate new samples based on the original and the current samples.
 
-        :param current_sample: Current adversarial example.
-        :param original_sample: The original input.
-        :param alpha: The coefficient of interpolation.
+        :param current_sample: Current adversarial examples.
+        :param original_sample: The original inputs.
+        :param alpha: The coefficient of interpolation of each example.
         :param norm: Order of the norm. Possible values: "inf", np.inf or 2.
-        :return: An adversarial example.
+        :return: The adversarial examples.
         """
+        alpha = expand_per_sample(alpha, current_sample)
+
         if norm == 2:
             result = (1 - alpha) * original_sample + alpha * current_sample
         else:
@@ -34,7 +34,7 @@ from art.estimators.estimator import BaseEstimator, LossGradientsMixin, NeuralNe
 from art.estimators.pytorch import PyTorchEstimator
 from art.estimators.speech_recognition.speech_recognizer import SpeechRecognizerMixin
 from art.estimators.tensorflow import TensorFlowV2Estimator
-from art.utils import pad_sequence_input
+from art.utils import PackedSequences, length_buckets, pad_sequence_input
 
 if TYPE_CHECKING:
     # pylint: disable=C0412
@@ -180,16 +180,17 @@ class ImperceptibleASR(EvasionAttack):
             raise ValueError("The target values `y` cannot be None. Please provide a `np.ndarray` of target labels.")
 
         nb_samples = x.shape[0]
+        y = np.asarray(y)
 
         x_imperceptible = [None] * nb_samples
 
-        nb_batches = int(np.ceil(nb_samples / float(self.batch_size)))
-        for m in range(nb_batches):
-            # batch indices
-            begin, end = m * self.batch_size, min((m + 1) * self.batch_size, nb_samples)
-
+        # batch samples of similar length to reduce the padding of the estimator and masking threshold computations
+        lengths = np.array([len(x_i) for x_i in x])
+        for batch_index in length_buckets(lengths, self.batch_size):
             # create batch of adversarial examples
-            x_imperceptible[begin:end] = self._generate_batch(x[begin:end], y[begin:end])
+            x_imperceptible_batch = self._generate_batch(x[batch_index], y[batch_index])
+            for i, x_imperceptible_i in zip(batch_index, x_imperceptible_batch):
+                x_imperceptible[i] = x_imperceptible_i
 
         # for ragged input, use object dtype
         dtype = np.float32 if x.ndim != 1 else object
@@ -233,19 +234,29 @@ class ImperceptibleASR(EvasionAttack):
         epsilon = [self.eps] * batch_size
         x_adversarial = [None] * batch_size
 
-        x_perturbed = x.copy()
+        # operate on the packed samples to avoid loops over the ragged samples
+        x_packed = PackedSequences.from_sequences(x)
+        x_perturbed_packed = x_packed.with_data(x_packed.data.copy())
+        x_perturbed = x_perturbed_packed.to_array()
 
         for i in range(1, self.max_iter_1 + 1):
             # perform FGSM step for x
-            gradients = self.estimator.loss_gradient(x_perturbed, y, batch_mode=True)
-            x_perturbed = x_perturbed - self.learning_rate_1 * np.array([np.sign(g) for g in gradients], dtype=dtype)
+            gradients = PackedSequences.from_sequences(self.estimator.loss_gradient(x_perturbed, y, batch_mode=True))
+            gradients_sign = np.sign(gradients.data)
+            if x.ndim != 1:
+                gradients_sign = gradients_sign.astype(dtype)
+            x_perturbed_data = x_perturbed_packed.data - self.learning_rate_1 * gradients_sign
 
             # clip perturbation
-            perturbation = x_perturbed - x
-            perturbation = np.array([np.clip(p, -e, e) for p, e in zip(perturbation, epsilon)], dtype=dtype)
+            epsilon_packed = x_packed.repeat(np.array(epsilon, dtype=x_packed.data.dtype))
+            perturbation_data = np.clip(x_perturbed_data - x_packed.data, -epsilon_packed, epsilon_packed)
+            if x.ndim != 1:
+                perturbation_data = perturbation_data.astype(dtype)
+            perturbation = x_packed.with_data(perturbation_data).to_array()
 
             # re-apply clipped perturbation to x
-            x_perturbed = x + perturbation
+            x_perturbed_packed = x_packed.with_data(x_packed.data + perturbation_data)
+            x_perturbed = x_perturbed_packed.to_array()
 
             if i % self.num_iter_decrease_eps == 0:
                 prediction = self.estimator.predict(x_perturbed, batch_size=batch_size)
@@ -421,14 +432,12 @@ class ImperceptibleASR(EvasionAttack):
 
         # undo padding, i.e. change gradients shape from (nb_samples, max_length) to (nb_samples)
         lengths = delta_mask.sum(axis=1)
-        gradients = []
-        for gradient_padded, length in zip(gradients_padded, lengths):
-            gradient = gradient_padded[:length]
-            gradients.append(gradient)
+        gradients = PackedSequences.from_padded(gradients_padded, lengths, ragged=x.ndim == 1).to_array()
 
         # for ragged input, use object dtype
-        dtype = np.float32 if x.ndim != 1 else object
-        return np.array(gradients, dtype=dtype), loss
+        if x.ndim != 1:
+            gradients = gradients.astype(np.float32)
+        return gradients, loss
 
     def _loss_gradient_masking_threshold_tf(
         self, perturbation: "Tensor", psd_maximum_stabilized: "Tensor", masking_threshold_stabilized: "Tensor"
@@ -30,13 +30,20 @@ from typing import Optional, Union, TYPE_CHECKING
 
 import numpy as np
 from scipy.stats import truncnorm
-from tqdm.auto import trange
+from tqdm.auto import tqdm, trange
 
 from art.attacks.evasion.fast_gradient import FastGradientMethod
 from art.config import ART_NUMPY_DTYPE
 from art.estimators.classification.classifier import ClassifierMixin
 from art.estimators.estimator import BaseEstimator, LossGradientsMixin
-from art.utils import compute_success, get_labels_np_array, check_and_transform_label_format, compute_success_array
+from art.utils import (
+    cache_predictions,
+    compute_success,
+    get_labels_np_array,
+    check_and_transform_label_format,
+    compute_success_array,
+    random_sphere,
+)
 from art.summary_writer import SummaryWriter
 
 if TYPE_CHECKING:
@@ -168,9 +175,9 @@ class ProjectedGradientDescentCommon(FastGradientMethod):
 
             # Use model predictions as correct outputs
             if classifier_mixin:
-                targets = get_labels_np_array(self.estimator.predict(x, batch_size=self.batch_size))
+                targets = get_labels_np_array(self.estimator.prediction_cache.predict(x, batch_size=self.batch_size))
             else:
-                targets = self.estimator.predict(x, batch_size=self.batch_size)
+                targets = self.estimator.prediction_cache.predict(x, batch_size=self.batch_size)
 
         else:
             targets = y
@@ -244,6 +251,8 @@ class ProjectedGradientDescentNumpy(ProjectedGradientDescentCommon):
     | Paper link: https://arxiv.org/abs/1706.06083
     """
 
+    attack_params = ProjectedGradientDescentCommon.attack_params + ["early_stop"]
+
     def __init__(
         self,
         estimator: Union["CLASSIFIER_LOSS_GRADIENTS_TYPE", "OBJECT_DETECTOR_TYPE"],
@@ -258,6 +267,7 @@ class ProjectedGradientDescentNumpy(ProjectedGradientDescentCommon):
         random_eps: bool = False,
         summary_writer: Union[str, bool, SummaryWriter] = False,
         verbose: bool = True,
+        early_stop: bool = False,
     ) -> None:
         """
         Create a :class:`.ProjectedGradientDescentNumpy` instance.
@@ -283,10 +293,16 @@ class ProjectedGradientDescentNumpy(ProjectedGradientDescentCommon):
                                Use hierarchical folder structure to compare between runs easily. e.g. pass in
                                ‘runs/exp1’, ‘runs/exp2’, etc. for each new experiment to compare across them.
         :param verbose: Show progress bars.
+        :param early_stop: Stop iterating on samples as soon as they are adversarial and refill the batch with pending
+                           samples. Random restarts are only run for samples which are still robust. Only supported for
+                           classifiers.
         """
         if summary_writer and num_random_init > 1:
             raise ValueError("TensorBoard is not yet supported for more than 1 random restart (num_random_init>1).")
 
+        if summary_writer and early_stop:
+            raise ValueError("TensorBoard is not yet supported with early stopping (early_stop=True).")
+
         super().__init__(
             estimator=estimator,
             norm=norm,
@@ -303,7 +319,10 @@ class ProjectedGradientDescentNumpy(ProjectedGradientDescentCommon):
         )
 
         self._project = True
+        self.early_stop = early_stop
+        ProjectedGradientDescentNumpy._check_params(self)
 
+    @cache_predictions
     def generate(self, x: np.ndarray, y: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
         """
         Generate adversarial samples and return them in an array.
@@ -328,13 +347,36 @@ class ProjectedGradientDescentNumpy(ProjectedGradientDescentCommon):
         # Check whether random eps is enabled
         self._random_eps()
 
-        if isinstance(self.estimator, ClassifierMixin):
+        if isinstance(self.estimator, ClassifierMixin) and self.early_stop:
+            # Set up targets
+            targets = self._set_targets(x, y)
+
+            adv_x = self._generate_early_stop(x, targets, mask)
+
+            logger.info(
+                "Success rate of attack: %.2f%%",
+                100
+                * compute_success(
+                    self.estimator,  # type: ignore
+                    x,
+                    targets,
+                    adv_x,
+                    self.targeted,
+                    batch_size=self.batch_size,  # type: ignore
+                ),
+            )
+
+        elif isinstance(self.estimator, ClassifierMixin):
             # Set up targets
             targets = self._set_targets(x, y)
 
             # Start to compute adversarial examples
             adv_x = x.astype(ART_NUMPY_DTYPE)
 
+            tensor_mode = self._tensor_mode(x)
+            if tensor_mode:
+                self._clip_values_pytorch = None
+
             for batch_id in range(int(np.ceil(x.shape[0] / float(self.batch_size)))):
 
                 self._batch_id = batch_id
@@ -353,6 +395,15 @@ class ProjectedGradientDescentNumpy(ProjectedGradientDescentCommon):
                             mask_batch = mask[batch_index_1:batch_index_2]
 
                     momentum = np.zeros(batch.shape)
+                    eps, eps_step = self.eps, self.eps_step
+
+                    # Transfer the batch once, all iterations then run on the device of the estimator
+                    if tensor_mode:
+                        batch, batch_labels, mask_batch, momentum, eps, eps_step = (
+                            self._to_device(value)
+                            for value in (batch, batch_labels, mask_batch, momentum, eps, eps_step)
+                        )
+                    batch_init = batch
 
                     for i_max_iter in trange(
                         self.max_iter, desc="PGD - Iterations", leave=False, disable=not self.verbose
@@ -361,11 +412,11 @@ class ProjectedGradientDescentNumpy(ProjectedGradientDescentCommon):
 
                         batch = self._compute(
                             batch,
-                            x[batch_index_1:batch_index_2],
+                            batch_init,
                             batch_labels,
                             mask_batch,
-                            self.eps,
-                            self.eps_step,
+                            eps,
+                            eps_step,
                             self._project,
                             self.num_random_init > 0 and i_max_iter == 0,
                             self._batch_id,
@@ -373,6 +424,8 @@ class ProjectedGradientDescentNumpy(ProjectedGradientDescentCommon):
                             momentum=momentum,
                         )
 
+                    batch = self._to_numpy(batch)
+
                     if rand_init_num == 0:
                         # initial (and possibly only) random restart: we only have this set of
                         # adversarial examples for now
@@ -436,3 +489,127 @@ class ProjectedGradientDescentNumpy(ProjectedGradientDescentCommon):
             self.summary_writer.reset()
 
         return adv_x
+
+    def _check_params(self) -> None:
+
+        super()._check_params()
+
+        if not isinstance(self.early_stop, bool):
+            raise ValueError("The flag `early_stop` has to be of type bool.")
+
+    def _generate_early_stop(self, x: np.ndarray, targets: np.ndarray, mask: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Generate adversarial samples with per-sample early stopping. The working batch holds up to `batch_size` active
+        samples. Samples leave the batch as soon as they are adversarial or have used all iterations of their last
+        random initialisation, and free slots are refilled with pending samples.
+
+        :param x: An array with the original inputs.
+        :param targets: Target values (class labels) one-hot-encoded of shape `(nb_samples, nb_classes)`.
+        :param mask: An array with a mask broadcastable to input `x`.
+        :return: An array holding the adversarial examples.
+        """
+        nb_samples = x.shape[0]
+        x_init = x.astype(ART_NUMPY_DTYPE)
+        adv_x = x_init.copy()
+        x_work = x_init.copy()
+        momentum = np.zeros(x.shape)
+
+        # Number of completed iterations and random initialisations of each sample
+        nb_iter = np.zeros(nb_samples, dtype=int)
+        nb_init = np.zeros(nb_samples, dtype=int)
+
+        # Clean predictions are computed once for the success checks of untargeted attacks
+        if self.targeted:
+            labels = np.argmax(targets, axis=1)
+        else:
+            labels = np.argmax(self.estimator.predict(x, batch_size=self.batch_size), axis=1)
+
+        per_sample_mask = mask is not None and len(mask.shape) == len(x.shape)
+        per_sample_eps = (
+            isinstance(self.eps, np.ndarray) and len(self.eps.shape) == len(x.shape) and self.eps.shape[0] == nb_samples
+        )
+
+        pending = list(range(nb_samples))
+        active = np.array([], dtype=int)
+
+        with tqdm(total=nb_samples, desc="PGD - Samples", disable=not self.verbose) as pbar:
+            while active.size > 0 or pending:
+                # Refill the working batch with pending samples
+                nb_new = min(self.batch_size - active.size, len(pending))
+                new, pending = np.array(pending[:nb_new], dtype=int), pending[nb_new:]
+                active = np.concatenate([active, new])
+
+                mask_batch = mask[active] if per_sample_mask else mask
+                eps = self.eps[active] if per_sample_eps else self.eps
+                eps_step = self.eps_step[active] if per_sample_eps else self.eps_step  # type: ignore
+
+                # Start random initialisations of samples entering their first iteration
+                if self.num_random_init > 0:
+                    start = nb_iter[active] == 0
+                    if start.any():
+                        x_work[active[start]] = self._random_init(
+                            x_init[active[start]],
+                            mask_batch[start] if per_sample_mask else mask_batch,
+                            eps[start] if per_sample_eps else eps,
+                        )
+
+                momentum_batch = momentum[active]
+                x_work[active] = self._compute(
+                    x_work[active],
+                    x_init[active],
+                    targets[active],
+                    mask_batch,
+                    eps,
+                    eps_step,
+                    self._project,
+                    False,
+                    decay=self.decay,
+                    momentum=momentum_batch,
+                )
+                momentum[active] = momentum_batch
+                nb_iter[active] += 1
+
+                preds = self.estimator.predict(x_work[active], batch_size=self.batch_size)
+                if self.targeted:
+                    success = np.argmax(preds, axis=1) == labels[active]
+                else:
+                    success = np.argmax(preds, axis=1) != labels[active]
+
+                # Keep the examples of the first initialisation and successful examples of later ones
+                exhausted = nb_iter[active] >= self.max_iter
+                keep = success | ((nb_init[active] == 0) & exhausted)
+                adv_x[active[keep]] = x_work[active[keep]]
+
+                # Schedule another random initialisation for samples which are still robust
+                restart = ~success & exhausted & (nb_init[active] + 1 < self.num_random_init)
+                nb_init[active[restart]] += 1
+                nb_iter[active[restart]] = 0
+                momentum[active[restart]] = 0.0
+
+                done = success | (exhausted & ~restart)
+                pbar.update(int(np.sum(done)))
+                active = active[~done]
+
+        return adv_x
+
+    def _random_init(self, x: np.ndarray, mask: Optional[np.ndarray], eps: Union[int, float, np.ndarray]) -> np.ndarray:
+        """
+        Draw random starting points within the epsilon ball around `x`.
+
+        :param x: An array with the original inputs.
+        :param mask: An array with a mask broadcastable to input `x`.
+        :param eps: Maximum perturbation that the attacker can introduce.
+        :return: Random starting points.
+        """
+        n = x.shape[0]
+        m = np.prod(x.shape[1:]).item()
+        random_perturbation = random_sphere(n, m, eps, self.norm).reshape(x.shape).astype(ART_NUMPY_DTYPE)
+        if mask is not None:
+            random_perturbation = random_perturbation * (mask.astype(ART_NUMPY_DTYPE))
+        x_adv = x + random_perturbation
+
+        if self.estimator.clip_values is not None:
+            clip_min, clip_max = self.estimator.clip_values
+            x_adv = np.clip(x_adv, clip_min, clip_max)
+
+        return x_adv
@@ -38,7 +38,7 @@ from art.estimators.classification.classifier import ClassifierMixin
 from art.attacks.evasion.projected_gradient_descent.projected_gradient_descent_numpy import (
     ProjectedGradientDescentCommon,
 )
-from art.utils import compute_success, random_sphere, compute_success_array
+from art.utils import cache_predictions, compute_success, random_sphere, compute_success_array
 
 if TYPE_CHECKING:
     # pylint: disable=C0412
@@ -125,6 +125,7 @@ class ProjectedGradientDescentPyTorch(ProjectedGradientDescentCommon):
         self._batch_id = 0
         self._i_max_iter = 0
 
+    @cache_predictions
     def generate(self, x: np.ndarray, y: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
         """
         Generate adversarial samples and return them in an array.
@@ -153,6 +154,9 @@ class ProjectedGradientDescentPyTorch(ProjectedGradientDescentCommon):
         # Set up targets
         targets = self._set_targets(x, y)
 
+        # Transfer the clipping range of the current estimator to the device at the first iteration
+        self._clip_values_pytorch = None
+
         # Create dataset
         if mask is not None:
             # Here we need to make a distinction: if the masks are different for each input, we need to index
@@ -269,11 +273,15 @@ class ProjectedGradientDescentPyTorch(ProjectedGradientDescentCommon):
         inputs = x.to(self.estimator.device)
         targets = targets.to(self.estimator.device)
         adv_x = torch.clone(inputs)
-        momentum = torch.zeros(inputs.shape)
+        momentum = torch.zeros(inputs.shape).to(self.estimator.device)
 
         if mask is not None:
             mask = mask.to(self.estimator.device)
 
+        # Transfer array-valued step sizes once, all iterations then stay on the device
+        eps = self._to_device(eps)
+        eps_step = self._to_device(eps_step)
+
         for i_max_iter in range(self.max_iter):
             self._i_max_iter = i_max_iter
             adv_x = self._compute_pytorch(
@@ -282,110 +290,14 @@ class ProjectedGradientDescentPyTorch(ProjectedGradientDescentCommon):
 
         return adv_x.cpu().detach().numpy()
 
-    def _compute_perturbation_pytorch(  # pylint: disable=W0221
-        self, x: "torch.Tensor", y: "torch.Tensor", mask: Optional["torch.Tensor"], momentum: "torch.Tensor"
-    ) -> "torch.Tensor":
-        """
-        Compute perturbations.
-
-        :param x: Current adversarial examples.
-        :param y: Target values (class labels) one-hot-encoded of shape `(nb_samples, nb_classes)` or indices of shape
-                  (nb_samples,). Only provide this parameter if you'd like to use true labels when crafting adversarial
-                  samples. Otherwise, model predictions are used as labels to avoid the "label leaking" effect
-                  (explained in this paper: https://arxiv.org/abs/1611.01236). Default is `None`.
-        :param mask: An array with a mask broadcastable to input `x` defining where to apply adversarial perturbations.
-                     Shape needs to be broadcastable to the shape of x and can also be of the same shape as `x`. Any
-                     features for which the mask is zero will not be adversarially perturbed.
-        :return: Perturbations.
-        """
-        import torch
-
-        # Pick a small scalar to avoid division by 0
-        tol = 10e-8
-
-        # Get gradient wrt loss; invert it if attack is targeted
-        grad = self.estimator.loss_gradient(x=x, y=y) * (1 - 2 * int(self.targeted))
-
-        # Write summary
-        if self.summary_writer is not None:  # pragma: no cover
-            self.summary_writer.update(
-                batch_id=self._batch_id,
-                global_step=self._i_max_iter,
-                grad=grad.cpu().detach().numpy(),
-                patch=None,
-                estimator=self.estimator,
-                x=x.cpu().detach().numpy(),
-                y=y.cpu().detach().numpy(),
-                targeted=self.targeted,
-            )
-
-        # Check for nan before normalisation an replace with 0
-        if torch.any(grad.isnan()):  # pragma: no cover
-            logger.warning("Elements of the loss gradient are NaN and have been replaced with 0.0.")
-            grad[grad.isnan()] = 0.0
-
-        # Apply mask
-        if mask is not None:
-            grad = torch.where(mask == 0.0, torch.tensor(0.0).to(self.estimator.device), grad)
-
-        # Apply momentum
-        if self.decay is not None:
-            ind = tuple(range(1, len(x.shape)))
-            grad = grad / (torch.sum(grad.abs(), dim=ind, keepdims=True) + tol)  # type: ignore
-            grad = self.decay * momentum + grad
-            # Accumulate the gradient for the next iter
-            momentum += grad
-
-        # Apply norm bound
-        if self.norm in ["inf", np.inf]:
-            grad = grad.sign()
-
-        elif self.norm == 1:
-            ind = tuple(range(1, len(x.shape)))
-            grad = grad / (torch.sum(grad.abs(), dim=ind, keepdims=True) + tol)  # type: ignore
-
-        elif self.norm == 2:
-            ind = tuple(range(1, len(x.shape)))
-            grad = grad / (torch.sqrt(torch.sum(grad * grad, axis=ind, keepdims=True)) + tol)  # type: ignore
-
-        assert x.shape == grad.shape
-
-        return grad
-
-    def _apply_perturbation_pytorch(  # pylint: disable=W0221
-        self, x: "torch.Tensor", perturbation: "torch.Tensor", eps_step: Union[int, float, np.ndarray]
-    ) -> "torch.Tensor":
-        """
-        Apply perturbation on examples.
-
-        :param x: Current adversarial examples.
-        :param perturbation: Current perturbations.
-        :param eps_step: Attack step size (input variation) at each iteration.
-        :return: Adversarial examples.
-        """
-        import torch
-
-        eps_step = np.array(eps_step, dtype=ART_NUMPY_DTYPE)
-        perturbation_step = torch.tensor(eps_step).to(self.estimator.device) * perturbation
-        perturbation_step[torch.isnan(perturbation_step)] = 0
-        x = x + perturbation_step
-        if self.estimator.clip_values is not None:
-            clip_min, clip_max = self.estimator.clip_values
-            x = torch.max(
-                torch.min(x, torch.tensor(clip_max).to(self.estimator.device)),
-                torch.tensor(clip_min).to(self.estimator.device),
-            )
-
-        return x
-
     def _compute_pytorch(
         self,
         x: "torch.Tensor",
         x_init: "torch.Tensor",
         y: "torch.Tensor",
         mask: "torch.Tensor",
-        eps: Union[int, float, np.ndarray],
-        eps_step: Union[int, float, np.ndarray],
+        eps: Union[int, float, np.ndarray, "torch.Tensor"],
+        eps_step: Union[int, float, np.ndarray, "torch.Tensor"],
         random_init: bool,
         momentum: "torch.Tensor",
     ) -> "torch.Tensor":
@@ -413,97 +325,30 @@ class ProjectedGradientDescentPyTorch(ProjectedGradientDescentCommon):
             n = x.shape[0]
             m = np.prod(x.shape[1:]).item()
 
-            random_perturbation_array = random_sphere(n, m, eps, self.norm).reshape(x.shape).astype(ART_NUMPY_DTYPE)
+            eps_array = eps.cpu().numpy() if isinstance(eps, torch.Tensor) else eps
+            random_perturbation_array = (
+                random_sphere(n, m, eps_array, self.norm).reshape(x.shape).astype(ART_NUMPY_DTYPE)
+            )
             random_perturbation = torch.from_numpy(random_perturbation_array).to(self.estimator.device)
 
             if mask is not None:
                 random_perturbation = random_perturbation * mask
 
-            x_adv = x + random_perturbation
-
-            if self.estimator.clip_values is not None:
-                clip_min, clip_max = self.estimator.clip_values
-                x_adv = torch.max(
-                    torch.min(x_adv, torch.tensor(clip_max).to(self.estimator.device)),
-                    torch.tensor(clip_min).to(self.estimator.device),
-                )
+            x_adv = self._clip_pytorch(x + random_perturbation)
 
         else:
             x_adv = x
 
         # Get perturbation
-        perturbation = self._compute_perturbation_pytorch(x_adv, y, mask, momentum)
+        perturbation = self._compute_perturbation_pytorch(x_adv, y, mask, self.decay, momentum)
 
         # Apply perturbation and clip
         x_adv = self._apply_perturbation_pytorch(x_adv, perturbation, eps_step)
 
         # Do projection
-        perturbation = self._projection(x_adv - x_init, eps, self.norm)
+        perturbation = self._projection_pytorch(x_adv - x_init, eps, self.norm)
 
         # Recompute x_adv
         x_adv = perturbation + x_init
 
         return x_adv
-
-    def _projection(
-        self, values: "torch.Tensor", eps: Union[int, float, np.ndarray], norm_p: Union[int, float, str]
-    ) -> "torch.Tensor":
-        """
-        Project `values` on the L_p norm ball of size `eps`.
-
-        :param values: Values to clip.
-        :param eps: Maximum norm allowed.
-        :param norm_p: L_p norm to use for clipping supporting 1, 2, `np.Inf` and "inf".
-        :return: Values of `values` after projection.
-        """
-        import torch
-
-        # Pick a small scalar to avoid division by 0
-        tol = 10e-8
-        values_tmp = values.reshape(values.shape[0], -1)
-
-        if norm_p == 2:
-            if isinstance(eps, np.ndarray):
-                raise NotImplementedError(
-                    "The parameter `eps` of type `np.ndarray` is not supported to use with norm 2."
-                )
-
-            values_tmp = (
-                values_tmp
-                * torch.min(
-                    torch.tensor([1.0], dtype=torch.float32).to(self.estimator.device),
-                    eps / (torch.norm(values_tmp, p=2, dim=1) + tol),
-                ).unsqueeze_(-1)
-            )
-
-        elif norm_p == 1:
-            if isinstance(eps, np.ndarray):
-                raise NotImplementedError(
-                    "The parameter `eps` of type `np.ndarray` is not supported to use with norm 1."
-                )
-
-            values_tmp = (
-                values_tmp
-                * torch.min(
-                    torch.tensor([1.0], dtype=torch.float32).to(self.estimator.device),
-                    eps / (torch.norm(values_tmp, p=1, dim=1) + tol),
-                ).unsqueeze_(-1)
-            )
-
-        elif norm_p in [np.inf, "inf"]:
-            if isinstance(eps, np.ndarray):
-                eps = eps * np.ones_like(values.cpu())
-                eps = eps.reshape([eps.shape[0], -1])  # type: ignore
-
-            values_tmp = values_tmp.sign() * torch.min(
-                values_tmp.abs(), torch.tensor([eps], dtype=torch.float32).to(self.estimator.device)
-            )
-
-        else:
-            raise NotImplementedError(
-                "Values of `norm_p` different from 1, 2 and `np.inf` are currently not supported."
-            )
-
-        values = values_tmp.reshape(values.shape)
-
-        return values
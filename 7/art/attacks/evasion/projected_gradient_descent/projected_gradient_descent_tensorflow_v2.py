@@ -37,7 +37,13 @@ from art.estimators.classification.classifier import ClassifierMixin
 from art.attacks.evasion.projected_gradient_descent.projected_gradient_descent_numpy import (
     ProjectedGradientDescentCommon,
 )
-from art.utils import compute_success, random_sphere, compute_success_array
+from art.utils import (
+    cache_predictions,
+    compute_success,
+    random_sphere,
+    compute_success_array,
+    projection_l1_1_tensorflow,
+)
 from art.summary_writer import SummaryWriter
 
 if TYPE_CHECKING:
@@ -123,6 +129,7 @@ class ProjectedGradientDescentTensorFlowV2(ProjectedGradientDescentCommon):
             verbose=verbose,
         )
 
+    @cache_predictions
     def generate(self, x: np.ndarray, y: Optional[np.ndarray] = None, **kwargs) -> np.ndarray:
         """
         Generate adversarial samples and return them in an array.
@@ -269,6 +276,12 @@ class ProjectedGradientDescentTensorFlowV2(ProjectedGradientDescentCommon):
         adv_x = tf.identity(x)
         momentum = tf.zeros(x.shape)
 
+        # Convert array-valued step sizes once, all iterations then stay on the device
+        if isinstance(eps, np.ndarray):
+            eps = tf.constant(eps, dtype=ART_NUMPY_DTYPE)
+        if isinstance(eps_step, np.ndarray):
+            eps_step = tf.constant(eps_step, dtype=ART_NUMPY_DTYPE)
+
         for i_max_iter in range(self.max_iter):
             self._i_max_iter = i_max_iter
             adv_x = self._compute_tf(
@@ -366,7 +379,7 @@ class ProjectedGradientDescentTensorFlowV2(ProjectedGradientDescentCommon):
         return grad
 
     def _apply_perturbation(  # pylint: disable=W0221
-        self, x: "tf.Tensor", perturbation: "tf.Tensor", eps_step: Union[int, float, np.ndarray]
+        self, x: "tf.Tensor", perturbation: "tf.Tensor", eps_step: Union[int, float, np.ndarray, "tf.Tensor"]
     ) -> "tf.Tensor":
         """
         Apply perturbation on examples.
@@ -378,7 +391,7 @@ class ProjectedGradientDescentTensorFlowV2(ProjectedGradientDescentCommon):
         """
         import tensorflow as tf
 
-        perturbation_step = tf.constant(eps_step, dtype=ART_NUMPY_DTYPE) * perturbation
+        perturbation_step = tf.cast(eps_step, dtype=ART_NUMPY_DTYPE) * perturbation
         perturbation_step = tf.where(tf.math.is_nan(perturbation_step), 0, perturbation_step)
         x = x + perturbation_step
         if self.estimator.clip_values is not None:
@@ -393,8 +406,8 @@ class ProjectedGradientDescentTensorFlowV2(ProjectedGradientDescentCommon):
         x_init: "tf.Tensor",
         y: "tf.Tensor",
         mask: "tf.Tensor",
-        eps: Union[int, float, np.ndarray],
-        eps_step: Union[int, float, np.ndarray],
+        eps: Union[int, float, np.ndarray, "tf.Tensor"],
+        eps_step: Union[int, float, np.ndarray, "tf.Tensor"],
         momentum: Optional["tf.Tensor"],
         random_init: bool,
     ) -> "tf.Tensor":
@@ -423,7 +436,8 @@ class ProjectedGradientDescentTensorFlowV2(ProjectedGradientDescentCommon):
             n = x.shape[0]
             m = np.prod(x.shape[1:]).item()
 
-            random_perturbation = random_sphere(n, m, eps, self.norm).reshape(x.shape).astype(ART_NUMPY_DTYPE)
+            eps_array = eps.numpy() if isinstance(eps, tf.Tensor) else eps
+            random_perturbation = random_sphere(n, m, eps_array, self.norm).reshape(x.shape).astype(ART_NUMPY_DTYPE)
             random_perturbation = tf.convert_to_tensor(random_perturbation)
             if mask is not None:
                 random_perturbation = random_perturbation * mask
@@ -453,14 +467,15 @@ class ProjectedGradientDescentTensorFlowV2(ProjectedGradientDescentCommon):
 
     @staticmethod
     def _projection(
-        values: "tf.Tensor", eps: Union[int, float, np.ndarray], norm_p: Union[int, float, str]
+        values: "tf.Tensor", eps: Union[int, float, np.ndarray, "tf.Tensor"], norm_p: Union[int, float, str]
     ) -> "tf.Tensor":
         """
         Project `values` on the L_p norm ball of size `eps`.
 
         :param values: Values to clip.
         :param eps: Maximum norm allowed.
-        :param norm_p: L_p norm to use for clipping supporting 1, 2 and `np.Inf`.
+        :param norm_p: L_p norm to use for clipping supporting 1, 2 and `np.Inf`. Norm 1 computes the orthogonal
+                       projection on the L1-ball.
         :return: Values of `values` after projection.
         """
         import tensorflow as tf
@@ -470,7 +485,7 @@ class ProjectedGradientDescentTensorFlowV2(ProjectedGradientDescentCommon):
         values_tmp = tf.reshape(values, (values.shape[0], -1))
 
         if norm_p == 2:
-            if isinstance(eps, np.ndarray):
+            if isinstance(eps, (np.ndarray, tf.Tensor)):
                 raise NotImplementedError(
                     "The parameter `eps` of type `np.ndarray` is not supported to use with norm 2."
                 )
@@ -480,19 +495,12 @@ class ProjectedGradientDescentTensorFlowV2(ProjectedGradientDescentCommon):
             )
 
         elif norm_p == 1:
-            if isinstance(eps, np.ndarray):
-                raise NotImplementedError(
-                    "The parameter `eps` of type `np.ndarray` is not supported to use with norm 1."
-                )
-
-            values_tmp = values_tmp * tf.expand_dims(
-                tf.minimum(1.0, eps / (tf.norm(values_tmp, ord=1, axis=1) + tol)), axis=1
-            )
+            values_tmp = projection_l1_1_tensorflow(values_tmp, eps)
 
         elif norm_p in ["inf", np.inf]:
-            if isinstance(eps, np.ndarray):
-                eps = eps * np.ones(shape=values.shape)
-                eps = eps.reshape([eps.shape[0], -1])  # type: ignore
+            if isinstance(eps, (np.ndarray, tf.Tensor)):
+                eps = tf.cast(eps, values.dtype) * tf.ones_like(values)
+                eps = tf.reshape(eps, (values.shape[0], -1))
 
             values_tmp = tf.sign(values_tmp) * tf.minimum(tf.math.abs(values_tmp), eps)
 
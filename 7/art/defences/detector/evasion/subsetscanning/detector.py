@@ -21,9 +21,11 @@ This module implements the fast generalized subset scan based detector.
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from functools import partial
 import logging
+import multiprocessing
 import sys
-from typing import Optional, Tuple, Union, TYPE_CHECKING
+from typing import Callable, Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
 from sklearn import metrics
@@ -43,6 +45,8 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+_WORKER_PVAL_RANGES: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
 
 class SubsetScanningDetector(EvasionDetector):
     """
@@ -51,7 +55,9 @@ class SubsetScanningDetector(EvasionDetector):
     | Paper link: https://www.cs.cmu.edu/~neill/papers/mcfowland13a.pdf
     """
 
-    defence_params = ["classifier", "bgd_data", "layer", "scoring_function", "verbose"]
+    defence_params = ["classifier", "bgd_data", "layer", "scoring_function", "nb_workers", "verbose"]
+
+    VECTORIZED_SEARCH_MAX_RECORDS = 16  # Largest number of records for which the p-value search runs across all nodes
 
     def __init__(
         self,
@@ -59,6 +65,7 @@ class SubsetScanningDetector(EvasionDetector):
         bgd_data: np.ndarray,
         layer: Union[int, str],
         scoring_function: Literal["BerkJones", "HigherCriticism", "KolmarovSmirnov"] = "BerkJones",
+        nb_workers: int = 1,
         verbose: bool = True,
     ) -> None:
         """
@@ -67,14 +74,19 @@ class SubsetScanningDetector(EvasionDetector):
         :param classifier: The model being evaluated for its robustness to anomalies (e.g. adversarial samples).
         :param bgd_data: The background data used to learn a null model. Typically dataset used to train the classifier.
         :param layer: The layer from which to extract activations to perform scan.
+        :param nb_workers: Number of worker processes scanning records of `detect` and runs of `scan` in parallel.
         :param verbose: Show progress bars.
         """
         super().__init__()
         self.classifier = classifier
         self.bgd_data = bgd_data
         self.layer = layer
+        self.nb_workers = nb_workers
         self.verbose = verbose
 
+        if not isinstance(nb_workers, int) or nb_workers <= 0:
+            raise ValueError("The number of workers must be a positive integer.")
+
         if scoring_function == "BerkJones":
             self.scoring_function = ScoringFunctions.get_score_bj_fast
         elif scoring_function == "HigherCriticism":
@@ -108,11 +120,7 @@ class SubsetScanningDetector(EvasionDetector):
 
         # Background data scores
         pval_ranges = self._calculate_pvalue_ranges(bgd_data)
-        bgd_scores = []
-        for pval_range in pval_ranges:
-            best_score, _, _, _ = Scanner.fgss_individ_for_nets(pval_range, score_function=self.scoring_function)
-            bgd_scores.append(best_score)
-        self.bgd_scores = np.asarray(bgd_scores)
+        self.bgd_scores = _individual_scan(pval_ranges, self.scoring_function)
 
     def _get_activations(
         self, x: np.ndarray, layer: Union[int, str], batch_size: int, framework: bool = False
@@ -140,22 +148,7 @@ class SubsetScanningDetector(EvasionDetector):
             dim2 = eval_activations.shape[1] * eval_activations.shape[2] * eval_activations.shape[3]
             eval_activations = np.reshape(eval_activations, (eval_activations.shape[0], dim2))
 
-        bgrecords_n = bgd_activations.shape[0]
-        records_n = eval_activations.shape[0]
-        atrr_n = eval_activations.shape[1]
-
-        pvalue_ranges = np.empty((records_n, atrr_n, 2))
-
-        for j in range(atrr_n):
-            pvalue_ranges[:, j, 0] = np.searchsorted(bgd_activations[:, j], eval_activations[:, j], side="right")
-            pvalue_ranges[:, j, 1] = np.searchsorted(bgd_activations[:, j], eval_activations[:, j], side="left")
-
-        pvalue_ranges = bgrecords_n - pvalue_ranges
-
-        pvalue_ranges[:, :, 0] = np.divide(pvalue_ranges[:, :, 0], bgrecords_n + 1)
-        pvalue_ranges[:, :, 1] = np.divide(pvalue_ranges[:, :, 1] + 1, bgrecords_n + 1)
-
-        return pvalue_ranges
+        return _pvalue_ranges(bgd_activations, eval_activations, self.VECTORIZED_SEARCH_MAX_RECORDS)
 
     def scan(
         self,
@@ -178,41 +171,31 @@ class SubsetScanningDetector(EvasionDetector):
         clean_pval_ranges = self._calculate_pvalue_ranges(clean_x)
         adv_pval_ranges = self._calculate_pvalue_ranges(adv_x)
 
-        clean_scores = []
-        adv_scores = []
-
         if clean_size is None or adv_size is None:
             # Individual scan
-            with tqdm(
-                total=len(clean_pval_ranges) + len(adv_pval_ranges), desc="Subset scanning", disable=not self.verbose
-            ) as pbar:
-                for _, c_p in enumerate(clean_pval_ranges):
-                    best_score, _, _, _ = Scanner.fgss_individ_for_nets(c_p, score_function=self.scoring_function)
-                    clean_scores.append(best_score)
-                    pbar.update(1)
-                for _, a_p in enumerate(adv_pval_ranges):
-                    best_score, _, _, _ = Scanner.fgss_individ_for_nets(a_p, score_function=self.scoring_function)
-                    adv_scores.append(best_score)
-                    pbar.update(1)
-
-        else:
-            len_adv_x = len(adv_x)
-            len_clean_x = len(clean_x)
-
+            pval_ranges = np.concatenate((clean_pval_ranges, adv_pval_ranges), axis=0)
+            scores = self._individual_scan(pval_ranges)
+            clean_scores = list(scores[: len(clean_pval_ranges)])
+            adv_scores = list(scores[len(clean_pval_ranges) :])
+
+        elif self.nb_workers == 1:
+            clean_scores = []
+            adv_scores = []
             for _ in trange(run, desc="Subset scanning", disable=not self.verbose):
-                np.random.seed()
-
-                clean_choice = np.random.choice(range(len_clean_x), clean_size, replace=False)
-                adv_choice = np.random.choice(range(len_adv_x), adv_size, replace=False)
-
-                combined_pvals = np.concatenate((clean_pval_ranges[clean_choice], adv_pval_ranges[adv_choice]), axis=0)
-
-                best_score, _, _, _ = Scanner.fgss_for_nets(
-                    clean_pval_ranges[clean_choice], score_function=self.scoring_function
+                clean_score, adv_score = _scan_run(
+                    clean_pval_ranges, adv_pval_ranges, clean_size, adv_size, self.scoring_function
                 )
-                clean_scores.append(best_score)
-                best_score, _, _, _ = Scanner.fgss_for_nets(combined_pvals, score_function=self.scoring_function)
-                adv_scores.append(best_score)
+                clean_scores.append(clean_score)
+                adv_scores.append(adv_score)
+
+        else:
+            with multiprocessing.Pool(
+                self.nb_workers, initializer=_init_worker, initargs=(clean_pval_ranges, adv_pval_ranges)
+            ) as pool:
+                results = pool.imap(_scan_run_in_worker, [(clean_size, adv_size, self.scoring_function)] * run)
+                results = list(tqdm(results, total=run, desc="Subset scanning", disable=not self.verbose))
+            clean_scores = [clean_score for clean_score, _ in results]
+            adv_scores = [adv_score for _, adv_score in results]
 
         clean_scores_array = np.asarray(clean_scores)
         adv_scores_array = np.asarray(adv_scores)
@@ -238,18 +221,29 @@ class SubsetScanningDetector(EvasionDetector):
                 or not and has the same `batch_size` (first dimension) as `x`.
         """
         pval_ranges = self._calculate_pvalue_ranges(x, batch_size)
-        scores = []
-
-        for pval_range in tqdm(pval_ranges, desc="Subset scanning", disable=not self.verbose):
-            best_score, _, _, _ = Scanner.fgss_individ_for_nets(pval_range, score_function=self.scoring_function)
-            scores.append(best_score)
-        scores_array = np.asarray(scores)
+        scores_array = self._individual_scan(pval_ranges)
 
         is_adversarial = np.greater(scores_array, self.bgd_scores.max())
         report = {"scores": scores_array}
 
         return report, is_adversarial
 
+    def _individual_scan(self, pval_ranges: np.ndarray) -> np.ndarray:
+        """
+        Returns the scores of the highest scoring subsets of nodes of each record, in the worker processes if requested.
+
+        :param pval_ranges: p-value ranges of the records.
+        :return: Scores of the records.
+        """
+        if self.nb_workers == 1 or len(pval_ranges) <= 1:
+            return _individual_scan(pval_ranges, self.scoring_function, verbose=self.verbose)
+
+        chunks = np.array_split(pval_ranges, min(len(pval_ranges), 4 * self.nb_workers))
+        with multiprocessing.Pool(self.nb_workers) as pool:
+            results = pool.imap(partial(_individual_scan, score_function=self.scoring_function), chunks)
+            scores = list(tqdm(results, total=len(chunks), desc="Subset scanning", disable=not self.verbose))
+        return np.concatenate(scores)
+
     def fit(self, x: np.ndarray, y: np.ndarray, batch_size: int = 128, nb_epochs: int = 20, **kwargs) -> None:
         """
         Fit the detector using training data. Assumes that the classifier is already trained.
@@ -257,3 +251,139 @@ class SubsetScanningDetector(EvasionDetector):
         :raises `NotImplementedException`: This method is not supported for this detector.
         """
         raise NotImplementedError
+
+
+def _pvalue_ranges(
+    sorted_bgd_activations: np.ndarray, eval_activations: np.ndarray, max_vectorized_records: int
+) -> np.ndarray:
+    """
+    Compute the p-value ranges of the activations of each node w.r.t. the background activations of the same node.
+
+    :param sorted_bgd_activations: Background activations of shape `(nb_bgd_records, nb_nodes)` sorted along the first
+                                   axis.
+    :param eval_activations: Activations of shape `(nb_records, nb_nodes)` being evaluated.
+    :param max_vectorized_records: Largest number of records for which all nodes are searched at once.
+    :return: p-value ranges of shape `(nb_records, nb_nodes, 2)`.
+    """
+    bgrecords_n = sorted_bgd_activations.shape[0]
+    records_n = eval_activations.shape[0]
+    atrr_n = eval_activations.shape[1]
+
+    pvalue_ranges = np.empty((records_n, atrr_n, 2))
+
+    if records_n <= max_vectorized_records:
+        # For few records the loop over the nodes is dominated by its overhead, search all nodes at once instead
+        pvalue_ranges[:, :, 0] = _searchsorted_columns(sorted_bgd_activations, eval_activations, side="right")
+        pvalue_ranges[:, :, 1] = _searchsorted_columns(sorted_bgd_activations, eval_activations, side="left")
+    else:
+        for j in range(atrr_n):
+            pvalue_ranges[:, j, 0] = np.searchsorted(sorted_bgd_activations[:, j], eval_activations[:, j], side="right")
+            pvalue_ranges[:, j, 1] = np.searchsorted(sorted_bgd_activations[:, j], eval_activations[:, j], side="left")
+
+    pvalue_ranges = bgrecords_n - pvalue_ranges
+
+    pvalue_ranges[:, :, 0] = np.divide(pvalue_ranges[:, :, 0], bgrecords_n + 1)
+    pvalue_ranges[:, :, 1] = np.divide(pvalue_ranges[:, :, 1] + 1, bgrecords_n + 1)
+
+    return pvalue_ranges
+
+
+def _searchsorted_columns(sorted_a: np.ndarray, v: np.ndarray, side: Literal["left", "right"]) -> np.ndarray:
+    """
+    Find the indices into each column of `sorted_a` at which the values of the same column of `v` would be inserted,
+    like `np.searchsorted` on each column, with a branchless binary search vectorized across all columns.
+
+    :param sorted_a: Array of shape `(n, nb_columns)` sorted along the first axis.
+    :param v: Values of shape `(m, nb_columns)`.
+    :param side: If `left`, the index of the first suitable location is given, if `right`, the last such index.
+    :return: Insertion indices of shape `(m, nb_columns)`.
+    """
+    nb_rows, nb_columns = sorted_a.shape
+    sorted_flat = sorted_a.ravel()
+    columns = np.arange(nb_columns)
+    compare = np.less_equal if side == "right" else np.less
+
+    # number of elements of the column before the insertion point, increased by decreasing powers of two
+    indices = np.zeros(v.shape, dtype=np.int64)
+    step = 1 << int(np.log2(max(nb_rows, 1)))
+    while step >= 1:
+        candidates = indices + step
+        values = sorted_flat[(np.minimum(candidates, nb_rows) - 1) * nb_columns + columns]
+        indices = np.where((candidates <= nb_rows) & compare(values, v), candidates, indices)
+        step >>= 1
+    return indices
+
+
+def _individual_scan(
+    pval_ranges: np.ndarray,
+    score_function: Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray] = ScoringFunctions.get_score_bj_fast,
+    verbose: bool = False,
+) -> np.ndarray:
+    """
+    Returns the scores of the highest scoring subsets of nodes of each record.
+
+    :param pval_ranges: p-value ranges of the records.
+    :param score_function: Scoring function.
+    :param verbose: Show progress bars.
+    :return: Scores of the records.
+    """
+    scores = []
+    for pval_range in tqdm(pval_ranges, desc="Subset scanning", disable=not verbose):
+        best_score, _, _, _ = Scanner.fgss_individ_for_nets(pval_range, score_function=score_function)
+        scores.append(best_score)
+    return np.asarray(scores)
+
+
+def _scan_run(
+    clean_pval_ranges: np.ndarray,
+    adv_pval_ranges: np.ndarray,
+    clean_size: int,
+    adv_size: int,
+    score_function: Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray],
+) -> Tuple[float, float]:
+    """
+    Returns the scores of the highest scoring subsets of a random group of clean records and of the same group
+    combined with a random group of adversarial records.
+
+    :param clean_pval_ranges: p-value ranges of the clean records.
+    :param adv_pval_ranges: p-value ranges of the adversarial records.
+    :param clean_size: Number of clean records drawn.
+    :param adv_size: Number of adversarial records drawn.
+    :param score_function: Scoring function.
+    :return: (clean_score, adv_score).
+    """
+    np.random.seed()
+
+    clean_choice = np.random.choice(range(len(clean_pval_ranges)), clean_size, replace=False)
+    adv_choice = np.random.choice(range(len(adv_pval_ranges)), adv_size, replace=False)
+
+    combined_pvals = np.concatenate((clean_pval_ranges[clean_choice], adv_pval_ranges[adv_choice]), axis=0)
+
+    clean_score, _, _, _ = Scanner.fgss_for_nets(clean_pval_ranges[clean_choice], score_function=score_function)
+    adv_score, _, _, _ = Scanner.fgss_for_nets(combined_pvals, score_function=score_function)
+    return clean_score, adv_score
+
+
+def _init_worker(clean_pval_ranges: np.ndarray, adv_pval_ranges: np.ndarray) -> None:
+    """
+    Store the p-value ranges in a worker process of a parallel scan.
+
+    :param clean_pval_ranges: p-value ranges of the clean records.
+    :param adv_pval_ranges: p-value ranges of the adversarial records.
+    """
+    global _WORKER_PVAL_RANGES  # pylint: disable=W0603
+    _WORKER_PVAL_RANGES = (clean_pval_ranges, adv_pval_ranges)
+
+
+def _scan_run_in_worker(
+    args: Tuple[int, int, Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]]
+) -> Tuple[float, float]:
+    """
+    Run a scan of a random group of records in a worker process.
+
+    :param args: Tuple of `clean_size`, `adv_size` and the scoring function.
+    :return: (clean_score, adv_score).
+    """
+    if _WORKER_PVAL_RANGES is None:  # pragma: no cover
+        raise ValueError("The worker process has not been initialised.")
+    return _scan_run(*_WORKER_PVAL_RANGES, *args)
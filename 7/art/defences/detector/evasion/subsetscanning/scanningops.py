@@ -61,57 +61,38 @@ class ScanningOps:
         # alpha_thresholds = np.arange(a_max/50, a_max, a_max/50)
 
         if image_to_node:
-            number_of_elements = pvalues.shape[1]  # searching over j columns
-            size_of_given = pvalues.shape[0]  # for fixed this many images
-            unsort_priority = np.zeros((pvalues.shape[1], alpha_thresholds.shape[0]))  # number of columns
+            # collect ranges over images(rows) for each node(column)
+            pmaxes = pvalues[:, :, 1].T
         else:
-            number_of_elements = pvalues.shape[0]  # searching over i rows
-            size_of_given = pvalues.shape[1]  # for this many fixed nodes
-            unsort_priority = np.zeros((pvalues.shape[0], alpha_thresholds.shape[0]))  # number of rows
-
-        for elem_indx in range(0, number_of_elements):
-            # sort all the range maxes
-            if image_to_node:
-                # collect ranges over images(rows)
-                arg_sort_max = np.argsort(pvalues[:, elem_indx, 1])
-                # arg_sort_min = np.argsort(pvalues[:,e,0]) #collect ranges over images(rows)
-                completely_included = np.searchsorted(
-                    pvalues[:, elem_indx, 1][arg_sort_max],
-                    alpha_thresholds,
-                    side="right",
-                )
-            else:
-                # collect ranges over nodes(columns)
-                arg_sort_max = np.argsort(pvalues[elem_indx, :, 1])
-                # arg_sort_min = np.argsort(pvalues[elem_indx,:,0])
-
-                completely_included = np.searchsorted(
-                    pvalues[elem_indx, :, 1][arg_sort_max],
-                    alpha_thresholds,
-                    side="right",
-                )
-
-            # should be num elements by num thresh
-            unsort_priority[elem_indx, :] = completely_included
+            # collect ranges over nodes(columns) for each image(row)
+            pmaxes = pvalues[:, :, 1]
+        number_of_elements, size_of_given = pmaxes.shape
+
+        # priority of an element for a threshold is the number of its ranges completely included below the threshold,
+        # computed for all thresholds at once from the index of the smallest threshold including each range
+        threshold_indices = np.searchsorted(alpha_thresholds, pmaxes, side="left")
+        counts = np.bincount(
+            (threshold_indices + np.arange(number_of_elements)[:, np.newaxis] * (len(alpha_thresholds) + 1)).ravel(),
+            minlength=number_of_elements * (len(alpha_thresholds) + 1),
+        )
+        # should be num thresh by num elements
+        unsort_priority = np.cumsum(counts.reshape(number_of_elements, -1), axis=1)[:, :-1].T.astype(float)
 
         # want to sort for a fixed thresh (across?)
-        arg_sort_priority = np.argsort(-unsort_priority, axis=0)
+        arg_sort_priority = np.argsort(-unsort_priority, axis=1)
+        n_alpha = np.cumsum(np.take_along_axis(unsort_priority, arg_sort_priority, axis=1), axis=1)
+        n_v = np.cumsum(np.ones(number_of_elements) * size_of_given)
 
         best_score_so_far = -10000
         best_alpha = -2
 
-        alpha_count = 0
-        for alpha_threshold in alpha_thresholds:
+        for alpha_count, alpha_threshold in enumerate(alpha_thresholds):
 
             # score each threshold by itself, cumulating priority,
             # cumulating count, alpha stays same.
             alpha_v = np.ones(number_of_elements) * alpha_threshold
 
-            n_alpha_v = np.cumsum(unsort_priority[:, alpha_count][arg_sort_priority][:, alpha_count])
-            count_increments_this = np.ones(number_of_elements) * size_of_given
-            n_v = np.cumsum(count_increments_this)
-
-            vector_of_scores = score_function(n_alpha_v, n_v, alpha_v)
+            vector_of_scores = score_function(n_alpha[alpha_count], n_v, alpha_v)
 
             best_score_for_this_alpha_idx = np.argmax(vector_of_scores)
             best_score_for_this_alpha = vector_of_scores[best_score_for_this_alpha_idx]
@@ -121,15 +102,10 @@ class ScanningOps:
                 best_size = best_score_for_this_alpha_idx + 1  # not sure 1 is needed?
                 best_alpha = alpha_threshold
                 best_alpha_count = alpha_count
-            alpha_count = alpha_count + 1
 
         # after the alpha for loop we now have best score, best alpha, size of best subset,
         # and alpha counter use these with the priority argsort to reconstruct the best subset
-        unsort = arg_sort_priority[:, best_alpha_count]
-
-        subset = np.zeros(best_size).astype(int)
-        for loc in range(0, best_size):
-            subset[loc] = unsort[loc]
+        subset = arg_sort_priority[best_alpha_count, :best_size].astype(int)
 
         return best_score_so_far, subset, best_alpha
 
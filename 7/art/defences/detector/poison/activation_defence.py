@@ -69,6 +69,7 @@ class ActivationDefence(PoisonFilteringDefence):
         "cluster_analysis",
         "generator",
         "ex_re_threshold",
+        "activations_path",
     ]
     valid_clustering = ["KMeans"]
     valid_reduce = ["PCA", "FastICA", "TSNE"]
@@ -83,6 +84,7 @@ class ActivationDefence(PoisonFilteringDefence):
         y_train: np.ndarray,
         generator: Optional[DataGenerator] = None,
         ex_re_threshold: Optional[float] = None,
+        activations_path: Optional[str] = None,
     ) -> None:
         """
         Create an :class:`.ActivationDefence` object with the provided classifier.
@@ -92,6 +94,8 @@ class ActivationDefence(PoisonFilteringDefence):
         :param y_train: Labels used to train the classifier.
         :param generator: A data generator to be used instead of `x_train` and `y_train`.
         :param ex_re_threshold: Set to a positive value to enable exclusionary reclassification
+        :param activations_path: Directory in which the activations collected from `generator` are stored as
+                                 memory-mapped files instead of being kept in memory.
         """
         super().__init__(classifier, x_train, y_train)
         self.classifier: "CLASSIFIER_NEURALNETWORK_TYPE" = classifier
@@ -113,6 +117,7 @@ class ActivationDefence(PoisonFilteringDefence):
         self.poisonous_clusters: np.ndarray
         self.clusterer = MiniBatchKMeans(n_clusters=self.nb_clusters)
         self.ex_re_threshold = ex_re_threshold
+        self.activations_path = activations_path
         self._check_params()
 
     def evaluate_defence(self, is_clean: np.ndarray, **kwargs) -> str:
@@ -144,17 +149,18 @@ class ActivationDefence(PoisonFilteringDefence):
             batch_size = self.generator.batch_size
             num_samples = self.generator.size
             num_classes = self.classifier.nb_classes
-            self.is_clean_by_class = [np.empty(0, dtype=int) for _ in range(num_classes)]
+            is_clean_by_class_batches: List[List[np.ndarray]] = [[] for _ in range(num_classes)]
 
             # calculate is_clean_by_class for each batch
             for batch_idx in range(num_samples // batch_size):  # type: ignore
                 _, y_batch = self.generator.get_batch()
                 is_clean_batch = is_clean[batch_idx * batch_size : batch_idx * batch_size + batch_size]
                 clean_by_class_batch = self._segment_by_class(is_clean_batch, y_batch)
-                self.is_clean_by_class = [
-                    np.append(self.is_clean_by_class[class_idx], clean_by_class_batch[class_idx])
-                    for class_idx in range(num_classes)
-                ]
+                for class_idx in range(num_classes):
+                    is_clean_by_class_batches[class_idx].append(np.asarray(clean_by_class_batch[class_idx], dtype=int))
+            self.is_clean_by_class = [
+                np.concatenate([np.empty(0, dtype=int)] + batches) for batches in is_clean_by_class_batches
+            ]
 
         else:
             self.is_clean_by_class = self._segment_by_class(is_clean, self.y_train)
@@ -199,16 +205,19 @@ class ActivationDefence(PoisonFilteringDefence):
             batch_size = self.generator.batch_size
             num_samples = self.generator.size
             self.is_clean_lst = []
+            offsets = np.zeros(self.classifier.nb_classes, dtype=int)
 
             # loop though the generator to generator a report
             for _ in range(num_samples // batch_size):  # type: ignore
                 _, y_batch = self.generator.get_batch()
                 indices_by_class = self._segment_by_class(np.arange(batch_size), y_batch)
-                is_clean_lst = [0] * batch_size
+                is_clean_lst = np.zeros(batch_size, dtype=int)
                 for class_idx, idxs in enumerate(indices_by_class):
-                    for idx_in_class, idx in enumerate(idxs):
-                        is_clean_lst[idx] = self.assigned_clean_by_class[class_idx][idx_in_class]
-                self.is_clean_lst += is_clean_lst
+                    idxs = np.asarray(idxs, dtype=int)
+                    offset = offsets[class_idx]
+                    is_clean_lst[idxs] = self.assigned_clean_by_class[class_idx][offset : offset + len(idxs)]
+                    offsets[class_idx] += len(idxs)
+                self.is_clean_lst += is_clean_lst.tolist()
             return report, self.is_clean_lst
 
         if not self.activations_by_class:
@@ -254,42 +263,7 @@ class ActivationDefence(PoisonFilteringDefence):
         self.set_params(**kwargs)
 
         if self.generator is not None:
-            batch_size = self.generator.batch_size
-            num_samples = self.generator.size
-            num_classes = self.classifier.nb_classes
-            for batch_idx in range(num_samples // batch_size):  # type: ignore
-                x_batch, y_batch = self.generator.get_batch()
-
-                batch_activations = self._get_activations(x_batch)
-                activation_dim = batch_activations.shape[-1]
-
-                # initialize values list of lists on first run
-                if batch_idx == 0:
-                    self.activations_by_class = [np.empty((0, activation_dim)) for _ in range(num_classes)]
-                    self.clusters_by_class = [np.empty(0, dtype=int) for _ in range(num_classes)]
-                    self.red_activations_by_class = [np.empty((0, self.nb_dims)) for _ in range(num_classes)]
-
-                activations_by_class = self._segment_by_class(batch_activations, y_batch)
-                clusters_by_class, red_activations_by_class = cluster_activations(
-                    activations_by_class,
-                    nb_clusters=self.nb_clusters,
-                    nb_dims=self.nb_dims,
-                    reduce=self.reduce,
-                    clustering_method=self.clustering_method,
-                    generator=self.generator,
-                    clusterer_new=self.clusterer,
-                )
-
-                for class_idx in range(num_classes):
-                    self.activations_by_class[class_idx] = np.vstack(
-                        [self.activations_by_class[class_idx], activations_by_class[class_idx]]
-                    )
-                    self.clusters_by_class[class_idx] = np.append(
-                        self.clusters_by_class[class_idx], clusters_by_class[class_idx]
-                    )
-                    self.red_activations_by_class[class_idx] = np.vstack(
-                        [self.red_activations_by_class[class_idx], red_activations_by_class[class_idx]]
-                    )
+            self.clusters_by_class, self.red_activations_by_class = self._cluster_activations_generator()
             return self.clusters_by_class, self.red_activations_by_class
 
         if not self.activations_by_class:
@@ -306,6 +280,87 @@ class ActivationDefence(PoisonFilteringDefence):
 
         return self.clusters_by_class, self.red_activations_by_class
 
+    def _cluster_activations_generator(self) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """
+        Clusters the activations of the samples of the generator in a streaming fashion. The activations are collected
+        by class in a single pass over the generator, in memory or in memory-mapped files in `activations_path`. For
+        `PCA`, an incremental PCA is fitted per class on chunks of these activations, and a copy of `self.clusterer` is
+        fitted per class with `partial_fit` on chunks of the reduced activations. The clusters are assigned once all
+        chunks have been seen, so that all samples of a class are assigned by the same model.
+
+        :return: Clusters per class and activations by class.
+        """
+        from sklearn.base import clone
+        from sklearn.decomposition import IncrementalPCA
+
+        batch_size = self.generator.batch_size  # type: ignore
+        num_samples = self.generator.size  # type: ignore
+        num_classes = self.classifier.nb_classes
+
+        # Collect the activations by class
+        buffers: List[_ActivationBuffer] = []
+        for _ in range(num_samples // batch_size):  # type: ignore
+            x_batch, y_batch = self.generator.get_batch()  # type: ignore
+            batch_activations = self._get_activations(x_batch)
+
+            if not buffers:
+                buffers = [
+                    _ActivationBuffer(
+                        batch_activations.shape[1:],
+                        batch_activations.dtype,
+                        path=None
+                        if self.activations_path is None
+                        else os.path.join(self.activations_path, f"activations_class_{class_idx}.dat"),
+                    )
+                    for class_idx in range(num_classes)
+                ]
+
+            for buffer, activations in zip(buffers, self._segment_by_class(batch_activations, y_batch)):
+                buffer.append(activations)
+
+        self.activations_by_class = [buffer.data for buffer in buffers]
+
+        clusters_by_class = []
+        red_activations_by_class = []
+        for activations in self.activations_by_class:
+            nb_activations = activations.shape[1]
+
+            if len(activations) == 0:
+                clusters_by_class.append(np.empty(0, dtype=int))
+                red_activations_by_class.append(np.empty((0, min(nb_activations, self.nb_dims))))
+                continue
+
+            # Apply dimensionality reduction
+            if nb_activations <= self.nb_dims:
+                logger.info(
+                    "Dimensionality of activations = %i less than nb_dims = %i. Not applying dimensionality "
+                    "reduction.",
+                    nb_activations,
+                    self.nb_dims,
+                )
+                reduced_activations = np.asarray(activations)
+            elif self.reduce == "PCA":
+                chunks = _chunk_slices(len(activations), max(batch_size, self.nb_dims))
+                projector = IncrementalPCA(n_components=self.nb_dims)
+                for chunk in chunks:
+                    projector.partial_fit(activations[chunk])
+                reduced_activations = np.empty((len(activations), self.nb_dims))
+                for chunk in chunks:
+                    reduced_activations[chunk] = projector.transform(activations[chunk])
+            else:
+                reduced_activations = reduce_dimensionality(
+                    np.asarray(activations), nb_dims=self.nb_dims, reduce=self.reduce
+                )
+            red_activations_by_class.append(reduced_activations)
+
+            # Get cluster assignments
+            clusterer = clone(self.clusterer)
+            for chunk in _chunk_slices(len(reduced_activations), max(batch_size, self.nb_clusters)):
+                clusterer.partial_fit(reduced_activations[chunk])
+            clusters_by_class.append(clusterer.predict(reduced_activations))
+
+        return clusters_by_class, red_activations_by_class
+
     def analyze_clusters(self, **kwargs) -> Tuple[Dict[str, Any], np.ndarray]:
         """
         This function analyzes the clusters according to the provided method.
@@ -673,6 +728,8 @@ class ActivationDefence(PoisonFilteringDefence):
             raise TypeError("Generator must a an instance of DataGenerator")
         if self.ex_re_threshold is not None and self.ex_re_threshold <= 0:
             raise ValueError("Exclusionary reclassification threshold must be positive")
+        if self.activations_path is not None and not isinstance(self.activations_path, str):
+            raise TypeError("The path of the activations must be a string.")
 
     def _get_activations(self, x_train: Optional[np.ndarray] = None) -> np.ndarray:
         """
@@ -718,6 +775,82 @@ class ActivationDefence(PoisonFilteringDefence):
         return segment_by_class(data, features, n_classes)
 
 
+class _ActivationBuffer:
+    """
+    Buffer of rows of activations, kept in memory or in a memory-mapped file, whose capacity grows geometrically so
+    that appending batches takes linear time overall.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype: np.dtype, path: Optional[str] = None, capacity: int = 1024):
+        """
+        Create an empty buffer.
+
+        :param shape: Shape of a row of activations.
+        :param dtype: Data type of the activations.
+        :param path: Path of the memory-mapped file. The activations are kept in memory if `None`.
+        :param capacity: Initial number of rows allocated.
+        """
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.path = path
+        self.size = 0
+        if path is not None:
+            folder = os.path.split(path)[0]
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+        self._data = self._allocate(capacity, path)
+
+    def _allocate(self, capacity: int, path: Optional[str]) -> np.ndarray:
+        if path is None:
+            return np.empty((capacity,) + self.shape, dtype=self.dtype)
+        return np.memmap(path, dtype=self.dtype, mode="w+", shape=(capacity,) + self.shape)
+
+    def append(self, rows: np.ndarray) -> None:
+        """
+        Append rows of activations to the buffer.
+
+        :param rows: Activations of shape `(nb_rows,) + shape`.
+        """
+        if self.size + len(rows) > len(self._data):
+            capacity = max(2 * len(self._data), self.size + len(rows))
+            if self.path is None:
+                data = self._allocate(capacity, None)
+                data[: self.size] = self._data[: self.size]
+            else:
+                data = self._allocate(capacity, self.path + ".tmp")
+                data[: self.size] = self._data[: self.size]
+                data.flush()
+                del data, self._data
+                os.replace(self.path + ".tmp", self.path)
+                data = np.memmap(self.path, dtype=self.dtype, mode="r+", shape=(capacity,) + self.shape)
+            self._data = data
+        self._data[self.size : self.size + len(rows)] = rows
+        self.size += len(rows)
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        Return a view of the activations appended to the buffer.
+
+        :return: Activations of shape `(size,) + shape`.
+        """
+        return self._data[: self.size]
+
+
+def _chunk_slices(nb_rows: int, chunk_size: int) -> List[slice]:
+    """
+    Split rows into consecutive chunks of at least `chunk_size` rows, the last chunk absorbing the remainder. A single
+    chunk is returned if there are fewer than `chunk_size` rows.
+
+    :param nb_rows: Number of rows.
+    :param chunk_size: Minimum number of rows per chunk.
+    :return: Slices of the chunks.
+    """
+    bounds = list(range(0, nb_rows - chunk_size + 1, chunk_size))[1:] if nb_rows >= chunk_size else []
+    bounds = [0] + bounds + [nb_rows]
+    return [slice(begin, end) for begin, end in zip(bounds[:-1], bounds[1:])]
+
+
 def measure_misclassification(
     classifier: "CLASSIFIER_NEURALNETWORK_TYPE", x_test: np.ndarray, y_test: np.ndarray
 ) -> float:
@@ -24,14 +24,16 @@ This module implements the Reject on Negative Impact (RONI) defense by Nelson et
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
+import multiprocessing
 from copy import deepcopy
-from typing import Callable, List, Tuple, Union, TYPE_CHECKING
+from typing import Callable, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
 from sklearn.model_selection import train_test_split
 
 from art.defences.detector.poison.ground_truth_evaluator import GroundTruthEvaluator
 from art.defences.detector.poison.poison_filtering_defence import PoisonFilteringDefence
+from art.estimators.classification.classifier import ClassifierNeuralNetwork
 from art.utils import performance_diff
 
 if TYPE_CHECKING:
@@ -57,6 +59,8 @@ class RONIDefense(PoisonFilteringDefence):
         "perf_func",
         "calibrated",
         "eps",
+        "nb_workers",
+        "incremental_epochs",
     ]
 
     def __init__(
@@ -71,6 +75,8 @@ class RONIDefense(PoisonFilteringDefence):
         pp_quiz: float = 0.2,
         calibrated: bool = True,
         eps: float = 0.1,
+        nb_workers: int = 1,
+        incremental_epochs: Optional[int] = None,
     ):
         """
         Create an :class:`.RONIDefense` object with the provided classifier.
@@ -85,6 +91,12 @@ class RONIDefense(PoisonFilteringDefence):
         :param pp_quiz: Percent of training data used for quiz set.
         :param calibrated: True if using the calibrated form of RONI.
         :param eps: performance threshold if using uncalibrated RONI.
+        :param nb_workers: Number of worker processes fitting the classifiers of the calibration points and of
+                           consecutive suspect points in parallel. The classifier and `perf_func` must be picklable.
+        :param incremental_epochs: If set, the classifier with an additional point is obtained by updating a copy of
+                                   the current classifier with that point only, with this number of calls of
+                                   `partial_fit` for scikit-learn models that support it or of training epochs for
+                                   neural networks, instead of retraining it on all trusted points.
         """
         super().__init__(classifier, x_train, y_train)
         n_points = len(x_train)
@@ -99,7 +111,11 @@ class RONIDefense(PoisonFilteringDefence):
         self.x_val = x_val
         self.y_val = y_val
         self.perf_func = perf_func
+        self.nb_workers = nb_workers
+        self.incremental_epochs = incremental_epochs
         self.is_clean_lst: List[int] = []
+        self._calibration_info: Optional[Tuple["CLASSIFIER_TYPE", Tuple[np.ndarray, np.ndarray]]] = None
+        self._pool: Optional["multiprocessing.pool.Pool"] = None
         self._check_params()
 
     def evaluate_defence(self, is_clean: np.ndarray, **kwargs) -> str:
@@ -144,27 +160,36 @@ class RONIDefense(PoisonFilteringDefence):
         before_classifier = deepcopy(self.classifier)
         before_classifier.fit(x_suspect, y_suspect)
 
-        for idx in np.random.permutation(len(x_suspect)):
-            x_i = x_suspect[idx]
-            y_i = y_suspect[idx]
-
-            after_classifier = deepcopy(before_classifier)
-            after_classifier.fit(x=np.vstack([x_trusted, x_i]), y=np.vstack([y_trusted, y_i]))
-            acc_shift = performance_diff(
-                before_classifier,
-                after_classifier,
-                self.x_quiz,
-                self.y_quiz,
-                perf_function=self.perf_func,
-            )
-            # print(acc_shift, median, std_dev)
-            if self.is_suspicious(before_classifier, acc_shift):
-                self.is_clean_lst[idx] = 0
-                report[idx] = acc_shift
-            else:
-                before_classifier = after_classifier
-                x_trusted = np.vstack([x_trusted, x_i])
-                y_trusted = np.vstack([y_trusted, y_i])
+        if self.nb_workers > 1:
+            self._pool = multiprocessing.Pool(self.nb_workers)
+
+        try:
+            # The points of a block are evaluated in parallel against the same classifier. Once a point is accepted,
+            # the evaluations of the following points of the block are outdated and they start the next block.
+            indices = np.random.permutation(len(x_suspect))
+            position = 0
+            while position < len(indices):
+                block = indices[position : position + self.nb_workers]
+                results = self._fit_and_compare(
+                    before_classifier, x_trusted, y_trusted, x_suspect[block], y_suspect[block], True
+                )
+
+                for idx, (after_classifier, acc_shift) in zip(block, results):
+                    position += 1
+                    if self.is_suspicious(before_classifier, acc_shift):
+                        self.is_clean_lst[idx] = 0
+                        report[idx] = acc_shift
+                    else:
+                        before_classifier = after_classifier
+                        x_trusted = np.vstack([x_trusted, x_suspect[idx]])
+                        y_trusted = np.vstack([y_trusted, y_suspect[idx]])
+                        break
+        finally:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+            self._calibration_info = None
 
         return report, self.is_clean_lst
 
@@ -185,27 +210,60 @@ class RONIDefense(PoisonFilteringDefence):
     def get_calibration_info(self, before_classifier: "CLASSIFIER_TYPE") -> Tuple[np.ndarray, np.ndarray]:
         """
         Calculate the median and standard deviation of the accuracy shifts caused
-        by the calibration set.
+        by the calibration set. The result is cached until it is requested for another classifier.
 
         :param before_classifier: The classifier trained without suspicious point.
         :return: A tuple consisting of `(median, std_dev)`.
         """
-        accs = []
-
-        for x_c, y_c in zip(self.x_cal, self.y_cal):
-            after_classifier = deepcopy(before_classifier)
-            after_classifier.fit(x=np.vstack([self.x_val, x_c]), y=np.vstack([self.y_val, y_c]))
-            accs.append(
-                performance_diff(
-                    before_classifier,
-                    after_classifier,
-                    self.x_quiz,
-                    self.y_quiz,
-                    perf_function=self.perf_func,
-                )
-            )
+        if self._calibration_info is not None and self._calibration_info[0] is before_classifier:
+            return self._calibration_info[1]
 
-        return np.median(accs), np.std(accs)
+        results = self._fit_and_compare(before_classifier, self.x_val, self.y_val, self.x_cal, self.y_cal, False)
+        accs = [acc_shift for _, acc_shift in results]
+        calibration_info = (np.median(accs), np.std(accs))
+
+        self._calibration_info = (before_classifier, calibration_info)
+        return calibration_info
+
+    def _fit_and_compare(
+        self,
+        before_classifier: "CLASSIFIER_TYPE",
+        x_base: np.ndarray,
+        y_base: np.ndarray,
+        x_new: np.ndarray,
+        y_new: np.ndarray,
+        return_classifiers: bool,
+    ) -> List[Tuple[Optional["CLASSIFIER_TYPE"], float]]:
+        """
+        Fit a copy of the classifier with each new point and measure its performance shift on the quiz set, in the
+        worker processes if available.
+
+        :param before_classifier: The classifier without the new points.
+        :param x_base: The data the copies are fitted on in addition to each new point.
+        :param y_base: The labels of `x_base`.
+        :param x_new: The new points.
+        :param y_new: The labels of the new points.
+        :param return_classifiers: Return the fitted copies, otherwise `None` is returned in their place.
+        :return: A list of the fitted copy and the performance shift for each new point.
+        """
+        kwargs = dict(
+            x_quiz=self.x_quiz,
+            y_quiz=self.y_quiz,
+            perf_func=self.perf_func,
+            incremental_epochs=self.incremental_epochs,
+            return_classifiers=return_classifiers,
+        )
+        if self._pool is None or len(x_new) == 1:
+            return _fit_and_compare(before_classifier, x_base, y_base, x_new, y_new, **kwargs)
+
+        shards = np.array_split(np.arange(len(x_new)), min(len(x_new), self.nb_workers))
+        async_results = [
+            self._pool.apply_async(
+                _fit_and_compare, (before_classifier, x_base, y_base, x_new[shard], y_new[shard]), kwargs
+            )
+            for shard in shards
+        ]
+        return [result for async_result in async_results for result in async_result.get()]
 
     def _check_params(self) -> None:
         if len(self.x_train) != len(self.y_train):
@@ -213,3 +271,70 @@ class RONIDefense(PoisonFilteringDefence):
 
         if self.eps < 0:
             raise ValueError("Value of `eps` must be at least 0.")
+
+        if not isinstance(self.nb_workers, int) or self.nb_workers <= 0:
+            raise ValueError("The number of workers must be a positive integer.")
+
+        if self.incremental_epochs is not None:
+            if not isinstance(self.incremental_epochs, int) or self.incremental_epochs <= 0:
+                raise ValueError("The number of incremental epochs must be a positive integer.")
+
+            if not isinstance(self.classifier, ClassifierNeuralNetwork) and not hasattr(
+                getattr(self.classifier, "model", None), "partial_fit"
+            ):
+                raise ValueError(
+                    "Incremental fitting requires a neural network or a scikit-learn model supporting `partial_fit`."
+                )
+
+
+def _fit_and_compare(
+    before_classifier: "CLASSIFIER_TYPE",
+    x_base: np.ndarray,
+    y_base: np.ndarray,
+    x_new: np.ndarray,
+    y_new: np.ndarray,
+    x_quiz: np.ndarray,
+    y_quiz: np.ndarray,
+    perf_func: Union[str, Callable],
+    incremental_epochs: Optional[int],
+    return_classifiers: bool,
+) -> List[Tuple[Optional["CLASSIFIER_TYPE"], float]]:
+    """
+    Fit a copy of the classifier with each new point and measure its performance shift on the quiz set.
+
+    :param before_classifier: The classifier without the new points.
+    :param x_base: The data the copies are fitted on in addition to each new point, unless fitted incrementally.
+    :param y_base: The labels of `x_base`.
+    :param x_new: The new points.
+    :param y_new: The labels of the new points.
+    :param x_quiz: The quiz data.
+    :param y_quiz: The quiz labels.
+    :param perf_func: Performance function to use.
+    :param incremental_epochs: Number of incremental updates with the new point only, or `None` to refit.
+    :param return_classifiers: Return the fitted copies, otherwise `None` is returned in their place.
+    :return: A list of the fitted copy and the performance shift for each new point.
+    """
+    results: List[Tuple[Optional["CLASSIFIER_TYPE"], float]] = []
+    for x_i, y_i in zip(x_new, y_new):
+        after_classifier = deepcopy(before_classifier)
+        if incremental_epochs is None:
+            after_classifier.fit(x=np.vstack([x_base, x_i]), y=np.vstack([y_base, y_i]))
+        elif isinstance(after_classifier, ClassifierNeuralNetwork):
+            after_classifier.fit(x=x_i[np.newaxis], y=y_i[np.newaxis], nb_epochs=incremental_epochs)
+        else:
+            x_preprocessed, y_preprocessed = after_classifier._apply_preprocessing(  # pylint: disable=W0212
+                x_i[np.newaxis], y_i[np.newaxis], fit=True
+            )
+            y_preprocessed = np.argmax(y_preprocessed, axis=1)
+            for _ in range(incremental_epochs):
+                after_classifier.model.partial_fit(x_preprocessed, y_preprocessed)  # type: ignore
+
+        acc_shift = performance_diff(
+            before_classifier,
+            after_classifier,
+            x_quiz,
+            y_quiz,
+            perf_function=perf_func,
+        )
+        results.append((after_classifier if return_classifiers else None, acc_shift))
+    return results
@@ -25,5 +25,6 @@ from art.defences.preprocessor.spatial_smoothing_pytorch import SpatialSmoothing
 from art.defences.preprocessor.spatial_smoothing_tensorflow import SpatialSmoothingTensorFlowV2
 from art.defences.preprocessor.thermometer_encoding import ThermometerEncoding
 from art.defences.preprocessor.variance_minimization import TotalVarMin
+from art.defences.preprocessor.variance_minimization_pytorch import TotalVarMinPyTorch
 from art.defences.preprocessor.video_compression import VideoCompression
 from art.defences.preprocessor.video_compression_pytorch import VideoCompressionPyTorch
@@ -26,9 +26,10 @@ This module implements the JPEG compression defence `JpegCompression`.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from io import BytesIO
 import logging
-from typing import Optional, Tuple, TYPE_CHECKING
+from typing import Iterable, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
 from tqdm.auto import tqdm
@@ -58,7 +59,7 @@ class JpegCompression(Preprocessor):
         https://arxiv.org/abs/1902.06705
     """
 
-    params = ["quality", "channels_first", "clip_values", "verbose"]
+    params = ["quality", "channels_first", "clip_values", "nb_workers", "verbose"]
 
     def __init__(
         self,
@@ -67,6 +68,7 @@ class JpegCompression(Preprocessor):
         channels_first: bool = False,
         apply_fit: bool = True,
         apply_predict: bool = True,
+        nb_workers: int = 1,
         verbose: bool = False,
     ):
         """
@@ -78,6 +80,7 @@ class JpegCompression(Preprocessor):
         :param channels_first: Set channels first or last.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param nb_workers: Number of threads compressing the images of a batch in parallel.
         :param verbose: Show progress bars.
         """
 
@@ -85,22 +88,54 @@ class JpegCompression(Preprocessor):
         self.quality = quality
         self.channels_first = channels_first
         self.clip_values = clip_values
+        self.nb_workers = nb_workers
         self.verbose = verbose
         self._check_params()
 
-    def _compress(self, x: np.ndarray, mode: str) -> np.ndarray:
+    def _compress(self, x: np.ndarray, mode: str, buffer: Optional[BytesIO] = None) -> np.ndarray:
         """
         Apply JPEG compression to image input.
+
+        :param x: Image of shape `HWC` for mode `RGB` or `HW` for mode `L`.
+        :param mode: Mode of the image.
+        :param buffer: Buffer to reuse for the compressed image.
+        :return: Compressed image.
         """
         from PIL import Image
 
-        tmp_jpeg = BytesIO()
+        if buffer is None:
+            tmp_jpeg = BytesIO()
+        else:
+            tmp_jpeg = buffer
+            tmp_jpeg.seek(0)
+            tmp_jpeg.truncate()
+
         x_image = Image.fromarray(x, mode=mode)
         x_image.save(tmp_jpeg, format="jpeg", quality=self.quality)
-        x_jpeg = np.array(Image.open(tmp_jpeg))
-        tmp_jpeg.close()
+        with Image.open(tmp_jpeg) as x_image_jpeg:
+            x_jpeg = np.asarray(x_image_jpeg)
+
+        if buffer is None:
+            tmp_jpeg.close()
         return x_jpeg
 
+    def _compress_images(self, x: np.ndarray, x_jpeg: np.ndarray, indices: Iterable[int]) -> None:
+        """
+        Apply JPEG compression to images of a batch, reusing a single buffer.
+
+        :param x: Batch of images of shape `NHWC` in `uint8`.
+        :param x_jpeg: Array of the same shape as `x` to which the compressed images are written.
+        :param indices: Indices of the images to compress.
+        """
+        buffer = BytesIO()
+        for i in indices:
+            if x.shape[-1] == 3:
+                x_jpeg[i] = self._compress(x[i], mode="RGB", buffer=buffer)
+            else:
+                for i_channel in range(x.shape[-1]):
+                    x_jpeg[i, ..., i_channel] = self._compress(x[i, ..., i_channel], mode="L", buffer=buffer)
+        buffer.close()
+
     def __call__(self, x: np.ndarray, y: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
         """
         Apply JPEG compression to sample `x`.
@@ -142,16 +177,21 @@ class JpegCompression(Preprocessor):
             x = x * 255
         x = x.astype("uint8")
 
-        # Compress one image at a time
-        x_jpeg = x.copy()
-        for idx in tqdm(np.ndindex(x.shape[:2]), desc="JPEG compression", disable=not self.verbose):  # type: ignore
-            if x.shape[-1] == 3:
-                x_jpeg[idx] = self._compress(x[idx], mode="RGB")
-            else:
-                for i_channel in range(x.shape[-1]):
-                    x_channel = x[idx[0], idx[1], ..., i_channel]
-                    x_channel = self._compress(x_channel, mode="L")
-                    x_jpeg[idx[0], idx[1], :, :, i_channel] = x_channel
+        # Compress all images of the batch and of all frames, in parallel if requested
+        x_images = x.reshape((-1,) + x.shape[2:])
+        x_jpeg = np.empty_like(x_images)
+        if self.nb_workers == 1:
+            indices = tqdm(range(x_images.shape[0]), desc="JPEG compression", disable=not self.verbose)
+            self._compress_images(x_images, x_jpeg, indices)
+        else:
+            chunks = np.array_split(np.arange(x_images.shape[0]), min(x_images.shape[0], 4 * self.nb_workers))
+            with ThreadPoolExecutor(max_workers=self.nb_workers) as executor:
+                futures = [executor.submit(self._compress_images, x_images, x_jpeg, chunk) for chunk in chunks]
+                for future in tqdm(
+                    as_completed(futures), total=len(futures), desc="JPEG compression", disable=not self.verbose
+                ):
+                    future.result()
+        x_jpeg = x_jpeg.reshape(x.shape)
 
         # Convert to ART dtype
         if self.clip_values[1] == 1.0:
@@ -187,5 +227,8 @@ class JpegCompression(Preprocessor):
         if self.clip_values[1] != 1.0 and self.clip_values[1] != 255:
             raise ValueError("'clip_values' max value must be either 1 or 255.")
 
+        if not isinstance(self.nb_workers, int) or self.nb_workers <= 0:
+            raise ValueError("The number of workers must be a positive integer.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
@@ -31,7 +31,7 @@ import logging
 from typing import Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
-from tqdm.auto import tqdm
+from tqdm.auto import trange
 
 from art.config import ART_NUMPY_DTYPE
 from art.defences.preprocessor.preprocessor import Preprocessor
@@ -54,7 +54,7 @@ class PixelDefend(Preprocessor):
         https://arxiv.org/abs/1902.06705
     """
 
-    params = ["clip_values", "eps", "pixel_cnn", "verbose"]
+    params = ["clip_values", "eps", "pixel_cnn", "autoregressive", "verbose"]
 
     def __init__(
         self,
@@ -64,6 +64,7 @@ class PixelDefend(Preprocessor):
         batch_size: int = 128,
         apply_fit: bool = False,
         apply_predict: bool = True,
+        autoregressive: bool = False,
         verbose: bool = False,
     ) -> None:
         """
@@ -73,6 +74,12 @@ class PixelDefend(Preprocessor):
                for features.
         :param eps: Defense parameter 0-255.
         :param pixel_cnn: Pre-trained PixelCNN model.
+        :param batch_size: Size of batches.
+        :param apply_fit: True if applied during fitting/training.
+        :param apply_predict: True if applied during predicting.
+        :param autoregressive: If True, purify the features one after another and recompute the PixelCNN probabilities
+               of the whole batch on the partially purified images after every feature, as in the original paper.
+               Otherwise the probabilities are computed once on the input.
         :param verbose: Show progress bars.
         """
         super().__init__(is_fitted=True, apply_fit=apply_fit, apply_predict=apply_predict)
@@ -80,6 +87,7 @@ class PixelDefend(Preprocessor):
         self.eps = eps
         self.batch_size = batch_size
         self.pixel_cnn = pixel_cnn
+        self.autoregressive = autoregressive
         self.verbose = verbose
         self._check_params()
 
@@ -92,47 +100,28 @@ class PixelDefend(Preprocessor):
         :param y: Labels of the sample `x`. This function does not affect them in any way.
         :return: Purified sample.
         """
+        if self.pixel_cnn is None:
+            raise ValueError("No model received for `pixel_cnn`.")
+
         # Convert into `uint8`
         original_shape = x.shape
-        if self.pixel_cnn is not None:
-            activations = self.pixel_cnn.get_activations(x, layer=-1, batch_size=self.batch_size)
-            if isinstance(activations, np.ndarray):
-                probs = activations.reshape((x.shape[0], -1, 256))
-            else:
-                raise ValueError("Activations are None.")
+        x_uint8 = (x * 255).astype("uint8").reshape((x.shape[0], -1))
+
+        if self.autoregressive:
+            # Purify one feature at a time for all images, conditioning on the already purified features
+            x_purified = x.astype(ART_NUMPY_DTYPE).reshape((x.shape[0], -1))
+            for feat_index in trange(x_uint8.shape[1], desc="PixelDefend", disable=not self.verbose):
+                probs = self._get_probs(x_purified.reshape(original_shape))
+                x_purified[:, feat_index] = self._windowed_argmax(x_uint8[:, feat_index], probs[:, feat_index]) / 255.0
+            x = x_purified
         else:
-            raise ValueError("No model received for `pixel_cnn`.")
-
-        x = x * 255
-        x = x.astype("uint8")
-        x = x.reshape((x.shape[0], -1))
-
-        # Start defence one image at a time
-        for i, x_i in enumerate(tqdm(x, desc="PixelDefend", disable=not self.verbose)):
-            for feat_index in range(x.shape[1]):
-                # Setup the search space
-                f_probs = probs[i, feat_index, :]
-                f_range = range(
-                    int(max(x_i[feat_index] - self.eps, 0)),
-                    int(min(x_i[feat_index] + self.eps, 255) + 1),
-                )
-
-                # Look in the search space
-                best_prob = -1
-                best_idx = -1
-                for idx in f_range:
-                    if f_probs[idx] > best_prob:
-                        best_prob = f_probs[idx]
-                        best_idx = idx
-
-                # Update result
-                x_i[feat_index] = best_idx
-
-            # Update in batch
-            x[i] = x_i
+            probs = self._get_probs(x)
+            x = np.empty(x_uint8.shape, dtype=ART_NUMPY_DTYPE)
+            for begin in trange(0, x.shape[0], self.batch_size, desc="PixelDefend", disable=not self.verbose):
+                end = begin + self.batch_size
+                x[begin:end] = self._windowed_argmax(x_uint8[begin:end], probs[begin:end]) / 255.0
 
         # Convert to old dtype
-        x = x / 255.0
         x = x.astype(ART_NUMPY_DTYPE).reshape(original_shape)
 
         # Clip to clip_values
@@ -140,6 +129,29 @@ class PixelDefend(Preprocessor):
 
         return x, y
 
+    def _get_probs(self, x: np.ndarray) -> np.ndarray:
+        """
+        Compute the PixelCNN probabilities of the 256 intensities of every feature.
+
+        :param x: Sample of shape `(batch_size, width, height, depth)`.
+        :return: Probabilities of shape `(batch_size, nb_features, 256)`.
+        """
+        activations = self.pixel_cnn.get_activations(x, layer=-1, batch_size=self.batch_size)  # type: ignore
+        if not isinstance(activations, np.ndarray):
+            raise ValueError("Activations are None.")
+        return activations.reshape((x.shape[0], -1, 256))
+
+    def _windowed_argmax(self, x: np.ndarray, probs: np.ndarray) -> np.ndarray:
+        """
+        Find the most probable intensity within `eps` of every feature.
+
+        :param x: Intensities of the features in `uint8`.
+        :param probs: Probabilities of the 256 intensities of the features, of shape `x.shape + (256,)`.
+        :return: The most probable intensities, the lowest one for ties.
+        """
+        in_window = np.abs(np.arange(256) - x[..., np.newaxis].astype(int)) <= self.eps
+        return np.argmax(np.where(in_window, probs, -np.inf), axis=-1)
+
     def _check_params(self) -> None:
 
         if not isinstance(self.eps, int) or self.eps < 0 or self.eps > 255:
@@ -165,5 +177,8 @@ class PixelDefend(Preprocessor):
         if self.batch_size <= 0:
             raise ValueError("The batch size `batch_size` has to be positive.")
 
+        if not isinstance(self.autoregressive, bool):
+            raise ValueError("The argument `autoregressive` has to be of type bool.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
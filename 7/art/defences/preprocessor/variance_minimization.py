@@ -53,7 +53,7 @@ class TotalVarMin(Preprocessor):
         see https://arxiv.org/abs/1902.06705
     """
 
-    params = ["prob", "norm", "lamb", "solver", "max_iter", "clip_values", "verbose"]
+    params = ["prob", "norm", "lamb", "solver", "max_iter", "clip_values", "batch_size", "verbose"]
 
     def __init__(
         self,
@@ -63,6 +63,7 @@ class TotalVarMin(Preprocessor):
         solver: str = "L-BFGS-B",
         max_iter: int = 10,
         clip_values: Optional["CLIP_VALUES_TYPE"] = None,
+        batch_size: int = 1,
         apply_fit: bool = False,
         apply_predict: bool = True,
         verbose: bool = False,
@@ -77,6 +78,8 @@ class TotalVarMin(Preprocessor):
         :param max_iter: Maximum number of iterations when performing optimization.
         :param clip_values: Tuple of the form `(min, max)` representing the minimum and maximum values allowed
                for features.
+        :param batch_size: Number of images whose channels are optimized jointly as a single vectorized problem by
+               one solver run. With `batch_size=1` each channel of each image is optimized separately.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
         :param verbose: Show progress bars.
@@ -88,6 +91,7 @@ class TotalVarMin(Preprocessor):
         self.solver = solver
         self.max_iter = max_iter
         self.clip_values = clip_values
+        self.batch_size = batch_size
         self.verbose = verbose
         self._check_params()
 
@@ -104,11 +108,19 @@ class TotalVarMin(Preprocessor):
                 "Feature vectors detected. Variance minimization can only be applied to data with spatial dimensions."
             )
         x_preproc = x.copy()
+        mask = (np.random.rand(*x.shape) < self.prob).astype("int")
 
-        # Minimize one input at a time
-        for i, x_i in enumerate(tqdm(x_preproc, desc="Variance minimization", disable=not self.verbose)):
-            mask = (np.random.rand(*x_i.shape) < self.prob).astype("int")
-            x_preproc[i] = self._minimize(x_i, mask)
+        if self.batch_size == 1:
+            # Minimize one input at a time
+            for i, x_i in enumerate(tqdm(x_preproc, desc="Variance minimization", disable=not self.verbose)):
+                x_preproc[i] = self._minimize(x_i, mask[i])
+        else:
+            # Minimize all channels of a batch of inputs at once
+            for begin in tqdm(
+                range(0, x.shape[0], self.batch_size), desc="Variance minimization", disable=not self.verbose
+            ):
+                end = begin + self.batch_size
+                x_preproc[begin:end] = self._minimize_batch(x_preproc[begin:end], mask[begin:end])
 
         if self.clip_values is not None:
             np.clip(x_preproc, self.clip_values[0], self.clip_values[1], out=x_preproc)
@@ -138,67 +150,99 @@ class TotalVarMin(Preprocessor):
 
         return z_min
 
+    def _minimize_batch(self, x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        Minimize the sum of the total variance objective functions of all channels of a batch of images.
+
+        :param x: Batch of original images.
+        :param mask: A matrix that decides which points are kept.
+        :return: A batch of new images.
+        """
+        # NHWC --> NCHW --> (N * C)HW
+        x_nchw = np.transpose(x, (0, 3, 1, 2))
+        x_flat = np.reshape(x_nchw, (-1,) + x_nchw.shape[2:])
+        mask_flat = np.reshape(np.transpose(mask, (0, 3, 1, 2)), x_flat.shape)
+
+        res = minimize(
+            self._loss_func,
+            x_flat.flatten(),
+            (x_flat, mask_flat, self.norm, self.lamb),
+            method=self.solver,
+            jac=self._deri_loss_func,
+            options={"maxiter": self.max_iter},
+        )
+
+        # (N * C)HW --> NCHW --> NHWC
+        z_min = np.reshape(res.x, x_nchw.shape)
+        return np.transpose(z_min, (0, 2, 3, 1))
+
     @staticmethod
     def _loss_func(z_init: np.ndarray, x: np.ndarray, mask: np.ndarray, norm: int, lamb: float) -> float:
         """
         Loss function to be minimized.
 
         :param z_init: Initial guess.
-        :param x: Original image.
+        :param x: Original image channel of shape `(height, width)` or a stack of them with shape
+                  `(nb_channels, height, width)`, in which case the sum of their losses is returned.
         :param mask: A matrix that decides which points are kept.
         :param norm: The norm (positive integer).
         :param lamb: The lambda parameter in the objective function.
         :return: Loss value.
         """
-        res = np.sqrt(np.power(z_init - x.flatten(), 2).dot(mask.flatten()))
+        x = np.reshape(x, (-1,) + x.shape[-2:])
+        mask = np.reshape(mask, x.shape)
         z_init = np.reshape(z_init, x.shape)
-        res += lamb * np.linalg.norm(z_init[1:, :] - z_init[:-1, :], norm, axis=1).sum()
-        res += lamb * np.linalg.norm(z_init[:, 1:] - z_init[:, :-1], norm, axis=0).sum()
+
+        res = np.sqrt(np.sum(np.power(z_init - x, 2) * mask, axis=(1, 2))).sum()
+        res += lamb * np.linalg.norm(z_init[:, 1:, :] - z_init[:, :-1, :], norm, axis=2).sum()
+        res += lamb * np.linalg.norm(z_init[:, :, 1:] - z_init[:, :, :-1], norm, axis=1).sum()
 
         return res
 
     @staticmethod
-    def _deri_loss_func(z_init: np.ndarray, x: np.ndarray, mask: np.ndarray, norm: int, lamb: float) -> float:
+    def _deri_loss_func(z_init: np.ndarray, x: np.ndarray, mask: np.ndarray, norm: int, lamb: float) -> np.ndarray:
         """
         Derivative of loss function to be minimized.
 
         :param z_init: Initial guess.
-        :param x: Original image.
+        :param x: Original image channel of shape `(height, width)` or a stack of them with shape
+                  `(nb_channels, height, width)`.
         :param mask: A matrix that decides which points are kept.
         :param norm: The norm (positive integer).
         :param lamb: The lambda parameter in the objective function.
         :return: Derivative value.
         """
+        x_shape = x.shape
+        x = np.reshape(x, (-1,) + x.shape[-2:])
+        mask = np.reshape(mask, x.shape)
+        z_init = np.reshape(z_init, x.shape)
+
         # First compute the derivative of the first component of the loss function
-        nor1 = np.sqrt(np.power(z_init - x.flatten(), 2).dot(mask.flatten()))
-        nor1 = max(nor1, 1e-06)
-        der1 = ((z_init - x.flatten()) * mask.flatten()) / (nor1 * 1.0)
+        nor1 = np.sqrt(np.sum(np.power(z_init - x, 2) * mask, axis=(1, 2), keepdims=True))
+        nor1 = np.maximum(nor1, 1e-06)
+        der1 = ((z_init - x) * mask) / (nor1 * 1.0)
 
         # Then compute the derivative of the second component of the loss function
-        z_init = np.reshape(z_init, x.shape)
-
         if norm == 1:
-            z_d1 = np.sign(z_init[1:, :] - z_init[:-1, :])
-            z_d2 = np.sign(z_init[:, 1:] - z_init[:, :-1])
+            z_d1 = np.sign(z_init[:, 1:, :] - z_init[:, :-1, :])
+            z_d2 = np.sign(z_init[:, :, 1:] - z_init[:, :, :-1])
         else:
-            z_d1_norm = np.power(np.linalg.norm(z_init[1:, :] - z_init[:-1, :], norm, axis=1), norm - 1)
-            z_d2_norm = np.power(np.linalg.norm(z_init[:, 1:] - z_init[:, :-1], norm, axis=0), norm - 1)
+            z_d1_norm = np.power(np.linalg.norm(z_init[:, 1:, :] - z_init[:, :-1, :], norm, axis=2), norm - 1)
+            z_d2_norm = np.power(np.linalg.norm(z_init[:, :, 1:] - z_init[:, :, :-1], norm, axis=1), norm - 1)
             z_d1_norm[z_d1_norm < 1e-6] = 1e-6
             z_d2_norm[z_d2_norm < 1e-6] = 1e-6
-            z_d1_norm = np.repeat(z_d1_norm[:, np.newaxis], z_init.shape[1], axis=1)
-            z_d2_norm = np.repeat(z_d2_norm[np.newaxis, :], z_init.shape[0], axis=0)
-            z_d1 = norm * np.power(z_init[1:, :] - z_init[:-1, :], norm - 1) / z_d1_norm
-            z_d2 = norm * np.power(z_init[:, 1:] - z_init[:, :-1], norm - 1) / z_d2_norm
+            z_d1 = norm * np.power(z_init[:, 1:, :] - z_init[:, :-1, :], norm - 1) / z_d1_norm[:, :, np.newaxis]
+            z_d2 = norm * np.power(z_init[:, :, 1:] - z_init[:, :, :-1], norm - 1) / z_d2_norm[:, np.newaxis, :]
 
         der2 = np.zeros(z_init.shape)
-        der2[:-1, :] -= z_d1
-        der2[1:, :] += z_d1
-        der2[:, :-1] -= z_d2
-        der2[:, 1:] += z_d2
-        der2 = lamb * der2.flatten()
+        der2[:, :-1, :] -= z_d1
+        der2[:, 1:, :] += z_d1
+        der2[:, :, :-1] -= z_d2
+        der2[:, :, 1:] += z_d2
+        der2 = lamb * der2
 
         # Total derivative
-        return der1 + der2
+        return np.reshape(der1 + der2, x_shape).flatten()
 
     def _check_params(self) -> None:
         if not isinstance(self.prob, (float, int)) or self.prob < 0.0 or self.prob > 1.0:
@@ -217,6 +261,10 @@ class TotalVarMin(Preprocessor):
             logger.error("Number of iterations must be a positive integer.")
             raise ValueError("Number of iterations must be a positive integer.")
 
+        if not isinstance(self.batch_size, int) or self.batch_size <= 0:
+            logger.error("Batch size must be a positive integer.")
+            raise ValueError("Batch size must be a positive integer.")
+
         if self.clip_values is not None:
 
             if len(self.clip_values) != 2:
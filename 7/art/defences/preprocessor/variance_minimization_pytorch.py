@@ -0,0 +1,195 @@
+# MIT License
+#
+# Copyright (C) The Adversarial Robustness Toolbox (ART) Authors 2022
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""
+This module implements the total variance minimization defence `TotalVarMin` in PyTorch.
+
+| Paper link: https://openreview.net/forum?id=SyJ7ClWCb
+
+| Please keep in mind the limitations of defences. For more information on the limitations of this defence,
+    see https://arxiv.org/abs/1802.00420 . For details on how to evaluate classifier security in general, see
+    https://arxiv.org/abs/1902.06705
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+from typing import Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from art.defences.preprocessor.preprocessor import PreprocessorPyTorch
+
+if TYPE_CHECKING:
+    # pylint: disable=C0412
+    import torch
+    from art.utils import CLIP_VALUES_TYPE
+
+logger = logging.getLogger(__name__)
+
+
+class TotalVarMinPyTorch(PreprocessorPyTorch):
+    """
+    Implement the total variance minimization defence approach in PyTorch. All channels of all images of a batch are
+    optimized jointly with L-BFGS on the device of the classifier. The gradient of the defence is approximated with
+    the identity function (BPDA).
+
+    | Paper link: https://openreview.net/forum?id=SyJ7ClWCb
+
+    | Please keep in mind the limitations of defences. For more information on the limitations of this
+        defence, see https://arxiv.org/abs/1802.00420 . For details on how to evaluate classifier security in general,
+        see https://arxiv.org/abs/1902.06705
+    """
+
+    params = ["prob", "norm", "lamb", "max_iter", "channels_first", "clip_values", "verbose"]
+
+    def __init__(
+        self,
+        prob: float = 0.3,
+        norm: int = 2,
+        lamb: float = 0.5,
+        max_iter: int = 10,
+        channels_first: bool = False,
+        clip_values: Optional["CLIP_VALUES_TYPE"] = None,
+        apply_fit: bool = False,
+        apply_predict: bool = True,
+        device_type: str = "gpu",
+        verbose: bool = False,
+    ):
+        """
+        Create an instance of total variance minimization in PyTorch.
+
+        :param prob: Probability of the Bernoulli distribution.
+        :param norm: The norm (positive integer).
+        :param lamb: The lambda parameter in the objective function.
+        :param max_iter: Maximum number of iterations when performing optimization.
+        :param channels_first: Set channels first or last.
+        :param clip_values: Tuple of the form `(min, max)` representing the minimum and maximum values allowed
+               for features.
+        :param apply_fit: True if applied during fitting/training.
+        :param apply_predict: True if applied during predicting.
+        :param device_type: Type of device on which the classifier is run, either `gpu` or `cpu`.
+        :param verbose: Show the loss of the optimization.
+        """
+        super().__init__(
+            device_type=device_type,
+            is_fitted=True,
+            apply_fit=apply_fit,
+            apply_predict=apply_predict,
+        )
+        self.prob = prob
+        self.norm = norm
+        self.lamb = lamb
+        self.max_iter = max_iter
+        self.channels_first = channels_first
+        self.clip_values = clip_values
+        self.verbose = verbose
+        self._check_params()
+
+    def forward(
+        self, x: "torch.Tensor", y: Optional["torch.Tensor"] = None
+    ) -> Tuple["torch.Tensor", Optional["torch.Tensor"]]:
+        """
+        Apply total variance minimization to sample `x`.
+
+        :param x: Sample to compress with shape `(batch_size, width, height, depth)` or `(batch_size, depth, width,
+                  height)` if `channels_first` is set.
+        :param y: Labels of the sample `x`. This function does not affect them in any way.
+        :return: Similar samples.
+        """
+        import torch
+
+        if x.ndim != 4:
+            raise ValueError("Unrecognized input dimension. Variance minimization can only be applied to image data.")
+
+        # NHWC --> NCHW
+        x_nchw = x.detach() if self.channels_first else x.detach().permute(0, 3, 1, 2)
+        x_nchw = x_nchw.to(torch.float32).contiguous()
+        mask = (torch.rand(x_nchw.shape, device=x_nchw.device) < self.prob).to(x_nchw.dtype)
+
+        z_nchw = x_nchw.clone().requires_grad_(True)
+        optimizer = torch.optim.LBFGS([z_nchw], max_iter=self.max_iter, line_search_fn="strong_wolfe")
+
+        def closure():
+            optimizer.zero_grad()
+            loss = self._loss_func(z_nchw, x_nchw, mask)
+            loss.backward()
+            return loss
+
+        with torch.enable_grad():
+            loss = optimizer.step(closure)
+
+        if self.verbose:
+            logger.info("Total variance minimization loss: %f", float(loss))
+
+        # NHWC <-- NCHW
+        z_min = z_nchw.detach() if self.channels_first else z_nchw.detach().permute(0, 2, 3, 1)
+        z_min = z_min.to(x.dtype)
+
+        if self.clip_values is not None:
+            z_min = z_min.clamp(min=float(self.clip_values[0]), max=float(self.clip_values[1]))
+
+        # Backward pass differentiable approximation with the identity function
+        x_preproc = x + (z_min - x).detach()
+
+        return x_preproc, y
+
+    def _loss_func(self, z_init: "torch.Tensor", x: "torch.Tensor", mask: "torch.Tensor") -> "torch.Tensor":
+        """
+        Loss function to be minimized, summed over all channels of all images.
+
+        :param z_init: Initial guess with shape `(batch_size, depth, width, height)`.
+        :param x: Original images with shape `(batch_size, depth, width, height)`.
+        :param mask: A matrix that decides which points are kept.
+        :return: Loss value.
+        """
+        import torch
+
+        res = torch.sqrt(torch.clamp(torch.sum((z_init - x) ** 2 * mask, dim=(2, 3)), min=1e-12)).sum()
+        res = (
+            res
+            + self.lamb * torch.linalg.vector_norm(z_init[:, :, 1:, :] - z_init[:, :, :-1, :], self.norm, dim=3).sum()
+        )
+        res = (
+            res
+            + self.lamb * torch.linalg.vector_norm(z_init[:, :, :, 1:] - z_init[:, :, :, :-1], self.norm, dim=2).sum()
+        )
+
+        return res
+
+    def _check_params(self) -> None:
+        if not isinstance(self.prob, (float, int)) or self.prob < 0.0 or self.prob > 1.0:
+            logger.error("Probability must be between 0 and 1.")
+            raise ValueError("Probability must be between 0 and 1.")
+
+        if not isinstance(self.norm, int) or self.norm <= 0:
+            logger.error("Norm must be a positive integer.")
+            raise ValueError("Norm must be a positive integer.")
+
+        if not isinstance(self.max_iter, int) or self.max_iter <= 0:
+            logger.error("Number of iterations must be a positive integer.")
+            raise ValueError("Number of iterations must be a positive integer.")
+
+        if self.clip_values is not None:
+
+            if len(self.clip_values) != 2:
+                raise ValueError("`clip_values` should be a tuple of 2 floats containing the allowed data range.")
+
+            if np.array(self.clip_values[0] >= self.clip_values[1]).any():
+                raise ValueError("Invalid `clip_values`: min >= max.")
+
+        if not isinstance(self.verbose, bool):
+            raise ValueError("The argument `verbose` has to be of type bool.")
@@ -23,9 +23,13 @@ This module implements a wrapper for video compression defence with FFmpeg.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext, suppress
 import logging
 import os
+import subprocess
 from tempfile import TemporaryDirectory
+import threading
 from typing import Optional, Tuple
 import warnings
 
@@ -46,7 +50,7 @@ class VideoCompression(Preprocessor):
     parameter. More information on the constant rate factor: https://trac.ffmpeg.org/wiki/Encode/H.264.
     """
 
-    params = ["video_format", "constant_rate_factor", "channels_first", "verbose"]
+    params = ["video_format", "constant_rate_factor", "channels_first", "in_memory", "nb_workers", "verbose"]
 
     def __init__(
         self,
@@ -56,6 +60,8 @@ class VideoCompression(Preprocessor):
         channels_first: bool = False,
         apply_fit: bool = False,
         apply_predict: bool = True,
+        in_memory: bool = False,
+        nb_workers: int = 1,
         verbose: bool = False,
     ):
         """
@@ -66,12 +72,18 @@ class VideoCompression(Preprocessor):
         :param channels_first: Set channels first or last.
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
+        :param in_memory: Stream the frames through pipes between an FFmpeg encoder and decoder instead of writing
+               temporary video files. The video is muxed into Matroska in memory, so `video_format` only applies to
+               temporary video files. The compressed frames are identical for both settings.
+        :param nb_workers: Number of videos compressed in parallel, each by its own FFmpeg processes.
         :param verbose: Show progress bars.
         """
         super().__init__(is_fitted=True, apply_fit=apply_fit, apply_predict=apply_predict)
         self.video_format = video_format
         self.constant_rate_factor = constant_rate_factor
         self.channels_first = channels_first
+        self.in_memory = in_memory
+        self.nb_workers = nb_workers
         self.verbose = verbose
         self._check_params()
 
@@ -84,66 +96,173 @@ class VideoCompression(Preprocessor):
         :param y: Labels of the sample `x`. This function does not affect them in any way.
         :return: Compressed sample.
         """
-
-        def compress_video(x: np.ndarray, video_format: str, constant_rate_factor: int, dir_: str = ""):
-            """
-            Apply video compression to video input of shape (frames, height, width, channel).
-            """
-            import ffmpeg
-
-            video_path = os.path.join(dir_, f"tmp_video.{video_format}")
-            _, height, width, _ = x.shape
-
-            if (height % 2) != 0 or (width % 2) != 0:
-                warnings.warn("Codec might require even number of pixels in height and width.")
-
-            # numpy to local video file
-            process = (
-                ffmpeg.input("pipe:", format="rawvideo", pix_fmt="rgb24", s=f"{width}x{height}")
-                .output(video_path, pix_fmt="yuv420p", vcodec="libx264", crf=constant_rate_factor)
-                .overwrite_output()
-                .run_async(pipe_stdin=True, quiet=True)
-            )
-            process.stdin.write(x.flatten().astype(np.uint8).tobytes())
-            process.stdin.close()
-            process.wait()
-
-            # local video file to numpy
-            stdout, _ = (
-                ffmpeg.input(video_path)
-                .output("pipe:", format="rawvideo", pix_fmt="rgb24")
-                .run(capture_stdout=True, quiet=True)
-            )
-            return np.frombuffer(stdout, np.uint8).reshape(x.shape)
-
         if x.ndim != 5:
             raise ValueError("Video compression can only be applied to spatio-temporal data.")
 
         if self.channels_first:
             x = np.transpose(x, (0, 2, 3, 4, 1))
 
-        # apply video compression per video item
+        _, _, height, width, _ = x.shape
+        if (height % 2) != 0 or (width % 2) != 0:
+            warnings.warn("Codec might require even number of pixels in height and width.")
+
         scale = 1
         if x.min() >= 0 and x.max() <= 1.0:
             scale = 255
 
-        x_compressed = x.copy()
-        with TemporaryDirectory(dir=config.ART_DATA_PATH) as tmp_dir:
-            for i, x_i in enumerate(tqdm(x, desc="Video compression", disable=not self.verbose)):
-                x_i *= scale
-                x_compressed[i] = compress_video(x_i, self.video_format, self.constant_rate_factor, dir_=tmp_dir)
+        # apply video compression per video item, in parallel if requested, the compressed frames are scaled back one
+        # frame at a time
+        x_compressed = np.empty(x.shape, dtype=x.dtype)
+        with nullcontext() if self.in_memory else TemporaryDirectory(dir=config.ART_DATA_PATH) as tmp_dir:
+
+            def compress(i: int) -> None:
+                if self.in_memory:
+                    self._compress_video_in_memory(x[i], x_compressed[i], scale)
+                else:
+                    video_path = os.path.join(tmp_dir, f"tmp_video_{i}.{self.video_format}")
+                    self._compress_video_file(x[i], x_compressed[i], scale, video_path)
 
-        x_compressed = x_compressed / scale
-        x_compressed = x_compressed.astype(x.dtype)
+            if self.nb_workers == 1:
+                for i in tqdm(range(x.shape[0]), desc="Video compression", disable=not self.verbose):
+                    compress(i)
+            else:
+                with ThreadPoolExecutor(max_workers=self.nb_workers) as executor:
+                    results = executor.map(compress, range(x.shape[0]))
+                    for _ in tqdm(results, total=x.shape[0], desc="Video compression", disable=not self.verbose):
+                        pass
 
         if self.channels_first:
             x_compressed = np.transpose(x_compressed, (0, 4, 1, 2, 3))
 
         return x_compressed, y
 
+    def _encoder(self, x: np.ndarray, output: str, **kwargs):
+        """
+        Create the FFmpeg stream encoding raw frames read from stdin with H.264.
+
+        :param x: Video of shape (frames, height, width, channel).
+        :param output: File name or `pipe:` to which the encoded video is written.
+        :return: FFmpeg stream.
+        """
+        import ffmpeg
+
+        _, height, width, _ = x.shape
+        return ffmpeg.input("pipe:", format="rawvideo", pix_fmt="rgb24", s=f"{width}x{height}").output(
+            output, pix_fmt="yuv420p", vcodec="libx264", crf=self.constant_rate_factor, **kwargs
+        )
+
+    @staticmethod
+    def _write_frames(stdin, x: np.ndarray, scale: int) -> None:
+        """
+        Write the frames of a video as raw RGB bytes, one frame at a time.
+
+        :param stdin: Standard input of the FFmpeg encoder, closed after the last frame or if the encoder exited.
+        :param x: Video of shape (frames, height, width, channel).
+        :param scale: Factor scaling the values of `x` to the range [0, 255].
+        """
+        # the encoder exiting early closes the pipe, its error is reported by the caller
+        with suppress(BrokenPipeError):
+            try:
+                for frame in x:
+                    stdin.write((frame * scale).astype(np.uint8).tobytes())
+            finally:
+                stdin.close()
+
+    def _compress_video_file(self, x: np.ndarray, x_compressed: np.ndarray, scale: int, video_path: str) -> None:
+        """
+        Apply video compression to video input of shape (frames, height, width, channel) through a temporary file.
+
+        :param x: Video to compress.
+        :param x_compressed: Array of the same shape as `x` to which the compressed frames are written, divided by
+                             `scale`.
+        :param scale: Factor scaling the values of `x` to the range [0, 255].
+        :param video_path: Path of the temporary video file.
+        """
+        import ffmpeg
+
+        # numpy to local video file
+        process = self._encoder(x, video_path).overwrite_output().run_async(pipe_stdin=True, quiet=True)
+        self._write_frames(process.stdin, x, scale)
+        process.wait()
+
+        # local video file to numpy
+        stdout, _ = (
+            ffmpeg.input(video_path)
+            .output("pipe:", format="rawvideo", pix_fmt="rgb24")
+            .run(capture_stdout=True, quiet=True)
+        )
+        for i_frame, frame in enumerate(np.frombuffer(stdout, np.uint8).reshape(x.shape)):
+            x_compressed[i_frame] = frame / scale
+
+    def _compress_video_in_memory(self, x: np.ndarray, x_compressed: np.ndarray, scale: int) -> None:
+        """
+        Apply video compression to video input of shape (frames, height, width, channel) without temporary files. The
+        encoder streams into the decoder through a pipe, and the frames are written and read one at a time, so that
+        only a few frames of the video need to be held as bytes in memory.
+
+        :param x: Video to compress.
+        :param x_compressed: Array of the same shape as `x` to which the compressed frames are written, divided by
+                             `scale`.
+        :param scale: Factor scaling the values of `x` to the range [0, 255].
+        :raises `ffmpeg.Error`: If the encoder or the decoder fails, with the error output of FFmpeg as `stderr`.
+        """
+        import ffmpeg
+
+        # only errors are logged, so that the error output cannot fill its pipe while the video is processed
+        encoder = subprocess.Popen(  # pylint: disable=R1732
+            self._encoder(x, "pipe:", format="matroska").global_args("-loglevel", "error").compile(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        decoder = subprocess.Popen(  # pylint: disable=R1732
+            ffmpeg.input("pipe:", format="matroska")
+            .output("pipe:", format="rawvideo", pix_fmt="rgb24")
+            .global_args("-loglevel", "error")
+            .compile(),
+            stdin=encoder.stdout,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        # the decoder receives end-of-file once the encoder exits
+        encoder.stdout.close()
+
+        writer = threading.Thread(target=self._write_frames, args=(encoder.stdin, x, scale), daemon=True)
+        writer.start()
+
+        frame_size = int(np.prod(x.shape[1:]))
+        nb_frames = 0
+        try:
+            while nb_frames < x.shape[0]:
+                frame = decoder.stdout.read(frame_size)
+                if len(frame) != frame_size:
+                    break
+                x_compressed[nb_frames] = np.frombuffer(frame, np.uint8).reshape(x.shape[1:]) / scale
+                nb_frames += 1
+        finally:
+            decoder.stdout.close()
+            writer.join()
+            encoder_stderr = encoder.stderr.read()
+            decoder_stderr = decoder.stderr.read()
+            encoder.stderr.close()
+            decoder.stderr.close()
+            encoder.wait()
+            decoder.wait()
+
+        if encoder.returncode != 0:
+            raise ffmpeg.Error("ffmpeg", None, encoder_stderr)
+        if nb_frames != x.shape[0]:
+            raise ffmpeg.Error("ffmpeg", None, decoder_stderr)
+
     def _check_params(self) -> None:
         if not (isinstance(self.constant_rate_factor, int) and 0 <= self.constant_rate_factor < 52):
             raise ValueError("Constant rate factor must be an integer in the range [0, 51].")
 
+        if not isinstance(self.in_memory, bool):
+            raise ValueError("The argument `in_memory` has to be of type bool.")
+
+        if not isinstance(self.nb_workers, int) or self.nb_workers <= 0:
+            raise ValueError("The number of workers must be a positive integer.")
+
         if not isinstance(self.verbose, bool):
             raise ValueError("The argument `verbose` has to be of type bool.")
@@ -44,7 +44,7 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
     parameter. More information on the constant rate factor: https://trac.ffmpeg.org/wiki/Encode/H.264.
     """
 
-    params = ["video_format", "constant_rate_factor", "channels_first", "verbose"]
+    params = ["video_format", "constant_rate_factor", "channels_first", "in_memory", "nb_workers", "verbose"]
 
     def __init__(
         self,
@@ -55,6 +55,8 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
         apply_fit: bool = False,
         apply_predict: bool = True,
         device_type: str = "gpu",
+        in_memory: bool = False,
+        nb_workers: int = 1,
         verbose: bool = False,
     ):
         """
@@ -66,6 +68,9 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
         :param apply_fit: True if applied during fitting/training.
         :param apply_predict: True if applied during predicting.
         :param device_type: Type of device on which the classifier is run, either `gpu` or `cpu`.
+        :param in_memory: Stream the frames through pipes between an FFmpeg encoder and decoder instead of writing
+               temporary video files.
+        :param nb_workers: Number of videos compressed in parallel, each by its own FFmpeg processes.
         :param verbose: Show progress bars.
         """
         from torch.autograd import Function
@@ -79,6 +84,8 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
         self.video_format = video_format
         self.constant_rate_factor = constant_rate_factor
         self.channels_first = channels_first
+        self.in_memory = in_memory
+        self.nb_workers = nb_workers
         self.verbose = verbose
         self._check_params()
 
@@ -88,6 +95,8 @@ class VideoCompressionPyTorch(PreprocessorPyTorch):
             channels_first=channels_first,
             apply_fit=apply_fit,
             apply_predict=apply_predict,
+            in_memory=in_memory,
+            nb_workers=nb_workers,
             verbose=verbose,
         )
 
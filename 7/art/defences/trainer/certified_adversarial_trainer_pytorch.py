@@ -22,7 +22,6 @@ This module implements certified adversarial training following techniques from
     | Paper link: https://arxiv.org/pdf/1810.12715.pdf
 """
 import logging
-import math
 import random
 import sys
 
@@ -39,7 +38,6 @@ if sys.version_info >= (3, 8):
     from typing import TypedDict, List, Optional, Any, Tuple, Union, TYPE_CHECKING
 else:
     from typing import Dict, List, Optional, Any, Tuple, Union, TYPE_CHECKING
-    from functools import reduce
 
 if TYPE_CHECKING:
     from art.utils import CERTIFIER_TYPE
@@ -131,8 +129,8 @@ class AdversarialTrainerCertifiedPytorch(Trainer):
                                        have shown that this is often required to achieve best performance.
                                        Either True to use the default linear scheduler,
                                        or a class with a .step() method that returns the updated bound every epoch.
-        :param batch_size: Size of batches to use for certified training. NB, this will run the data
-                           sequentially accumulating gradients over the batch size.
+        :param batch_size: Size of batches to use for certified training. The zonotopes of a batch are pushed through
+                           the model together.
         """
         from art.estimators.certification.deep_z.pytorch import PytorchDeepZ
 
@@ -189,8 +187,8 @@ class AdversarialTrainerCertifiedPytorch(Trainer):
                                    Alternatively, a user can supply their own loss function which takes in as input
                                    the zonotope predictions of the form () and labels of the from () and returns a
                                    scalar loss.
-        :param batch_size: Size of batches to use for certified training. NB, this will run the data
-                           sequentially accumulating gradients over the batch size.
+        :param batch_size: Size of batches to use for certified training. The zonotopes of a batch are pushed through
+                           the model together.
         :param nb_epochs: Number of epochs to use for training.
         :param training_mode: `True` for model set to training mode and `'False` for model set to evaluation mode.
         :param scheduler: Learning rate scheduler to run at the start of every epoch.
@@ -263,27 +261,19 @@ class AdversarialTrainerCertifiedPytorch(Trainer):
 
                 # get the certified loss
                 x_cert, y_cert = shuffle(x_cert, y_cert)
-                for i, (sample, label) in enumerate(zip(x_cert, y_cert)):
+                x_cert_batch = x_cert[:batch_size]
 
-                    self.set_forward_mode("concrete")
-                    concrete_pred = self.classifier.model.forward(np.expand_dims(sample, axis=0))
-                    concrete_pred = torch.argmax(concrete_pred)
-
-                    if self.classifier.concrete_to_zonotope is None:
-                        if sys.version_info >= (3, 8):
-                            eps_bound = np.eye(math.prod(self.classifier.input_shape)) * bound
-                        else:
-                            eps_bound = np.eye(reduce(lambda x, y: x * y, self.classifier.input_shape)) * bound
+                self.set_forward_mode("concrete")
+                concrete_preds = self.classifier.model.forward(x_cert_batch)
+                concrete_preds = torch.argmax(concrete_preds, dim=1).cpu().numpy()
 
-                        processed_sample, eps_bound = self.classifier.pre_process(cent=np.copy(sample), eps=eps_bound)
-                        processed_sample = np.expand_dims(processed_sample, axis=0)
-                    else:
-                        processed_sample, eps_bound = self.classifier.concrete_to_zonotope(sample, bound)
+                # Perform prediction
+                self.set_forward_mode("abstract")
+                bias_batch, eps_batch, mask_batch = self.classifier.forward_zonotopes(x_cert_batch, bound)
 
-                    # Perform prediction
-                    self.set_forward_mode("abstract")
-                    bias, eps = self.classifier.model.forward(eps=eps_bound, cent=processed_sample)
-                    bias = torch.unsqueeze(bias, dim=0)
+                for i, (concrete_pred, label) in enumerate(zip(concrete_preds, y_cert[:batch_size])):
+                    bias = bias_batch[i : i + 1]
+                    eps = eps_batch[i][mask_batch[i]]
 
                     if certification_loss == "max_logit_loss":
                         certified_loss += self.classifier.max_logit_loss(
@@ -311,9 +301,6 @@ class AdversarialTrainerCertifiedPytorch(Trainer):
                     if all(certification_results) and concrete_pred == label:
                         samples_certified += 1
 
-                    if (i + 1) % batch_size == 0 and i > 0:
-                        break
-
                 certified_loss /= batch_size
                 epoch_cert_loss.append(certified_loss)
                 epoch_cert_acc.append(np.sum(samples_certified) / batch_size)
@@ -53,6 +53,18 @@ class ZonoDenseLayer(torch.nn.Module):
         x = self.zonotope_add(x)
         return x
 
+    def batch_forward(self, x: "torch.Tensor", mask: "torch.Tensor") -> Tuple["torch.Tensor", "torch.Tensor"]:
+        """
+        Abstract forward pass through the dense layer for a batch of zonotopes.
+
+        :param x: input zonotopes of shape `(batch_size, 1 + nb_error_terms, in_features)`.
+        :param mask: mask of the valid error terms of each zonotope of shape `(batch_size, nb_error_terms)`.
+        :return: zonotopes after being pushed through the dense layer and the unchanged mask.
+        """
+        x = self.zonotope_matmul(x)
+        x = torch.cat((x[:, :1] + self.bias, x[:, 1:]), dim=1)
+        return x, mask
+
     def concrete_forward(self, x: "torch.Tensor") -> "torch.Tensor":
         """
         Concrete forward pass through the dense layer.
@@ -168,15 +180,30 @@ class ZonoBounds:
         :param eps: the zonotope error terms.
         :return: adjusted center and eps values if center + eps exceed 1 or if center - eps falls below 0.
         """
-        for j in range(cent.shape[1]):
-            # we assume that each feature will start with just a single eps term
-            row_of_eps = np.argmax(eps[:, j])
-            if cent[:, j] < eps[row_of_eps, j]:
-                eps[row_of_eps, j] = (eps[row_of_eps, j] + cent[:, j]) / 2
-                cent[:, j] = eps[row_of_eps, j]
-            elif cent[:, j] > (1 - eps[row_of_eps, j]):
-                eps[row_of_eps, j] = (eps[row_of_eps, j] + (1 - cent[:, j])) / 2
-                cent[:, j] = 1 - eps[row_of_eps, j]
+        # we assume that each feature will start with just a single eps term
+        rows_of_eps = np.argmax(eps, axis=0)
+        cols_of_eps = np.arange(cent.shape[1])
+        cent[0], eps[rows_of_eps, cols_of_eps] = ZonoBounds.adjust_diagonal_to_within_bounds(
+            cent[0], eps[rows_of_eps, cols_of_eps]
+        )
+
+        return cent, eps
+
+    @staticmethod
+    def adjust_diagonal_to_within_bounds(cent: np.ndarray, eps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Version of `adjust_to_within_bounds` for zonotopes whose error terms are only given by their diagonal, i.e. each
+        feature has a single eps term which is zero for all other features.
+
+        :param cent: original feature values between 0 - 1
+        :param eps: the size of the eps term of each feature, of the same shape as `cent`.
+        :return: adjusted center and eps values if center + eps exceed 1 or if center - eps falls below 0.
+        """
+        eps_cent = eps.astype(cent.dtype)
+        below = cent < eps_cent
+        above = np.logical_and(np.logical_not(below), cent > (1 - eps).astype(cent.dtype))
+        eps = np.where(below, (eps_cent + cent) / 2, np.where(above, (eps_cent + (1 - cent)) / 2, eps))
+        cent = np.where(below, eps, np.where(above, 1 - eps, cent)).astype(cent.dtype)
 
         return cent, eps
 
@@ -202,6 +229,45 @@ class ZonoBounds:
 
         return cent, eps
 
+    @staticmethod
+    def merge_error_terms(
+        x: "torch.Tensor", mask: "torch.Tensor", max_error_terms: int
+    ) -> Tuple["torch.Tensor", "torch.Tensor"]:
+        """
+        Bound the number of error terms of a batch of zonotopes. The error terms with the largest magnitude are kept and
+        the remaining ones are over-approximated by their box, which adds one new error term per feature. Hence, at
+        most `max(max_error_terms, nb_features)` error terms remain. The zonotopes are left unchanged if merging would
+        not reduce their number of error terms.
+
+        :param x: zonotopes of shape `(batch_size, 1 + nb_error_terms, ...)`.
+        :param mask: mask of the valid error terms of each zonotope of shape `(batch_size, nb_error_terms)`.
+        :param max_error_terms: the maximum number of error terms to keep.
+        :return: zonotopes with merged error terms and the mask of their valid error terms.
+        """
+        nb_samples = x.shape[0]
+        eps = x[:, 1:].reshape((nb_samples, x.shape[1] - 1, int(np.prod(x.shape[2:]))))
+        nb_error_terms, nb_features = eps.shape[1:]
+        nb_keep = max(max_error_terms - nb_features, 0)
+        if nb_error_terms <= max_error_terms or nb_keep + nb_features >= nb_error_terms:
+            return x, mask
+
+        magnitude = torch.sum(torch.abs(eps), dim=2).masked_fill(torch.logical_not(mask), -1)
+        idx_keep = torch.topk(magnitude, nb_keep, dim=1).indices
+        to_merge = torch.ones_like(mask).scatter(1, idx_keep, False)
+        radius = torch.sum(torch.abs(eps) * torch.unsqueeze(to_merge, dim=2), dim=1)
+
+        # one new error term per feature with a non-zero radius in any of the zonotopes
+        features = torch.nonzero(torch.any(radius > 0, dim=0), as_tuple=True)[0]
+        box = torch.zeros((nb_samples, len(features), nb_features), dtype=x.dtype, device=x.device)
+        box[:, torch.arange(len(features), device=x.device), features] = radius[:, features]
+
+        eps_keep = torch.gather(eps, 1, torch.unsqueeze(idx_keep, dim=2).expand(-1, -1, nb_features))
+        eps = torch.cat((eps_keep, box), dim=1)
+        mask = torch.cat((torch.gather(mask, 1, idx_keep), radius[:, features] > 0), dim=1)
+        x = torch.cat((x[:, :1], eps.reshape((nb_samples, eps.shape[1]) + x.shape[2:])), dim=1)
+
+        return x, mask
+
 
 class ZonoConv(torch.nn.Module):
     """
@@ -248,6 +314,23 @@ class ZonoConv(torch.nn.Module):
         x = self.zonotope_add(x)
         return x
 
+    def batch_forward(self, x: "torch.Tensor", mask: "torch.Tensor") -> Tuple["torch.Tensor", "torch.Tensor"]:
+        """
+        Abstract forward pass through the convolutional layer for a batch of zonotopes.
+
+        :param x: input zonotopes of shape `(batch_size, 1 + nb_error_terms, channels, height, width)`.
+        :param mask: mask of the valid error terms of each zonotope of shape `(batch_size, nb_error_terms)`.
+        :return: zonotopes after being pushed through the convolutional layer and the unchanged mask.
+        """
+        zonotope_shape = x.shape[:2]
+        x = self.conv(x.reshape((-1,) + x.shape[2:]))
+        x = x.reshape(zonotope_shape + x.shape[1:])
+        # unsqueeze to broadcast along height and width
+        bias = torch.unsqueeze(self.bias, dim=-1)
+        bias = torch.unsqueeze(bias, dim=-1)
+        x = torch.cat((x[:, :1] + bias, x[:, 1:]), dim=1)
+        return x, mask
+
     def concrete_forward(self, x: "torch.Tensor") -> "torch.Tensor":
         """
         Concrete forward pass through the convolutional layer
@@ -261,6 +344,45 @@ class ZonoConv(torch.nn.Module):
         bias = torch.unsqueeze(bias, dim=0)
         return x + bias
 
+    def unit_responses(self, input_shape: Tuple[int, ...]) -> "torch.Tensor":
+        """
+        Compute the response of the convolution, without bias, to a unit value at each single input feature. The
+        responses are assembled from the kernel weights one kernel position at a time, without convolving an identity
+        matrix of shape `(nb_features, nb_features)`.
+
+        :param input_shape: Shape of the input `(channels, height, width)`.
+        :return: Responses of shape `(nb_features, out_channels, out_height, out_width)`, in the order of the flattened
+                 input features.
+        """
+        weight = self.conv.weight
+        in_channels, height, width = input_shape
+        out_channels, _, kernel_height, kernel_width = weight.shape
+        (stride_h, stride_w), (pad_h, pad_w) = self.conv.stride, self.conv.padding
+        dilation_h, dilation_w = self.conv.dilation
+        out_height = (height + 2 * pad_h - dilation_h * (kernel_height - 1) - 1) // stride_h + 1
+        out_width = (width + 2 * pad_w - dilation_w * (kernel_width - 1) - 1) // stride_w + 1
+
+        responses = weight.new_zeros((in_channels, height, width, out_channels, out_height, out_width))
+        rows_out = torch.arange(out_height, device=weight.device)
+        cols_out = torch.arange(out_width, device=weight.device)
+        for i_kernel in range(kernel_height):
+            # input row read by the kernel row `i_kernel` for each output row
+            rows_in = rows_out * stride_h - pad_h + i_kernel * dilation_h
+            is_row = (rows_in >= 0) & (rows_in < height)
+            for j_kernel in range(kernel_width):
+                cols_in = cols_out * stride_w - pad_w + j_kernel * dilation_w
+                is_col = (cols_in >= 0) & (cols_in < width)
+                responses[
+                    :,
+                    rows_in[is_row][:, None],
+                    cols_in[is_col][None, :],
+                    :,
+                    rows_out[is_row][:, None],
+                    cols_out[is_col][None, :],
+                ] = torch.transpose(weight[:, :, i_kernel, j_kernel], 0, 1)
+
+        return responses.reshape((in_channels * height * width, out_channels, out_height, out_width))
+
     def zonotope_add(self, x: "torch.Tensor") -> "torch.Tensor":
         """
         Modification required compared to the normal torch conv layers.
@@ -309,6 +431,16 @@ class ZonoReLU(torch.nn.Module, ZonoBounds):
         """
         return self.concrete_activation(x)
 
+    def batch_forward(self, x: "torch.Tensor", mask: "torch.Tensor") -> Tuple["torch.Tensor", "torch.Tensor"]:
+        """
+        Forward pass through the relu for a batch of zonotopes.
+
+        :param x: input zonotopes of shape `(batch_size, 1 + nb_error_terms, ...)`.
+        :param mask: mask of the valid error terms of each zonotope of shape `(batch_size, nb_error_terms)`.
+        :return: zonotopes after application of the relu and the mask of their valid error terms.
+        """
+        return self.zonotope_relu_batch(x, mask)
+
     def zonotope_relu(self, x: "torch.Tensor") -> "torch.Tensor":
         """
         Implements "DeepZ" for relu.
@@ -316,58 +448,56 @@ class ZonoReLU(torch.nn.Module, ZonoBounds):
         :param x: input zonotope
         :return x: zonotope after application of the relu. May have grown in dimension if crossing relus occur.
         """
+        mask = torch.ones((1, x.shape[0] - 1), dtype=torch.bool, device=x.device)
+        x, _ = self.zonotope_relu_batch(torch.unsqueeze(x, dim=0), mask)
+        return x[0]
+
+    def zonotope_relu_batch(self, x: "torch.Tensor", mask: "torch.Tensor") -> Tuple["torch.Tensor", "torch.Tensor"]:
+        """
+        Implements "DeepZ" for relu on a batch of zonotopes. The new error terms of crossing relus are appended to all
+        zonotopes, padded with zero error terms for the zonotopes with fewer crossing relus.
+
+        :param x: input zonotopes of shape `(batch_size, 1 + nb_error_terms, ...)`.
+        :param mask: mask of the valid error terms of each zonotope of shape `(batch_size, nb_error_terms)`.
+        :return: zonotopes after application of the relu and the mask of their valid error terms. May have grown in
+                 dimension if crossing relus occur.
+        """
         original_shape = x.shape
-        x = x.reshape((x.shape[0], -1))
+        x = x.reshape((x.shape[0], x.shape[1], -1))
 
         # compute lower bounds
-        lbs = self.compute_lb(cent=x[0], eps=x[1:])
+        lbs = self.compute_lb(cent=x[:, 0], eps=x[:, 1:].transpose(0, 1))
 
         # compute upper bounds
-        ubs = self.compute_ub(cent=x[0], eps=x[1:])
+        ubs = self.compute_ub(cent=x[:, 0], eps=x[:, 1:].transpose(0, 1))
         slope = torch.div(ubs, (ubs - lbs))
 
-        index_cent_vector = torch.zeros((x.shape[0], 1)).to(self.device)
-        index_cent_vector[0] = 1
-
         cent_update = (slope * lbs) / 2
-        cent_update = torch.tile(cent_update, (x.shape[0], 1))
 
         # find where we have a crossing relu
         bools = torch.logical_and(lbs < 0, ubs > 0)
 
         # where we have a crossing relu, update the terms. Else, do not change input.
-        x = torch.where(bools, x * slope - cent_update * index_cent_vector, x)
+        x_crossing = x * torch.unsqueeze(slope, dim=1)
+        x_crossing = torch.cat((x_crossing[:, :1] - torch.unsqueeze(cent_update, dim=1), x_crossing[:, 1:]), dim=1)
+        x = torch.where(torch.unsqueeze(bools, dim=1), x_crossing, x)
 
         # where we have a feature that is < 0, relu always returns 0
         zeros = torch.from_numpy(np.zeros(1).astype("float32")).to(self.device)
-        x = torch.where(ubs < 0, zeros, x)
-
-        # vector containing all the (potential) new error terms. We will need to 1) select the ones
-        # we need and zero out the rest. And 2) Shape the errors into the correct matrix.
-        new_vector = torch.unsqueeze(-1 * ((slope * lbs) / 2), dim=0)
-
-        # indexing_matrix is the shape we want the error terms to be.
-        indexing_matrix = np.zeros((torch.sum(bools), x.shape[1]))
+        x = torch.where(torch.unsqueeze(ubs < 0, dim=1), zeros, x)
 
-        tmp_crossing_relu = torch.logical_and(lbs < 0, ubs > 0)
-        crossing_relu_index = 0
-        for j, crossing_relu in enumerate(tmp_crossing_relu):
-            if crossing_relu:
-                indexing_matrix[crossing_relu_index, j] = 1
-                crossing_relu_index += 1
+        # the new error terms of each zonotope, one per crossing relu in the order of the features
+        nb_crossing = torch.sum(bools, dim=1)
+        max_nb_crossing = int(torch.max(nb_crossing)) if x.shape[0] > 0 else 0
+        idx_zonotope, idx_feature = torch.nonzero(bools, as_tuple=True)
+        idx_error_term = (torch.cumsum(bools, dim=1) - 1)[idx_zonotope, idx_feature]
 
-        indexing_matrix_tensor = torch.from_numpy(indexing_matrix.astype("float32")).to(self.device)
+        new_error_terms = torch.zeros((x.shape[0], max_nb_crossing, x.shape[2]), dtype=x.dtype, device=x.device)
+        new_error_terms[idx_zonotope, idx_error_term, idx_feature] = -cent_update[idx_zonotope, idx_feature]
+        new_mask = torch.arange(max_nb_crossing, device=x.device) < torch.unsqueeze(nb_crossing, dim=1)
 
-        # where there is a crossing ReLU, select the error terms, else zero the vector.
-        new_vector = torch.where(bools, new_vector, zeros)
-        # tile the error vector to the correct shape and select the terms we want.
-        # crossing_relu_index at this point is also the same as the number of crossing relus
-        new_vector = torch.tile(new_vector, (crossing_relu_index, 1))
-        new_vector = new_vector * indexing_matrix_tensor
+        # add the new error terms to the zonotopes.
+        x = torch.cat((x, new_error_terms), dim=1)
+        mask = torch.cat((mask, new_mask), dim=1)
 
-        # add the new error terms to the zonotope.
-        x = torch.cat((x, new_vector))
-
-        if len(original_shape) > 2:
-            x = x.reshape((-1, original_shape[1], original_shape[2], original_shape[3]))
-        return x
+        return x.reshape((x.shape[0], -1) + original_shape[2:]), mask
@@ -24,9 +24,7 @@ This module implements DeepZ proposed in Fast and Effective Robustness Certifica
 from typing import List, Optional, Tuple, Union, Callable, Any, TYPE_CHECKING
 
 import logging
-import math
 import warnings
-import sys
 
 import numpy as np
 import torch
@@ -34,14 +32,13 @@ import torch
 from art.estimators.certification.deep_z.deep_z import ZonoConv, ZonoDenseLayer, ZonoReLU, ZonoBounds
 from art.estimators.classification.pytorch import PyTorchClassifier
 
-if sys.version_info < (3, 8):
-    from functools import reduce
-
 if TYPE_CHECKING:
     from art.utils import CLIP_VALUES_TYPE, PREPROCESSING_TYPE
     from art.defences.preprocessor import Preprocessor
     from art.defences.postprocessor import Postprocessor
 
+logger = logging.getLogger(__name__)
+
 
 class ConvertedModel(torch.nn.Module):
     """
@@ -150,6 +147,88 @@ class ConvertedModel(torch.nn.Module):
             x = op(x)
         return x[0, :], x[1:, :]
 
+    def abstract_forward_batch(
+        self,
+        cent: np.ndarray,
+        eps: np.ndarray,
+        eps_mask: Optional[np.ndarray] = None,
+        max_error_terms: Optional[int] = None,
+    ) -> Tuple["torch.Tensor", "torch.Tensor", "torch.Tensor"]:
+        """
+        Do the forward pass through the NN for a batch of zonotopes. Zonotopes with fewer error terms than others are
+        padded with zero error terms, `eps_mask` and the returned mask indicate which error terms are valid.
+
+        :param cent: The datapoints, representing the zonotope centers, of shape `(batch_size,) + input_shape`.
+        :param eps: Error terms of the zonotopes of shape `(batch_size, nb_error_terms) + input_shape`.
+        :param eps_mask: Mask of the valid error terms of shape `(batch_size, nb_error_terms)`. All error terms are
+                         valid if `None`.
+        :param max_error_terms: If set, error terms are merged after each ReLU to keep at most
+                                `max(max_error_terms, nb_features)` error terms, see `ZonoBounds.merge_error_terms`.
+        :return: A tuple of the zonotope center vectors, the zonotope error terms and the mask of the valid error terms.
+        """
+        x = np.concatenate([np.expand_dims(cent, axis=1), eps], axis=1)
+        x = torch.from_numpy(x.astype("float32")).to(self.device)
+        if eps_mask is None:
+            mask = torch.ones(x.shape[:1] + (x.shape[1] - 1,), dtype=torch.bool, device=self.device)
+        else:
+            mask = torch.from_numpy(eps_mask.astype(bool)).to(self.device)
+
+        return self._batch_forward_ops(x, mask, first_op=0, max_error_terms=max_error_terms)
+
+    def abstract_forward_diagonal(
+        self, cent: np.ndarray, eps: np.ndarray, max_error_terms: Optional[int] = None
+    ) -> Tuple["torch.Tensor", "torch.Tensor", "torch.Tensor"]:
+        """
+        Do the forward pass through the NN for a batch of zonotopes with one error term per input feature, given by
+        the diagonal of the error terms only. The error terms of a leading dense or convolutional layer are computed
+        directly from the diagonal, without materialising the identity-shaped input error terms of every zonotope.
+
+        :param cent: The datapoints, representing the zonotope centers, of shape `(batch_size,) + input_shape`.
+        :param eps: The size of the error term of each input feature, of the same shape as `cent`.
+        :param max_error_terms: If set, error terms are merged after each ReLU to keep at most
+                                `max(max_error_terms, nb_features)` error terms, see `ZonoBounds.merge_error_terms`.
+        :return: A tuple of the zonotope center vectors, the zonotope error terms and the mask of the valid error terms.
+        """
+        nb_samples = cent.shape[0]
+        nb_features = int(np.prod(cent.shape[1:]))
+        x_cent = torch.from_numpy(cent.astype("float32")).to(self.device)
+        x_eps = torch.from_numpy(eps.reshape((nb_samples, nb_features, 1)).astype("float32")).to(self.device)
+        mask = torch.ones((nb_samples, nb_features), dtype=torch.bool, device=self.device)
+
+        first_op = self.ops[0]
+        if isinstance(first_op, ZonoDenseLayer) and x_cent.ndim == 2:
+            # the error term of feature j only touches row j of the weight matrix
+            x_cent = first_op.concrete_forward(x_cent)
+            x_eps = x_eps * torch.unsqueeze(torch.transpose(first_op.weight, 0, 1), dim=0)
+        elif isinstance(first_op, ZonoConv):
+            # the response of the convolution to each input feature is shared by all zonotopes in the batch
+            x_cent = first_op.concrete_forward(x_cent)
+            basis = first_op.unit_responses(cent.shape[1:])
+            x_eps = x_eps.reshape((nb_samples, nb_features, 1, 1, 1)) * torch.unsqueeze(basis, dim=0)
+        else:
+            x_eps = torch.diag_embed(x_eps[:, :, 0]).reshape((nb_samples, nb_features) + cent.shape[1:])
+            first_op = None
+
+        x = torch.cat((torch.unsqueeze(x_cent, dim=1), x_eps), dim=1)
+        return self._batch_forward_ops(x, mask, first_op=0 if first_op is None else 1, max_error_terms=max_error_terms)
+
+    def _batch_forward_ops(
+        self, x: "torch.Tensor", mask: "torch.Tensor", first_op: int, max_error_terms: Optional[int]
+    ) -> Tuple["torch.Tensor", "torch.Tensor", "torch.Tensor"]:
+        """
+        Push a batch of zonotopes through the abstract operations, starting at op number `first_op`.
+        """
+        for op_num, op in enumerate(self.ops):
+            if op_num < first_op:
+                continue
+            # as reshapes are not modules we infer when the reshape from convolutional to dense occurs
+            if self.reshape_op_num == op_num:
+                x = x.reshape((x.shape[0], x.shape[1], -1))
+            x, mask = op.batch_forward(x, mask)
+            if max_error_terms is not None and isinstance(op, ZonoReLU):
+                x, mask = op.merge_error_terms(x, mask, max_error_terms)
+        return x[:, 0], x[:, 1:], mask
+
     def concrete_forward(self, in_x: Union[np.ndarray, "torch.Tensor"]) -> "torch.Tensor":
         """
         Do the forward pass using the concrete operations
@@ -280,43 +359,114 @@ class PytorchDeepZ(PyTorchClassifier, ZonoBounds):
         )
 
     def predict_zonotopes(  # pylint: disable=W0613
-        self, cent: np.ndarray, bound: float, training_mode: bool = True, **kwargs
+        self,
+        cent: np.ndarray,
+        bound: float,
+        training_mode: bool = True,
+        batch_size: int = 32,
+        max_error_terms: Optional[int] = None,
+        **kwargs,
     ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
         """
+        Push the zonotopes around the datapoints through the neural network, `batch_size` zonotopes at a time.
+
+        Larger batches are faster, but memory grows linearly with `batch_size`: every zonotope of a batch holds one
+        error term per input feature plus one per crossing ReLU of the zonotope in the batch with the most crossing
+        ReLUs, each as large as the layer it passes through. `max_error_terms` bounds this growth at the cost of
+        looser bounds.
 
         :param cent: The datapoint, representing the zonotope center.
         :param bound: The perturbation range for the zonotope.
         :param training_mode: `True` for model set to training mode and `'False` for model set to evaluation mode.
+        :param batch_size: Number of zonotopes pushed through the neural network together.
+        :param max_error_terms: If set, the error terms of smallest magnitude are merged into one new error term per
+                                feature after each ReLU so that at most `max(max_error_terms, nb_features)` error terms
+                                remain. The default `None` keeps all error terms.
         :param kwargs: Dictionary of framework-specific arguments. This parameter is not currently supported for PyTorch
                and providing it takes no effect.
+        :return: Lists with the zonotope center of shape `(1, nb_classes)` and the zonotope error terms of shape
+                 `(nb_error_terms, nb_classes)` of each datapoint.
         """
+        if batch_size < 1:
+            raise ValueError("The batch size must be a positive integer.")
+        if max_error_terms is not None and max_error_terms < 1:
+            raise ValueError("The maximum number of error terms must be a positive integer.")
+
         x_preprocessed, _ = self._apply_preprocessing(cent, y=None, fit=False)
         self._model.train(mode=training_mode)
 
         bias_results_list = []
         eps_results_list = []
 
-        for sample in x_preprocessed:
-            if self.concrete_to_zonotope is None:
-                if sys.version_info >= (3, 8):
-                    eps_bound = np.eye(math.prod(self.input_shape)) * bound
-                else:
-                    eps_bound = np.eye(reduce(lambda x, y: x * y, self.input_shape)) * bound
+        for begin in range(0, x_preprocessed.shape[0], batch_size):
+            bias, eps, mask = self.forward_zonotopes(
+                x_preprocessed[begin : begin + batch_size], bound, max_error_terms=max_error_terms
+            )
+            logger.info(
+                "Zonotope batch %d: %d zonotopes with up to %d error terms, %.1f MB of output error terms.",
+                begin // batch_size,
+                eps.shape[0],
+                eps.shape[1],
+                eps.element_size() * eps.nelement() / 1e6,
+            )
 
-                processed_sample, eps_bound = self.pre_process(cent=np.copy(sample), eps=eps_bound)
-                processed_sample = np.expand_dims(processed_sample, axis=0)
-            else:
-                processed_sample, eps_bound = self.concrete_to_zonotope(sample, bound)
-
-            bias, eps = self.model.forward(eps=eps_bound, cent=processed_sample)
             bias = bias.detach().cpu().numpy()
             eps = eps.detach().cpu().numpy()
+            mask = mask.cpu().numpy()
 
-            bias_results_list.append(np.expand_dims(bias, axis=0))
-            eps_results_list.append(eps)
+            for i_sample in range(bias.shape[0]):
+                bias_results_list.append(bias[i_sample : i_sample + 1])
+                eps_results_list.append(eps[i_sample][mask[i_sample]])
 
         return bias_results_list, eps_results_list
 
+    def forward_zonotopes(
+        self, x: np.ndarray, bound: float, max_error_terms: Optional[int] = None
+    ) -> Tuple["torch.Tensor", "torch.Tensor", "torch.Tensor"]:
+        """
+        Push the zonotopes around a batch of preprocessed datapoints through the neural network, keeping the gradients.
+
+        :param x: Batch of preprocessed datapoints.
+        :param bound: The perturbation range for the zonotope.
+        :param max_error_terms: If set, the error terms of smallest magnitude are merged into one new error term per
+                                feature after each ReLU so that at most `max(max_error_terms, nb_features)` error terms
+                                remain.
+        :return: A tuple of the zonotope centers of shape `(batch_size, nb_classes)`, the zonotope error terms of shape
+                 `(batch_size, nb_error_terms, nb_classes)` padded with zero error terms and the mask of the valid
+                 error terms of shape `(batch_size, nb_error_terms)`.
+        """
+        if self.concrete_to_zonotope is None:
+            if type(self).pre_process is ZonoBounds.pre_process:
+                # the default pre-processing only adjusts the single error term of each feature, the diagonal suffices
+                cent, eps = self.adjust_diagonal_to_within_bounds(np.copy(x), np.full(x.shape, bound))
+                return self.model.abstract_forward_diagonal(cent, eps, max_error_terms=max_error_terms)
+
+            # a custom pre-processing receives the error terms of each datapoint as a full matrix
+            zonotopes = [self.pre_process(cent=np.copy(sample), eps=np.eye(sample.size) * bound) for sample in x]
+        else:
+            zonotopes = [self.concrete_to_zonotope(sample, bound) for sample in x]  # type: ignore
+
+        cent, eps, eps_mask = self._stack_zonotopes(zonotopes)
+        return self.model.abstract_forward_batch(cent, eps, eps_mask=eps_mask, max_error_terms=max_error_terms)
+
+    def _stack_zonotopes(
+        self, zonotopes: List[Tuple[np.ndarray, np.ndarray]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Stack the zonotopes of a batch of datapoints and pad the error terms to the largest number of error terms.
+
+        :param zonotopes: The zonotope center and error terms of each datapoint.
+        :return: The zonotope centers, the padded error terms and the mask of the valid error terms.
+        """
+        nb_error_terms = [np.reshape(eps, (-1,) + self.input_shape).shape[0] for _, eps in zonotopes]
+        cent = np.stack([np.reshape(sample, self.input_shape) for sample, _ in zonotopes])
+        eps = np.zeros((len(zonotopes), max(nb_error_terms)) + self.input_shape, dtype=np.float32)
+        mask = np.zeros((len(zonotopes), max(nb_error_terms)), dtype=bool)
+        for i_sample, (_, eps_sample) in enumerate(zonotopes):
+            eps[i_sample, : nb_error_terms[i_sample]] = np.reshape(eps_sample, (-1,) + self.input_shape)
+            mask[i_sample, : nb_error_terms[i_sample]] = True
+        return cent, eps, mask
+
     def certify(self, cent: np.ndarray, eps: np.ndarray, prediction: int) -> bool:
         """
         Check if the datapoint has been certifiably classified.
@@ -125,6 +125,27 @@ class PyTorchRandomizedSmoothing(RandomizedSmoothingMixin, PyTorchClassifier):
         x = x.astype(ART_NUMPY_DTYPE)
         return PyTorchClassifier.predict(self, x=x, batch_size=batch_size, training_mode=training_mode, **kwargs)
 
+    def _predict_noisy_classes(self, x: np.ndarray, batch_size: int) -> np.ndarray:
+        import torch
+
+        if self.postprocessing_defences or not self.all_framework_preprocessing:
+            # The noisy samples have to be processed as numpy arrays
+            return super()._predict_noisy_classes(x, batch_size=batch_size)
+
+        # Set model mode
+        self._model.train(mode=False)
+
+        # Generate the noise on the device of the model
+        with torch.no_grad():
+            x_noisy = torch.from_numpy(x.astype(ART_NUMPY_DTYPE)).to(self._device)
+            x_noisy = x_noisy + self.scale * torch.randn_like(x_noisy)
+            x_preprocessed, _ = self._apply_preprocessing(x_noisy, y=None, fit=False)
+            model_outputs = self._model(x_preprocessed)[-1]
+
+        if model_outputs.dim() == 1:
+            return np.zeros(x.shape[0], dtype=int)
+        return torch.argmax(model_outputs, dim=-1).cpu().numpy()
+
     def _fit_classifier(self, x: np.ndarray, y: np.ndarray, batch_size: int, nb_epochs: int, **kwargs) -> None:
         x = x.astype(ART_NUMPY_DTYPE)
         return PyTorchClassifier.fit(self, x, y, batch_size=batch_size, nb_epochs=nb_epochs, **kwargs)
@@ -24,7 +24,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from abc import ABC
 import logging
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 import numpy as np
 from scipy.stats import norm
@@ -93,26 +93,26 @@ class RandomizedSmoothingMixin(ABC):
             is_abstain = True
 
         logger.info("Applying randomized smoothing.")
+
+        # get class counts
+        counts = self._batch_prediction_counts(x, batch_size=batch_size)
+
         n_abstained = 0
-        prediction = []
-        for x_i in tqdm(x, desc="Randomized smoothing"):
-            # get class counts
-            counts_pred = self._prediction_counts(x_i, batch_size=batch_size)
+        prediction = np.zeros(counts.shape)
+        for i, counts_pred in enumerate(counts):
             top = counts_pred.argsort()[::-1]
             count1 = np.max(counts_pred)
             count2 = counts_pred[top[1]]
 
             # predict or abstain
-            smooth_prediction = np.zeros(counts_pred.shape)
             if (not is_abstain) or (binom_test(count1, count1 + count2, p=0.5) <= self.alpha):
-                smooth_prediction[np.argmax(counts_pred)] = 1
+                prediction[i, np.argmax(counts_pred)] = 1
             elif is_abstain:
                 n_abstained += 1
 
-            prediction.append(smooth_prediction)
         if n_abstained > 0:
             logger.info("%s prediction(s) abstained.", n_abstained)
-        return np.array(prediction)
+        return prediction
 
     def _fit_classifier(self, x: np.ndarray, y: np.ndarray, batch_size: int, nb_epochs: int, **kwargs) -> None:
         """
@@ -151,77 +151,79 @@ class RandomizedSmoothingMixin(ABC):
         :param batch_size: Batch size.
         :return: Tuple of length 2 of the selected class and certified radius.
         """
-        prediction = []
-        radius = []
-
-        for x_i in x:
+        # get sample predictions for classification
+        counts_pred = self._batch_prediction_counts(x, n=self.sample_size, batch_size=batch_size)
+        class_select = np.argmax(counts_pred, axis=1)
 
-            # get sample prediction for classification
-            counts_pred = self._prediction_counts(x_i, n=self.sample_size, batch_size=batch_size)
-            class_select = int(np.argmax(counts_pred))
+        # get sample predictions for certification
+        counts_est = self._batch_prediction_counts(x, n=n, batch_size=batch_size)
+        count_class = counts_est[np.arange(len(x)), class_select]
 
-            # get sample prediction for certification
-            counts_est = self._prediction_counts(x_i, n=n, batch_size=batch_size)
-            count_class = counts_est[class_select]
+        prob_class = self._lower_confidence_bound(count_class, n)
 
-            prob_class = self._lower_confidence_bound(count_class, n)
+        abstain = prob_class < 0.5
+        prediction = np.where(abstain, -1, class_select)
+        radius = np.zeros(len(x))
+        radius[~abstain] = self.scale * norm.ppf(prob_class[~abstain])
 
-            if prob_class < 0.5:
-                prediction.append(-1)
-                radius.append(0.0)
-            else:
-                prediction.append(class_select)
-                radius.append(self.scale * norm.ppf(prob_class))
+        return prediction, radius
 
-        return np.array(prediction), np.array(radius)
-
-    def _noisy_samples(self, x: np.ndarray, n: Optional[int] = None) -> np.ndarray:
+    def _prediction_counts(self, x: np.ndarray, n: Optional[int] = None, batch_size: int = 128) -> np.ndarray:
         """
-        Adds Gaussian noise to `x` to generate samples. Optionally augments `y` similarly.
+        Makes predictions and then converts probability distribution to counts.
 
         :param x: Sample input with shape as expected by the model.
         :param n: Number of noisy samples to create.
-        :return: Array of samples of the same shape as `x`.
+        :param batch_size: Size of batches.
+        :return: Array of counts with length equal to number of columns of `x`.
+        """
+        return self._batch_prediction_counts(np.expand_dims(x, axis=0), n=n, batch_size=batch_size)[0]
+
+    def _batch_prediction_counts(self, x: np.ndarray, n: Optional[int] = None, batch_size: int = 128) -> np.ndarray:
+        """
+        Makes predictions of noisy samples of a batch of inputs and then converts them to counts. The noisy samples are
+        generated and predicted in batches of `batch_size` samples, which can contain noisy samples of several inputs,
+        instead of creating all `n` samples of an input at once.
+
+        :param x: Sample inputs with shape as expected by the model.
+        :param n: Number of noisy samples to create per input.
+        :param batch_size: Size of batches.
+        :return: Array of counts of shape `(nb_inputs, nb_classes)`.
         """
         # set default value to sample_size
         if n is None:
             n = self.sample_size
 
-        # augment x
-        x = np.expand_dims(x, axis=0)
-        x = np.repeat(x, n, axis=0)
-        x = x + np.random.normal(scale=self.scale, size=x.shape).astype(ART_NUMPY_DTYPE)
+        counts = np.zeros((x.shape[0], self.nb_classes))  # type: ignore
+        nb_noisy_samples = x.shape[0] * n
 
-        return x
+        for begin in tqdm(range(0, nb_noisy_samples, batch_size), desc="Randomized smoothing"):
+            # inputs of the noisy samples of this batch
+            idx_inputs = np.arange(begin, min(begin + batch_size, nb_noisy_samples)) // n
+            idx_classes = self._predict_noisy_classes(x[idx_inputs], batch_size=batch_size)
+            np.add.at(counts, (idx_inputs, idx_classes), 1)
 
-    def _prediction_counts(self, x: np.ndarray, n: Optional[int] = None, batch_size: int = 128) -> np.ndarray:
+        return counts
+
+    def _predict_noisy_classes(self, x: np.ndarray, batch_size: int) -> np.ndarray:
         """
-        Makes predictions and then converts probability distribution to counts.
+        Adds Gaussian noise to each sample of `x` and predicts the classes of the noisy samples.
 
-        :param x: Sample input with shape as expected by the model.
-        :param n: Number of noisy samples to create.
+        :param x: Sample inputs with shape as expected by the model.
         :param batch_size: Size of batches.
-        :return: Array of counts with length equal to number of columns of `x`.
+        :return: Array of the predicted class indices of shape `(nb_inputs,)`.
         """
-        # sample and predict
-        x_new = self._noisy_samples(x, n=n)
-        predictions = self._predict_classifier(x=x_new, batch_size=batch_size, training_mode=False)
-
-        # convert to binary predictions
-        idx = np.argmax(predictions, axis=-1)
-        pred = np.zeros(predictions.shape)
-        pred[np.arange(pred.shape[0]), idx] = 1
-
-        # get class counts
-        counts = np.sum(pred, axis=0)
-
-        return counts
+        x_noisy = x + np.random.normal(scale=self.scale, size=x.shape).astype(ART_NUMPY_DTYPE)
+        predictions = self._predict_classifier(x=x_noisy, batch_size=batch_size, training_mode=False)
+        return np.argmax(predictions, axis=-1)
 
-    def _lower_confidence_bound(self, n_class_samples: int, n_total_samples: int) -> float:
+    def _lower_confidence_bound(
+        self, n_class_samples: Union[int, np.ndarray], n_total_samples: int
+    ) -> Union[float, np.ndarray]:
         """
         Uses Clopper-Pearson method to return a (1-alpha) lower confidence bound on bernoulli proportion
 
-        :param n_class_samples: Number of samples of a specific class.
+        :param n_class_samples: Number of samples of a specific class, or an array of numbers of samples.
         :param n_total_samples: Number of samples for certification.
         :return: Lower bound on the binomial proportion w.p. (1-alpha) over samples.
         """
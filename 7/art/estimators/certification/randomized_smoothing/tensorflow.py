@@ -29,6 +29,7 @@ import warnings
 from tqdm import tqdm
 import numpy as np
 
+from art.config import ART_NUMPY_DTYPE
 from art.estimators.classification.tensorflow import TensorFlowV2Classifier
 from art.estimators.certification.randomized_smoothing.randomized_smoothing import RandomizedSmoothingMixin
 from art.utils import check_and_transform_label_format
@@ -119,6 +120,22 @@ class TensorFlowV2RandomizedSmoothing(RandomizedSmoothingMixin, TensorFlowV2Clas
     def _predict_classifier(self, x: np.ndarray, batch_size: int, training_mode: bool, **kwargs) -> np.ndarray:
         return TensorFlowV2Classifier.predict(self, x=x, batch_size=batch_size, training_mode=training_mode, **kwargs)
 
+    def _predict_noisy_classes(self, x: np.ndarray, batch_size: int) -> np.ndarray:
+        import tensorflow as tf
+
+        if self.postprocessing_defences or not self.all_framework_preprocessing:
+            # The noisy samples have to be processed as numpy arrays
+            return super()._predict_noisy_classes(x, batch_size=batch_size)
+
+        # Generate the noise on the device of the model
+        x_noisy = tf.convert_to_tensor(x.astype(ART_NUMPY_DTYPE))
+        x_noisy = x_noisy + tf.random.normal(shape=tf.shape(x_noisy), stddev=self.scale, dtype=x_noisy.dtype)
+        model_outputs = self._predict_framework(x_noisy, training_mode=False)
+
+        if len(model_outputs.shape) == 1:
+            return np.zeros(x.shape[0], dtype=int)
+        return tf.argmax(model_outputs, axis=-1).numpy()
+
     def _fit_classifier(self, x: np.ndarray, y: np.ndarray, batch_size: int, nb_epochs: int, **kwargs) -> None:
         return TensorFlowV2Classifier.fit(self, x, y, batch_size=batch_size, nb_epochs=nb_epochs, **kwargs)
 
@@ -20,14 +20,19 @@ This module implements the classifier `BlackBoxClassifier` for black-box classif
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from collections import OrderedDict
+from contextlib import contextmanager
 from functools import total_ordering
 import logging
-from typing import Callable, List, Optional, Union, Tuple, TYPE_CHECKING
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional, Union, Tuple, TYPE_CHECKING
 
 import numpy as np
 
+from art.config import ART_NUMPY_DTYPE
+
 from art.estimators.estimator import BaseEstimator, NeuralNetworkMixin
 from art.estimators.classification.classifier import ClassifierMixin, Classifier
+from art.utils import deprecated
 
 if TYPE_CHECKING:
     from art.utils import CLIP_VALUES_TYPE, PREPROCESSING_TYPE
@@ -37,7 +42,35 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
+class QueryCacheMixin:
+    """
+    Mixin giving access to the `QueryCache` in front of the prediction function of a black-box classifier.
+    """
+
+    _query_cache: "QueryCache"
+
+    @property
+    def query_cache(self) -> "QueryCache":
+        """
+        Return the cache in front of the prediction function, holding the hit-rate and query statistics.
+
+        :return: The query cache.
+        """
+        return self._query_cache
+
+    def query_budget(self, name: str, max_queries: Optional[int] = None) -> ContextManager[None]:
+        """
+        Context manager accounting all queries to the prediction function to `name`, e.g. the name of an attack.
+
+        :param name: Name of the budget.
+        :param max_queries: Maximum number of queries of the budget. A `ValueError` is raised before the budget would
+                            be exceeded.
+        :return: Context manager.
+        """
+        return self._query_cache.budget(name, max_queries)
+
+
+class BlackBoxClassifier(QueryCacheMixin, ClassifierMixin, BaseEstimator):
     """
     Class for black-box classifiers.
     """
@@ -54,6 +87,9 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         postprocessing_defences: Union["Postprocessor", List["Postprocessor"], None] = None,
         preprocessing: "PREPROCESSING_TYPE" = (0.0, 1.0),
         fuzzy_float_compare: bool = False,
+        cache_size: int = 0,
+        cache_policy: str = "lru",
+        cache_decimals: Optional[int] = None,
     ):
         """
         Create a `Classifier` instance for a black-box model.
@@ -75,6 +111,13 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         :param fuzzy_float_compare: If `predict_fn` is a tuple mapping inputs to labels, and this is True, looking up
                inputs in the table will be done using `numpy.isclose`. Only set to True if really needed, since this
                severely affects performance.
+        :param cache_size: Maximum number of predictions kept in a cache in front of `predict_fn`, which assumes that
+               `predict_fn` is deterministic. With the cache, identical inputs within a batch are queried only once.
+               Set to 0 to disable the cache.
+        :param cache_policy: Eviction policy of the cache, either least recently used (`lru`) or least frequently used
+               (`lfu`).
+        :param cache_decimals: If not None, inputs are rounded to this number of decimals to compute their cache key,
+               such that near-identical inputs share the same cached prediction.
         """
         super().__init__(
             model=None,
@@ -89,6 +132,7 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
             self._predict_fn = _make_lookup_predict_fn(predict_fn, fuzzy_float_compare)
         self._input_shape = input_shape
         self.nb_classes = nb_classes
+        self._query_cache = QueryCache(max_size=cache_size, policy=cache_policy, decimals=cache_decimals)
 
     @property
     def input_shape(self) -> Tuple[int, ...]:
@@ -117,19 +161,11 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         :param batch_size: Size of batches.
         :return: Array of predictions of shape `(nb_inputs, nb_classes)`.
         """
-        from art.config import ART_NUMPY_DTYPE
-
         # Apply preprocessing
         x_preprocessed, _ = self._apply_preprocessing(x, y=None, fit=False)
 
-        # Run predictions with batching
-        predictions = np.zeros((x_preprocessed.shape[0], self.nb_classes), dtype=ART_NUMPY_DTYPE)
-        for batch_index in range(int(np.ceil(x_preprocessed.shape[0] / float(batch_size)))):
-            begin, end = (
-                batch_index * batch_size,
-                min((batch_index + 1) * batch_size, x_preprocessed.shape[0]),
-            )
-            predictions[begin:end] = self.predict_fn(x_preprocessed[begin:end])
+        # Run predictions with batching, answering repeated queries from the cache
+        predictions = self._query_cache.predict(self._predict_fn, x_preprocessed, batch_size, self.nb_classes)
 
         # Apply postprocessing
         predictions = self._apply_postprocessing(preds=predictions, fit=False)
@@ -161,7 +197,7 @@ class BlackBoxClassifier(ClassifierMixin, BaseEstimator):
         raise NotImplementedError
 
 
-class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseEstimator):
+class BlackBoxClassifierNeuralNetwork(QueryCacheMixin, NeuralNetworkMixin, ClassifierMixin, BaseEstimator):
     """
     Class for black-box neural network classifiers.
     """
@@ -184,6 +220,9 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
         postprocessing_defences: Union["Postprocessor", List["Postprocessor"], None] = None,
         preprocessing: "PREPROCESSING_TYPE" = (0, 1),
         fuzzy_float_compare: bool = False,
+        cache_size: int = 0,
+        cache_policy: str = "lru",
+        cache_decimals: Optional[int] = None,
     ):
         """
         Create a `Classifier` instance for a black-box model.
@@ -206,6 +245,13 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
         :param fuzzy_float_compare: If `predict_fn` is a tuple mapping inputs to labels, and this is True, looking up
                inputs in the table will be done using `numpy.isclose`. Only set to True if really needed, since this
                severely affects performance.
+        :param cache_size: Maximum number of predictions kept in a cache in front of `predict_fn`, which assumes that
+               `predict_fn` is deterministic. With the cache, identical inputs within a batch are queried only once.
+               Set to 0 to disable the cache.
+        :param cache_policy: Eviction policy of the cache, either least recently used (`lru`) or least frequently used
+               (`lfu`).
+        :param cache_decimals: If not None, inputs are rounded to this number of decimals to compute their cache key,
+               such that near-identical inputs share the same cached prediction.
         """
         super().__init__(
             model=None,
@@ -222,6 +268,7 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
             self._predict_fn = _make_lookup_predict_fn(predict_fn, fuzzy_float_compare)
         self._input_shape = input_shape
         self.nb_classes = nb_classes
+        self._query_cache = QueryCache(max_size=cache_size, policy=cache_policy, decimals=cache_decimals)
         self._learning_phase = None
         self._layer_names = None
 
@@ -242,19 +289,11 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
         :param batch_size: Size of batches.
         :return: Array of predictions of shape `(nb_inputs, nb_classes)`.
         """
-        from art.config import ART_NUMPY_DTYPE
-
         # Apply preprocessing
         x_preprocessed, _ = self._apply_preprocessing(x, y=None, fit=False)
 
-        # Run predictions with batching
-        predictions = np.zeros((x_preprocessed.shape[0], self.nb_classes), dtype=ART_NUMPY_DTYPE)
-        for batch_index in range(int(np.ceil(x_preprocessed.shape[0] / float(batch_size)))):
-            begin, end = (
-                batch_index * batch_size,
-                min((batch_index + 1) * batch_size, x_preprocessed.shape[0]),
-            )
-            predictions[begin:end] = self._predict_fn(x_preprocessed[begin:end])
+        # Run predictions with batching, answering repeated queries from the cache
+        predictions = self._query_cache.predict(self._predict_fn, x_preprocessed, batch_size, self.nb_classes)
 
         # Apply postprocessing
         predictions = self._apply_postprocessing(preds=predictions, fit=False)
@@ -307,12 +346,223 @@ class BlackBoxClassifierNeuralNetwork(NeuralNetworkMixin, ClassifierMixin, BaseE
         raise NotImplementedError
 
 
+class QueryCache:
+    """
+    Bounded cache of the predictions of a black-box prediction function. The cache is keyed on the bytes of the inputs,
+    optionally rounded, and deduplicates identical inputs within a batch. It also collects hit-rate statistics and
+    accounts the queries against named query budgets.
+    """
+
+    def __init__(self, max_size: int = 0, policy: str = "lru", decimals: Optional[int] = None) -> None:
+        """
+        Create a cache of predictions.
+
+        :param max_size: Maximum number of cached predictions, 0 disables caching and deduplication.
+        :param policy: Eviction policy, either least recently used (`lru`) or least frequently used (`lfu`).
+        :param decimals: If not None, inputs are rounded to this number of decimals to compute their cache key.
+        """
+        if not isinstance(max_size, int) or max_size < 0:
+            raise ValueError("The cache size has to be a non-negative integer.")
+        if policy not in ["lru", "lfu"]:
+            raise ValueError('The cache policy has to be either "lru" or "lfu".')
+        if decimals is not None and not isinstance(decimals, int):
+            raise ValueError("The number of decimals has to be an integer or None.")
+
+        self.max_size = max_size
+        self.policy = policy
+        self.decimals = decimals
+
+        self.hits = 0
+        self.misses = 0
+        self.query_counts: Dict[str, int] = {}
+        self._budgets: List[Tuple[str, Optional[int]]] = []
+
+        self._entries: Dict[bytes, np.ndarray] = {}
+        # Recency order of the keys for `lru`, keys grouped by their number of accesses for `lfu`
+        self._recency: "OrderedDict[bytes, None]" = OrderedDict()
+        self._frequencies: Dict[bytes, int] = {}
+        self._frequency_keys: Dict[int, "OrderedDict[bytes, None]"] = {}
+        self._min_frequency = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Return the fraction of inputs answered without querying the prediction function.
+
+        :return: The hit rate.
+        """
+        nb_inputs = self.hits + self.misses
+        return self.hits / nb_inputs if nb_inputs > 0 else 0.0
+
+    def clear(self) -> None:
+        """
+        Remove all cached predictions and reset the statistics.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.query_counts = {}
+        self._entries = {}
+        self._recency = OrderedDict()
+        self._frequencies = {}
+        self._frequency_keys = {}
+        self._min_frequency = 0
+
+    @contextmanager
+    def budget(self, name: str, max_queries: Optional[int] = None) -> Iterator[None]:
+        """
+        Account all queries within the context to the budget `name`.
+
+        :param name: Name of the budget.
+        :param max_queries: Maximum number of queries of the budget.
+        """
+        if max_queries is not None and (not isinstance(max_queries, int) or max_queries < 0):
+            raise ValueError("The maximum number of queries has to be a non-negative integer or None.")
+
+        self.query_counts.setdefault(name, 0)
+        self._budgets.append((name, max_queries))
+        try:
+            yield
+        finally:
+            self._budgets.pop()
+
+    def predict(self, predict_fn: Callable, x: np.ndarray, batch_size: int, nb_classes: int) -> np.ndarray:
+        """
+        Predict inputs, querying `predict_fn` with batches of only the inputs that are not cached.
+
+        :param predict_fn: The prediction function.
+        :param x: Input samples.
+        :param batch_size: Size of the batches passed to `predict_fn`.
+        :param nb_classes: Number of prediction classes.
+        :return: Array of predictions of shape `(nb_inputs, nb_classes)`.
+        """
+        predictions = np.zeros((x.shape[0], nb_classes), dtype=ART_NUMPY_DTYPE)
+
+        if self.max_size == 0:
+            self._charge(x.shape[0])
+            for begin in range(0, x.shape[0], batch_size):
+                predictions[begin : begin + batch_size] = predict_fn(x[begin : begin + batch_size])
+            return predictions
+
+        # Resolve cached and repeated inputs, keeping the first index of each input to query
+        pending: Dict[bytes, List[int]] = {}
+        for i, key in enumerate(self._keys(x)):
+            cached = self._get(key)
+            if cached is not None:
+                predictions[i] = cached
+                self.hits += 1
+            elif key in pending:
+                pending[key].append(i)
+                self.hits += 1
+            else:
+                pending[key] = [i]
+
+        query_idx = np.array([indices[0] for indices in pending.values()], dtype=int)
+        self._charge(query_idx.size)
+
+        for begin in range(0, query_idx.size, batch_size):
+            batch_idx = query_idx[begin : begin + batch_size]
+            predictions[batch_idx] = predict_fn(x[batch_idx])
+
+        for key, indices in pending.items():
+            predictions[indices[1:]] = predictions[indices[0]]
+            self._put(key, predictions[indices[0]].copy())
+
+        return predictions
+
+    def _keys(self, x: np.ndarray) -> List[bytes]:
+        """
+        Compute the cache key of each input.
+
+        :param x: Input samples.
+        :return: The keys.
+        """
+        x_flat = np.ascontiguousarray(x.reshape((x.shape[0], -1)))
+        if self.decimals is not None:
+            # Adding 0.0 turns negative zeros into zeros to give them the same key
+            x_flat = np.round(x_flat.astype(np.float64), self.decimals) + 0.0
+        return [row.tobytes() for row in x_flat]
+
+    def _charge(self, nb_queries: int) -> None:
+        """
+        Account queries to the statistics and all active budgets.
+
+        :param nb_queries: Number of queries to the prediction function.
+        """
+        for name, max_queries in self._budgets:
+            if max_queries is not None and self.query_counts[name] + nb_queries > max_queries:
+                raise ValueError(f"The query budget of {max_queries} queries of `{name}` is exhausted.")
+
+        self.misses += nb_queries
+        for name, _ in self._budgets:
+            self.query_counts[name] += nb_queries
+
+    def _get(self, key: bytes) -> Optional[np.ndarray]:
+        """
+        Look up a key and update its recency or frequency.
+
+        :param key: The key.
+        :return: The cached prediction or None.
+        """
+        if key not in self._entries:
+            return None
+
+        if self.policy == "lru":
+            self._recency.move_to_end(key)
+        else:
+            frequency = self._frequencies[key]
+            del self._frequency_keys[frequency][key]
+            if not self._frequency_keys[frequency]:
+                del self._frequency_keys[frequency]
+                if self._min_frequency == frequency:
+                    self._min_frequency = frequency + 1
+            self._frequencies[key] = frequency + 1
+            self._frequency_keys.setdefault(frequency + 1, OrderedDict())[key] = None
+
+        return self._entries[key]
+
+    def _put(self, key: bytes, value: np.ndarray) -> None:
+        """
+        Add a new prediction to the cache, evicting another one if the cache is full.
+
+        :param key: The key.
+        :param value: The prediction.
+        """
+        if self.max_size == 0:
+            return
+
+        if len(self._entries) >= self.max_size:
+            if self.policy == "lru":
+                evicted, _ = self._recency.popitem(last=False)
+            else:
+                evicted, _ = self._frequency_keys[self._min_frequency].popitem(last=False)
+                if not self._frequency_keys[self._min_frequency]:
+                    del self._frequency_keys[self._min_frequency]
+                del self._frequencies[evicted]
+            del self._entries[evicted]
+
+        self._entries[key] = value
+        if self.policy == "lru":
+            self._recency[key] = None
+        else:
+            self._frequencies[key] = 1
+            self._frequency_keys.setdefault(1, OrderedDict())[key] = None
+            self._min_frequency = 1
+
+
 @total_ordering
 class FuzzyMapping:
     """
     Class for a sample/label pair to be used in a `SortedList`.
     """
 
+    @deprecated(
+        "1.16.0",
+        reason="`BlackBoxClassifier` and `BlackBoxRegressor` look up existing predictions without `FuzzyMapping`.",
+        replaced_by="art.estimators.classification.blackbox.QueryCache",
+    )
     def __init__(self, key: np.ndarray, value=None):
         """
         Create an instance of a key/value to pair to be used in a `SortedList`.
@@ -343,51 +593,67 @@ class FuzzyMapping:
 
 def _make_lookup_predict_fn(existing_predictions: Tuple[np.ndarray, np.ndarray], fuzzy_float_compare: bool) -> Callable:
     """
-    Makes a predict_fn callback based on a table of existing predictions.
+    Makes a predict_fn callback based on a table of existing predictions. Whole batches are looked up at once, exact
+    matches by a binary search over the sorted bytes of the samples and fuzzy matches with a KD-tree.
 
     :param existing_predictions: Tuple of (samples, labels).
-    :param fuzzy_float_compare: Look up predictions using `np.isclose`, only set to True if really needed, since this
-                                severely affects performance.
+    :param fuzzy_float_compare: Look up predictions using `np.isclose`, only set to True if really needed.
     :return: Prediction function.
     """
 
     samples, labels = existing_predictions
+    labels = np.asarray(labels)
+    samples_flat = np.ascontiguousarray(np.asarray(samples).reshape((len(samples), -1)))
 
     if fuzzy_float_compare:
-        from sortedcontainers import SortedList
+        from scipy.spatial import cKDTree
 
-        # Construct a search-tree of the predictions, using fuzzy float comparison
-        sorted_predictions = SortedList([FuzzyMapping(key, value) for key, value in zip(samples, labels)])
+        samples_flat = samples_flat.astype(np.float64)
+        tree = cKDTree(samples_flat)
+
+        # Upper bound of the tolerance of `np.isclose` for any sample
+        max_tolerance = np.nextafter(1e-08 + 1e-05 * np.max(np.abs(samples_flat), initial=0.0), np.inf)
 
         def fuzzy_predict_fn(batch):
-            predictions = []
-            for row in batch:
-                try:
-                    match_idx = sorted_predictions.index(FuzzyMapping(row))
-                except ValueError as err:  # pragma: no cover
-                    raise ValueError("No existing prediction for queried input") from err
+            batch_flat = np.asarray(batch, dtype=np.float64).reshape((len(batch), -1))
+
+            # The nearest sample in the maximum norm is a match if any sample is close to the queried input
+            _, match_idx = tree.query(batch_flat, k=1, p=np.inf, distance_upper_bound=max_tolerance)
+            is_found = match_idx < len(samples_flat)
+            is_found[is_found] = np.all(np.isclose(batch_flat[is_found], samples_flat[match_idx[is_found]]), axis=1)
 
-                predictions.append(sorted_predictions[match_idx].value)
+            # Fall back to all samples in the tolerance for inputs whose nearest sample is not close
+            for i in np.where(~is_found)[0]:
+                for candidate_idx in tree.query_ball_point(batch_flat[i], r=max_tolerance, p=np.inf):
+                    if np.all(np.isclose(batch_flat[i], samples_flat[candidate_idx])):
+                        match_idx[i] = candidate_idx
+                        is_found[i] = True
+                        break
+                else:  # pragma: no cover
+                    raise ValueError("No existing prediction for queried input")
 
-            return np.array(predictions)
+            return labels[match_idx]
 
         return fuzzy_predict_fn
 
-    # Construct a dictionary to map from samples to predictions. We use the bytes of the `ndarray` as the key,
-    # because the `ndarray` itself is not hashable
-    mapping = {}
-    for x, y in zip(samples, labels):
-        mapping[x.tobytes()] = y
+    # View every sample as a single opaque element of its bytes, since the `ndarray` rows are not hashable, and sort
+    # them once to join the queried inputs with a binary search
+    row_dtype = np.dtype((np.void, samples_flat.dtype.itemsize * samples_flat.shape[1]))
+    sample_rows = samples_flat.view(row_dtype).ravel()
+    sort_idx = np.argsort(sample_rows, kind="stable")
+    sorted_rows = sample_rows[sort_idx]
 
     def predict_fn(batch):
-        predictions = []
-        for row in batch:
-            row_bytes = row.tobytes()
-            if row.tobytes() not in mapping:
-                raise ValueError("No existing prediction for queried input")
+        batch_flat = np.ascontiguousarray(np.asarray(batch).reshape((len(batch), -1)))
+        if batch_flat.dtype.itemsize * batch_flat.shape[1] != row_dtype.itemsize:
+            raise ValueError("No existing prediction for queried input")
 
-            predictions.append(mapping[row_bytes])
+        batch_rows = batch_flat.view(row_dtype).ravel()
+        # Take the last of equal samples, which is the latest recorded prediction of an input
+        match_idx = np.maximum(np.searchsorted(sorted_rows, batch_rows, side="right") - 1, 0)
+        if len(sorted_rows) == 0 or np.any(sorted_rows[match_idx] != batch_rows):
+            raise ValueError("No existing prediction for queried input")
 
-        return np.array(predictions)
+        return labels[sort_idx[match_idx]]
 
     return predict_fn
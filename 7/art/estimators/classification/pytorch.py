@@ -202,6 +202,36 @@ class PyTorchClassifier(ClassGradientsMixin, ClassifierMixin, PyTorchEstimator):
         """
         return self._device
 
+    @property
+    def supports_tensor_inputs(self) -> bool:
+        """
+        Return `True` if all preprocessing operations are implemented in PyTorch, in which case `loss_gradient` accepts
+        and returns tensors on the device of the classifier.
+
+        :return: Whether the classifier supports tensor inputs.
+        """
+        return self.all_framework_preprocessing
+
+    def to_tensor(self, x: np.ndarray) -> "torch.Tensor":
+        """
+        Convert an array to a tensor of type `ART_NUMPY_DTYPE` on the device of the classifier.
+
+        :param x: Array.
+        :return: Tensor with the values of `x`.
+        """
+        import torch
+
+        return torch.from_numpy(np.asarray(x, dtype=config.ART_NUMPY_DTYPE)).to(self._device)
+
+    def to_numpy(self, x: "torch.Tensor") -> np.ndarray:
+        """
+        Convert a tensor back to an array on the host.
+
+        :param x: Tensor.
+        :return: Array with the values of `x`.
+        """
+        return x.detach().cpu().numpy()
+
     @property
     def model(self) -> "torch.nn.Module":
         return self._model._model  # pylint: disable=W0212
@@ -568,7 +598,12 @@ class PyTorchClassifier(ClassGradientsMixin, ClassifierMixin, PyTorchEstimator):
         self.model.apply(weight_reset)
 
     def class_gradient(  # pylint: disable=W0221
-        self, x: np.ndarray, label: Union[int, List[int], None] = None, training_mode: bool = False, **kwargs
+        self,
+        x: np.ndarray,
+        label: Union[int, List[int], np.ndarray, None] = None,
+        training_mode: bool = False,
+        top_k: Optional[int] = None,
+        **kwargs,
     ) -> np.ndarray:
         """
         Compute per-class derivatives w.r.t. `x`.
@@ -577,16 +612,21 @@ class PyTorchClassifier(ClassGradientsMixin, ClassifierMixin, PyTorchEstimator):
         :param label: Index of a specific per-class derivative. If an integer is provided, the gradient of that class
                       output is computed for all samples. If multiple values as provided, the first dimension should
                       match the batch size of `x`, and each value will be used as target for its corresponding sample in
-                      `x`. If `None`, then gradients for all classes will be computed for each sample.
+                      `x`. An array of shape `(nb_samples, k)` provides a set of `k` classes for each sample. If `None`,
+                      then gradients for all classes will be computed for each sample.
         :param training_mode: `True` for model set to training mode and `'False` for model set to evaluation mode.
                               Note on RNN-like models: Backpropagation through RNN modules in eval mode raises
                               RuntimeError due to cudnn issues and require training mode, i.e. RuntimeError: cudnn RNN
                               backward can only be called in training mode. Therefore, if the model is an RNN type we
                               always use training mode but freeze batch-norm and dropout layers if
                               `training_mode=False.`
+        :param top_k: Compute the gradients of the `top_k` classes with the highest outputs of each sample, in
+                      decreasing order of the outputs, instead of the classes given by `label`. The model outputs of
+                      the same forward pass select the classes.
         :return: Array of gradients of input features w.r.t. each class in the form
                  `(batch_size, nb_classes, input_shape)` when computing for all classes, otherwise shape becomes
-                 `(batch_size, 1, input_shape)` when `label` parameter is specified.
+                 `(batch_size, 1, input_shape)` when `label` parameter is specified, or `(batch_size, k, input_shape)`
+                 for sets of `k` classes per sample and `top_k=k`.
         """
         import torch
 
@@ -610,13 +650,19 @@ class PyTorchClassifier(ClassGradientsMixin, ClassifierMixin, PyTorchEstimator):
             or (isinstance(label, (int, np.integer)) and label in range(self.nb_classes))
             or (
                 isinstance(label, np.ndarray)
-                and len(label.shape) == 1
+                and len(label.shape) in [1, 2]
                 and (label < self.nb_classes).all()
                 and label.shape[0] == x.shape[0]
             )
         ):
             raise ValueError(f"Label {label} is out of range.")  # pragma: no cover
 
+        if top_k is not None:
+            if label is not None:
+                raise ValueError("The arguments `label` and `top_k` cannot be used together.")
+            if not (isinstance(top_k, (int, np.integer)) and 1 <= top_k <= self.nb_classes):
+                raise ValueError(f"The number of classes `top_k` has to be in the range [1, {self.nb_classes}].")
+
         # Apply preprocessing
         if self.all_framework_preprocessing:
             x_grad = torch.from_numpy(x).to(self._device)
@@ -642,67 +688,89 @@ class PyTorchClassifier(ClassGradientsMixin, ClassifierMixin, PyTorchEstimator):
         # Set where to get gradient from
         preds = model_outputs[-1]
 
-        # Compute the gradient
-        grads_list = []
-
-        def save_grad():
-            def hook(grad):
-                grads_list.append(grad.cpu().numpy().copy())
-                grad.data.zero_()
+        if len(preds.shape) == 1:
+            preds = preds[:, None]
 
-            return hook
-
-        input_grad.register_hook(save_grad())
+        if top_k is not None:
+            label = np.argsort(-preds.detach().cpu().numpy(), axis=1, kind="stable")[:, :top_k]
 
-        self._model.zero_grad()
         if label is None:
-            if len(preds.shape) == 1 or preds.shape[1] == 1:
-                num_outputs = 1
-            else:
-                num_outputs = self.nb_classes
+            # Vector-Jacobian products for all outputs at once, the Jacobian stays on the device until complete
+            num_outputs = preds.shape[1] if preds.shape[1] == 1 else self.nb_classes
+            grads_t = self._vector_jacobian_products(preds, input_grad, np.arange(num_outputs))
+            grads_t = torch.swapaxes(grads_t, 0, 1)
 
-            for i in range(num_outputs):
-                torch.autograd.backward(
-                    preds[:, i],
-                    torch.tensor([1.0] * len(preds[:, 0])).to(self._device),
-                    retain_graph=True,
-                )
+        elif isinstance(label, (int, np.integer)):
+            grads_t = self._vector_jacobian_products(preds, input_grad, np.array([label]))
+            grads_t = torch.swapaxes(grads_t, 0, 1)
 
-            grads = np.swapaxes(np.array(grads_list), 0, 1)
+        elif not training_mode:
+            # Samples are independent in evaluation mode, a single backward pass computes the gradient of each sample
+            # w.r.t. its own label, one pass per label of the sets of classes
+            label = np.reshape(label, (label.shape[0], -1))
+            grads_t = self._vector_jacobian_products(preds, input_grad, label.T)
+            grads_t = torch.swapaxes(grads_t, 0, 1)
 
-        elif isinstance(label, (int, np.integer)):
-            torch.autograd.backward(
-                preds[:, label],
-                torch.tensor([1.0] * len(preds[:, 0])).to(self._device),
-                retain_graph=True,
-            )
-            grads = np.swapaxes(np.array(grads_list), 0, 1)
         else:
-            unique_label = list(np.unique(label))
-            for i in unique_label:
-                torch.autograd.backward(
-                    preds[:, i],
-                    torch.tensor([1.0] * len(preds[:, 0])).to(self._device),
-                    retain_graph=True,
-                )
+            label = np.reshape(label, (label.shape[0], -1))
+            unique_label = np.unique(label)
+            grads_t = self._vector_jacobian_products(preds, input_grad, unique_label)
+            lst = torch.from_numpy(np.searchsorted(unique_label, label)).to(grads_t.device)
+            grads_t = grads_t[lst, torch.arange(grads_t.shape[1], device=grads_t.device)[:, None]]
 
-            grads = np.swapaxes(np.array(grads_list), 0, 1)
-            lst = [unique_label.index(i) for i in label]
-            grads = grads[np.arange(len(grads)), lst]
-
-            grads = grads[None, ...]
-            grads = np.swapaxes(np.array(grads), 0, 1)
+        grads = grads_t.cpu().numpy()
 
         if not self.all_framework_preprocessing:
             grads = self._apply_preprocessing_gradient(x, grads)
 
         return grads
 
+    @staticmethod
+    def _vector_jacobian_products(
+        preds: "torch.Tensor", input_grad: "torch.Tensor", labels: np.ndarray
+    ) -> "torch.Tensor":
+        """
+        Compute the gradients of the outputs `labels` w.r.t. `input_grad` with a batch of vector-Jacobian products.
+
+        :param preds: Model outputs of shape `(nb_samples, nb_outputs)`.
+        :param input_grad: Tensor w.r.t. which the gradients are computed.
+        :param labels: Indices of the outputs of shape `(nb_products,)` shared by all samples, or of shape
+                       `(nb_products, nb_samples)` with one output per sample for each product.
+        :return: Tensor of gradients of shape `(len(labels), nb_samples, input_shape)`.
+        """
+        import torch
+
+        label_t = torch.from_numpy(labels).to(preds.device)
+        if label_t.ndim == 1:
+            label_t = label_t[:, None]
+        grad_outputs = torch.zeros((len(labels),) + tuple(preds.shape), dtype=preds.dtype, device=preds.device)
+        grad_outputs[
+            torch.arange(len(labels), device=preds.device)[:, None],
+            torch.arange(preds.shape[0], device=preds.device)[None, :],
+            label_t,
+        ] = 1.0
+
+        if len(labels) > 1:
+            try:
+                return torch.autograd.grad(
+                    preds, input_grad, grad_outputs=grad_outputs, retain_graph=True, is_grads_batched=True
+                )[0]
+            except (RuntimeError, TypeError):  # pragma: no cover
+                # Fall back to one backward pass per output for models without batching rules or older PyTorch
+                logger.debug("Batched vector-Jacobian products failed, computing one output at a time.")
+
+        grads_list = [
+            torch.autograd.grad(preds, input_grad, grad_outputs=grad_outputs[i], retain_graph=True)[0]
+            for i in range(len(labels))
+        ]
+        return torch.stack(grads_list)
+
     def compute_loss(  # type: ignore # pylint: disable=W0221
         self,
         x: Union[np.ndarray, "torch.Tensor"],
         y: Union[np.ndarray, "torch.Tensor"],
         reduction: str = "none",
+        batch_size: Optional[int] = None,
         **kwargs,
     ) -> Union[np.ndarray, "torch.Tensor"]:
         """
@@ -715,6 +783,10 @@ class PyTorchClassifier(ClassGradientsMixin, ClassifierMixin, PyTorchEstimator):
                    'none': no reduction will be applied
                    'mean': the sum of the output will be divided by the number of elements in the output,
                    'sum': the output will be summed.
+        :param batch_size: Size of batches passed through the model. If `None`, all samples are processed in a single
+                           batch. For NumPy inputs the forward passes run without building the autograd graph. Losses
+                           with class weights normalise their `mean` reduction by the sum of the weights of all samples
+                           and are always computed in a single batch for `reduction='mean'`.
         :return: Array of losses of the same shape as `x`.
         """
         import torch
@@ -738,19 +810,65 @@ class PyTorchClassifier(ClassGradientsMixin, ClassifierMixin, PyTorchEstimator):
             # Convert the labels to Tensors
             labels_t = torch.from_numpy(y_preprocessed).to(self._device)
 
-        # Compute the loss and return
-        model_outputs = self._model(inputs_t)
+        if batch_size is None or batch_size >= inputs_t.shape[0] or (reduction == "mean" and self._is_weighted_loss()):
+            # Compute the loss and return
+            model_outputs = self._model(inputs_t)
+            prev_reduction = self._loss.reduction
+
+            # Return individual loss values
+            self._loss.reduction = reduction
+            loss = self._loss(model_outputs[-1], labels_t)
+            self._loss.reduction = prev_reduction
+
+            if isinstance(x, torch.Tensor):
+                return loss
+
+            return loss.detach().cpu().numpy()
+
+        # Compute the individual losses batch by batch and reduce them afterwards
         prev_reduction = self._loss.reduction
+        self._loss.reduction = "none"
+
+        losses: Optional[Union[np.ndarray, "torch.Tensor"]] = None
+        losses_list = []
+        num_batch = int(np.ceil(inputs_t.shape[0] / float(batch_size)))
+        for m in range(num_batch):
+            # Batch indexes
+            begin, end = (
+                m * batch_size,
+                min((m + 1) * batch_size, inputs_t.shape[0]),
+            )
+
+            if isinstance(x, torch.Tensor):
+                model_outputs = self._model(inputs_t[begin:end])
+                losses_list.append(self._loss(model_outputs[-1], labels_t[begin:end]))
+            else:
+                with torch.no_grad():
+                    model_outputs = self._model(inputs_t[begin:end])
+                    loss_batch = self._loss(model_outputs[-1], labels_t[begin:end]).cpu().numpy()
+                if losses is None:
+                    losses = np.zeros((inputs_t.shape[0],) + loss_batch.shape[1:], dtype=loss_batch.dtype)
+                losses[begin:end] = loss_batch
 
-        # Return individual loss values
-        self._loss.reduction = reduction
-        loss = self._loss(model_outputs[-1], labels_t)
         self._loss.reduction = prev_reduction
 
         if isinstance(x, torch.Tensor):
-            return loss
+            losses = torch.cat(losses_list)
+
+        if reduction == "mean":
+            return losses.mean()  # type: ignore
+        if reduction == "sum":
+            return losses.sum()  # type: ignore
+        return losses  # type: ignore
+
+    def _is_weighted_loss(self) -> bool:
+        """
+        Check whether the loss function weights the samples, e.g. `CrossEntropyLoss` with class weights. The `mean`
+        reduction of such losses divides by the sum of the weights of the samples instead of their number.
 
-        return loss.detach().cpu().numpy()
+        :return: True if the loss has sample or class weights.
+        """
+        return getattr(self._loss, "weight", None) is not None
 
     def compute_losses(
         self,
@@ -777,6 +895,7 @@ class PyTorchClassifier(ClassGradientsMixin, ClassifierMixin, PyTorchEstimator):
         x: Union[np.ndarray, "torch.Tensor"],
         y: Union[np.ndarray, "torch.Tensor"],
         training_mode: bool = False,
+        batch_size: Optional[int] = None,
         **kwargs,
     ) -> Union[np.ndarray, "torch.Tensor"]:
         """
@@ -791,6 +910,11 @@ class PyTorchClassifier(ClassGradientsMixin, ClassifierMixin, PyTorchEstimator):
                               backward can only be called in training mode. Therefore, if the model is an RNN type we
                               always use training mode but freeze batch-norm and dropout layers if
                               `training_mode=False.`
+        :param batch_size: Size of batches for the forward and backward passes. If `None`, all samples are processed
+                           in a single batch. The gradients of each batch are rescaled for losses with `mean`
+                           reduction so that the result matches the gradients of the unbatched computation. This is
+                           only exact for plain means over the samples, losses with class weights and `mean` reduction
+                           are always computed in a single batch.
         :return: Array of gradients of the same shape as `x`.
         """
         import torch
@@ -813,55 +937,86 @@ class PyTorchClassifier(ClassGradientsMixin, ClassifierMixin, PyTorchEstimator):
         # Apply preprocessing
         if self.all_framework_preprocessing:
             if isinstance(x, torch.Tensor):
-                x_grad = x.clone().detach().requires_grad_(True)
+                x_t = x.clone().detach()
             else:
-                x_grad = torch.tensor(x).to(self._device)
-                x_grad.requires_grad = True
+                x_t = torch.tensor(x).to(self._device)
             if isinstance(y, torch.Tensor):
-                y_grad = y.clone().detach()
+                y_t = y.clone().detach()
             else:
-                y_grad = torch.tensor(y).to(self._device)
-            inputs_t, y_preprocessed = self._apply_preprocessing(x_grad, y=y_grad, fit=False, no_grad=False)
+                y_t = torch.tensor(y).to(self._device)
         elif isinstance(x, np.ndarray):
             x_preprocessed, y_preprocessed = self._apply_preprocessing(x, y=y, fit=False, no_grad=True)
-            x_grad = torch.from_numpy(x_preprocessed).to(self._device)
-            x_grad.requires_grad = True
-            inputs_t = x_grad
+
+            # Check label shape
+            y_preprocessed = self.reduce_labels(y_preprocessed)
+
+            x_t = torch.from_numpy(x_preprocessed).to(self._device)
+            if isinstance(y_preprocessed, np.ndarray):
+                y_t = torch.from_numpy(y_preprocessed).to(self._device)
+            else:
+                y_t = y_preprocessed
         else:
             raise NotImplementedError("Combination of inputs and preprocessing not supported.")
 
-        # Check label shape
-        y_preprocessed = self.reduce_labels(y_preprocessed)
+        # Losses averaged over a batch have to be rescaled to the share of the batch in all samples, which does not
+        # hold for weighted means
+        is_mean = getattr(self._loss, "reduction", "mean") == "mean"
 
-        if isinstance(y_preprocessed, np.ndarray):
-            labels_t = torch.from_numpy(y_preprocessed).to(self._device)
+        num_samples = x_t.shape[0]
+        if batch_size is None or batch_size >= num_samples or (is_mean and self._is_weighted_loss()):
+            batch_size = max(num_samples, 1)
+        num_batch = int(np.ceil(num_samples / float(batch_size)))
+        rescale = num_batch > 1 and is_mean
+
+        # Preallocate the gradients for all samples
+        if isinstance(x, torch.Tensor):
+            grads = torch.empty_like(x_t)
         else:
-            labels_t = y_preprocessed
+            grads = np.empty(tuple(x_t.shape), dtype=x_t.new_empty(0).cpu().numpy().dtype)
 
-        # Compute the gradient and return
-        model_outputs = self._model(inputs_t)
-        loss = self._loss(model_outputs[-1], labels_t)
+        for m in range(num_batch):
+            # Batch indexes
+            begin, end = (
+                m * batch_size,
+                min((m + 1) * batch_size, num_samples),
+            )
 
-        # Clean gradients
-        self._model.zero_grad()
+            x_grad = x_t[begin:end].clone().detach().requires_grad_(True)
 
-        # Compute gradients
-        if self._use_amp:  # pragma: no cover
-            from apex import amp  # pylint: disable=E0611
+            if self.all_framework_preprocessing:
+                inputs_t, y_preprocessed = self._apply_preprocessing(x_grad, y=y_t[begin:end], fit=False, no_grad=False)
+                labels_t = self.reduce_labels(y_preprocessed)
+            else:
+                inputs_t = x_grad
+                labels_t = y_t[begin:end]
 
-            with amp.scale_loss(loss, self._optimizer) as scaled_loss:
-                scaled_loss.backward()
+            # Compute the gradient and return
+            model_outputs = self._model(inputs_t)
+            loss = self._loss(model_outputs[-1], labels_t)
 
-        else:
-            loss.backward()
+            if rescale:
+                loss = loss * (end - begin) / num_samples
+
+            # Clean gradients
+            self._model.zero_grad()
+
+            # Compute gradients
+            if self._use_amp:  # pragma: no cover
+                from apex import amp  # pylint: disable=E0611
+
+                with amp.scale_loss(loss, self._optimizer) as scaled_loss:
+                    scaled_loss.backward()
+
+            else:
+                loss.backward()
+
+            if x_grad.grad is None:
+                raise ValueError("Gradient term in PyTorch model is `None`.")
 
-        if x_grad.grad is not None:
             if isinstance(x, torch.Tensor):
-                grads = x_grad.grad
+                grads[begin:end] = x_grad.grad
             else:
-                grads = x_grad.grad.cpu().numpy().copy()
-        else:
-            raise ValueError("Gradient term in PyTorch model is `None`.")
+                grads[begin:end] = x_grad.grad.cpu().numpy()
 
         if not self.all_framework_preprocessing:
             grads = self._apply_preprocessing_gradient(x, grads)
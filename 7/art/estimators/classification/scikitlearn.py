@@ -822,31 +822,23 @@ class ScikitlearnLogisticRegression(ClassGradientsMixin, LossGradientsMixin, Sci
         if self.nb_classes > 2:  # type: ignore
             w_weighted = np.matmul(y_pred, weights)
 
-        def _f_class_gradient(i_class, i_sample):
+        def _f_class_gradient(i_class: Union[int, np.ndarray]) -> np.ndarray:
+            # Gradients of the class `i_class`, or of the class of each sample if an array, for all samples
             if self.nb_classes == 2:
-                return (-1.0) ** (i_class + 1.0) * y_pred[i_sample, 0] * y_pred[i_sample, 1] * weights[0, :]
+                sign = np.reshape((-1.0) ** (np.asarray(i_class) + 1.0), (-1, 1))
+                return sign * (y_pred[:, 0] * y_pred[:, 1])[:, np.newaxis] * weights[0, :]
 
-            return weights[i_class, :] - w_weighted[i_sample, :]
+            return weights[i_class, :] - w_weighted
 
         if label is None:
             # Compute the gradients w.r.t. all classes
-            class_gradients = []
-
-            for i_class in range(self.nb_classes):  # type: ignore
-                class_gradient = np.zeros(x.shape)
-                for i_sample in range(nb_samples):
-                    class_gradient[i_sample, :] += _f_class_gradient(i_class, i_sample)
-                class_gradients.append(class_gradient)
-
-            gradients = np.swapaxes(np.array(class_gradients), 0, 1)
+            gradients = np.stack(
+                [_f_class_gradient(i_class) for i_class in range(self.nb_classes)], axis=1  # type: ignore
+            )
 
         elif isinstance(label, int):
             # Compute the gradients only w.r.t. the provided label
-            class_gradient = np.zeros(x.shape)
-            for i_sample in range(nb_samples):
-                class_gradient[i_sample, :] += _f_class_gradient(label, i_sample)
-
-            gradients = np.swapaxes(np.array([class_gradient]), 0, 1)
+            gradients = _f_class_gradient(label)[:, np.newaxis]
 
         elif (
             (isinstance(label, list) and len(label) == nb_samples)
@@ -854,21 +846,7 @@ class ScikitlearnLogisticRegression(ClassGradientsMixin, LossGradientsMixin, Sci
             and label.shape == (nb_samples,)
         ):
             # For each sample, compute the gradients w.r.t. the indicated target class (possibly distinct)
-            class_gradients = []
-            unique_labels = list(np.unique(label))
-
-            for unique_label in unique_labels:
-                class_gradient = np.zeros(x.shape)
-                for i_sample in range(nb_samples):
-                    # class_gradient[i_sample, :] += label[i_sample, unique_label] * (weights[unique_label, :]
-                    # - w_weighted[i_sample, :])
-                    class_gradient[i_sample, :] += _f_class_gradient(unique_label, i_sample)
-
-                class_gradients.append(class_gradient)
-
-            gradients = np.swapaxes(np.array(class_gradients), 0, 1)
-            lst = [unique_labels.index(i) for i in label]
-            gradients = np.expand_dims(gradients[np.arange(len(gradients)), lst], axis=1)
+            gradients = _f_class_gradient(np.asarray(label))[:, np.newaxis]
 
         else:
             raise TypeError("Unrecognized type for argument `label` with type " + str(type(label)))
@@ -1050,119 +1028,25 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
             if self.model.fit_status_:  # pragma: no cover
                 raise AssertionError("Model has not been fitted correctly.")
 
-            support_indices = [0] + list(np.cumsum(self.model.n_support_))
-
             if self.nb_classes == 2:
                 sign_multiplier = -1
             else:
                 sign_multiplier = 1
 
-            if label is None:
-                gradients = np.zeros(
-                    (
-                        x_preprocessed.shape[0],
-                        self.nb_classes,
-                        x_preprocessed.shape[1],
-                    )
-                )
+            sv_coefficients = self._get_class_sv_coefficients()
 
-                for i_label in range(self.nb_classes):  # type: ignore
-                    for i_sample in range(num_samples):
-                        for not_label in range(self.nb_classes):  # type: ignore
-                            if i_label != not_label:
-                                if not_label < i_label:
-                                    label_multiplier = -1
-                                else:
-                                    label_multiplier = 1
-
-                                for label_sv in range(
-                                    support_indices[i_label],
-                                    support_indices[i_label + 1],
-                                ):
-                                    alpha_i_k_y_i = self.model.dual_coef_[
-                                        not_label if not_label < i_label else not_label - 1,
-                                        label_sv,
-                                    ]
-                                    grad_kernel = self._get_kernel_gradient_sv(label_sv, x_preprocessed[i_sample])
-                                    gradients[i_sample, i_label] += label_multiplier * alpha_i_k_y_i * grad_kernel
-
-                                for not_label_sv in range(
-                                    support_indices[not_label],
-                                    support_indices[not_label + 1],
-                                ):
-                                    alpha_i_k_y_i = self.model.dual_coef_[
-                                        i_label if i_label < not_label else i_label - 1,
-                                        not_label_sv,
-                                    ]
-                                    grad_kernel = self._get_kernel_gradient_sv(not_label_sv, x_preprocessed[i_sample])
-                                    gradients[i_sample, i_label] += label_multiplier * alpha_i_k_y_i * grad_kernel
+            if label is None:
+                gradients = self._get_kernel_gradients(x_preprocessed, sv_coefficients[np.newaxis])
 
             elif isinstance(label, int):
-                gradients = np.zeros((x_preprocessed.shape[0], 1, x_preprocessed.shape[1]))
-
-                for i_sample in range(num_samples):
-                    for not_label in range(self.nb_classes):  # type: ignore
-                        if label != not_label:
-                            if not_label < label:
-                                label_multiplier = -1
-                            else:
-                                label_multiplier = 1
-
-                            for label_sv in range(support_indices[label], support_indices[label + 1]):
-                                alpha_i_k_y_i = self.model.dual_coef_[
-                                    not_label if not_label < label else not_label - 1,
-                                    label_sv,
-                                ]
-                                grad_kernel = self._get_kernel_gradient_sv(label_sv, x_preprocessed[i_sample])
-                                gradients[i_sample, 0] += label_multiplier * alpha_i_k_y_i * grad_kernel
-
-                            for not_label_sv in range(
-                                support_indices[not_label],
-                                support_indices[not_label + 1],
-                            ):
-                                alpha_i_k_y_i = self.model.dual_coef_[
-                                    label if label < not_label else label - 1,
-                                    not_label_sv,
-                                ]
-                                grad_kernel = self._get_kernel_gradient_sv(not_label_sv, x_preprocessed[i_sample])
-                                gradients[i_sample, 0] += label_multiplier * alpha_i_k_y_i * grad_kernel
+                gradients = self._get_kernel_gradients(x_preprocessed, sv_coefficients[np.newaxis, [label]])
 
             elif (
                 (isinstance(label, list) and len(label) == num_samples)
                 or isinstance(label, np.ndarray)
                 and label.shape == (num_samples,)
             ):
-                gradients = np.zeros((x_preprocessed.shape[0], 1, x_preprocessed.shape[1]))
-
-                for i_sample in range(num_samples):
-                    for not_label in range(self.nb_classes):  # type: ignore
-                        if label[i_sample] != not_label:
-                            if not_label < label[i_sample]:
-                                label_multiplier = -1
-                            else:
-                                label_multiplier = 1
-
-                            for label_sv in range(
-                                support_indices[label[i_sample]],
-                                support_indices[label[i_sample] + 1],
-                            ):
-                                alpha_i_k_y_i = self.model.dual_coef_[
-                                    not_label if not_label < label[i_sample] else not_label - 1,
-                                    label_sv,
-                                ]
-                                grad_kernel = self._get_kernel_gradient_sv(label_sv, x_preprocessed[i_sample])
-                                gradients[i_sample, 0] += label_multiplier * alpha_i_k_y_i * grad_kernel
-
-                            for not_label_sv in range(
-                                support_indices[not_label],
-                                support_indices[not_label + 1],
-                            ):
-                                alpha_i_k_y_i = self.model.dual_coef_[
-                                    label[i_sample] if label[i_sample] < not_label else label[i_sample] - 1,
-                                    not_label_sv,
-                                ]
-                                grad_kernel = self._get_kernel_gradient_sv(not_label_sv, x_preprocessed[i_sample])
-                                gradients[i_sample, 0] += label_multiplier * alpha_i_k_y_i * grad_kernel
+                gradients = self._get_kernel_gradients(x_preprocessed, sv_coefficients[np.asarray(label), np.newaxis])
 
             else:
                 raise TypeError("Unrecognized type for argument `label` with type " + str(type(label)))
@@ -1170,43 +1054,23 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
             gradients = self._apply_preprocessing_gradient(x, gradients * sign_multiplier)
 
         elif isinstance(self.model, sklearn.svm.LinearSVC):
-            if label is None:
-                gradients = np.zeros(
-                    (
-                        x_preprocessed.shape[0],
-                        self.nb_classes,
-                        x_preprocessed.shape[1],
-                    )
-                )
+            if self.nb_classes == 2:
+                class_weights = self.model.coef_[0] * np.array([[-1], [1]])
+            else:
+                class_weights = self.model.coef_
 
-                for i in range(self.nb_classes):  # type: ignore
-                    for i_sample in range(num_samples):
-                        if self.nb_classes == 2:
-                            gradients[i_sample, i] = self.model.coef_[0] * (2 * i - 1)
-                        else:
-                            gradients[i_sample, i] = self.model.coef_[i]
+            if label is None:
+                gradients = np.repeat(class_weights[np.newaxis], num_samples, axis=0)
 
             elif isinstance(label, int):
-                gradients = np.zeros((x_preprocessed.shape[0], 1, x_preprocessed.shape[1]))
-
-                for i_sample in range(num_samples):
-                    if self.nb_classes == 2:
-                        gradients[i_sample, 0] = self.model.coef_[0] * (2 * label - 1)
-                    else:
-                        gradients[i_sample, 0] = self.model.coef_[label]
+                gradients = np.repeat(class_weights[np.newaxis, [label]], num_samples, axis=0)
 
             elif (
                 (isinstance(label, list) and len(label) == num_samples)
                 or isinstance(label, np.ndarray)
                 and label.shape == (num_samples,)
             ):
-                gradients = np.zeros((x_preprocessed.shape[0], 1, x_preprocessed.shape[1]))
-
-                for i_sample in range(num_samples):
-                    if self.nb_classes == 2:
-                        gradients[i_sample, 0] = self.model.coef_[0] * (2 * label[i_sample] - 1)
-                    else:
-                        gradients[i_sample, 0] = self.model.coef_[label[i_sample]]
+                gradients = class_weights[np.asarray(label), np.newaxis]
 
             else:
                 raise TypeError("Unrecognized type for argument `label` with type " + str(type(label)))
@@ -1232,6 +1096,7 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
         elif self.model.kernel == "poly":
             grad = (
                 self.model.degree
+                * self.model._gamma
                 * (self.model._gamma * np.sum(x_sample * sv) + self.model.coef0) ** (self.model.degree - 1)
                 * sv
             )
@@ -1244,7 +1109,11 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
                 * (x_sample - sv)
             )
         elif self.model.kernel == "sigmoid":
-            raise NotImplementedError
+            grad = (
+                self.model._gamma
+                * (1 - np.tanh(self.model._gamma * np.sum(x_sample * sv) + self.model.coef0) ** 2)
+                * sv
+            )
         else:
             raise NotImplementedError(f"Loss gradients for kernel '{self.model.kernel}' are not implemented.")
         return grad
@@ -1260,6 +1129,82 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
         x_i = self.model.support_vectors_[i_sv, :]
         return self._kernel_grad(x_i, x_sample)
 
+    def _get_kernel_gradients(self, x_samples: np.ndarray, sv_coefficients: np.ndarray) -> np.ndarray:
+        """
+        Applies the kernel gradients of all of a model's support vectors to a batch of samples and sums them weighted
+        by the coefficients of the support vectors.
+
+        :param x_samples: Sample vectors of shape `(nb_samples, nb_features)`.
+        :param sv_coefficients: Coefficients of the support vectors of shape `(nb_samples, nb_outputs, nb_sv)`, the
+                                first dimension can be of size 1 to use the same coefficients for all samples.
+        :return: The weighted sums of the kernel gradients of shape `(nb_samples, nb_outputs, nb_features)`.
+        """
+        # pylint: disable=W0212
+        support_vectors = self.model.support_vectors_
+
+        if self.model.kernel == "linear":
+            kernel_weights = None
+        elif self.model.kernel == "poly":
+            kernel_weights = (
+                self.model.degree
+                * self.model._gamma
+                * (self.model._gamma * x_samples @ support_vectors.T + self.model.coef0) ** (self.model.degree - 1)
+            )
+        elif self.model.kernel == "rbf":
+            squared_distances = (
+                np.sum(x_samples**2, axis=1)[:, np.newaxis]
+                - 2 * x_samples @ support_vectors.T
+                + np.sum(support_vectors**2, axis=1)[np.newaxis, :]
+            )
+            kernel_weights = -2 * self.model._gamma * np.exp(-self.model._gamma * np.maximum(squared_distances, 0))
+        elif self.model.kernel == "sigmoid":
+            kernel_weights = self.model._gamma * (
+                1 - np.tanh(self.model._gamma * x_samples @ support_vectors.T + self.model.coef0) ** 2
+            )
+        else:
+            raise NotImplementedError(f"Loss gradients for kernel '{self.model.kernel}' are not implemented.")
+
+        nb_outputs = sv_coefficients.shape[1]
+        gradients = np.zeros((x_samples.shape[0], nb_outputs, x_samples.shape[1]))
+        for i_output in range(nb_outputs):
+            weights = sv_coefficients[:, i_output]
+            if kernel_weights is not None:
+                weights = weights * kernel_weights
+            gradients[:, i_output] = weights @ support_vectors
+            if self.model.kernel == "rbf":
+                # The rbf kernel gradient of a support vector is proportional to `x_sample - sv`
+                gradients[:, i_output] = np.sum(weights, axis=1, keepdims=True) * x_samples - gradients[:, i_output]
+
+        return gradients
+
+    def _get_class_sv_coefficients(self, loss: bool = False) -> np.ndarray:
+        """
+        Returns the coefficients of the support vectors in the one-vs-one decision functions summed per class.
+
+        :param loss: If `True`, return the coefficients used by `loss_gradient`.
+        :return: Coefficients of shape `(nb_classes, nb_sv)`.
+        """
+        support_indices = [0] + list(np.cumsum(self.model.n_support_))
+        sv_coefficients = np.zeros((self.nb_classes, self.model.dual_coef_.shape[1]))
+
+        for i_label in range(self.nb_classes):  # type: ignore
+            label_svs = slice(support_indices[i_label], support_indices[i_label + 1])
+            for not_label in range(self.nb_classes):  # type: ignore
+                if i_label != not_label:
+                    not_label_svs = slice(support_indices[not_label], support_indices[not_label + 1])
+                    label_multiplier = -1 if not_label < i_label else 1
+                    not_label_i = not_label if not_label < i_label else not_label - 1
+                    label_i = not_label_i if loss else (i_label if i_label < not_label else i_label - 1)
+
+                    sv_coefficients[i_label, label_svs] += (
+                        label_multiplier * self.model.dual_coef_[not_label_i, label_svs]
+                    )
+                    sv_coefficients[i_label, not_label_svs] += (
+                        label_multiplier * self.model.dual_coef_[label_i, not_label_svs]
+                    )
+
+        return sv_coefficients
+
     def loss_gradient(self, x: np.ndarray, y: np.ndarray, **kwargs) -> np.ndarray:
         """
         Compute the gradient of the loss function w.r.t. `x`.
@@ -1278,8 +1223,6 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
         # Apply preprocessing
         x_preprocessed, y_preprocessed = self._apply_preprocessing(x, y, fit=False)
 
-        num_samples, _ = x_preprocessed.shape
-        gradients = np.zeros_like(x_preprocessed)
         y_index = np.argmax(y_preprocessed, axis=1)
 
         if isinstance(self.model, sklearn.svm.SVC):
@@ -1292,51 +1235,17 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
             else:
                 sign_multiplier = -1
 
-            i_not_label_i = None
-            label_multiplier = None
-            support_indices = [0] + list(np.cumsum(self.model.n_support_))
-
-            for i_sample in range(num_samples):
-                i_label = y_index[i_sample]
-
-                for i_not_label in range(self.nb_classes):  # type: ignore
-                    if i_label != i_not_label:
-                        if i_not_label < i_label:
-                            i_not_label_i = i_not_label
-                            label_multiplier = -1
-                        elif i_not_label > i_label:
-                            i_not_label_i = i_not_label - 1
-                            label_multiplier = 1
-
-                        for i_label_sv in range(support_indices[i_label], support_indices[i_label + 1]):
-                            alpha_i_k_y_i = self.model.dual_coef_[i_not_label_i, i_label_sv] * label_multiplier
-                            grad_kernel = self._get_kernel_gradient_sv(i_label_sv, x_preprocessed[i_sample])
-                            gradients[i_sample, :] += sign_multiplier * alpha_i_k_y_i * grad_kernel
-
-                        for i_not_label_sv in range(
-                            support_indices[i_not_label],
-                            support_indices[i_not_label + 1],
-                        ):
-                            alpha_i_k_y_i = self.model.dual_coef_[i_not_label_i, i_not_label_sv] * label_multiplier
-                            grad_kernel = self._get_kernel_gradient_sv(i_not_label_sv, x_preprocessed[i_sample])
-                            gradients[i_sample, :] += sign_multiplier * alpha_i_k_y_i * grad_kernel
+            sv_coefficients = self._get_class_sv_coefficients(loss=True)
+            gradients = (
+                sign_multiplier * self._get_kernel_gradients(x_preprocessed, sv_coefficients[y_index, np.newaxis])[:, 0]
+            )
 
         elif isinstance(self.model, sklearn.svm.LinearSVC):
-            for i_sample in range(num_samples):
-                i_label = y_index[i_sample]
-                if self.nb_classes == 2:
-                    i_label_i = 0
-                    if i_label == 0:
-                        label_multiplier = 1
-                    elif i_label == 1:
-                        label_multiplier = -1
-                    else:
-                        raise ValueError("Label index not recognized because it is not 0 or 1.")
-                else:
-                    i_label_i = i_label
-                    label_multiplier = -1
-
-                gradients[i_sample] = label_multiplier * self.model.coef_[i_label_i]
+            if self.nb_classes == 2:
+                # Label 0 has multiplier 1 and label 1 has multiplier -1
+                gradients = (1 - 2 * y_index)[:, np.newaxis] * self.model.coef_[0]
+            else:
+                gradients = -self.model.coef_[y_index]
         else:
             raise TypeError("Model not recognized.")
 
@@ -1355,6 +1264,7 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
             polynomial_kernel,
             linear_kernel,
             rbf_kernel,
+            sigmoid_kernel,
         )
 
         if isinstance(self.model, sklearn.svm.LinearSVC):
@@ -1370,6 +1280,8 @@ class ScikitlearnSVC(ClassGradientsMixin, LossGradientsMixin, ScikitlearnClassif
             kernel_func = polynomial_kernel
         elif kernel == "rbf":
             kernel_func = rbf_kernel
+        elif kernel == "sigmoid":
+            kernel_func = sigmoid_kernel
         elif callable(kernel):
             kernel_func = kernel
         else:
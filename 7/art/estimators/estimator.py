@@ -25,6 +25,7 @@ import numpy as np
 from tqdm.auto import trange
 
 from art.config import ART_NUMPY_DTYPE
+from art.utils import PredictionCache
 
 if TYPE_CHECKING:
     # pylint: disable=R0401
@@ -288,6 +289,17 @@ class BaseEstimator(ABC):
         """
         return self._clip_values
 
+    @property
+    def prediction_cache(self) -> PredictionCache:
+        """
+        Return the cache of predictions on clean inputs shared by attacks and metrics, see `art.utils.PredictionCache`.
+
+        :return: The prediction cache of the estimator.
+        """
+        if getattr(self, "_prediction_cache", None) is None:
+            self._prediction_cache = PredictionCache(self)  # pylint: disable=W0201
+        return self._prediction_cache
+
     def _apply_preprocessing(self, x, y, fit: bool) -> Tuple[Any, Any]:
         """
         Apply all defences and preprocessing operations on the inputs `x` and `y`. This function has to be applied to
@@ -386,6 +398,34 @@ class LossGradientsMixin(ABC):
         """
         raise NotImplementedError
 
+    @property
+    def supports_tensor_inputs(self) -> bool:
+        """
+        Return `True` if `loss_gradient` accepts and returns tensors of the framework of the estimator as created by
+        `to_tensor`, such that attacks can keep their iterations on the device of the estimator.
+
+        :return: Whether the estimator supports tensor inputs.
+        """
+        return False
+
+    def to_tensor(self, x: np.ndarray) -> Any:
+        """
+        Convert an array to a tensor on the device of the estimator. Only supported if `supports_tensor_inputs`.
+
+        :param x: Array.
+        :return: Tensor with the values of `x`.
+        """
+        raise NotImplementedError
+
+    def to_numpy(self, x: Any) -> np.ndarray:
+        """
+        Convert a tensor created by `to_tensor` back to an array. Only supported if `supports_tensor_inputs`.
+
+        :param x: Tensor.
+        :return: Array with the values of `x`.
+        """
+        raise NotImplementedError
+
     def _apply_preprocessing_gradient(self, x, gradients, fit=False):
         """
         Apply the backward pass to the gradients through all normalization and preprocessing defences that have been
@@ -305,54 +305,34 @@ class PyTorchObjectDetector(ObjectDetectorMixin, PyTorchEstimator):
         """
         import torch
 
-        grad_list = []
-
-        # Adding this loop because torch==[1.7, 1.8] and related versions of torchvision do not allow loss gradients at
-        #  the input for batches larger than 1 anymore for PyTorch FasterRCNN because of a view created by torch or
-        #  torchvision. This loop should be revisited with later releases of torch and removed once it becomes
-        #  unnecessary.
-        for i in range(x.shape[0]):
-
-            x_i = x[[i]]
-            y_i = [y[i]]
-
-            output, inputs_t, image_tensor_list_grad = self._get_losses(x=x_i, y=y_i)
-
-            # Compute the gradient and return
-            loss = None
-            for loss_name in self.attack_losses:
-                if loss is None:
-                    loss = output[loss_name]
-                else:
-                    loss = loss + output[loss_name]
-
-            # Clean gradients
-            self._model.zero_grad()
-
-            # Compute gradients
-            loss.backward(retain_graph=True)  # type: ignore
+        grad_list = None
+
+        # The gradients of all images are computed with a single forward and backward pass. torch==[1.7, 1.8] and
+        #  related versions of torchvision do not allow loss gradients at the input for batches larger than 1 for
+        #  PyTorch FasterRCNN because of an in-place modification of a view created by torch or torchvision, in which
+        #  case the gradients of this call are computed one image at a time.
+        if x.shape[0] > 1:
+            try:
+                grad_list = self._get_loss_gradient_list(x=x, y=y)
+            except RuntimeError as exception:
+                if "is a view" not in str(exception):
+                    raise
+                logger.warning(
+                    "Batched loss gradients failed with `%s`, computing loss gradients one image at a time.",
+                    exception,
+                )
 
-            if isinstance(x, np.ndarray):
-                for img in image_tensor_list_grad:
-                    if img.grad is not None:
-                        gradients = img.grad.cpu().numpy().copy()
-                    else:
-                        raise ValueError("Gradient term in PyTorch model is `None`.")
-                    grad_list.append(gradients)
-            else:
-                for img in inputs_t:
-                    if img.grad is not None:
-                        gradients = img.grad.copy()
-                    else:
-                        raise ValueError("Gradient term in PyTorch model is `None`.")
-                    grad_list.append(gradients)
+        if grad_list is None:
+            grad_list = []
+            for i in range(x.shape[0]):
+                grad_list += self._get_loss_gradient_list(x=x[[i]], y=[y[i]])
 
         if isinstance(x, np.ndarray):
             grads = np.stack(grad_list, axis=0)
             grads = np.transpose(grads, (0, 2, 3, 1))
         else:
             grads = torch.stack(grad_list, dim=0)
-            grads = grads.premute(0, 2, 3, 1)
+            grads = grads.permute(0, 2, 3, 1)
 
         if self.clip_values is not None:
             grads = grads / self.clip_values[1]
@@ -364,6 +344,55 @@ class PyTorchObjectDetector(ObjectDetectorMixin, PyTorchEstimator):
 
         return grads
 
+    def _get_loss_gradient_list(
+        self, x: np.ndarray, y: List[Dict[str, Union[np.ndarray, "torch.Tensor"]]]
+    ) -> List[Union[np.ndarray, "torch.Tensor"]]:
+        """
+        Compute the gradients of the losses of each image w.r.t. the image in one forward and backward pass.
+
+        :param x: Samples of shape (nb_samples, height, width, nb_channels).
+        :param y: Target values of format `List[Dict[Tensor]]`, one for each input image.
+        :return: List of the loss gradients of each image in channels first format.
+        """
+        output, inputs_t, image_tensor_list_grad = self._get_losses(x=x, y=y)
+
+        # Compute the gradient and return
+        loss = None
+        for loss_name in self.attack_losses:
+            if loss is None:
+                loss = output[loss_name]
+            else:
+                loss = loss + output[loss_name]
+
+        # torchvision averages the losses over the images of a batch, scale to the sum of the losses of the images.
+        #  The images of a batch do not interact otherwise, unless the model uses batch statistics in training mode,
+        #  which torchvision detectors avoid with frozen batch normalisation.
+        loss = loss * x.shape[0]  # type: ignore
+
+        # Clean gradients
+        self._model.zero_grad()
+
+        # Compute gradients
+        loss.backward(retain_graph=True)  # type: ignore
+
+        grad_list = []
+        if isinstance(x, np.ndarray):
+            for img in image_tensor_list_grad:
+                if img.grad is not None:
+                    gradients = img.grad.cpu().numpy().copy()
+                else:
+                    raise ValueError("Gradient term in PyTorch model is `None`.")
+                grad_list.append(gradients)
+        else:
+            for img in inputs_t:
+                if img.grad is not None:
+                    gradients = img.grad.clone()
+                else:
+                    raise ValueError("Gradient term in PyTorch model is `None`.")
+                grad_list.append(gradients)
+
+        return grad_list
+
     def predict(self, x: np.ndarray, batch_size: int = 128, **kwargs) -> List[Dict[str, np.ndarray]]:
         """
         Perform prediction for a batch of inputs.
@@ -394,18 +423,17 @@ class PyTorchObjectDetector(ObjectDetectorMixin, PyTorchEstimator):
         else:
             norm_factor = 1.0
 
-        if self.channels_first:
-            x_preprocessed = [torch.from_numpy(x_i / norm_factor).to(self.device) for x_i in x_preprocessed]
-        else:
-            x_preprocessed = [transform(x_i / norm_factor).to(self.device) for x_i in x_preprocessed]
-
         predictions: List[Dict[str, np.ndarray]] = []
 
-        # Run prediction
+        # Run prediction, moving one batch at a time to the device
         num_batch = int(np.ceil(len(x_preprocessed) / float(batch_size)))
         for m in range(num_batch):
             # Batch using indices
-            i_batch = x_preprocessed[m * batch_size : (m + 1) * batch_size]
+            x_batch = x_preprocessed[m * batch_size : (m + 1) * batch_size]
+            if self.channels_first:
+                i_batch = [torch.from_numpy(x_i / norm_factor).to(self.device) for x_i in x_batch]
+            else:
+                i_batch = [transform(x_i / norm_factor).to(self.device) for x_i in x_batch]
 
             with torch.no_grad():
                 predictions_x1y1x2y2 = self._model(i_batch)
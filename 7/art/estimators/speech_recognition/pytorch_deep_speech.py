@@ -30,7 +30,7 @@ import numpy as np
 from art import config
 from art.estimators.pytorch import PyTorchEstimator
 from art.estimators.speech_recognition.speech_recognizer import SpeechRecognizerMixin, PytorchSpeechRecognizerMixin
-from art.utils import get_file
+from art.utils import PackedSequences, get_file, length_buckets
 
 if TYPE_CHECKING:
     # pylint: disable=C0412
@@ -361,54 +361,35 @@ class PyTorchDeepSpeech(PytorchSpeechRecognizerMixin, SpeechRecognizerMixin, PyT
         # Put the model in the eval mode
         self._model.eval()
 
-        # Transform x into the model input space
-        inputs, _, input_rates, _, batch_idx = self._transform_model_input(x=x_in)
-
-        # Compute real input sizes
-        input_sizes = input_rates.mul_(inputs.size()[-1]).int()
-
-        # Run prediction with batch processing
+        # Run prediction with batch processing on utterances of similar length, such that every batch is only padded
+        # to its longest utterance
         results = []
         result_output_sizes = np.zeros(x_preprocessed.shape[0], dtype=int)
-        num_batch = int(np.ceil(len(x_preprocessed) / float(batch_size)))
+        lengths = np.array([len(x_i) for x_i in x_in])
 
-        for m in range(num_batch):
-            # Batch indexes
-            begin, end = (
-                m * batch_size,
-                min((m + 1) * batch_size, x_preprocessed.shape[0]),
-            )
+        for batch_index in length_buckets(lengths, batch_size):
+            # Transform x into the model input space, note that the batch is re-ordered during the transformation
+            inputs, _, input_rates, _, batch_idx = self._transform_model_input(x=x_in[batch_index])
+            original_index = batch_index[batch_idx]
+
+            # Compute real input sizes
+            input_sizes = input_rates.mul_(inputs.size()[-1]).int()
 
             # Call to DeepSpeech model for prediction
             with torch.no_grad():
-                outputs, output_sizes = self._model(
-                    inputs[begin:end].to(self._device), input_sizes[begin:end].to(self._device)
-                )
+                outputs, output_sizes = self._model(inputs.to(self._device), input_sizes.to(self._device))
 
-            results.append(outputs)
-            result_output_sizes[begin:end] = output_sizes.detach().cpu().numpy()
+            results.append((original_index, outputs.cpu().numpy()))
+            result_output_sizes[original_index] = output_sizes.detach().cpu().numpy()
 
-        # Aggregate results
+        # Aggregate results in the original order
         result_outputs = np.zeros(
-            shape=(x_preprocessed.shape[0], result_output_sizes.max(), results[0].shape[-1]),
+            shape=(x_preprocessed.shape[0], result_output_sizes.max(), results[0][1].shape[-1]),
             dtype=config.ART_NUMPY_DTYPE,
         )
 
-        for m in range(num_batch):
-            # Batch indexes
-            begin, end = (
-                m * batch_size,
-                min((m + 1) * batch_size, x_preprocessed.shape[0]),
-            )
-
-            # Overwrite results
-            result_outputs[begin:end, : results[m].shape[1], : results[m].shape[-1]] = results[m].cpu().numpy()
-
-        # Rearrange to the original order
-        result_output_sizes_ = result_output_sizes.copy()
-        result_outputs_ = result_outputs.copy()
-        result_output_sizes[batch_idx] = result_output_sizes_
-        result_outputs[batch_idx] = result_outputs_
+        for original_index, outputs in results:
+            result_outputs[original_index, : outputs.shape[1], : outputs.shape[-1]] = outputs
 
         # Check if users want transcription outputs
         transcription_output = kwargs.get("transcription_output", True)
@@ -426,7 +407,9 @@ class PyTorchDeepSpeech(PytorchSpeechRecognizerMixin, SpeechRecognizerMixin, PyT
 
         return decoded_output
 
-    def loss_gradient(self, x: np.ndarray, y: np.ndarray, **kwargs) -> np.ndarray:
+    def loss_gradient(  # pylint: disable=W0221
+        self, x: np.ndarray, y: np.ndarray, batch_size: Optional[int] = None, **kwargs
+    ) -> np.ndarray:
         """
         Compute the gradient of the loss function w.r.t. `x`.
 
@@ -435,8 +418,12 @@ class PyTorchDeepSpeech(PytorchSpeechRecognizerMixin, SpeechRecognizerMixin, PyT
                   `x = np.array([np.array([0.1, 0.2, 0.1, 0.4]), np.array([0.3, 0.1])])`.
         :param y: Target values of shape (nb_samples). Each sample in `y` is a string and it may possess different
                   lengths. A possible example of `y` could be: `y = np.array(['SIXTY ONE', 'HELLO'])`.
+        :param batch_size: Batch size. If set, the gradients are computed on batches of utterances of similar length,
+                           otherwise on all utterances at once.
         :return: Loss gradients of the same shape as `x`.
         """
+        import torch
+
         # Apply preprocessing
         x_preprocessed, _ = self._apply_preprocessing(x, None, fit=False)
 
@@ -448,51 +435,56 @@ class PyTorchDeepSpeech(PytorchSpeechRecognizerMixin, SpeechRecognizerMixin, PyT
         self._model.train()
         self.set_batchnorm(train=False)
 
-        # Transform data into the model input space
-        inputs, targets, input_rates, target_sizes, _ = self._transform_model_input(x=x_in, y=y, compute_gradient=True)
+        # The gradients of all utterances are collected in one flat array
+        lengths = np.array([len(x_i) for x_i in x_in])
+        gradients = PackedSequences(
+            np.zeros(lengths.sum(), dtype=config.ART_NUMPY_DTYPE), lengths, ragged=x.dtype == object
+        )
+        y = np.asarray(y)
 
-        # Compute real input sizes
-        input_sizes = input_rates.mul_(inputs.size()[-1]).int()
+        for batch_index in length_buckets(lengths, batch_size or max(len(x_in), 1)):
+            x_batch = x_in[batch_index]
 
-        # Call to DeepSpeech model for prediction
-        outputs, output_sizes = self._model(inputs.to(self._device), input_sizes.to(self._device))
-        outputs = outputs.transpose(0, 1)
+            # Transform data into the model input space
+            inputs, targets, input_rates, target_sizes, _ = self._transform_model_input(
+                x=x_batch, y=y[batch_index], compute_gradient=True
+            )
 
-        if self._version == 2:
-            outputs = outputs.float()
-        else:
-            outputs = outputs.log_softmax(-1)
+            # Compute real input sizes
+            input_sizes = input_rates.mul_(inputs.size()[-1]).int()
 
-        # Compute the loss
-        loss = self.criterion(outputs, targets, output_sizes, target_sizes).to(self._device)
+            # Call to DeepSpeech model for prediction
+            outputs, output_sizes = self._model(inputs.to(self._device), input_sizes.to(self._device))
+            outputs = outputs.transpose(0, 1)
 
-        # Average the loss by mini batch if version 2 of DeepSpeech is used
-        if self._version == 2:
-            loss = loss / inputs.size(0)
+            if self._version == 2:
+                outputs = outputs.float()
+            else:
+                outputs = outputs.log_softmax(-1)
 
-        # Compute gradients
-        if self.use_amp:  # pragma: no cover
-            from apex import amp  # pylint: disable=E0611
+            # Compute the loss
+            loss = self.criterion(outputs, targets, output_sizes, target_sizes).to(self._device)
 
-            with amp.scale_loss(loss, self.optimizer) as scaled_loss:
-                scaled_loss.backward()
+            # Average the loss over all utterances if version 2 of DeepSpeech is used
+            if self._version == 2:
+                loss = loss / len(x_in)
 
-        else:
-            loss.backward()
+            # Compute gradients
+            if self.use_amp:  # pragma: no cover
+                from apex import amp  # pylint: disable=E0611
 
-        # Get results
-        results_list = []
-        for i, _ in enumerate(x_in):
-            results_list.append(x_in[i].grad.cpu().numpy().copy())
+                with amp.scale_loss(loss, self.optimizer) as scaled_loss:
+                    scaled_loss.backward()
 
-        results = np.array(results_list)
+            else:
+                loss.backward()
 
-        if results.shape[0] == 1:
-            results_ = np.empty(len(results), dtype=object)
-            results_[:] = list(results)
-            results = results_
+            # Get results with a single copy from the device
+            gradients.data[gradients.flat_indices(batch_index)] = (
+                torch.cat([x_i.grad.reshape(-1) for x_i in x_batch]).cpu().numpy()
+            )
 
-        results = self._apply_preprocessing_gradient(x, results)
+        results = self._apply_preprocessing_gradient(x, gradients.to_array())
 
         if x.dtype != object:
             results = np.array([i for i in results], dtype=x.dtype)  # pylint: disable=R1721
@@ -31,7 +31,7 @@ import numpy as np
 from art import config
 from art.estimators.pytorch import PyTorchEstimator
 from art.estimators.speech_recognition.speech_recognizer import SpeechRecognizerMixin, PytorchSpeechRecognizerMixin
-from art.utils import get_file
+from art.utils import PackedSequences, get_file, length_buckets
 
 if TYPE_CHECKING:
     # pylint: disable=C0412
@@ -225,21 +225,15 @@ class PyTorchEspresso(PytorchSpeechRecognizerMixin, SpeechRecognizerMixin, PyTor
         # Apply preprocessing
         x_preprocessed, _ = self._apply_preprocessing(x_in, y=None, fit=False)
 
-        # Run prediction with batch processing
-        decoded_output = []
-        # result_output_sizes = np.zeros(x_preprocessed.shape[0], dtype=int)
-        num_batch = int(np.ceil(len(x_preprocessed) / float(batch_size)))
-
-        for m in range(num_batch):
-            # Batch indexes
-            begin, end = (
-                m * batch_size,
-                min((m + 1) * batch_size, x_preprocessed.shape[0]),
-            )
+        # Run prediction with batch processing on utterances of similar length, such that every batch is only padded
+        # to its longest utterance
+        decoded_output = np.empty(len(x_preprocessed), dtype=object)
+        lengths = np.array([len(x_i) for x_i in x_preprocessed])
 
+        for batch_index in length_buckets(lengths, batch_size):
             # Transform x into the model input space
             # Note that batch is re-ordered during transformation
-            batch, batch_idx = self._transform_model_input(x=x_preprocessed[begin:end])
+            batch, batch_idx = self._transform_model_input(x=x_preprocessed[batch_index])
 
             hypos = self.task.inference_step(self.generator, self._models, batch)
 
@@ -256,15 +250,14 @@ class PyTorchEspresso(PytorchSpeechRecognizerMixin, SpeechRecognizerMixin, PyTor
                     detok_hypo_str = self.bpe.decode(hypo_str)
                     decoded_output_batch.append(detok_hypo_str)
 
-            decoded_output_array = np.array(decoded_output_batch)
-
-            decoded_output_copy = decoded_output_array.copy()
-            decoded_output_array[batch_idx] = decoded_output_copy  # revert decoded output to its original order
-            decoded_output.append(decoded_output_array)
+            # revert decoded output to its original order
+            decoded_output[batch_index[batch_idx]] = decoded_output_batch
 
-        return np.concatenate(decoded_output)
+        return np.array(decoded_output.tolist())
 
-    def loss_gradient(self, x: np.ndarray, y: np.ndarray, **kwargs) -> np.ndarray:
+    def loss_gradient(  # pylint: disable=W0221
+        self, x: np.ndarray, y: np.ndarray, batch_size: Optional[int] = None, **kwargs
+    ) -> np.ndarray:
         """
         Compute the gradient of the loss function w.r.t. `x`.
 
@@ -273,6 +266,8 @@ class PyTorchEspresso(PytorchSpeechRecognizerMixin, SpeechRecognizerMixin, PyTor
                   `x = np.array([np.array([0.1, 0.2, 0.1, 0.4]), np.array([0.3, 0.1])])`.
         :param y: Target values of shape (nb_samples). Each sample in `y` is a string and it may possess different
                   lengths. A possible example of `y` could be: `y = np.array(['SIXTY ONE', 'HELLO'])`.
+        :param batch_size: Batch size. If set, the gradients are computed on batches of utterances of similar length,
+                           otherwise on all utterances at once.
         :return: Loss gradients of the same shape as `x`.
         """
         x_in = np.empty(len(x), dtype=object)
@@ -286,37 +281,33 @@ class PyTorchEspresso(PytorchSpeechRecognizerMixin, SpeechRecognizerMixin, PyTor
         # Apply preprocessing
         x_preprocessed, y_preprocessed = self._apply_preprocessing(x_in, y, fit=False)
 
-        # Transform data into the model input space
-        batch_dict, batch_idx = self._transform_model_input(x=x_preprocessed, y=y_preprocessed, compute_gradient=True)
-
-        loss, _, _ = self.criterion(self.model, batch_dict)
-        loss.backward()
-
-        # Get results
-        results_list = []
-        src_frames = batch_dict["net_input"]["src_tokens"].grad.cpu().numpy().copy()
-        src_lengths = batch_dict["net_input"]["src_lengths"].cpu().numpy().copy()
-        for i, _ in enumerate(x_preprocessed):
-            results_list.append(src_frames[i, : src_lengths[i], :])
+        # The gradients of all utterances are collected in one flat array
+        lengths = np.array([len(x_i) for x_i in x_preprocessed])
+        gradients = PackedSequences(
+            np.zeros(lengths.sum(), dtype=config.ART_NUMPY_DTYPE), lengths, ragged=x.dtype == object
+        )
+        y_preprocessed = np.asarray(y_preprocessed)
 
-        results = np.array(results_list)
+        for batch_index in length_buckets(lengths, batch_size or max(len(x_preprocessed), 1)):
+            # Transform data into the model input space
+            batch_dict, batch_idx = self._transform_model_input(
+                x=x_preprocessed[batch_index], y=y_preprocessed[batch_index], compute_gradient=True
+            )
 
-        if results.shape[0] == 1:
-            results_ = np.empty(len(results), dtype=object)
-            results_[:] = list(results)
-            results = results_
+            loss, _, _ = self.criterion(self.model, batch_dict)
+            loss.backward()
 
-        # Rearrange to the original order
-        results_ = results.copy()
-        results[batch_idx] = results_
+            # Get results, the padded gradients are in the order of the transformed batch
+            src_frames = batch_dict["net_input"]["src_tokens"].grad.cpu().numpy()
+            src_lengths = batch_dict["net_input"]["src_lengths"].cpu().numpy()
+            gradients_batch = PackedSequences.from_padded(src_frames[:, :, 0], src_lengths)
+            gradients.data[gradients.flat_indices(batch_index[batch_idx])] = gradients_batch.data
 
-        results = self._apply_preprocessing_gradient(x_in, results)
+        results = self._apply_preprocessing_gradient(x_in, gradients.to_array())
 
         if x.dtype != object:
             results = np.array([i for i in results], dtype=x.dtype)  # pylint: disable=R1721
             assert results.shape == x.shape and results.dtype == x.dtype
-        else:
-            results = np.array([np.squeeze(res) for res in results], dtype=object)
 
         # Unfreeze batch norm layers again
         self.set_batchnorm(train=True)
@@ -23,6 +23,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from functools import reduce
 import logging
+import multiprocessing
 from typing import Any, Dict, List, Optional, Union, TYPE_CHECKING
 
 import numpy as np
@@ -166,11 +167,14 @@ def empirical_robustness(
     """
     crafter = get_crafter(classifier, attack_name, attack_params)
     crafter.set_params(**{"minimal": True})
-    adv_x = crafter.generate(x)
 
-    # Predict the labels for adversarial examples
-    y = classifier.predict(x)
-    y_pred = classifier.predict(adv_x)
+    # the predictions on `x` are shared with the attack
+    with classifier.prediction_cache.scope():
+        adv_x = crafter.generate(x)
+
+        # Predict the labels for adversarial examples
+        y = classifier.prediction_cache.predict(x)
+        y_pred = classifier.predict(adv_x)
 
     idxs = np.argmax(y_pred, axis=1) != np.argmax(y, axis=1)
     if np.sum(idxs) == 0.0:
@@ -252,6 +256,7 @@ def clever(
     c_init: float = 1.0,
     pool_factor: int = 10,
     verbose: bool = True,
+    nb_workers: int = 1,
 ) -> Optional[np.ndarray]:
     """
     Compute CLEVER score for an untargeted attack.
@@ -270,6 +275,7 @@ def clever(
     :param c_init: initialization of Weibull distribution.
     :param pool_factor: The factor to create a pool of random samples with size pool_factor x n_s.
     :param verbose: Show progress bars.
+    :param nb_workers: Number of worker processes fitting the Weibull distributions.
     :return: CLEVER score.
     """
     # Find the predicted class first
@@ -286,13 +292,21 @@ def clever(
     else:
         # Assume it's iterable
         target_classes = target
-    score_list: List[Optional[float]] = []
-    for j in tqdm(target_classes, desc="CLEVER untargeted", disable=not verbose):
-        if j == pred_class:
-            score_list.append(None)
-            continue
-        score = clever_t(classifier, x, j, nb_batches, batch_size, radius, norm, c_init, pool_factor)
-        score_list.append(score)
+
+    scores = clever_batch(
+        classifier,
+        np.array([x]),
+        nb_batches,
+        batch_size,
+        radius,
+        norm,
+        target=[j for j in target_classes if j != pred_class],
+        c_init=c_init,
+        pool_factor=pool_factor,
+        verbose=verbose,
+        nb_workers=nb_workers,
+    )[0]
+    score_list: List[Optional[float]] = [None if j == pred_class else scores[j] for j in target_classes]
     return np.array(score_list)
 
 
@@ -306,6 +320,7 @@ def clever_u(
     c_init: float = 1.0,
     pool_factor: int = 10,
     verbose: bool = True,
+    nb_workers: int = 1,
 ) -> float:
     """
     Compute CLEVER score for an untargeted attack.
@@ -321,20 +336,24 @@ def clever_u(
     :param c_init: initialization of Weibull distribution.
     :param pool_factor: The factor to create a pool of random samples with size pool_factor x n_s.
     :param verbose: Show progress bars.
+    :param nb_workers: Number of worker processes fitting the Weibull distributions.
     :return: CLEVER score.
     """
-    # Get a list of untargeted classes
-    y_pred = classifier.predict(np.array([x]))
-    pred_class = np.argmax(y_pred, axis=1)[0]
-    untarget_classes = [i for i in range(classifier.nb_classes) if i != pred_class]
-
     # Compute CLEVER score for each untargeted class
-    score_list = []
-    for j in tqdm(untarget_classes, desc="CLEVER untargeted", disable=not verbose):
-        score = clever_t(classifier, x, j, nb_batches, batch_size, radius, norm, c_init, pool_factor)
-        score_list.append(score)
+    scores = clever_batch(
+        classifier,
+        np.array([x]),
+        nb_batches,
+        batch_size,
+        radius,
+        norm,
+        c_init=c_init,
+        pool_factor=pool_factor,
+        verbose=verbose,
+        nb_workers=nb_workers,
+    )
 
-    return np.min(score_list)
+    return np.nanmin(scores)
 
 
 def clever_t(
@@ -370,71 +389,151 @@ def clever_t(
     if target_class == pred_class:  # pragma: no cover
         raise ValueError("The targeted class is the predicted class.")
 
+    scores = clever_batch(
+        classifier,
+        np.array([x]),
+        nb_batches,
+        batch_size,
+        radius,
+        norm,
+        target=target_class,
+        c_init=c_init,
+        pool_factor=pool_factor,
+        verbose=False,
+    )
+
+    return scores[0, target_class]
+
+
+def clever_batch(
+    classifier: "CLASSIFIER_CLASS_LOSS_GRADIENTS_TYPE",
+    x: np.ndarray,
+    nb_batches: int,
+    batch_size: int,
+    radius: float,
+    norm: float,
+    target: Union[int, List[int], None] = None,
+    c_init: float = 1.0,
+    pool_factor: int = 10,
+    verbose: bool = True,
+    nb_workers: int = 1,
+) -> np.ndarray:
+    """
+    Compute CLEVER scores of a batch of samples for targeted attacks against several classes at once. The random
+    examples of each sample are processed in batches of `batch_size`, computing the gradients of all classes in a single
+    call to `class_gradient` per batch.
+
+    | Paper link: https://arxiv.org/abs/1801.10578
+
+    :param classifier: A trained model.
+    :param x: Input samples.
+    :param nb_batches: Number of repetitions of the estimate.
+    :param batch_size: Number of random examples to sample per batch.
+    :param radius: Radius of the maximum perturbation.
+    :param norm: Current support: 1, 2, np.inf.
+    :param target: Class or classes to target. If `None`, targets all classes.
+    :param c_init: Initialization of Weibull distribution.
+    :param pool_factor: The factor to create a pool of random samples with size pool_factor x n_s.
+    :param verbose: Show progress bars.
+    :param nb_workers: Number of worker processes fitting the Weibull distributions.
+    :return: CLEVER scores of shape `(nb_samples, nb_classes)`, with `np.nan` for the predicted class of each sample
+             and for the classes not targeted.
+    """
     # Check if pool_factor is smaller than 1
     if pool_factor < 1:  # pragma: no cover
         raise ValueError("The `pool_factor` must be larger than 1.")
 
+    if nb_workers < 1:
+        raise ValueError("The number of workers must be a positive integer.")
+
+    if target is None:
+        target_classes = np.arange(classifier.nb_classes)
+    elif isinstance(target, (int, np.integer)):
+        target_classes = np.array([target])
+    else:
+        target_classes = np.asarray(target)
+
     # Some auxiliary vars
-    rand_pool_grad_set = []
-    grad_norm_set = []
-    dim = reduce(lambda x_, y: x_ * y, x.shape, 1)
-    shape = [pool_factor * batch_size]
-    shape.extend(x.shape)
-
-    # Generate a pool of samples
-    rand_pool = np.reshape(
-        random_sphere(nb_points=pool_factor * batch_size, nb_dims=dim, radius=radius, norm=norm),
-        shape,
-    )
-    rand_pool += np.repeat(np.array([x]), pool_factor * batch_size, 0)
-    rand_pool = rand_pool.astype(ART_NUMPY_DTYPE)
-    if hasattr(classifier, "clip_values") and classifier.clip_values is not None:
-        np.clip(rand_pool, classifier.clip_values[0], classifier.clip_values[1], out=rand_pool)
+    nb_samples = x.shape[0]
+    pool_size = pool_factor * batch_size
+    dim = reduce(lambda x_, y: x_ * y, x.shape[1:], 1)
+    y_pred = classifier.predict(x)
+    pred_classes = np.argmax(y_pred, axis=1)
 
     # Change norm since q = p / (p-1)
     if norm == 1:
-        norm = np.inf
+        grad_norm = np.inf
     elif norm == np.inf:
-        norm = 1
-    elif norm != 2:  # pragma: no cover
+        grad_norm = 1
+    elif norm == 2:
+        grad_norm = 2
+    else:  # pragma: no cover
         raise ValueError(f"Norm {norm} not supported")
 
-    # Compute gradients for all samples in rand_pool
-    for i in range(batch_size):
-        rand_pool_batch = rand_pool[i * pool_factor : (i + 1) * pool_factor]
-
-        # Compute gradients
-        grad_pred_class = classifier.class_gradient(rand_pool_batch, label=pred_class)
-        grad_target_class = classifier.class_gradient(rand_pool_batch, label=target_class)
+    # Compute gradient norms for all samples in the pools and all targeted classes
+    rand_pool_grads = np.zeros((nb_samples, pool_size, len(target_classes)))
+    for i in tqdm(range(nb_samples), desc="CLEVER", disable=not verbose):
+        # Generate a pool of samples around the input
+        rand_pool = np.reshape(
+            random_sphere(nb_points=pool_size, nb_dims=dim, radius=radius, norm=norm), (pool_size,) + x.shape[1:]
+        )
+        rand_pool += x[i]
+        rand_pool = rand_pool.astype(ART_NUMPY_DTYPE)
+        if hasattr(classifier, "clip_values") and classifier.clip_values is not None:
+            np.clip(rand_pool, classifier.clip_values[0], classifier.clip_values[1], out=rand_pool)
+
+        # The predicted class followed by the targeted classes of this sample
+        i_targets = np.flatnonzero(target_classes != pred_classes[i])
+        if i_targets.size == 0:
+            continue
+        labels = np.concatenate([[pred_classes[i]], target_classes[i_targets]])
 
-        if np.isnan(grad_pred_class).any() or np.isnan(grad_target_class).any():  # pragma: no cover
-            raise Exception("The classifier results NaN gradients.")
+        for i_batch in range(pool_factor):
+            rand_pool_batch = rand_pool[i_batch * batch_size : (i_batch + 1) * batch_size]
 
-        grad = grad_pred_class - grad_target_class
-        grad = np.reshape(grad, (pool_factor, -1))
-        grad = np.linalg.norm(grad, ord=norm, axis=1)
-        rand_pool_grad_set.extend(grad)
+            # Compute the gradients of all classes with one call and select the classes of this sample
+            grads = classifier.class_gradient(rand_pool_batch)
+            if np.isnan(grads).any():  # pragma: no cover
+                raise Exception("The classifier results NaN gradients.")
 
-    rand_pool_grads = np.array(rand_pool_grad_set)
+            grads = np.reshape(grads, (grads.shape[0], grads.shape[1], -1))[:, labels]
+            grad = grads[:, :1] - grads[:, 1:]
+            rand_pool_grads[i, i_batch * batch_size : (i_batch + 1) * batch_size][:, i_targets] = np.linalg.norm(
+                grad, ord=grad_norm, axis=2
+            )
 
-    # Loop over the batches
-    for _ in range(nb_batches):
-        # Random selection of gradients
-        grad_norm = rand_pool_grads[np.random.choice(pool_factor * batch_size, batch_size)]
-        grad_norm = np.max(grad_norm)
-        grad_norm_set.append(grad_norm)
+    # Random selection of gradients for all batches
+    indices = np.random.choice(pool_size, (nb_samples, nb_batches, batch_size))
+    grad_norm_set = np.max(rand_pool_grads[np.arange(nb_samples)[:, np.newaxis, np.newaxis], indices], axis=2)
 
     # Maximum likelihood estimation for max gradient norms
-    [_, loc, _] = weibull_min.fit(-np.array(grad_norm_set), c_init, optimizer=scipy_optimizer)
+    sample_indices, target_indices = np.nonzero(target_classes[np.newaxis, :] != pred_classes[:, np.newaxis])
+    fit_args = [(-grad_norm_set[i, :, i_target], c_init) for i, i_target in zip(sample_indices, target_indices)]
+    if nb_workers == 1 or len(fit_args) <= 1:
+        locs = [_weibull_loc(*args) for args in fit_args]
+    else:
+        with multiprocessing.Pool(nb_workers) as pool:
+            locs = pool.starmap(_weibull_loc, fit_args)
+
+    # Compute function values and scores
+    scores = np.full((nb_samples, classifier.nb_classes), np.nan)
+    for i, i_target, loc in zip(sample_indices, target_indices, locs):
+        value = y_pred[i, pred_classes[i]] - y_pred[i, target_classes[i_target]]
+        scores[i, target_classes[i_target]] = np.min([-value / loc, radius])
+
+    return scores
 
-    # Compute function value
-    values = classifier.predict(np.array([x]))
-    value = values[:, pred_class] - values[:, target_class]
 
-    # Compute scores
-    score = np.min([-value[0] / loc, radius])
+def _weibull_loc(grad_norm_set: np.ndarray, c_init: float) -> float:
+    """
+    Estimate the location of the reverse Weibull distribution of the negated maximum gradient norms.
 
-    return score
+    :param grad_norm_set: Negated maximum gradient norms of all batches.
+    :param c_init: Initialization of Weibull distribution.
+    :return: Location of the Weibull distribution.
+    """
+    [_, loc, _] = weibull_min.fit(grad_norm_set, c_init, optimizer=scipy_optimizer)
+    return loc
 
 
 def wasserstein_distance(
@@ -21,6 +21,7 @@ Module providing convenience functions.
 # pylint: disable=C0302
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import hashlib
 import logging
 import math
 import os
@@ -29,9 +30,11 @@ import sys
 import tarfile
 import warnings
 import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
 from functools import wraps
 from inspect import signature
-from typing import TYPE_CHECKING, Callable, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import six
@@ -41,6 +44,7 @@ from tqdm.auto import tqdm
 from art import config
 
 if TYPE_CHECKING:
+    import tensorflow as tf
     import torch
 
 logger = logging.getLogger(__name__)
@@ -387,83 +391,108 @@ def projection_l1_1(values: np.ndarray, eps: Union[int, float, np.ndarray]) -> n
     The batch size is  m = values.shape[0].  The points are flattened to dimension
     n = np.prod(value.shape[1:]).  This is required to facilitate sorting.
 
-    If a[0] <= ... <= a[n-1], then the projection can be characterized using the largest  j  such that
-    a[j+1] +...+ a[n-1] - a[j]*(n-j-1) >= eps. The  ith  coordinate of projection is equal to  0
-    if i=0,...,j.
+    If a[0] >= ... >= a[n-1] are the sorted absolute values of a point outside of its L1-ball, then the projection is
+    obtained by soft-thresholding with  theta = (a[0] +...+ a[rho-1] - eps) / rho,  where  rho  is the largest
+    index such that  a[rho-1] > (a[0] +...+ a[rho-1] - eps) / rho.  Points inside of their L1-ball are not changed.
+    This requires one sort and one cumulative sum per point, i.e. O(m n log n) operations.
+
+    | Paper link: https://doi.org/10.1145/1390156.1390191
 
     :param values:  A batch of  m  points, each an ndarray
-    :param eps:  The radii of the respective L1-balls
+    :param eps:  The radii of the respective L1-balls, either a scalar or an array with one radius per point
     :return: projections
     """
     # pylint: disable=C0103
-
     shp = values.shape
-    a = values.copy()
-    n = np.prod(a.shape[1:])
-    m = a.shape[0]
-    a = a.reshape((m, n))
-    sgns = np.sign(a)
-    a = np.abs(a)
+    m = shp[0]
+    a = values.reshape((m, -1))
+    n = a.shape[1]
+    eps = _l1_radii(eps, m)
+
+    a_abs = np.abs(a)
+    a_sorted = -np.sort(-a_abs, axis=1)
+    a_cumsum = np.cumsum(a_sorted, axis=1) - eps[:, np.newaxis]
+    rho = np.sum(a_sorted * np.arange(1, n + 1) > a_cumsum, axis=1)
+    rho = np.maximum(rho, 1)
+    theta = np.maximum(a_cumsum[np.arange(m), rho - 1] / rho, 0)
+
+    proj = np.sign(a) * np.maximum(a_abs - theta[:, np.newaxis], 0)
+    proj = proj.reshape(shp)
 
-    a_argsort = a.argsort(axis=1)
-    a_sorted = np.zeros((m, n))
-    for i in range(m):
-        a_sorted[i, :] = a[i, a_argsort[i, :]]
-    a_argsort_inv = a.argsort(axis=1).argsort(axis=1)
-    mat = np.zeros((m, 2))
+    return proj
 
-    #   if  a_sorted[i, n-1]  >= a_sorted[i, n-2] + eps,  then the projection is  [0,...,0,eps]
-    done = early_done = False
-    active = np.array([1] * m)
-    after_vec = np.zeros((m, n))
-    proj = a_sorted.copy()
-    j = n - 2
-    while j >= 0:
-        mat[:, 0] += a_sorted[:, j + 1]  # =  sum(a_sorted[: i] :  i = j + 1,...,n-1
-        mat[:, 1] = a_sorted[:, j] * (n - j - 1) + eps
-        #  Find the max in each problem  max{ sum{a_sorted[:, i] : i=j+1,..,n-1} , a_sorted[:, j] * (n-j-1) + eps }
-        row_maxes = np.max(mat, axis=1)
-        #  Set to  1  if  max >  a_sorted[:, j] * (n-j-1) + eps  >  sum ;  otherwise, set to  0
-        ind_set = np.sign(np.sign(row_maxes - mat[:, 0]))
-        #  ind_set = ind_set.reshape((m, 1))
-        #   Multiplier for activation
-        act_multiplier = (1 - ind_set) * active
-        act_multiplier = np.transpose([np.transpose(act_multiplier)] * n)
-        #  if done, the projection is supported by the current indices  j+1,..,n-1   and the amount by which each
-        #  has to be reduced is  delta
-        delta = (mat[:, 0] - eps) / (n - j - 1)
-        #    The vector of reductions
-        delta_vec = np.transpose(np.array([delta] * (n - j - 1)))
-        #   The sub-vectors:  a_sorted[:, (j+1):]
-        a_sub = a_sorted[:, (j + 1) :]
-        #   After reduction by delta_vec
-        a_after = a_sub - delta_vec
-        after_vec[:, (j + 1) :] = a_after
-        proj += act_multiplier * (after_vec - proj)
-        active = active * ind_set
-        if sum(active) == 0:
-            done = early_done = True
-            break
-        j -= 1
-    if not early_done:
-        delta = (mat[:, 0] + a_sorted[:, 0] - eps) / n
-        ind_set = np.sign(np.maximum(delta, 0))
-        act_multiplier = ind_set * active
-        act_multiplier = np.transpose([np.transpose(act_multiplier)] * n)
-        delta_vec = np.transpose(np.array([delta] * n))
-        a_after = a_sorted - delta_vec
-        proj += act_multiplier * (a_after - proj)
-        done = True
-    if not done:
-        proj = active * (a_sorted - proj)
 
-    for i in range(m):
-        proj[i, :] = proj[i, a_argsort_inv[i, :]]
+def projection_l1_1_pytorch(
+    values: "torch.Tensor", eps: Union[int, float, np.ndarray, "torch.Tensor"]
+) -> "torch.Tensor":
+    """
+    PyTorch implementation of `projection_l1_1`, computing the orthogonal projections of a batch of points on L1-balls
+    of given radii on the device of `values`.
 
-    proj = sgns * proj
-    proj = proj.reshape(shp)
+    :param values: A batch of  m  points as a tensor.
+    :param eps: The radii of the respective L1-balls, either a scalar or one radius per point.
+    :return: projections
+    """
+    import torch
 
-    return proj
+    values_tmp = values.reshape(values.shape[0], -1)
+    if isinstance(eps, torch.Tensor):
+        eps = eps.detach().cpu().numpy()
+    eps_t = torch.as_tensor(_l1_radii(eps, values.shape[0]), dtype=values.dtype, device=values.device)
+
+    values_abs = values_tmp.abs()
+    values_sorted = torch.sort(values_abs, dim=1, descending=True)[0]
+    values_cumsum = torch.cumsum(values_sorted, dim=1) - eps_t.unsqueeze(-1)
+    indices = torch.arange(1, values_tmp.shape[1] + 1, dtype=values.dtype, device=values.device)
+    rho = torch.clamp(torch.sum(values_sorted * indices > values_cumsum, dim=1), min=1)
+    theta = torch.clamp(torch.gather(values_cumsum, 1, (rho - 1).unsqueeze(-1)).squeeze(-1) / rho, min=0)
+
+    proj = values_tmp.sign() * torch.clamp(values_abs - theta.unsqueeze(-1), min=0)
+
+    return proj.reshape(values.shape)
+
+
+def projection_l1_1_tensorflow(values: "tf.Tensor", eps: Union[int, float, np.ndarray, "tf.Tensor"]) -> "tf.Tensor":
+    """
+    TensorFlow implementation of `projection_l1_1`, computing the orthogonal projections of a batch of points on
+    L1-balls of given radii.
+
+    :param values: A batch of  m  points as a tensor.
+    :param eps: The radii of the respective L1-balls, either a scalar or one radius per point.
+    :return: projections
+    """
+    import tensorflow as tf
+
+    values_tmp = tf.reshape(values, (values.shape[0], -1))
+    if isinstance(eps, tf.Tensor):
+        eps = eps.numpy()
+    eps_t = tf.constant(_l1_radii(eps, values.shape[0]), dtype=values.dtype)
+
+    values_abs = tf.math.abs(values_tmp)
+    values_sorted = tf.sort(values_abs, axis=1, direction="DESCENDING")
+    values_cumsum = tf.cumsum(values_sorted, axis=1) - tf.expand_dims(eps_t, axis=1)
+    indices = tf.range(1, values_tmp.shape[1] + 1, dtype=values.dtype)
+    rho = tf.maximum(tf.reduce_sum(tf.cast(values_sorted * indices > values_cumsum, tf.int32), axis=1), 1)
+    theta = tf.maximum(tf.gather(values_cumsum, rho - 1, batch_dims=1) / tf.cast(rho, values.dtype), 0)
+
+    proj = tf.sign(values_tmp) * tf.maximum(values_abs - tf.expand_dims(theta, axis=1), 0)
+
+    return tf.reshape(proj, values.shape)
+
+
+def _l1_radii(eps: Union[int, float, np.ndarray], nb_points: int) -> np.ndarray:
+    """
+    Broadcast the radii of L1-balls to one radius per point.
+
+    :param eps: The radii, either a scalar or an array with one radius per point.
+    :param nb_points: The number of points.
+    :return: Array of shape `(nb_points,)`.
+    """
+    eps = np.reshape(eps, (-1,))
+    if eps.shape[0] not in (1, nb_points):
+        raise NotImplementedError("The L1-ball projection supports a scalar `eps` or one `eps` per sample only.")
+
+    return np.broadcast_to(eps, (nb_points,))
 
 
 def projection_l1_2(values: np.ndarray, eps: Union[int, float, np.ndarray]) -> np.ndarray:
@@ -527,7 +556,8 @@ def projection(values: np.ndarray, eps: Union[int, float, np.ndarray], norm_p: U
     :param eps: Maximum norm allowed.
     :param norm_p: L_p norm to use for clipping.
             Only 1, 2 , `np.Inf` 1.1 and 1.2 supported for now.
-            1.1 and 1.2 compute orthogonal projections on l1-ball, using two different algorithms
+            1, 1.1 and 1.2 compute orthogonal projections on l1-ball, using two different algorithms. 1 and 1.1 use
+            the faster one, which supports one `eps` per sample.
     :return: Values of `values` after projection.
     """
     # Pick a small scalar to avoid division by 0
@@ -542,15 +572,7 @@ def projection(values: np.ndarray, eps: Union[int, float, np.ndarray], norm_p: U
             np.minimum(1.0, eps / (np.linalg.norm(values_tmp, axis=1) + tol)), axis=1
         )
 
-    elif norm_p == 1:
-        if isinstance(eps, np.ndarray):
-            raise NotImplementedError("The parameter `eps` of type `np.ndarray` is not supported to use with norm 1.")
-
-        values_tmp = values_tmp * np.expand_dims(
-            np.minimum(1.0, eps / (np.linalg.norm(values_tmp, axis=1, ord=1) + tol)),
-            axis=1,
-        )
-    elif norm_p == 1.1:
+    elif norm_p in [1, 1.1]:
         values_tmp = projection_l1_1(values_tmp, eps)
     elif norm_p == 1.2:
         values_tmp = projection_l1_2(values_tmp, eps)
@@ -695,6 +717,29 @@ def uniform_sample_from_sphere_or_ball(
     return res
 
 
+def per_sample_random_states(nb_samples: int) -> List[np.random.RandomState]:
+    """
+    Create one random generator per sample, seeded from the global NumPy random generator. A sample drawing only from
+    its own generator receives the same random numbers regardless of the other samples processed together with it.
+
+    :param nb_samples: Number of samples.
+    :return: List of the random generators of the samples.
+    """
+    seeds = np.random.randint(np.iinfo(np.int32).max, size=nb_samples)
+    return [np.random.RandomState(seed) for seed in seeds]
+
+
+def expand_per_sample(values: np.ndarray, samples: np.ndarray) -> np.ndarray:
+    """
+    Reshape per-sample values to broadcast against a batch of samples and cast them to its data type.
+
+    :param values: An array with one value per sample.
+    :param samples: A batch of samples.
+    :return: The values of shape `(nb_samples, 1, ..., 1)`.
+    """
+    return np.reshape(values, (-1,) + (1,) * (samples.ndim - 1)).astype(samples.dtype)
+
+
 def original_to_tanh(
     x_original: np.ndarray,
     clip_min: Union[float, np.ndarray],
@@ -976,6 +1021,120 @@ def remove_attacked_feature(attack_feature: Union[int, slice], non_numerical_fea
             non_numerical_features.remove(attack_feature)
 
 
+class PredictionCache:
+    """
+    Content-addressed cache of the predictions of an estimator, keyed by a fingerprint of the input array and bounded
+    by the memory of the cached predictions. The cache only stores and returns predictions while it is active, i.e.
+    within `scope`, for example during the `generate` call of an attack, for which the estimator is assumed to be
+    unchanged. The cached predictions are dropped when the outermost scope is left, the hit and miss counters are kept
+    for profiling.
+    """
+
+    def __init__(self, estimator, max_bytes: int = 2**27) -> None:
+        """
+        Create a prediction cache.
+
+        :param estimator: The estimator whose predictions are cached.
+        :param max_bytes: Maximum memory of the cached predictions in bytes. The least recently used predictions are
+                          dropped first.
+        """
+        self.estimator = estimator
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._depth = 0
+        self._nb_bytes = 0
+        self._predictions: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+
+    @property
+    def active(self) -> bool:
+        """
+        Return whether predictions are currently cached.
+
+        :return: `True` within `scope`.
+        """
+        return self._depth > 0
+
+    @staticmethod
+    def fingerprint(x: np.ndarray) -> Tuple:
+        """
+        Compute the key of an input array from its shape, data type and content.
+
+        :param x: Input array.
+        :return: Key of the input array.
+        """
+        digest = hashlib.blake2b(np.ascontiguousarray(x).view(np.uint8), digest_size=16).hexdigest()
+        return x.shape, x.dtype.str, digest
+
+    @contextmanager
+    def scope(self) -> Iterator["PredictionCache"]:
+        """
+        Activate the cache within a `with` statement. Scopes can be nested, the cached predictions are dropped when the
+        outermost scope is left.
+        """
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.clear()
+
+    def predict(self, x: np.ndarray, batch_size: int = 128) -> np.ndarray:
+        """
+        Return the predictions of the estimator on `x`, from the cache if available while the cache is active.
+
+        :param x: Input samples.
+        :param batch_size: Batch size.
+        :return: Predictions of the estimator.
+        """
+        if not self.active or not isinstance(x, np.ndarray) or x.dtype == object:
+            return self.estimator.predict(x, batch_size=batch_size)
+
+        key = self.fingerprint(x)
+        if key in self._predictions:
+            self.hits += 1
+            self._predictions.move_to_end(key)
+            return self._predictions[key].copy()
+
+        self.misses += 1
+        predictions = self.estimator.predict(x, batch_size=batch_size)
+        if isinstance(predictions, np.ndarray) and predictions.nbytes <= self.max_bytes:
+            self._predictions[key] = predictions.copy()
+            self._nb_bytes += predictions.nbytes
+            while self._nb_bytes > self.max_bytes:
+                _, dropped = self._predictions.popitem(last=False)
+                self._nb_bytes -= dropped.nbytes
+        return predictions
+
+    def clear(self) -> None:
+        """
+        Drop all cached predictions. The hit and miss counters are not reset.
+        """
+        self._predictions.clear()
+        self._nb_bytes = 0
+
+
+def cache_predictions(function: Callable) -> Callable:
+    """
+    Decorator for the `generate` method of an attack which activates the prediction cache of the attack's estimator for
+    the duration of the call, so that the predictions on the clean inputs are only computed once.
+
+    :param function: The `generate` method.
+    :return: The decorated method.
+    """
+
+    @wraps(function)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self.estimator, "prediction_cache", None)
+        if not isinstance(cache, PredictionCache):
+            return function(self, *args, **kwargs)
+        with cache.scope():
+            return function(self, *args, **kwargs)
+
+    return wrapper
+
+
 def compute_success_array(
     classifier: "CLASSIFIER_TYPE",
     x_clean: np.ndarray,
@@ -986,6 +1145,7 @@ def compute_success_array(
 ) -> float:
     """
     Compute the success rate of an attack based on clean samples, adversarial samples and targets or correct labels.
+    The predictions on the clean samples are taken from the prediction cache of the classifier while it is active.
 
     :param classifier: Classifier used for prediction.
     :param x_clean: Original clean samples.
@@ -1004,7 +1164,11 @@ def compute_success_array(
     if targeted:
         attack_success = adv_preds == np.argmax(labels, axis=1)
     else:
-        preds = classifier.predict(x_clean, batch_size=batch_size)
+        cache = getattr(classifier, "prediction_cache", None)
+        if isinstance(cache, PredictionCache):
+            preds = cache.predict(x_clean, batch_size=batch_size)
+        else:
+            preds = classifier.predict(x_clean, batch_size=batch_size)
         if len(preds.shape) >= 2:
             preds = np.argmax(preds, axis=1)
         else:
@@ -1730,17 +1894,151 @@ def pad_sequence_input(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     :param x: A batch of 1-dimensional input data, e.g. `np.array([np.array([1,2,3]), np.array([4,5,6,7])])`.
     :return: The padded input batch and its corresponding mask.
     """
-    max_length = max(map(len, x))
-    batch_size = x.shape[0]
+    x_padded, x_mask = PackedSequences.from_sequences(x).pad()
 
     # note: use dtype of inner elements
-    x_padded = np.zeros((batch_size, max_length), dtype=x[0].dtype)
-    x_mask = np.zeros((batch_size, max_length), dtype=bool)
+    return x_padded.astype(x[0].dtype, copy=False), x_mask
+
+
+def length_buckets(lengths: np.ndarray, batch_size: int) -> List[np.ndarray]:
+    """
+    Group the indices of sequences into batches of similar length. The sequences are sorted by decreasing length with
+    ties kept in their original order, such that each batch only needs to be padded to the length of its first
+    sequence.
+
+    :param lengths: Lengths of the sequences of shape `(nb_samples,)`.
+    :param batch_size: Maximum number of sequences per batch.
+    :return: List of index arrays into the sequences, one per batch.
+    """
+    if batch_size < 1:
+        raise ValueError("The batch size has to be a positive integer.")
+
+    order = np.argsort(-np.asarray(lengths), kind="stable")
+    return [order[begin : begin + batch_size] for begin in range(0, len(order), batch_size)]
+
+
+class PackedSequences:
+    """
+    Batch of 1-dimensional sequences of possibly different lengths, e.g. ragged audio inputs, packed into a single flat
+    array. Element-wise operations are applied to the flat array without looping over the sequences in Python, and
+    padded or ragged representations are created from it on demand.
+    """
+
+    def __init__(self, data: np.ndarray, lengths: np.ndarray, ragged: bool = True) -> None:
+        """
+        Create packed sequences from a flat array.
+
+        :param data: Concatenation of all sequences of shape `(sum(lengths),)`.
+        :param lengths: Lengths of the sequences of shape `(nb_samples,)`.
+        :param ragged: Whether `to_array` returns a 1-dimensional object array of sequences instead of a 2-dimensional
+                       array of equally long sequences.
+        """
+        self.data = data
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)])
+        self.ragged = ragged
 
-    for i, x_i in enumerate(x):
-        x_padded[i, : len(x_i)] = x_i
-        x_mask[i, : len(x_i)] = 1
-    return x_padded, x_mask
+        if self.data.shape != (self.offsets[-1],):
+            raise ValueError("The flat data does not match the lengths of the sequences.")
+
+    @classmethod
+    def from_sequences(cls, x: Union[np.ndarray, List[np.ndarray]], ragged: Optional[bool] = None) -> "PackedSequences":
+        """
+        Pack a batch of sequences.
+
+        :param x: Sequences as a 1-dimensional object array, a list of 1-dimensional arrays or a 2-dimensional array.
+        :param ragged: Whether `to_array` returns a ragged object array. By default inferred from `x`, i.e. `False` for
+                       2-dimensional arrays.
+        :return: The packed sequences.
+        """
+        is_dense = isinstance(x, np.ndarray) and x.dtype != object and x.ndim == 2
+        if ragged is None:
+            ragged = not is_dense
+
+        if is_dense:
+            return cls(x.reshape(-1), np.full(x.shape[0], x.shape[1]), ragged=ragged)
+
+        lengths = np.array([len(x_i) for x_i in x], dtype=np.int64)
+        data = np.concatenate([np.ravel(x_i) for x_i in x]) if len(x) > 0 else np.zeros(0, dtype=config.ART_NUMPY_DTYPE)
+        return cls(data, lengths, ragged=ragged)
+
+    @classmethod
+    def from_padded(cls, x_padded: np.ndarray, lengths: np.ndarray, ragged: bool = True) -> "PackedSequences":
+        """
+        Pack a batch of padded sequences.
+
+        :param x_padded: Padded sequences of shape `(nb_samples, max_length)`.
+        :param lengths: Real lengths of the sequences of shape `(nb_samples,)`.
+        :param ragged: Whether `to_array` returns a ragged object array.
+        :return: The packed sequences.
+        """
+        lengths = np.asarray(lengths, dtype=np.int64)
+        mask = np.arange(x_padded.shape[1]) < lengths[:, np.newaxis]
+        return cls(x_padded[mask], lengths, ragged=ragged)
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.data[self.offsets[index] : self.offsets[index + 1]]
+
+    def with_data(self, data: np.ndarray) -> "PackedSequences":
+        """
+        Create packed sequences of the same lengths from new flat data, e.g. the result of an element-wise operation.
+
+        :param data: New flat data of shape `(sum(lengths),)`.
+        :return: The packed sequences.
+        """
+        return PackedSequences(data, self.lengths, ragged=self.ragged)
+
+    def repeat(self, values: Union[np.ndarray, List[float]]) -> np.ndarray:
+        """
+        Broadcast one value per sequence to all elements of the sequence.
+
+        :param values: Values of shape `(nb_samples,)`.
+        :return: Flat array of shape `(sum(lengths),)`.
+        """
+        return np.repeat(np.asarray(values), self.lengths)
+
+    def flat_indices(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Compute the positions in the flat data of all elements of the selected sequences.
+
+        :param indices: Indices of the selected sequences.
+        :return: Positions into `data` of the concatenated selected sequences.
+        """
+        lengths = self.lengths[indices]
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        return np.repeat(self.offsets[indices] - starts, lengths) + np.arange(lengths.sum())
+
+    def pad(self, max_length: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pad the sequences with zeros to a common length.
+
+        :param max_length: Length of the padded sequences, by default the length of the longest sequence.
+        :return: The padded sequences of shape `(nb_samples, max_length)` and their mask.
+        """
+        if max_length is None:
+            max_length = int(self.lengths.max()) if len(self) > 0 else 0
+
+        x_mask = np.arange(max_length) < self.lengths[:, np.newaxis]
+        x_padded = np.zeros(x_mask.shape, dtype=self.data.dtype)
+        x_padded[x_mask] = self.data
+        return x_padded, x_mask
+
+    def to_array(self) -> np.ndarray:
+        """
+        Unpack the sequences without copying their elements.
+
+        :return: A 1-dimensional object array of views of the sequences if ragged, otherwise a 2-dimensional view.
+        """
+        if not self.ragged:
+            return self.data.reshape(len(self), -1)
+
+        x = np.empty(len(self), dtype=object)
+        for i in range(len(self)):
+            x[i] = self[i]
+        return x
 
 
 # -------------------------------------------------------------------------------------------------------- CUDA SUPPORT
@@ -145,6 +145,44 @@ def test_generate_attacks_and_targeted(art_warning, fix_get_mnist_subset, image_
         art_warning(e)
 
 
+@pytest.mark.only_with_platform("pytorch")
+def test_generate_parallel_and_checkpoint(art_warning, fix_get_mnist_subset, image_dl_estimator, tmp_path):
+    try:
+        from art.attacks.evasion import FastGradientMethod
+
+        classifier, _ = image_dl_estimator(from_logits=True)
+
+        (x_train_mnist, y_train_mnist, _, _) = fix_get_mnist_subset
+
+        def get_attack(**kwargs):
+            attacks = [FastGradientMethod(estimator=classifier, eps=0.1), FastGradientMethod(estimator=classifier)]
+            return AutoAttack(estimator=classifier, eps=0.3, attacks=attacks, targeted=True, **kwargs)
+
+        x_train_mnist_adv = get_attack().generate(x=x_train_mnist, y=y_train_mnist)
+
+        # Sharding the attack steps over worker processes does not change the result
+        x_train_mnist_adv_parallel = get_attack(parallel_pool_size=2).generate(x=x_train_mnist, y=y_train_mnist)
+        np.testing.assert_array_equal(x_train_mnist_adv_parallel, x_train_mnist_adv)
+
+        # Samples appended to the checkpointed samples are attacked incrementally
+        checkpoint_path = str(tmp_path / "auto_attack.npz")
+        x_train_mnist_adv_checkpoint = get_attack(checkpoint_path=checkpoint_path).generate(
+            x=x_train_mnist[:50], y=y_train_mnist[:50]
+        )
+        np.testing.assert_array_equal(x_train_mnist_adv_checkpoint, x_train_mnist_adv[:50])
+
+        x_train_mnist_adv_checkpoint = get_attack(checkpoint_path=checkpoint_path).generate(
+            x=x_train_mnist, y=y_train_mnist
+        )
+        np.testing.assert_array_equal(x_train_mnist_adv_checkpoint, x_train_mnist_adv)
+
+        checkpoint = np.load(checkpoint_path)
+        assert checkpoint["x_adv"].shape == x_train_mnist.shape
+        assert np.all(checkpoint["progress"] == 2 + 2 * 9)
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.skip_framework("tensorflow1", "keras", "pytorch", "non_dl_frameworks", "mxnet", "kerastf")
 def test_check_params(art_warning, image_dl_estimator_for_attack):
     try:
@@ -172,6 +210,12 @@ def test_check_params(art_warning, image_dl_estimator_for_attack):
         with pytest.raises(ValueError):
             _ = AutoAttack(classifier, attacks=attacks, batch_size=-1)
 
+        with pytest.raises(ValueError):
+            _ = AutoAttack(classifier, attacks=attacks, parallel_pool_size=-1)
+
+        with pytest.raises(ValueError):
+            _ = AutoAttack(classifier, attacks=attacks, checkpoint_path=1)
+
     except ARTTestException as e:
         art_warning(e)
 
@@ -19,6 +19,8 @@
 import pytest
 import logging
 
+import numpy as np
+
 from art.attacks.evasion import BoundaryAttack
 from art.estimators.estimator import BaseEstimator
 from art.estimators.classification.classifier import ClassifierMixin
@@ -66,6 +68,40 @@ def test_images(art_warning, fix_get_mnist_subset, image_dl_estimator_for_attack
         art_warning(e)
 
 
+@pytest.mark.framework_agnostic
+def test_batched_proposals(art_warning, fix_get_mnist_subset, image_dl_estimator_for_attack):
+    try:
+        classifier = image_dl_estimator_for_attack(BoundaryAttack)
+        (_, _, x_test_mnist, _) = fix_get_mnist_subset
+        x_test_mnist = x_test_mnist[:5]
+
+        query_sizes = []
+        predict = classifier.predict
+
+        def predict_and_record(x, batch_size=128, **kwargs):
+            query_sizes.append(x.shape[0])
+            return predict(x, batch_size=batch_size, **kwargs)
+
+        classifier.predict = predict_and_record
+
+        # The orthogonal proposals of all samples of a trial are classified in one prediction call
+        attack = BoundaryAttack(estimator=classifier, targeted=False, max_iter=5, batch_size=64, verbose=False)
+        np.random.seed(1234)
+        x_test_adv = attack.generate(x_test_mnist)
+        assert 5 * attack.sample_size in query_sizes
+        assert not (x_test_mnist == x_test_adv).all()
+
+        # Attacking the samples in batches of two gives the same adversarial examples for a fixed seed
+        attack_pairs = BoundaryAttack(estimator=classifier, targeted=False, max_iter=5, batch_size=2, verbose=False)
+        query_sizes.clear()
+        np.random.seed(1234)
+        x_test_adv_pairs = attack_pairs.generate(x_test_mnist)
+        assert max(query_sizes) <= 2 * attack_pairs.sample_size
+        np.testing.assert_array_almost_equal(x_test_adv_pairs, x_test_adv, decimal=5)
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.framework_agnostic
 def test_check_params(art_warning, image_dl_estimator_for_attack):
     try:
@@ -177,6 +177,37 @@ def test_augment_images_with_patch(art_warning, random_location, image_format, f
         art_warning(e)
 
 
+@pytest.mark.parametrize("channels_first", [True, False])
+@pytest.mark.framework_agnostic
+def test_place_patch(art_warning, channels_first):
+    try:
+        x = np.random.rand(4, 3, 12, 10) if channels_first else np.random.rand(4, 12, 10, 3)
+        patch = np.random.rand(3, 4, 5) if channels_first else np.random.rand(4, 5, 3)
+        transforms = [
+            {"i_x_1": i_x_1, "i_y_1": i_y_1, "i_x_2": i_x_1 + 4, "i_y_2": i_y_1 + 5}
+            for i_x_1, i_y_1 in [(0, 0), (8, 5), (3, 2), (8, 0)]
+        ]
+
+        patched_images, _ = DPatch._augment_images_with_patch(
+            x=x, patch=patch, random_location=False, channels_first=channels_first, transforms=transforms
+        )
+        i_n, i_x, i_y = DPatch._patch_indices(transforms)
+
+        for i_image, transform in enumerate(transforms):
+            x_expected = x[i_image].copy()
+            if channels_first:
+                x_expected[:, transform["i_x_1"] : transform["i_x_2"], transform["i_y_1"] : transform["i_y_2"]] = patch
+                patch_region = np.transpose(patched_images[i_n, :, i_x, i_y][i_image], (2, 0, 1))
+            else:
+                x_expected[transform["i_x_1"] : transform["i_x_2"], transform["i_y_1"] : transform["i_y_2"], :] = patch
+                patch_region = patched_images[i_n, i_x, i_y, :][i_image]
+            np.testing.assert_array_equal(patched_images[i_image], x_expected)
+            np.testing.assert_array_equal(patch_region, patch)
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.framework_agnostic
 def test_check_params(art_warning, fix_get_rcnn):
     try:
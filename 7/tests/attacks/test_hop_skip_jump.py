@@ -688,6 +688,39 @@ class TestHopSkipJump(TestBase):
     #     if sess is not None:
     #         sess.close()
 
+    def test_5_pytorch_stacked_gradient_queries(self):
+        x_test = np.reshape(self.x_test_mnist[:5], (5, 1, 28, 28)).astype(np.float32)
+
+        # Build PyTorchClassifier recording the number of examples of each prediction call
+        ptc = get_image_classifier_pt()
+        query_sizes = []
+        predict = ptc.predict
+
+        def predict_and_record(x, batch_size=128, **kwargs):
+            query_sizes.append(x.shape[0])
+            return predict(x, batch_size=batch_size, **kwargs)
+
+        ptc.predict = predict_and_record
+
+        # The evaluations of the first gradient estimates of all samples are stacked into one prediction call
+        hsj = HopSkipJump(
+            classifier=ptc, targeted=False, max_iter=5, max_eval=100, init_eval=10, batch_size=64, verbose=False
+        )
+        np.random.seed(1234)
+        x_test_adv = hsj.generate(x_test)
+        self.assertIn(5 * 10, query_sizes)
+        self.assertFalse((x_test == x_test_adv).all())
+
+        # Evaluating the gradient estimates of one sample per prediction call gives the same adversarial examples
+        hsj_single = HopSkipJump(
+            classifier=ptc, targeted=False, max_iter=5, max_eval=100, init_eval=10, batch_size=10, verbose=False
+        )
+        query_sizes.clear()
+        np.random.seed(1234)
+        x_test_adv_single = hsj_single.generate(x_test)
+        self.assertNotIn(5 * 10, query_sizes)
+        np.testing.assert_array_almost_equal(x_test_adv_single, x_test_adv, decimal=5)
+
     def test_4_pytorch_iris(self):
         classifier = get_tabular_classifier_pt()
         x_test = self.x_test_iris.astype(np.float32)
@@ -19,10 +19,12 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import logging
 import unittest
+from unittest import mock
 
 import numpy as np
 import tensorflow as tf
 
+from art.attacks.evasion.fast_gradient import FastGradientMethod
 from art.attacks.evasion.projected_gradient_descent.projected_gradient_descent import ProjectedGradientDescent
 from art.attacks.evasion.projected_gradient_descent.projected_gradient_descent_numpy import (
     ProjectedGradientDescentNumpy,
@@ -778,6 +780,104 @@ class TestPGD(TestBase):
             np.mean(x_test_adv_np - self.x_test_mnist), np.mean(x_test_adv_fw - self.x_test_mnist), places=6
         )
 
+    def test_7_early_stop_pytorch_mnist(self):
+        x_test_mnist = np.swapaxes(self.x_test_mnist, 1, 3).astype(np.float32)
+        classifier = get_image_classifier_pt()
+
+        for num_random_init in [0, 2]:
+            attack = ProjectedGradientDescentNumpy(
+                classifier,
+                eps=1.0,
+                eps_step=0.1,
+                max_iter=10,
+                num_random_init=num_random_init,
+                batch_size=3,
+                verbose=False,
+            )
+            attack_early_stop = ProjectedGradientDescentNumpy(
+                classifier,
+                eps=1.0,
+                eps_step=0.1,
+                max_iter=10,
+                num_random_init=num_random_init,
+                batch_size=3,
+                verbose=False,
+                early_stop=True,
+            )
+            x_test_adv = attack.generate(x_test_mnist)
+            x_test_adv_early_stop = attack_early_stop.generate(x_test_mnist)
+
+            self.assertLessEqual(np.max(np.abs(x_test_adv_early_stop - x_test_mnist)), 1.0 + 1e-6)
+
+            if num_random_init > 0:
+                continue
+
+            # Without random initialisations samples follow the same trajectory until they are adversarial
+            self.assertGreaterEqual(
+                np.sum(
+                    np.argmax(classifier.predict(x_test_adv_early_stop), axis=1)
+                    != np.argmax(classifier.predict(x_test_mnist), axis=1)
+                ),
+                np.sum(
+                    np.argmax(classifier.predict(x_test_adv), axis=1)
+                    != np.argmax(classifier.predict(x_test_mnist), axis=1)
+                ),
+            )
+
+        # Targeting the predicted classes makes every sample adversarial after its first step, early stopping then
+        # needs a single gradient computation per batch instead of `max_iter`
+        targets = np.eye(10)[np.argmax(classifier.predict(x_test_mnist), axis=1)]
+        nb_batches = int(np.ceil(x_test_mnist.shape[0] / 3))
+        for early_stop in [False, True]:
+            attack = ProjectedGradientDescentNumpy(
+                classifier,
+                eps=1.0,
+                eps_step=0.1,
+                max_iter=10,
+                targeted=True,
+                batch_size=3,
+                verbose=False,
+                early_stop=early_stop,
+            )
+            with mock.patch.object(classifier, "loss_gradient", wraps=classifier.loss_gradient) as loss_gradient:
+                _ = attack.generate(x_test_mnist, y=targets)
+
+            if early_stop:
+                self.assertLess(loss_gradient.call_count, attack.max_iter * nb_batches)
+            else:
+                self.assertEqual(loss_gradient.call_count, attack.max_iter * nb_batches)
+
+    def test_8_tensor_mode_pytorch_mnist(self):
+        x_test_mnist = np.swapaxes(self.x_test_mnist, 1, 3).astype(np.float32)
+        classifier = get_image_classifier_pt()
+        mask = (np.random.rand(*x_test_mnist.shape) > 0.3).astype(np.float32)
+        eps = np.random.uniform(0.1, 0.4, (x_test_mnist.shape[0], 1, 1, 1))
+
+        attacks = [
+            FastGradientMethod(classifier, norm=1, eps=5.0, num_random_init=2, batch_size=3),
+            FastGradientMethod(classifier, eps=eps, eps_step=eps, batch_size=x_test_mnist.shape[0]),
+            ProjectedGradientDescentNumpy(classifier, norm=2, eps=2.0, eps_step=0.5, max_iter=5, verbose=False),
+            ProjectedGradientDescentNumpy(
+                classifier, eps=0.3, eps_step=0.05, decay=0.8, max_iter=5, num_random_init=1, verbose=False
+            ),
+            ProjectedGradientDescentNumpy(
+                classifier, eps=eps, eps_step=eps / 4, max_iter=5, batch_size=x_test_mnist.shape[0], verbose=False
+            ),
+        ]
+
+        for attack in attacks:
+            # Iterations on the device of the classifier give the same examples as iterations on the host
+            self.assertTrue(attack._tensor_mode(x_test_mnist))
+            master_seed(seed=1234)
+            x_test_adv_tensor = attack.generate(x_test_mnist, mask=mask)
+
+            with mock.patch.object(type(attack), "_tensor_mode", return_value=False):
+                master_seed(seed=1234)
+                x_test_adv = attack.generate(x_test_mnist, mask=mask)
+
+            np.testing.assert_array_almost_equal(x_test_adv_tensor, x_test_adv, decimal=6)
+            self.assertFalse((x_test_adv == x_test_mnist).all())
+
     def test_check_params_pt(self):
 
         ptc = get_image_classifier_pt(from_logits=True)
@@ -815,6 +915,9 @@ class TestPGD(TestBase):
         with self.assertRaises(ValueError):
             _ = ProjectedGradientDescent(ptc, verbose="true")
 
+        with self.assertRaises(ValueError):
+            _ = ProjectedGradientDescentNumpy(ptc, early_stop="true")
+
 
 if __name__ == "__main__":
     unittest.main()
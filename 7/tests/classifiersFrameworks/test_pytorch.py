@@ -384,3 +384,116 @@ def test_get_activation_modular(get_default_mnist_subset, image_dl_estimator, de
                 .numpy()
             )
         np.testing.assert_array_almost_equal(activation_i, features_i, decimal=4)
+
+
+@pytest.mark.only_with_platform("pytorch")
+@pytest.mark.parametrize("device_type", ["cpu"])
+# Function to evaluate batched loss gradients and losses against the unbatched computation
+def test_loss_gradient_batch_size(get_default_mnist_subset, image_dl_estimator, device_type):
+    (_, _), (x_test_mnist, y_test_mnist) = get_default_mnist_subset
+    classifier, _ = image_dl_estimator()
+
+    gradients = classifier.loss_gradient(x_test_mnist, y_test_mnist)
+    gradients_batched = classifier.loss_gradient(x_test_mnist, y_test_mnist, batch_size=7)
+    np.testing.assert_array_almost_equal(gradients, gradients_batched, decimal=6)
+
+    gradients = classifier.loss_gradient(torch.from_numpy(x_test_mnist), torch.from_numpy(y_test_mnist))
+    gradients_batched = classifier.loss_gradient(
+        torch.from_numpy(x_test_mnist), torch.from_numpy(y_test_mnist), batch_size=7
+    )
+    np.testing.assert_array_almost_equal(gradients.numpy(), gradients_batched.numpy(), decimal=6)
+
+    for reduction in ["none", "mean", "sum"]:
+        loss = classifier.compute_loss(x_test_mnist, y_test_mnist, reduction=reduction)
+        loss_batched = classifier.compute_loss(x_test_mnist, y_test_mnist, reduction=reduction, batch_size=7)
+        np.testing.assert_array_almost_equal(loss, loss_batched, decimal=4)
+
+    # Means of losses with class weights are normalised by the sum of the weights of all samples
+    classifier_weighted = PyTorchClassifier(
+        model=classifier.model,
+        loss=nn.CrossEntropyLoss(weight=torch.linspace(0.1, 1.0, 10), label_smoothing=0.1),
+        input_shape=classifier.input_shape,
+        nb_classes=classifier.nb_classes,
+        clip_values=classifier.clip_values,
+    )
+    gradients = classifier_weighted.loss_gradient(x_test_mnist, y_test_mnist)
+    gradients_batched = classifier_weighted.loss_gradient(x_test_mnist, y_test_mnist, batch_size=7)
+    np.testing.assert_array_almost_equal(gradients, gradients_batched, decimal=6)
+
+    loss = classifier_weighted.compute_loss(x_test_mnist, y_test_mnist, reduction="mean")
+    loss_batched = classifier_weighted.compute_loss(x_test_mnist, y_test_mnist, reduction="mean", batch_size=7)
+    np.testing.assert_array_almost_equal(loss, loss_batched, decimal=4)
+
+
+@pytest.mark.only_with_platform("pytorch")
+@pytest.mark.parametrize("device_type", ["cpu"])
+# Function to evaluate class gradients for per-sample labels against the full Jacobian
+def test_class_gradient_labels(get_default_mnist_subset, image_dl_estimator, device_type):
+    (_, _), (x_test_mnist, y_test_mnist) = get_default_mnist_subset
+    classifier, _ = image_dl_estimator()
+    labels = np.argmax(y_test_mnist, axis=1)
+
+    gradients_all = classifier.class_gradient(x_test_mnist)
+    assert gradients_all.shape == (x_test_mnist.shape[0], 10) + x_test_mnist.shape[1:]
+
+    gradients_labels = classifier.class_gradient(x_test_mnist, label=labels)
+    np.testing.assert_array_almost_equal(
+        gradients_labels[:, 0], gradients_all[np.arange(x_test_mnist.shape[0]), labels], decimal=5
+    )
+
+    gradients_label = classifier.class_gradient(x_test_mnist, label=3)
+    np.testing.assert_array_almost_equal(gradients_label[:, 0], gradients_all[:, 3], decimal=5)
+
+
+@pytest.mark.only_with_platform("pytorch")
+@pytest.mark.parametrize("device_type", ["cpu"])
+# Function to evaluate loss gradients of tensors created by the classifier against loss gradients of arrays
+def test_tensor_inputs(get_default_mnist_subset, image_dl_estimator, device_type):
+    import torch
+
+    (_, _), (x_test_mnist, y_test_mnist) = get_default_mnist_subset
+    classifier, _ = image_dl_estimator()
+    assert classifier.supports_tensor_inputs
+
+    x_tensor = classifier.to_tensor(x_test_mnist)
+    y_tensor = classifier.to_tensor(y_test_mnist)
+    assert isinstance(x_tensor, torch.Tensor)
+    assert x_tensor.device == classifier.device
+    np.testing.assert_array_equal(classifier.to_numpy(x_tensor), x_test_mnist.astype(np.float32))
+
+    gradients_tensor = classifier.loss_gradient(x_tensor, y_tensor)
+    assert isinstance(gradients_tensor, torch.Tensor)
+    np.testing.assert_array_almost_equal(
+        classifier.to_numpy(gradients_tensor), classifier.loss_gradient(x_test_mnist, y_test_mnist), decimal=5
+    )
+
+
+@pytest.mark.only_with_platform("pytorch")
+@pytest.mark.parametrize("device_type", ["cpu"])
+@pytest.mark.parametrize("training_mode", [False, True])
+# Function to evaluate class gradients for sets of labels per sample against one call per label
+def test_class_gradient_top_k(get_default_mnist_subset, image_dl_estimator, device_type, training_mode):
+    (_, _), (x_test_mnist, _) = get_default_mnist_subset
+    classifier, _ = image_dl_estimator()
+    top_k = 3
+
+    labels = np.argsort(-classifier.predict(x_test_mnist), axis=1)[:, :top_k]
+    gradients_separate = np.concatenate(
+        [
+            classifier.class_gradient(x_test_mnist, label=labels[:, i], training_mode=training_mode)
+            for i in range(top_k)
+        ],
+        axis=1,
+    )
+    assert gradients_separate.shape == (x_test_mnist.shape[0], top_k) + x_test_mnist.shape[1:]
+
+    gradients_labels = classifier.class_gradient(x_test_mnist, label=labels, training_mode=training_mode)
+    np.testing.assert_array_almost_equal(gradients_labels, gradients_separate, decimal=5)
+
+    gradients_top_k = classifier.class_gradient(x_test_mnist, training_mode=training_mode, top_k=top_k)
+    np.testing.assert_array_almost_equal(gradients_top_k, gradients_separate, decimal=5)
+
+    with pytest.raises(ValueError):
+        classifier.class_gradient(x_test_mnist, label=labels, top_k=top_k)
+    with pytest.raises(ValueError):
+        classifier.class_gradient(x_test_mnist, top_k=classifier.nb_classes + 1)
@@ -21,12 +21,15 @@ A unittest class for testing the subset scanning detector.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
+import time
+
 import pytest
 
 import numpy as np
 
 from art.attacks.evasion.fast_gradient import FastGradientMethod
 from art.defences.detector.evasion import SubsetScanningDetector
+from art.defences.detector.evasion.subsetscanning.detector import _pvalue_ranges
 
 from tests.utils import ARTTestException
 
@@ -113,3 +116,106 @@ def test_subsetscannning_detector_detect(art_warning, get_default_mnist_subset,
         assert len(is_adversarial) == len(adv_data)
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.only_with_platform("keras", "kerastf", "tensorflow2", "pytorch")
+def test_subsetscannning_detector_nb_workers(art_warning, get_default_mnist_subset, image_dl_estimator):
+    (x_train, _), (x_test, _) = get_default_mnist_subset
+    classifier, _ = image_dl_estimator()
+
+    try:
+        detector = SubsetScanningDetector(classifier, bgd_data=x_train, layer=1, verbose=False)
+        detector_parallel = SubsetScanningDetector(classifier, bgd_data=x_train, layer=1, nb_workers=2, verbose=False)
+
+        clean_scores, adv_scores, _ = detector.scan(clean_x=x_test[:20], adv_x=x_test[20:40])
+        clean_scores_parallel, adv_scores_parallel, _ = detector_parallel.scan(clean_x=x_test[:20], adv_x=x_test[20:40])
+        np.testing.assert_array_almost_equal(clean_scores_parallel, clean_scores)
+        np.testing.assert_array_almost_equal(adv_scores_parallel, adv_scores)
+
+        _, adv_scores_parallel, _ = detector_parallel.scan(
+            clean_x=x_test[:20], adv_x=x_test[20:40], clean_size=10, adv_size=5, run=4
+        )
+        assert len(adv_scores_parallel) == 4
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("keras", "kerastf", "tensorflow2", "pytorch")
+def test_subsetscannning_detector_pvalue_ranges(art_warning, get_default_mnist_subset, image_dl_estimator):
+    (x_train, _), (x_test, _) = get_default_mnist_subset
+    classifier, _ = image_dl_estimator()
+
+    try:
+        detector = SubsetScanningDetector(classifier, bgd_data=x_train, layer=1, verbose=False)
+        assert x_test.shape[0] > detector.VECTORIZED_SEARCH_MAX_RECORDS
+
+        # Baseline searching the background activations of each node separately
+        bgd_activations = detector.sorted_bgd_activations
+        eval_activations = detector._get_activations(x_test, detector._layer_name, batch_size=128)
+        eval_activations = np.reshape(eval_activations, (eval_activations.shape[0], -1))
+        pval_ranges_expected = np.empty(eval_activations.shape + (2,))
+        for j in range(eval_activations.shape[1]):
+            pval_ranges_expected[:, j, 0] = np.searchsorted(bgd_activations[:, j], eval_activations[:, j], side="right")
+            pval_ranges_expected[:, j, 1] = np.searchsorted(bgd_activations[:, j], eval_activations[:, j], side="left")
+        pval_ranges_expected = bgd_activations.shape[0] - pval_ranges_expected
+        pval_ranges_expected[:, :, 0] /= bgd_activations.shape[0] + 1
+        pval_ranges_expected[:, :, 1] = (pval_ranges_expected[:, :, 1] + 1) / (bgd_activations.shape[0] + 1)
+
+        pval_ranges = detector._calculate_pvalue_ranges(x_test)
+        np.testing.assert_array_equal(pval_ranges, pval_ranges_expected)
+        np.testing.assert_array_equal(detector._calculate_pvalue_ranges(x_test[:5]), pval_ranges[:5])
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.framework_agnostic
+def test_subsetscannning_detector_pvalue_ranges_speed(art_warning):
+    def pvalue_ranges_per_node(sorted_bgd_activations, eval_activations):
+        pvalue_ranges = np.empty(eval_activations.shape + (2,))
+        for j in range(eval_activations.shape[1]):
+            pvalue_ranges[:, j, 0] = np.searchsorted(sorted_bgd_activations[:, j], eval_activations[:, j], side="right")
+            pvalue_ranges[:, j, 1] = np.searchsorted(sorted_bgd_activations[:, j], eval_activations[:, j], side="left")
+        pvalue_ranges = sorted_bgd_activations.shape[0] - pvalue_ranges
+        pvalue_ranges[:, :, 0] /= sorted_bgd_activations.shape[0] + 1
+        pvalue_ranges[:, :, 1] = (pvalue_ranges[:, :, 1] + 1) / (sorted_bgd_activations.shape[0] + 1)
+        return pvalue_ranges
+
+    def best_time(function, *args):
+        durations = []
+        for _ in range(3):
+            start = time.perf_counter()
+            result = function(*args)
+            durations.append(time.perf_counter() - start)
+        return result, min(durations)
+
+    try:
+        rng = np.random.default_rng(1234)
+        sorted_bgd_activations = np.sort(rng.random((200, 10000), dtype=np.float32), axis=0)
+        max_vectorized_records = SubsetScanningDetector.VECTORIZED_SEARCH_MAX_RECORDS
+
+        # Searching all nodes at once pays off for small batches only, larger batches must not be slower than the loop
+        # over the nodes
+        for nb_records in [max_vectorized_records, 512]:
+            eval_activations = rng.random((nb_records, 10000), dtype=np.float32)
+            pvalue_ranges, duration = best_time(
+                _pvalue_ranges, sorted_bgd_activations, eval_activations, max_vectorized_records
+            )
+            pvalue_ranges_expected, duration_expected = best_time(
+                pvalue_ranges_per_node, sorted_bgd_activations, eval_activations
+            )
+            np.testing.assert_array_equal(pvalue_ranges, pvalue_ranges_expected)
+            assert duration < 1.5 * duration_expected
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("keras", "kerastf", "tensorflow2", "pytorch")
+def test_check_params(art_warning, get_default_mnist_subset, image_dl_estimator):
+    (x_train, _), (_, _) = get_default_mnist_subset
+    classifier, _ = image_dl_estimator()
+
+    try:
+        with pytest.raises(ValueError):
+            _ = SubsetScanningDetector(classifier, bgd_data=x_train, layer=1, nb_workers=0)
+    except ARTTestException as e:
+        art_warning(e)
@@ -18,12 +18,14 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import logging
+import os
+import tempfile
 import unittest
 
 from keras_preprocessing.image import ImageDataGenerator
 import numpy as np
 
-from art.data_generators import KerasDataGenerator
+from art.data_generators import KerasDataGenerator, NumpyDataGenerator
 from art.defences.detector.poison import ActivationDefence
 from art.utils import load_mnist
 from art.visualization import convert_to_rgb
@@ -194,6 +196,35 @@ class TestActivationDefence(unittest.TestCase):
         self.assertNotEqual(sum_dist, sum_size)
         self.assertNotEqual(sum_dist_gen, sum_size_gen)
 
+    def test_cluster_activations_generator(self):
+        # Get MNIST
+        (x_train, y_train), (_, _), (_, _) = self.mnist
+
+        with tempfile.TemporaryDirectory() as activations_path:
+            data_gen = NumpyDataGenerator(x_train, y_train, batch_size=50, shuffle=False)
+            defence_gen = ActivationDefence(self.classifier, None, None, generator=data_gen)
+            defence_mmap = ActivationDefence(
+                self.classifier, None, None, generator=data_gen, activations_path=activations_path
+            )
+
+            clusters_by_class, red_activations_by_class = defence_gen.cluster_activations(nb_clusters=2, nb_dims=10)
+            _ = defence_mmap.cluster_activations(nb_clusters=2, nb_dims=10)
+            self.assertEqual(len(os.listdir(activations_path)), self.classifier.nb_classes)
+
+            n_dp = 0
+            for class_idx in range(self.classifier.nb_classes):
+                nb_class = np.sum(np.argmax(y_train, axis=1) == class_idx)
+                self.assertEqual(len(clusters_by_class[class_idx]), nb_class)
+                self.assertEqual(red_activations_by_class[class_idx].shape, (nb_class, 10))
+                np.testing.assert_array_equal(
+                    defence_gen.activations_by_class[class_idx], defence_mmap.activations_by_class[class_idx]
+                )
+                n_dp += len(clusters_by_class[class_idx])
+            self.assertEqual(len(x_train), n_dp)
+
+            _, is_clean_lst = defence_gen.detect_poison(nb_clusters=2, nb_dims=10, reduce="PCA")
+            self.assertEqual(len(x_train), len(is_clean_lst))
+
     def test_evaluate_defense(self):
         # Get MNIST
         (x_train, _), (_, _), (_, _) = self.mnist
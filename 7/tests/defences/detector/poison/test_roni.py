@@ -21,6 +21,7 @@ import logging
 import unittest
 
 import numpy as np
+from sklearn.linear_model import SGDClassifier
 from sklearn.svm import SVC
 
 from art.attacks.poisoning.poisoning_attack_svm import PoisoningAttackSVM
@@ -148,6 +149,35 @@ class TestRONI(unittest.TestCase):
         )
         self.assertRaises(ValueError, self.defense_cal.set_params, x_train=-all_data, y_train=y_test)
 
+    def test_wrong_parameters_3(self):
+        self.assertRaises(ValueError, self.defense_cal.set_params, nb_workers=0)
+        self.assertRaises(ValueError, self.defense_cal.set_params, incremental_epochs=0)
+        # SVC does not support partial_fit
+        self.assertRaises(ValueError, self.defense_cal.set_params, incremental_epochs=1)
+
+    def test_detect_poison_parallel(self):
+        (all_data, all_labels), (_, _), (trusted_data, trusted_labels), (_, _), (_, _) = self.mnist
+
+        master_seed(seed=1234)
+        defence_serial = RONIDefense(self.classifier, all_data, all_labels, trusted_data, trusted_labels)
+        _, clean_serial = defence_serial.detect_poison()
+
+        master_seed(seed=1234)
+        defence_parallel = RONIDefense(
+            self.classifier, all_data, all_labels, trusted_data, trusted_labels, nb_workers=2
+        )
+        _, clean_parallel = defence_parallel.detect_poison()
+
+        self.assertEqual(clean_serial, clean_parallel)
+
+    def test_detect_poison_incremental(self):
+        (all_data, all_labels), (_, _), (trusted_data, trusted_labels), (_, _), (min_, max_) = self.mnist
+
+        classifier = SklearnClassifier(model=SGDClassifier(), clip_values=(min_, max_))
+        defence = RONIDefense(classifier, all_data, all_labels, trusted_data, trusted_labels, incremental_epochs=2)
+        _, is_clean_lst = defence.detect_poison()
+        self.assertEqual(len(is_clean_lst), NB_TRAIN + NB_POISON)
+
     def test_detect_poison(self):
         _, clean_trust = self.defense_cal.detect_poison()
         _, clean_no_trust = self.defence_no_cal.detect_poison()
@@ -117,6 +117,21 @@ def test_jpeg_compress(art_warning, image_batch, channels_first):
         art_warning(e)
 
 
+@pytest.mark.parametrize("channels_first", [True, False])
+@pytest.mark.framework_agnostic
+def test_jpeg_compression_nb_workers(art_warning, video_batch, channels_first):
+    try:
+        test_input, _ = video_batch
+        test_input = np.random.RandomState(1234).uniform(0, 255, size=test_input.shape).astype(ART_NUMPY_DTYPE)
+
+        jpeg_compression = JpegCompression(clip_values=(0, 255), channels_first=channels_first)
+        jpeg_compression_parallel = JpegCompression(clip_values=(0, 255), channels_first=channels_first, nb_workers=3)
+
+        assert_array_equal(jpeg_compression_parallel(test_input)[0], jpeg_compression(test_input)[0])
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.framework_agnostic
 def test_non_spatial_data_error(art_warning, tabular_batch):
     try:
@@ -145,6 +160,9 @@ def test_check_params(art_warning):
         with pytest.raises(ValueError):
             _ = JpegCompression(clip_values=(0, 1, 2))
 
+        with pytest.raises(ValueError):
+            _ = JpegCompression(clip_values=(0, 1), nb_workers=0)
+
         with pytest.raises(ValueError):
             _ = JpegCompression(clip_values=(0, 1), verbose="False")
 
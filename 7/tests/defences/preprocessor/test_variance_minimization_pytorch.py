@@ -0,0 +1,95 @@
+# MIT License
+#
+# Copyright (C) The Adversarial Robustness Toolbox (ART) Authors 2022
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+# persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+# Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+
+import numpy as np
+import pytest
+
+from art.defences.preprocessor import TotalVarMin, TotalVarMinPyTorch
+from tests.utils import ARTTestException
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.only_with_platform("pytorch")
+@pytest.mark.parametrize("channels_first", [True, False])
+@pytest.mark.parametrize("norm", [1, 2])
+def test_total_var_min_pytorch(art_warning, channels_first, norm):
+    try:
+        clip_values = (0, 1)
+        x = np.random.rand(2, 16, 16, 3).astype(np.float32)
+        if channels_first:
+            x = np.transpose(x, (0, 3, 1, 2))
+
+        preprocess = TotalVarMinPyTorch(
+            norm=norm, channels_first=channels_first, clip_values=clip_values, device_type="cpu"
+        )
+        x_preprocessed, _ = preprocess(x)
+
+        assert x_preprocessed.shape == x.shape
+        assert x_preprocessed.dtype == x.dtype
+        assert np.all(x_preprocessed >= clip_values[0])
+        assert np.all(x_preprocessed <= clip_values[1])
+        assert not np.all(x_preprocessed == x)
+
+        # The purification strength is comparable to the NumPy implementation
+        if channels_first:
+            x = np.transpose(x, (0, 2, 3, 1))
+            x_preprocessed = np.transpose(x_preprocessed, (0, 2, 3, 1))
+        x_numpy, _ = TotalVarMin(norm=norm, clip_values=clip_values, batch_size=2)(x)
+        assert np.mean(np.abs(x_preprocessed - x)) == pytest.approx(np.mean(np.abs(x_numpy - x)), rel=0.25)
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_total_var_min_pytorch_estimate_gradient(art_warning):
+    try:
+        x = np.random.rand(2, 16, 16, 3).astype(np.float32)
+        grad = np.random.rand(2, 16, 16, 3).astype(np.float32)
+        preprocess = TotalVarMinPyTorch(device_type="cpu")
+
+        x_grad = preprocess.estimate_gradient(x=x, grad=grad)
+
+        assert x_grad.shape == x.shape
+        np.testing.assert_array_almost_equal(x_grad, grad)
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.only_with_platform("pytorch")
+def test_check_params(art_warning):
+    try:
+        with pytest.raises(ValueError):
+            _ = TotalVarMinPyTorch(prob=-1)
+
+        with pytest.raises(ValueError):
+            _ = TotalVarMinPyTorch(norm=0)
+
+        with pytest.raises(ValueError):
+            _ = TotalVarMinPyTorch(max_iter=-1)
+
+        with pytest.raises(ValueError):
+            _ = TotalVarMinPyTorch(clip_values=(1, 0))
+
+        with pytest.raises(ValueError):
+            _ = TotalVarMinPyTorch(verbose="False")
+    except ARTTestException as e:
+        art_warning(e)
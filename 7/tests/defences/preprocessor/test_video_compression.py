@@ -54,6 +54,50 @@ def test_video_compresssion(art_warning, video_batch, channels_first):
         art_warning(e)
 
 
+@pytest.mark.parametrize("channels_first", [True, False])
+@pytest.mark.skip_framework("keras", "pytorch", "scikitlearn", "mxnet")
+def test_video_compresssion_in_memory(art_warning, video_batch, channels_first):
+    try:
+        test_input, test_output = video_batch
+        video_compression = VideoCompression(
+            video_format="mp4", constant_rate_factor=0, channels_first=channels_first, in_memory=True, nb_workers=2
+        )
+
+        assert_array_equal(video_compression(test_input)[0], test_output)
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.skip_framework("keras", "pytorch", "scikitlearn", "mxnet")
+def test_compress_video_in_memory_call(art_warning):
+    try:
+        test_input = np.random.rand(3, 3, 8, 16, 16)
+        video_compression = VideoCompression(video_format="mp4", constant_rate_factor=50, channels_first=True)
+        video_compression_in_memory = VideoCompression(
+            video_format="mp4", constant_rate_factor=50, channels_first=True, in_memory=True, nb_workers=2
+        )
+
+        assert_array_equal(video_compression_in_memory(test_input)[0], video_compression(test_input)[0])
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.skip_framework("keras", "pytorch", "scikitlearn", "mxnet")
+def test_compress_video_in_memory_error(art_warning):
+    try:
+        import ffmpeg
+
+        # H.264 with 4:2:0 chroma subsampling rejects frames of odd width
+        test_input = np.random.rand(1, 3, 2, 5, 5)
+        video_compression = VideoCompression(video_format="mp4", channels_first=True, in_memory=True)
+
+        with pytest.warns(UserWarning), pytest.raises(ffmpeg.Error) as exception:
+            video_compression(test_input)
+        assert b"not divisible by 2" in exception.value.stderr
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.skip_framework("keras", "pytorch", "scikitlearn", "mxnet")
 def test_compress_video_call(art_warning):
     try:
@@ -75,6 +119,17 @@ def test_constant_rate_factor_error(art_warning, constant_rate_factor):
         art_warning(e)
 
 
+def test_check_params(art_warning):
+    try:
+        with pytest.raises(ValueError):
+            VideoCompression(video_format="", in_memory="True")
+
+        with pytest.raises(ValueError):
+            VideoCompression(video_format="", nb_workers=0)
+    except ARTTestException as e:
+        art_warning(e)
+
+
 def test_non_spatio_temporal_data_error(art_warning, image_batch_small):
     try:
         test_input = image_batch_small
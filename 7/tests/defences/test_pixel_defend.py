@@ -104,6 +104,27 @@ class TestPixelDefend(unittest.TestCase):
         self.assertTrue((x_defended <= 1.0).all())
         self.assertTrue((x_defended >= 0.0).all())
 
+    def test_autoregressive(self):
+        # Define the network
+        model = Model()
+        loss_fn = nn.CrossEntropyLoss()
+        optimizer = optim.Adam(model.parameters(), lr=0.01)
+        pixel_cnn = PyTorchClassifier(
+            model=model, loss=loss_fn, optimizer=optimizer, input_shape=(4,), nb_classes=2, clip_values=(0, 1)
+        )
+
+        x = np.random.rand(5, 4).astype(np.float32)
+        x_defended, _ = PixelDefend(eps=5, pixel_cnn=pixel_cnn)(x)
+        x_defended_autoregressive, _ = PixelDefend(eps=5, pixel_cnn=pixel_cnn, autoregressive=True)(x)
+
+        self.assertEqual(x_defended_autoregressive.shape, x.shape)
+        self.assertTrue((x_defended_autoregressive <= 1.0).all())
+        self.assertTrue((x_defended_autoregressive >= 0.0).all())
+        self.assertTrue((np.abs(x_defended_autoregressive - x) <= 6 / 255).all())
+
+        # The first feature is purified with the probabilities of the input in both cases
+        np.testing.assert_array_equal(x_defended_autoregressive[:, 0], x_defended[:, 0])
+
     def test_check_params(self):
         model = Model()
         loss_fn = nn.CrossEntropyLoss()
@@ -130,6 +151,9 @@ class TestPixelDefend(unittest.TestCase):
         with self.assertRaises(ValueError):
             _ = PixelDefend(pixel_cnn=pixel_cnn, batch_size=-1)
 
+        with self.assertRaises(ValueError):
+            _ = PixelDefend(pixel_cnn=pixel_cnn, autoregressive="False")
+
         with self.assertRaises(ValueError):
             _ = PixelDefend(pixel_cnn=pixel_cnn, verbose="False")
 
@@ -57,6 +57,27 @@ class TestTotalVarMin(unittest.TestCase):
         # Check that x has not been modified by attack and classifier
         self.assertAlmostEqual(float(np.max(np.abs(x_original - x))), 0.0, delta=0.00001)
 
+    def test_batch_size(self):
+        clip_values = (0, 1)
+        x = np.random.rand(5, 16, 16, 3)
+        preprocess = TotalVarMin(clip_values=clip_values, batch_size=2)
+        x_preprocessed, _ = preprocess(x)
+        self.assertEqual(x_preprocessed.shape, x.shape)
+        self.assertTrue((x_preprocessed >= clip_values[0]).all())
+        self.assertTrue((x_preprocessed <= clip_values[1]).all())
+        self.assertFalse((x_preprocessed == x).all())
+
+        # The stacked loss and derivative are the sums and concatenations of the per-channel ones
+        z = np.random.rand(3, 16, 16)
+        x_c = np.random.rand(3, 16, 16)
+        mask = (np.random.rand(3, 16, 16) < 0.3).astype("int")
+        loss = TotalVarMin._loss_func(z.flatten(), x_c, mask, 2, 0.5)
+        deri = TotalVarMin._deri_loss_func(z.flatten(), x_c, mask, 2, 0.5)
+        loss_c = [TotalVarMin._loss_func(z[i].flatten(), x_c[i], mask[i], 2, 0.5) for i in range(3)]
+        deri_c = [TotalVarMin._deri_loss_func(z[i].flatten(), x_c[i], mask[i], 2, 0.5) for i in range(3)]
+        self.assertAlmostEqual(loss, sum(loss_c), places=6)
+        np.testing.assert_array_almost_equal(deri, np.concatenate(deri_c))
+
     def test_failure_feature_vectors(self):
         x = np.random.rand(10, 3)
         preprocess = TotalVarMin()
@@ -80,6 +101,9 @@ class TestTotalVarMin(unittest.TestCase):
         with self.assertRaises(ValueError):
             _ = TotalVarMin(max_iter=-1)
 
+        with self.assertRaises(ValueError):
+            _ = TotalVarMin(batch_size=0)
+
         with self.assertRaises(ValueError):
             _ = TotalVarMin(clip_values=(0, 1, 2))
 
@@ -24,7 +24,7 @@ import numpy as np
 import torch
 
 from art.utils import load_dataset
-from art.estimators.certification.deep_z import PytorchDeepZ
+from art.estimators.certification.deep_z import PytorchDeepZ, ZonoConv
 from tests.utils import ARTTestException
 from tests.utils import get_image_classifier_pt, get_cifar10_image_classifier_pt
 
@@ -257,3 +257,98 @@ def test_cifar_certification(art_warning, fix_get_cifar10_data):
 
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.skip_framework("mxnet", "non_dl_frameworks", "tensorflow1", "keras", "kerastf", "tensorflow2")
+def test_mnist_predict_zonotopes_batch(art_warning, fix_get_mnist_data):
+    """
+    Check that zonotopes pushed through the network in batches match the zonotopes of single samples, and that merging
+    error terms only loosens the bounds.
+    """
+    bound = 0.05
+
+    ptc = get_image_classifier_pt(from_logits=True, use_maxpool=False)
+
+    zonotope_model = PytorchDeepZ(
+        model=ptc.model, clip_values=(0, 1), loss=torch.nn.CrossEntropyLoss(), input_shape=(1, 28, 28), nb_classes=10
+    )
+
+    try:
+        x_test = fix_get_mnist_data[0][:10].astype("float32")
+        zonotope_model.model.set_forward_mode("abstract")
+        bias_batch, eps_batch = zonotope_model.predict_zonotopes(x_test, bound, batch_size=4)
+        bias_merged, eps_merged = zonotope_model.predict_zonotopes(x_test, bound, batch_size=4, max_error_terms=500)
+
+        assert len(bias_batch) == len(eps_batch) == len(bias_merged) == len(eps_merged) == 10
+
+        for i, x in enumerate(x_test):
+            data_sample_processed, eps_bound = zonotope_model.pre_process(cent=x, eps=np.eye(784) * bound)
+            data_sample_processed = np.expand_dims(data_sample_processed, axis=0)
+            bias, eps = zonotope_model.model.forward(eps=eps_bound, cent=data_sample_processed)
+            bias = bias.detach().cpu().numpy()
+            eps = eps.detach().cpu().numpy()
+
+            assert bias_batch[i].shape == (1, 10)
+            assert eps_batch[i].shape == eps.shape
+            assert np.allclose(bias_batch[i][0], bias, rtol=1e-05, atol=1e-05)
+            assert np.allclose(eps_batch[i], eps, rtol=1e-05, atol=1e-05)
+
+            assert eps_merged[i].shape[0] <= 784
+            upper_bounds = bias + np.sum(np.abs(eps), axis=0)
+            lower_bounds = bias - np.sum(np.abs(eps), axis=0)
+            assert np.all(bias_merged[i][0] + np.sum(np.abs(eps_merged[i]), axis=0) >= upper_bounds - 1e-05)
+            assert np.all(bias_merged[i][0] - np.sum(np.abs(eps_merged[i]), axis=0) <= lower_bounds + 1e-05)
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
+@pytest.mark.skip_framework("mxnet", "non_dl_frameworks", "tensorflow1", "keras", "kerastf", "tensorflow2")
+def test_diagonal_zonotopes_conv(art_warning):
+    """
+    Check the responses of a convolution to each input feature and that a custom `pre_process` is applied to the
+    zonotopes pushed through the network in batches.
+    """
+    bound = 0.05
+
+    class PreProcessHalf(PytorchDeepZ):
+        def pre_process(self, cent, eps):
+            cent, eps = super().pre_process(cent, eps)
+            return cent, eps / 2
+
+    try:
+        zono_conv = ZonoConv(in_channels=3, out_channels=4, kernel_size=3, stride=2, dilation=1, padding=1)
+        responses_expected = zono_conv.conv(torch.eye(3 * 9 * 8).reshape((3 * 9 * 8, 3, 9, 8)))
+        assert torch.equal(zono_conv.unit_responses((3, 9, 8)), responses_expected)
+
+        ptc = get_image_classifier_pt(from_logits=True, use_maxpool=False, load_init=False)
+        x_test = np.random.rand(3, 1, 28, 28).astype("float32")
+
+        zonotope_model = PytorchDeepZ(
+            model=ptc.model,
+            clip_values=(0, 1),
+            loss=torch.nn.CrossEntropyLoss(),
+            input_shape=(1, 28, 28),
+            nb_classes=10,
+        )
+        zonotope_model_half = PreProcessHalf(
+            model=ptc.model,
+            clip_values=(0, 1),
+            loss=torch.nn.CrossEntropyLoss(),
+            input_shape=(1, 28, 28),
+            nb_classes=10,
+        )
+        for model in [zonotope_model, zonotope_model_half]:
+            model.model.set_forward_mode("abstract")
+            bias_batch, eps_batch = model.predict_zonotopes(x_test, bound, batch_size=2)
+
+            for i, x in enumerate(x_test):
+                data_sample_processed, eps_bound = model.pre_process(cent=x, eps=np.eye(784) * bound)
+                data_sample_processed = np.expand_dims(data_sample_processed, axis=0)
+                bias, eps = model.model.forward(eps=eps_bound, cent=data_sample_processed)
+
+                assert np.allclose(bias_batch[i][0], bias.detach().cpu().numpy(), rtol=1e-05, atol=1e-05)
+                assert np.allclose(eps_batch[i], eps.detach().cpu().numpy(), rtol=1e-05, atol=1e-05)
+
+    except ARTTestException as e:
+        art_warning(e)
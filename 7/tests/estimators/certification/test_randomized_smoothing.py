@@ -303,6 +303,28 @@ class TestRandomizedSmoothingVectors(unittest.TestCase):
         self.assertTrue((radius <= 1).all())
         self.assertTrue((pred < y_test.shape[1]).all())
 
+    def test_iris_batch_prediction_counts(self):
+        (_, _), (x_test, _) = self.iris
+        x_test = x_test[:5]
+
+        ptc = get_tabular_classifier_pt()
+        rs = NumpyRandomizedSmoothing(classifier=ptc, sample_size=100, scale=0.1, alpha=0.001)
+
+        # Noisy samples of several inputs share the batches of the classifier
+        master_seed(seed=1234)
+        counts = rs._batch_prediction_counts(x_test, n=30, batch_size=16)
+        self.assertEqual(counts.shape, (len(x_test), ptc.nb_classes))
+        np.testing.assert_array_equal(np.sum(counts, axis=1), 30)
+
+        master_seed(seed=1234)
+        counts_single = np.stack([rs._prediction_counts(x_i, n=30, batch_size=16) for x_i in x_test])
+        np.testing.assert_array_equal(counts, counts_single)
+
+        pred, radius = rs.certify(x=x_test, n=250, batch_size=64)
+        self.assertEqual(pred.shape, (len(x_test),))
+        self.assertEqual(radius.shape, (len(x_test),))
+        self.assertTrue((radius[pred == -1] == 0).all())
+
 
 if __name__ == "__main__":
     unittest.main()
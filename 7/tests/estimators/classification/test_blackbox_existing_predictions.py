@@ -19,7 +19,7 @@ import pytest
 
 import numpy as np
 
-from art.estimators.classification.blackbox import BlackBoxClassifierNeuralNetwork, BlackBoxClassifier
+from art.estimators.classification.blackbox import BlackBoxClassifierNeuralNetwork, BlackBoxClassifier, FuzzyMapping
 from tests.utils import ARTTestException
 
 
@@ -51,6 +51,25 @@ def test_blackbox_existing_predictions_fuzzy(art_warning):
         art_warning(e)
 
 
+def test_blackbox_existing_predictions_batch(art_warning):
+    try:
+        rng = np.random.RandomState(1234)
+        x = rng.rand(1000, 4, 3).astype(np.float32)
+        y = np.eye(5)[rng.randint(0, 5, size=1000)]
+        permutation = rng.permutation(1000)
+
+        bb = BlackBoxClassifier((x, y), (4, 3), 5)
+        np.testing.assert_array_equal(bb.predict(x[permutation], batch_size=256), y[permutation])
+
+        bb = BlackBoxClassifier((x, y), (4, 3), 5, fuzzy_float_compare=True)
+        np.testing.assert_array_equal(bb.predict(x[permutation] * (1 + 1e-6), batch_size=256), y[permutation])
+
+        with pytest.raises(ValueError):
+            bb.predict(x[:10] + 0.1)
+    except ARTTestException as e:
+        art_warning(e)
+
+
 def test_blackbox_nn_existing_predictions(art_warning, get_mnist_dataset):
     try:
         _, (x_test, y_test) = get_mnist_dataset
@@ -77,3 +96,52 @@ def test_blackbox_nn_existing_predictions_fuzzy(art_warning):
         assert np.array_equal(bb.predict(fuzzy_x), y)
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.parametrize("cache_policy", ["lru", "lfu"])
+def test_blackbox_query_cache(art_warning, cache_policy):
+    try:
+        queries = []
+
+        def predict_fn(x):
+            queries.append(x.shape[0])
+            return np.eye(2)[(x[:, 0] > 0.5).astype(int)]
+
+        x = np.array([[0.1], [0.9], [0.1], [0.7]])
+        bb = BlackBoxClassifier(predict_fn, (1,), 2, cache_size=2, cache_policy=cache_policy)
+
+        # Repeated inputs within a batch are queried only once
+        np.testing.assert_array_equal(bb.predict(x), predict_fn(x))
+        assert queries[0] == 3
+        assert bb.query_cache.hits == 1
+        assert bb.query_cache.misses == 3
+        assert len(bb.query_cache) == 2
+
+        # Cached inputs are not queried again, the first input has been evicted
+        queries.clear()
+        np.testing.assert_array_equal(bb.predict(x[2:]), predict_fn(x[2:]))
+        assert queries[0] == 1
+        assert bb.query_cache.hit_rate == pytest.approx(2 / 6)
+
+        with bb.query_budget("attack", max_queries=1):
+            bb.predict(np.array([[0.2]]))
+            with pytest.raises(ValueError):
+                bb.predict(np.array([[0.3]]))
+        assert bb.query_cache.query_counts == {"attack": 1}
+
+        with pytest.raises(ValueError):
+            _ = BlackBoxClassifier(predict_fn, (1,), 2, cache_size=2, cache_policy="fifo")
+    except ARTTestException as e:
+        art_warning(e)
+
+
+def test_blackbox_fuzzy_mapping_deprecated(art_warning):
+    try:
+        with pytest.deprecated_call():
+            mapping = FuzzyMapping(np.array([0.1, 0.2]), 1)
+        with pytest.deprecated_call():
+            assert mapping == FuzzyMapping(np.array([0.1, 0.2 + 1e-10]))
+        with pytest.deprecated_call():
+            assert mapping < FuzzyMapping(np.array([0.1, 0.3]))
+    except ARTTestException as e:
+        art_warning(e)
@@ -489,6 +489,34 @@ class TestScikitlearnSVCSVC(TestBase):
             "Unrecognized type for argument `label` with type <class 'numpy.ndarray'>", str(context.exception)
         )
 
+    def test_class_gradient_kernels(self):
+        # Compare the gradients of binary models to finite differences of their decision functions
+        binary = np.argmax(self.y_train_iris, axis=1) < 2
+        x_train, y_train = self.x_train_iris[binary], self.y_train_iris[binary, :2]
+        x_test = self.x_test_iris[0:3]
+        delta = 1e-6
+
+        for kernel in ["linear", "poly", "rbf", "sigmoid"]:
+            classifier = ScikitlearnSVC(model=SVC(kernel=kernel, gamma="auto"))
+            classifier.fit(x=x_train, y=y_train)
+
+            grad_predicted = classifier.class_gradient(x_test, label=1)[:, 0]
+            grad_expected = np.stack(
+                [
+                    (
+                        classifier.model.decision_function(x_test + delta * np.eye(x_test.shape[1])[i])
+                        - classifier.model.decision_function(x_test - delta * np.eye(x_test.shape[1])[i])
+                    )
+                    / (2 * delta)
+                    for i in range(x_test.shape[1])
+                ],
+                axis=1,
+            )
+            np.testing.assert_array_almost_equal(grad_predicted, grad_expected, decimal=4)
+
+            grad_loss = classifier.loss_gradient(x_test, np.asarray([[1.0, 0.0]] * len(x_test)))
+            np.testing.assert_array_almost_equal(grad_loss, grad_expected, decimal=4)
+
     def test_save(self):
         self.classifier.save(filename="test.file", path=None)
         self.classifier.save(filename="test.file", path="./")
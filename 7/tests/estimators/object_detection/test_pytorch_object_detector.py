@@ -298,6 +298,30 @@ def test_loss_gradient(art_warning, get_pytorch_object_detector):
         art_warning(e)
 
 
+@pytest.mark.only_with_platform("pytorch")
+def test_loss_gradient_per_image(art_warning, get_pytorch_object_detector, monkeypatch):
+    import torch
+
+    try:
+        object_detector, x_test, y_test = get_pytorch_object_detector
+
+        # sample the first anchors and proposals instead of random ones, which makes the losses deterministic
+        monkeypatch.setattr(torch, "randperm", lambda n, **kwargs: torch.arange(n, device=kwargs.get("device")))
+
+        grads_batch = object_detector.loss_gradient(x_test, y_test)
+
+        # gradients computed one image at a time match the gradients computed in one batch
+        grads_per_image = np.concatenate(
+            [object_detector.loss_gradient(x_test[[i]], [y_test[i]]) for i in range(x_test.shape[0])]
+        )
+
+        assert grads_per_image.shape == grads_batch.shape == (2, 28, 28, 3)
+        np.testing.assert_array_equal(grads_per_image, grads_batch)
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
 @pytest.mark.only_with_platform("pytorch")
 def test_loss_gradient_mask(art_warning, get_pytorch_object_detector_mask):
     try:
@@ -20,6 +20,7 @@ import pytest
 import numpy as np
 
 from art.estimators.regression import BlackBoxRegressor
+from art.estimators.regression.blackbox import FuzzyMapping
 from art.config import ART_NUMPY_DTYPE
 from tests.utils import ARTTestException
 
@@ -60,6 +61,23 @@ def test_blackbox_existing_predictions_fuzzy(art_warning):
         art_warning(e)
 
 
+def test_blackbox_existing_predictions_fuzzy_batch(art_warning):
+    try:
+        x = np.arange(200, dtype=np.float64).reshape((100, 2))
+        y = np.arange(100, dtype=np.float64) / 10
+        bb = BlackBoxRegressor((x, y), (2,), fuzzy_float_compare=True)
+        assert np.array_equal(bb.predict(x[::-1] * (1 + 1e-6)), y[::-1].astype(ART_NUMPY_DTYPE))
+
+        with pytest.raises(ValueError):
+            bb.predict(x + 0.5)
+
+        with pytest.deprecated_call():
+            _ = FuzzyMapping(x[0], y[0])
+
+    except ARTTestException as e:
+        art_warning(e)
+
+
 def test_blackbox_existing_predictions_custom_loss(art_warning, get_diabetes_dataset):
     try:
         (_, _), (x_test, y_test) = get_diabetes_dataset
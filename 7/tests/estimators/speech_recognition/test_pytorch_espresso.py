@@ -124,3 +124,39 @@ def test_pytorch_espresso(art_warning, expected_values, device_type):
 
     except ARTTestException as e:
         art_warning(e)
+
+
+@pytest.mark.skip_module("espresso")
+@pytest.mark.skip_framework("tensorflow", "tensorflow2v1", "keras", "kerastf", "mxnet", "non_dl_frameworks")
+@pytest.mark.parametrize("device_type", ["cpu"])
+def test_pytorch_espresso_loss_gradient_batch_size(art_warning, device_type):
+    from art.estimators.speech_recognition.pytorch_espresso import PyTorchEspresso
+
+    try:
+        # Initialize a speech recognizer
+        speech_recognizer = PyTorchEspresso(
+            model="librispeech_transformer", espresso_config_filepath=None, device_type=device_type
+        )
+
+        # Create ragged signal data, the buckets of utterances of similar length are not in the order of the samples
+        rng = np.random.RandomState(seed=1234)
+        x = np.empty(4, dtype=object)
+        x[:] = [(rng.randn(length) * 100).astype(ART_NUMPY_DTYPE) for length in [1500, 1300, 1400, 1300]]
+
+        # Create labels
+        y = np.array(["HI", "SIX", "GOOD", "SIX"])
+
+        # Gradients computed on all utterances at once
+        grads = speech_recognizer.loss_gradient(x, y)
+
+        # Gradients computed on buckets of utterances of similar length are returned in the order of the samples
+        for batch_size in [1, 2, 3]:
+            grads_batched = speech_recognizer.loss_gradient(x, y, batch_size=batch_size)
+
+            assert grads_batched.shape == (4,)
+            for grad_batched, grad, x_i in zip(grads_batched, grads, x):
+                assert grad_batched.shape == x_i.shape
+                np.testing.assert_allclose(grad_batched, grad, rtol=1e-3, atol=1e-3 * np.abs(grad).max())
+
+    except ARTTestException as e:
+        art_warning(e)
@@ -36,6 +36,7 @@ from art.metrics.metrics import (
     clever_t,
     clever_u,
     clever,
+    clever_batch,
     loss_sensitivity,
     wasserstein_distance,
 )
@@ -414,6 +415,28 @@ class TestMetrics(unittest.TestCase):
         )
         self.assertIsNone(scores[0], msg="Clever scores for the predicted class should be `None`.")
 
+    def test_clever_batch(self):
+        batch_size = 100
+        (x_train, y_train), (x_test, _), _, _ = load_mnist()
+
+        # Get the classifier
+        krc = self._create_krclassifier()
+        krc.fit(x_train, y_train, batch_size=batch_size, nb_epochs=2, verbose=0)
+        pred_classes = np.argmax(krc.predict(x_test[:3]), axis=1)
+
+        scores = clever_batch(krc, x_test[:3], 5, 5, R_L2, 2, c_init=1, pool_factor=3, nb_workers=2, verbose=False)
+        self.assertEqual(scores.shape, (3, krc.nb_classes))
+        np.testing.assert_array_equal(np.isnan(scores), np.eye(krc.nb_classes, dtype=bool)[pred_classes])
+
+        # A single sample and target class reproduces `clever_t`
+        target = (pred_classes[0] + 1) % krc.nb_classes
+        master_seed(seed=42)
+        scores = clever_batch(krc, x_test[:1], 5, 5, R_L2, 2, target=int(target), pool_factor=3, verbose=False)
+        master_seed(seed=42)
+        score = clever_t(krc, x_test[0], target, 5, 5, R_L2, norm=2, pool_factor=3)
+        self.assertAlmostEqual(scores[0, target], score)
+        self.assertEqual(np.sum(np.isnan(scores)), krc.nb_classes - 1)
+
     def test_1_wasserstein_distance(self):
         nb_train = 1000
         nb_test = 100
@@ -23,12 +23,13 @@ import unittest
 import numpy as np
 import tensorflow as tf
 
-from art.utils import projection, random_sphere, uniform_sample_from_sphere_or_ball, to_categorical, least_likely_class
+from art.utils import projection, projection_l1_1, projection_l1_1_pytorch, projection_l1_1_tensorflow
+from art.utils import random_sphere, uniform_sample_from_sphere_or_ball, to_categorical, least_likely_class
 from art.utils import load_dataset, load_iris, load_mnist, load_nursery, load_cifar10
 from art.utils import second_most_likely_class, random_targets, get_label_conf, get_labels_np_array, preprocess
-from art.utils import compute_success_array, compute_success, check_and_transform_label_format
+from art.utils import compute_success_array, compute_success, check_and_transform_label_format, PredictionCache
 from art.utils import segment_by_class, performance_diff
-from art.utils import is_probability
+from art.utils import is_probability, length_buckets, pad_sequence_input, PackedSequences
 
 from tests.utils import master_seed
 
@@ -148,6 +149,57 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(x_proj.min(), -1.0)
         self.assertEqual(x_proj.max(), 1.0)
 
+    def test_projection_l1(self):
+        x = np.random.normal(size=(5, 2, 30))
+        x[0] = 0.0
+        x[1] *= 0.01
+        t = tuple(range(1, len(x.shape)))
+        eps = np.array([1.0, 1.0, 0.5, 2.0, 3.0])
+
+        x_proj_1 = projection(x, eps, 1.1)
+        x_proj_2 = projection(x, eps, 1.2)
+        self.assertEqual(x.shape, x_proj_1.shape)
+        np.testing.assert_array_almost_equal(x_proj_1, x_proj_2, decimal=6)
+
+        # points inside of their L1-ball are unchanged, the others are projected on its boundary
+        inside = np.sum(np.abs(x), axis=t) <= eps
+        self.assertTrue(inside[0] and inside[1] and not inside[2:].any())
+        np.testing.assert_array_almost_equal(x_proj_1[inside], x[inside])
+        np.testing.assert_array_almost_equal(np.sum(np.abs(x_proj_1[~inside]), axis=t), eps[~inside])
+        self.assertTrue(np.all(np.sign(x_proj_1) * np.sign(x) >= 0))
+
+        x_proj_scalar = projection(x, 2.0, 1.1)
+        np.testing.assert_array_almost_equal(x_proj_scalar[3], x_proj_1[3])
+
+        np.testing.assert_array_equal(projection(x, eps, 1), x_proj_1)
+        with self.assertRaises(NotImplementedError):
+            projection(x, np.ones(x.shape), 1)
+
+    def test_projection_l1_frameworks(self):
+        import torch
+
+        x = np.random.normal(size=(5, 3, 4, 4)).astype(np.float32)
+        x[0] = 0.0
+        x[1] *= 0.01
+        eps = np.array([1.0, 1.0, 0.5, 2.0, 3.0], dtype=np.float32)
+
+        for radii in [eps, 2.0]:
+            x_proj = projection_l1_1(x, radii)
+
+            x_proj_pt = projection_l1_1_pytorch(torch.from_numpy(x), radii)
+            self.assertIsInstance(x_proj_pt, torch.Tensor)
+            np.testing.assert_array_almost_equal(x_proj_pt.numpy(), x_proj, decimal=5)
+
+            x_proj_tf = projection_l1_1_tensorflow(tf.constant(x), radii)
+            self.assertIsInstance(x_proj_tf, tf.Tensor)
+            np.testing.assert_array_almost_equal(x_proj_tf.numpy(), x_proj, decimal=5)
+
+        np.testing.assert_array_almost_equal(
+            projection_l1_1_pytorch(torch.from_numpy(x), torch.from_numpy(eps)).numpy(),
+            projection_l1_1_tensorflow(tf.constant(x), tf.constant(eps)).numpy(),
+            decimal=5,
+        )
+
     def test_random_sphere(self):
         x = random_sphere(10, 10, 1, 1)
         self.assertEqual(x.shape, (10, 10))
@@ -407,6 +459,93 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(attack_success_targeted, 1.0)
         self.assertEqual(attack_success_untargeted, 1.0)
 
+    def test_prediction_cache(self):
+        class DummyClassifier:
+            def __init__(self):
+                self.nb_predict = 0
+                self.prediction_cache = PredictionCache(self, max_bytes=64)
+
+            def predict(self, x, batch_size):
+                self.nb_predict += 1
+                return x.astype(np.float32)
+
+        classifier = DummyClassifier()
+        x_clean = np.array([[0, 1], [1, 0]])
+        x_adv = np.array([[1, 0], [0, 1]])
+        labels = np.array([[1, 0], [0, 1]])
+
+        # the cache is only used while active
+        compute_success_array(classifier, x_clean, labels, x_adv)
+        compute_success_array(classifier, x_clean, labels, x_adv)
+        self.assertEqual(classifier.nb_predict, 4)
+        self.assertEqual(classifier.prediction_cache.hits + classifier.prediction_cache.misses, 0)
+
+        with classifier.prediction_cache.scope():
+            for _ in range(3):
+                attack_success = compute_success_array(classifier, x_clean, labels, x_adv)
+                self.assertTrue((attack_success == np.array([True, True])).all())
+            self.assertEqual(classifier.nb_predict, 8)
+            self.assertEqual(classifier.prediction_cache.hits, 2)
+            self.assertEqual(classifier.prediction_cache.misses, 1)
+
+            # keys depend on the content, modified inputs are predicted again
+            x_clean[0, 0] = 1
+            compute_success_array(classifier, x_clean, labels, x_adv)
+            self.assertEqual(classifier.prediction_cache.misses, 2)
+
+            # least recently used predictions are dropped beyond `max_bytes`
+            for i in range(5):
+                classifier.prediction_cache.predict(np.full((2, 2), i))
+            self.assertEqual(classifier.prediction_cache.misses, 7)
+            classifier.prediction_cache.predict(np.full((2, 2), 4))
+            classifier.prediction_cache.predict(np.full((2, 2), 0))
+            self.assertEqual(classifier.prediction_cache.hits, 3)
+            self.assertEqual(classifier.prediction_cache.misses, 8)
+
+        classifier.prediction_cache.predict(np.full((2, 2), 0))
+        self.assertEqual(classifier.prediction_cache.misses, 8)
+        self.assertEqual(classifier.nb_predict, 17)
+
+    def test_length_buckets(self):
+        lengths = np.array([3, 7, 5, 7, 1])
+        buckets = length_buckets(lengths, batch_size=2)
+        self.assertEqual([bucket.tolist() for bucket in buckets], [[1, 3], [2, 0], [4]])
+
+        with self.assertRaises(ValueError):
+            length_buckets(lengths, batch_size=0)
+
+    def test_packed_sequences(self):
+        x = np.empty(3, dtype=object)
+        x[0] = np.array([1.0, 2.0, 3.0])
+        x[1] = np.array([4.0])
+        x[2] = np.array([5.0, 6.0])
+
+        packed = PackedSequences.from_sequences(x)
+        self.assertEqual(packed.data.tolist(), [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        self.assertEqual(packed.offsets.tolist(), [0, 3, 4, 6])
+        self.assertEqual(packed[2].tolist(), [5.0, 6.0])
+        self.assertEqual(packed.repeat([1, 2, 3]).tolist(), [1, 1, 1, 2, 3, 3])
+        self.assertEqual(packed.data[packed.flat_indices(np.array([2, 0]))].tolist(), [5.0, 6.0, 1.0, 2.0, 3.0])
+
+        x_padded, x_mask = packed.pad()
+        np.testing.assert_array_equal(x_padded, np.array([[1.0, 2.0, 3.0], [4.0, 0.0, 0.0], [5.0, 6.0, 0.0]]))
+        np.testing.assert_array_equal(x_mask, x_padded != 0)
+        np.testing.assert_array_equal(pad_sequence_input(x)[0], x_padded)
+
+        unpacked = PackedSequences.from_padded(x_padded * 2, packed.lengths).to_array()
+        self.assertEqual(unpacked.shape, (3,))
+        self.assertEqual([x_i.tolist() for x_i in unpacked], [[2.0, 4.0, 6.0], [8.0], [10.0, 12.0]])
+
+        # sequences of equal length stay a 1-dimensional object array if ragged and a 2-dimensional array otherwise
+        x_equal = np.empty(2, dtype=object)
+        x_equal[0] = np.zeros(2)
+        x_equal[1] = np.ones(2)
+        self.assertEqual(PackedSequences.from_sequences(x_equal).with_data(np.arange(4)).to_array().shape, (2,))
+        self.assertEqual(PackedSequences.from_sequences(np.ones((2, 4))).to_array().shape, (2, 4))
+
+        with self.assertRaises(ValueError):
+            PackedSequences(np.zeros(5), packed.lengths)
+
     def test_preprocess(self):
         (x, y), (_, _), _, _ = load_mnist()
 